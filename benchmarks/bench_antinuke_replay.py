@@ -0,0 +1,219 @@
+"""
+Replay harness for AntiNuke's audit-log detection (cogs.antinuke).
+
+Feeds recorded audit log sequences through AntiNuke.on_audit_log_entry_create
+on a virtual clock and reports, per sequence, whether the actor was punished,
+at which event, and how long the punishment path took from the event
+arriving. The old fixed-window counter (reset when the first action of a
+window is older than the timeframe) is replayed alongside for comparison.
+
+A recording is a JSON list of events, each
+``{"t": seconds since start, "action": "<AuditLogAction name>", "user_id": id}``.
+Run from the repository root:
+
+    python benchmarks/bench_antinuke_replay.py [recording.json ...]
+
+Without arguments a few built-in sequences are replayed.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+
+from cogs.antinuke import detector
+from cogs.antinuke.antinuke import AntiNuke
+
+GUILD_ID = 1
+OWNER_ID = 2
+BOT_ID = 3
+NUKER_ID = 100
+TIMEFRAME = 10
+THRESHOLD = 3
+
+
+def burst(action, user_id, times):
+    return [{"t": t, "action": action, "user_id": user_id} for t in times]
+
+
+BUILTIN = {
+    # Three deletes within 2s, straddling the end of the fixed window opened at t=0
+    "straddling burst": burst("channel_delete", NUKER_ID, [0, 9, 10.5, 11]),
+    "mass ban": burst("ban", NUKER_ID, [i * 0.2 for i in range(20)]),
+    "slow moderator": burst("kick", NUKER_ID, [i * 6 for i in range(10)]),
+    "webhook spam": burst("webhook_create", NUKER_ID, [i * 0.05 for i in range(10)]),
+    "role wipe": burst("role_delete", NUKER_ID, [i * 0.5 for i in range(12)]),
+}
+
+
+class VirtualClock:
+    """Stands in for the time module inside the detector so recordings replay instantly"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def monotonic(self):
+        return self.now
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class FakeMember:
+    def __init__(self, guild, member_id):
+        self.guild = guild
+        self.id = member_id
+        self.name = f"member{member_id}"
+        self.mention = f"<@{member_id}>"
+        self.roles = []
+    
+    async def ban(self, reason=None):
+        self.guild.punished.append((self.id, time.perf_counter()))
+    
+    async def kick(self, reason=None):
+        self.guild.punished.append((self.id, time.perf_counter()))
+    
+    async def remove_roles(self, *roles, reason=None):
+        self.guild.punished.append((self.id, time.perf_counter()))
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id = GUILD_ID
+        self.owner_id = OWNER_ID
+        self.name = "replay"
+        self.system_channel = None
+        self.default_role = None
+        self.punished = []
+        self._members = {}
+    
+    def get_member(self, member_id):
+        if member_id not in self._members:
+            self._members[member_id] = FakeMember(self, member_id)
+        return self._members[member_id]
+    
+    async def ban(self, user, reason=None):
+        self.punished.append((user.id, time.perf_counter()))
+
+
+class FakeEntry:
+    def __init__(self, guild, action, user_id):
+        self.guild = guild
+        self.action = action
+        self.user_id = user_id
+        self.target = None
+        self.before = None
+        self.after = None
+
+
+class FakeStore:
+    def save(self, path, data, indent=4):
+        pass
+
+
+class FakeBot:
+    def __init__(self):
+        self.user = FakeUser(BOT_ID)
+        self.json_store = FakeStore()
+    
+    def is_closed(self):
+        return False
+
+
+def make_cog():
+    cog = AntiNuke(FakeBot())
+    settings = {
+        "modules": {
+            "kick": True, "ban": True, "channel": True, "role": True, "emoji": True,
+            "webhook": True, "botadd": True,
+            "permissions": {"enabled": True, "monitored": ["administrator"]}
+        },
+        "thresholds": {key: THRESHOLD for key in (
+            "kick", "ban", "channel_delete", "channel_create", "role_delete",
+            "emoji_delete", "webhook_create", "bot_add"
+        )},
+        "timeframe": TIMEFRAME,
+        "whitelist": [],
+        "bot_whitelist": [],
+        "admins": [],
+        "punishment": "ban"
+    }
+    cog.settings = {str(GUILD_ID): settings}
+    return cog
+
+
+def legacy_detect(events):
+    """Index of the event at which the old fixed-window counter would have fired"""
+    counters = {}
+    for index, event in enumerate(events):
+        key = (event["user_id"], event["action"])
+        counter = counters.setdefault(key, {"count": 0, "first_action": event["t"]})
+        counter["count"] += 1
+        if event["t"] - counter["first_action"] > TIMEFRAME:
+            counter.update(count=1, first_action=event["t"])
+        if counter["count"] >= THRESHOLD:
+            return index
+    return None
+
+
+async def replay(events):
+    clock = VirtualClock()
+    detector.time = clock
+    cog = make_cog()
+    guild = FakeGuild()
+    
+    fired_at = None
+    latencies = []
+    for index, event in enumerate(events):
+        clock.now = event["t"]
+        entry = FakeEntry(guild, discord.AuditLogAction[event["action"]], event["user_id"])
+        before = len(guild.punished)
+        start = time.perf_counter()
+        await cog.on_audit_log_entry_create(entry)
+        if len(guild.punished) > before:
+            latencies.append((guild.punished[-1][1] - start) * 1000)
+            if fired_at is None:
+                fired_at = index
+    
+    detector.time = time
+    return fired_at, latencies
+
+
+def describe(events, index):
+    if index is None:
+        return "not detected"
+    return f"event {index + 1}/{len(events)} (t={events[index]['t']:.2f}s)"
+
+
+def main():
+    # Punishment log lines would drown out the report
+    logging.getLogger('bot').setLevel(logging.ERROR)
+    
+    recordings = {}
+    for path in sys.argv[1:]:
+        with open(path, 'r') as f:
+            recordings[os.path.basename(path)] = json.load(f)
+    if not recordings:
+        recordings = BUILTIN
+    
+    print(f"threshold {THRESHOLD} actions in {TIMEFRAME}s")
+    for name, events in recordings.items():
+        fired_at, latencies = asyncio.run(replay(events))
+        print(name)
+        print(f"  sliding window : {describe(events, fired_at)}")
+        print(f"  fixed window   : {describe(events, legacy_detect(events))}")
+        if latencies:
+            print(f"  event -> punishment: median {statistics.median(latencies):.3f} ms, max {max(latencies):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark for the economy leaderboard index (core.ranking).
+
+Builds 100k synthetic accounts, then compares the old full rebuild-and-sort
+(what EconomyDB._update_leaderboard did on every balance change and every
+leaderboard call) against RankIndex updates, top-10 reads and rank lookups.
+Run from the repository root:
+
+    python benchmarks/bench_economy_leaderboard.py [accounts] [operations]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ranking import RankIndex
+
+ACCOUNTS = 100_000
+OPERATIONS = 200
+
+
+def make_users(count):
+    """Synthetic accounts in the legacy economy.json shape"""
+    rng = random.Random(42)
+    return {
+        str(user_id): {
+            'username': f"user{user_id}",
+            'wallet': rng.randint(0, 50_000),
+            'bank': rng.randint(0, 10_000),
+            'total_earnings': rng.randint(100, 500_000)
+        }
+        for user_id in range(count)
+    }
+
+
+def old_update_leaderboard(users):
+    """The pre-index implementation: rebuild and sort both boards"""
+    balance = [
+        {'user_id': user_id, 'username': data['username'], 'amount': data['wallet'] + data['bank']}
+        for user_id, data in users.items()
+    ]
+    balance.sort(key=lambda x: x['amount'], reverse=True)
+
+    earnings = [
+        {'user_id': user_id, 'username': data['username'], 'amount': data['total_earnings']}
+        for user_id, data in users.items()
+    ]
+    earnings.sort(key=lambda x: x['amount'], reverse=True)
+
+    return {'balance': balance, 'earnings': earnings}
+
+
+def old_rank(leaderboard, user_id):
+    """Rank lookup against the rebuilt list"""
+    for position, entry in enumerate(leaderboard, start=1):
+        if entry['user_id'] == user_id:
+            return position
+    return None
+
+
+def bench_old(users, changes):
+    start = time.perf_counter()
+    for user_id, delta in changes:
+        users[user_id]['wallet'] += delta
+        users[user_id]['total_earnings'] += max(delta, 0)
+        boards = old_update_leaderboard(users)
+        boards['balance'][:10]
+        old_rank(boards['balance'], user_id)
+    return time.perf_counter() - start
+
+
+def bench_index(users, changes):
+    build_start = time.perf_counter()
+    balance = RankIndex()
+    earnings = RankIndex()
+    balance.load((user_id, data['wallet'] + data['bank']) for user_id, data in users.items())
+    earnings.load((user_id, data['total_earnings']) for user_id, data in users.items())
+    build = time.perf_counter() - build_start
+
+    start = time.perf_counter()
+    for user_id, delta in changes:
+        data = users[user_id]
+        data['wallet'] += delta
+        data['total_earnings'] += max(delta, 0)
+        balance.update(user_id, data['wallet'] + data['bank'])
+        earnings.update(user_id, data['total_earnings'])
+        balance.top(10)
+        balance.rank(user_id)
+    return build, time.perf_counter() - start
+
+
+def main():
+    accounts = int(sys.argv[1]) if len(sys.argv) > 1 else ACCOUNTS
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else OPERATIONS
+
+    rng = random.Random(7)
+    changes = [(str(rng.randrange(accounts)), rng.randint(-500, 2_000)) for _ in range(operations)]
+
+    print(f"{accounts} accounts, {operations} balance changes (each followed by a top-10 read and a rank lookup)")
+
+    old_elapsed = bench_old(make_users(accounts), changes)
+    build, new_elapsed = bench_index(make_users(accounts), changes)
+
+    print(f"  full rebuild + sort : {old_elapsed * 1000 / operations:9.3f} ms/op")
+    print(f"  RankIndex           : {new_elapsed * 1000 / operations:9.3f} ms/op")
+    print(f"  RankIndex build     : {build:9.3f} s (once, at startup)")
+    print(f"  speedup             : {old_elapsed / new_elapsed:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Event-loop lag probe for Pokemon commands.
+
+Runs the database work behind !battle, !party and !pokebuy for many
+simulated users while core.loop_monitor.LoopLagProbe measures how late the
+event loop wakes up. The old implementation (blocking sqlite3 calls made
+directly from coroutines) is reproduced for comparison. Run from the
+repository root:
+
+    python benchmarks/bench_pokemon_loop_lag.py [commands]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import get_pool, close_all_pools
+from core.loop_monitor import LoopLagProbe
+from cogs.pokemon.pokemon_db import PokemonDB
+
+TRAINERS = 200
+
+
+LEGACY_SCHEMA = """
+    CREATE TABLE trainers (
+        user_id TEXT PRIMARY KEY, username TEXT, level INTEGER DEFAULT 1,
+        xp INTEGER DEFAULT 0, xp_to_level INTEGER DEFAULT 100, primary_pokemon TEXT,
+        party TEXT, pokedex TEXT, inventory TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE pokemon (
+        id TEXT PRIMARY KEY, trainer_id TEXT, pokemon_id INTEGER, level INTEGER DEFAULT 5,
+        xp INTEGER DEFAULT 0, xp_to_level INTEGER DEFAULT 100, display_name TEXT, nickname TEXT,
+        types TEXT, stats TEXT, moves TEXT, current_hp INTEGER, sprite_url TEXT,
+        caught_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+def seed_legacy(db_path):
+    """Create a pre-migration pokemon.db where every trainer owns a primary Pokemon"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    for user_id in range(TRAINERS):
+        pokemon_id = f"{user_id}_25_10000"
+        conn.execute(
+            "INSERT INTO trainers (user_id, username, party, pokedex, inventory, primary_pokemon) VALUES (?, ?, ?, ?, ?, ?)",
+            (str(user_id), f"user{user_id}", json.dumps([pokemon_id]), "[25]",
+             json.dumps({"pokeballs": 5}), pokemon_id)
+        )
+        conn.execute(
+            """
+            INSERT INTO pokemon (id, trainer_id, pokemon_id, level, display_name, types, stats, moves, current_hp)
+            VALUES (?, ?, 25, 5, 'Pikachu', '["electric"]', ?, ?, 35)
+            """,
+            (pokemon_id, str(user_id), json.dumps({"hp": 35, "attack": 55}),
+             json.dumps([{"name": "thunder-shock", "url": ""}]))
+        )
+    conn.commit()
+    conn.close()
+
+
+def blocking_battle(db_path, user_id):
+    """The pre-change implementation of the battle write path"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT primary_pokemon FROM trainers WHERE user_id = ?", (str(user_id),))
+    primary_id = cursor.fetchone()[0]
+    cursor.execute("SELECT xp FROM pokemon WHERE id = ?", (primary_id,))
+    cursor.execute("UPDATE pokemon SET xp = xp + ? WHERE id = ?", (random.randint(10, 20), primary_id))
+    cursor.execute("UPDATE trainers SET xp = xp + ? WHERE user_id = ?", (random.randint(5, 10), str(user_id)))
+    conn.commit()
+    conn.close()
+
+
+def blocking_party(db_path, user_id):
+    """The pre-change implementation of get_party"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute("SELECT party FROM trainers WHERE user_id = ?", (str(user_id),))
+    for pokemon_id in json.loads(cursor.fetchone()['party']):
+        cursor.execute("SELECT * FROM pokemon WHERE id = ?", (pokemon_id,))
+        json.loads(cursor.fetchone()['stats'])
+    conn.close()
+
+
+def blocking_buy(db_path, user_id):
+    """The pre-change implementation of add_to_inventory"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT inventory FROM trainers WHERE user_id = ?", (str(user_id),))
+    inventory = json.loads(cursor.fetchone()[0])
+    inventory["pokeballs"] = inventory.get("pokeballs", 0) + 1
+    cursor.execute("UPDATE trainers SET inventory = ? WHERE user_id = ?", (json.dumps(inventory), str(user_id)))
+    conn.commit()
+    conn.close()
+
+
+async def old_command(db_path, user_id):
+    blocking_battle(db_path, user_id)
+    blocking_party(db_path, user_id)
+    blocking_buy(db_path, user_id)
+
+
+async def new_command(db, user_id):
+    await db.handle_battle(user_id)
+    await db.get_party(user_id)
+    await db.add_to_inventory(user_id, "pokeballs", 1)
+
+
+async def run(label, make_command, commands):
+    async with LoopLagProbe() as probe:
+        start = time.perf_counter()
+        await asyncio.gather(*(make_command(i % TRAINERS) for i in range(commands)))
+        elapsed = time.perf_counter() - start
+    
+    stats = probe.summary()
+    print(
+        f"{label:<28} {elapsed:6.2f}s  loop lag max {stats['max_ms']:7.1f}ms  "
+        f"p99 {stats['p99_ms']:6.1f}ms  mean {stats['mean_ms']:5.2f}ms"
+    )
+
+
+async def main(commands):
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "old.db")
+        new_path = os.path.join(tmp, "new.db")
+        
+        seed_legacy(old_path)
+        seed_legacy(new_path)
+        
+        # The new code migrates the legacy JSON columns on first start
+        new_db = PokemonDB(offline=True)
+        new_db.db_path, new_db.pool = new_path, get_pool(new_path)
+        new_db.species_cache.pool = new_db.pool
+        await new_db.initialize()
+        
+        print(f"{commands} simulated commands over {TRAINERS} trainers\n")
+        await run("blocking sqlite3 (old)", lambda user_id: old_command(old_path, user_id), commands)
+        await run("pooled aiosqlite (new)", lambda user_id: new_command(new_db, user_id), commands)
+        
+        await close_all_pools()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
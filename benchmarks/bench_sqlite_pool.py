@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for the pooled SQLite layer (core.database).
+
+Compares queries per second for LevelsDB.get_user_level and
+LastFMDB.get_lastfm_username using the old connect-per-query pattern
+against the shared pool. Run from the repository root:
+
+    python benchmarks/bench_sqlite_pool.py [iterations]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+import aiosqlite
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import close_all_pools
+from cogs.levels.levels_db import LevelsDB
+from cogs.lastfm.lastfm_db import LastFMDB
+
+USERS = 1000
+
+
+async def seed(levels, lastfm):
+    """Create a realistic number of rows in both databases"""
+    await levels.initialize()
+    await lastfm.initialize()
+    for user_id in range(USERS):
+        await levels.get_user_level("1", str(user_id))
+        await lastfm.register_user(str(user_id), f"user{user_id}", f"fm{user_id}")
+
+
+async def old_get_user_level(db_path, guild_id, user_id):
+    """The pre-pool implementation: one connection per query"""
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            "SELECT * FROM user_levels WHERE guild_id = ? AND user_id = ?",
+            (str(guild_id), str(user_id))
+        ) as cursor:
+            result = await cursor.fetchone()
+            return dict(result) if result else None
+
+
+async def old_get_lastfm_username(db_path, user_id):
+    """The pre-pool implementation: one connection per query"""
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute(
+            "SELECT lastfm_username FROM lastfm_users WHERE user_id = ?",
+            (str(user_id),)
+        ) as cursor:
+            result = await cursor.fetchone()
+            return result[0] if result else None
+
+
+async def measure(label, make_call, iterations, concurrency=8):
+    """Run make_call(i) iterations times with a fixed concurrency and print QPS"""
+    queue = iter(range(iterations))
+    
+    async def worker():
+        for i in queue:
+            await make_call(i % USERS)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    qps = iterations / elapsed
+    print(f"{label:<40} {qps:>10.0f} q/s  ({elapsed:.2f}s)")
+    return qps
+
+
+async def main(iterations):
+    levels = LevelsDB()
+    lastfm = LastFMDB()
+    await seed(levels, lastfm)
+    
+    print(f"{iterations} queries per run, {USERS} seeded users\n")
+    
+    before = await measure(
+        "get_user_level (connect per query)",
+        lambda i: old_get_user_level(levels.db_path, "1", i), iterations)
+    after = await measure(
+        "get_user_level (pooled)",
+        lambda i: levels.get_user_level("1", str(i)), iterations)
+    print(f"{'speedup':<40} {after / before:>10.1f}x\n")
+    
+    before = await measure(
+        "get_lastfm_username (connect per query)",
+        lambda i: old_get_lastfm_username(lastfm.db_path, i), iterations)
+    after = await measure(
+        "get_lastfm_username (pooled)",
+        lambda i: lastfm.get_lastfm_username(str(i)), iterations)
+    print(f"{'speedup':<40} {after / before:>10.1f}x")
+    
+    await close_all_pools()
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        asyncio.run(main(iterations))
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark for the compiled trigger matcher (core.matching).
+
+Compares the old AutoReactions scan (compile a \\b-wrapped regex for every
+trigger on every message) against a TriggerMatcher built once per guild,
+at 1k and 10k triggers. Run from the repository root:
+
+    python benchmarks/bench_trigger_matcher.py [messages]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.matching import TriggerMatcher
+
+TRIGGER_COUNTS = (1_000, 10_000)
+MESSAGES = 200
+
+
+def make_words(rng, count):
+    """Random lowercase words so triggers rarely collide"""
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def make_messages(rng, triggers, count):
+    """Chat-sized messages, about a third of them containing a trigger"""
+    filler = make_words(rng, 500)
+    messages = []
+    for _ in range(count):
+        words = [rng.choice(filler) for _ in range(rng.randint(5, 40))]
+        if rng.random() < 0.33:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(triggers).upper())
+        messages.append(' '.join(words))
+    return messages
+
+
+def old_matches(triggers, content):
+    """The pre-matcher implementation from _check_reaction_triggers"""
+    content = content.lower()
+    found = []
+    for trigger in triggers:
+        pattern = re.compile(r'\b' + re.escape(trigger.lower()) + r'\b')
+        if pattern.search(content):
+            found.append(trigger)
+    return found
+
+
+def bench(trigger_count, message_count):
+    rng = random.Random(trigger_count)
+    triggers = make_words(rng, trigger_count)
+    messages = make_messages(rng, triggers, message_count)
+    
+    start = time.perf_counter()
+    old_results = [old_matches(triggers, message) for message in messages]
+    old_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    matcher = TriggerMatcher(triggers)
+    build = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    new_results = [matcher.matches(message) for message in messages]
+    new_elapsed = time.perf_counter() - start
+    
+    assert old_results == new_results, "matcher disagrees with the regex scan"
+    
+    print(f"{trigger_count} triggers, {message_count} messages")
+    print(f"  regex per trigger : {old_elapsed * 1000 / message_count:9.3f} ms/message")
+    print(f"  TriggerMatcher    : {new_elapsed * 1000 / message_count:9.3f} ms/message")
+    print(f"  matcher build     : {build * 1000:9.3f} ms (once per triggers.json change)")
+    print(f"  speedup           : {old_elapsed / new_elapsed:9.1f}x")
+
+
+def main():
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGES
+    for trigger_count in TRIGGER_COUNTS:
+        bench(trigger_count, message_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,15 @@ from dotenv import load_dotenv
 # Import custom checks
 import custom_checks
 
+from core.database import close_all_pools
+from core.http import configure_http_client, close_http_client, DEFAULT_PER_HOST, DEFAULT_TIMEOUT
+from core.scheduler import Scheduler
+from core.feeds import FeedPoller, DEFAULT_CONCURRENCY as FEED_CONCURRENCY
+from core.persistence import get_json_store, close_json_store
+from core.joins import JoinPipeline
+from core.bulk_actions import BulkActionEngine
+from core.member_stats import MemberStatsIndex
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO, 
@@ -23,9 +32,21 @@ load_dotenv()
 os.makedirs('data', exist_ok=True)
 os.makedirs('config', exist_ok=True)
 
+class QxrKBot(commands.Bot):
+    async def close(self):
+        # Unload cogs first so they can flush, then release shared resources
+        await super().close()
+        await self.scheduler.close()
+        await self.feeds.close()
+        await self.bulk_actions.close()
+        await close_json_store()
+        await close_http_client()
+        await close_all_pools()
+        logger.info("Flushed JSON files, closed shared HTTP client and database pools")
+
 # Bot configuration
 intents = discord.Intents.all()
-bot = commands.Bot(command_prefix='!', intents=intents, help_command=None)
+bot = QxrKBot(command_prefix='!', intents=intents, help_command=None)
 
 # Load config
 bot.config = {}
@@ -47,6 +68,36 @@ try:
 except Exception as e:
     logger.error(f"Error loading configuration: {e}")
 
+# Shared HTTP client for every cog's outbound API calls
+bot.http_client = configure_http_client(
+    per_host=bot.config.get("http_per_host_limit", DEFAULT_PER_HOST),
+    timeout=bot.config.get("http_timeout", DEFAULT_TIMEOUT)
+)
+
+# Debounced, atomic writes for the cogs' JSON config and data files
+bot.json_store = get_json_store()
+
+# Durable timers (reminders, jails, tempbans, giveaways); jobs fire once the bot is ready
+bot.scheduler = Scheduler(wait_until=bot.wait_until_ready)
+
+# Shared polling engine for the YouTube/Twitch/X/TikTok/Instagram/SoundCloud notifiers
+bot.feeds = FeedPoller(
+    concurrency=bot.config.get("feed_concurrency", FEED_CONCURRENCY),
+    wait_until=bot.wait_until_ready
+)
+
+# One on_member_join handler: antiraid verdict, then every cog's join roles in a single edit
+bot.joins = JoinPipeline()
+bot.add_listener(bot.joins.handle, "on_member_join")
+
+# Mass bans, kicks and unbans (raid cleanup, recentban, unbanall); unfinished jobs resume after a restart
+bot.bulk_actions = BulkActionEngine(get_guild=bot.get_guild, wait_until=bot.wait_until_ready)
+
+# Per-guild human/bot/booster/status counts and join order, kept current from member events
+bot.member_stats = MemberStatsIndex()
+for event, listener in bot.member_stats.listeners():
+    bot.add_listener(listener, event)
+
 @bot.event
 async def on_ready():
     logger.info(f'Logged in as {bot.user} (ID: {bot.user.id})')
@@ -109,6 +160,7 @@ async def load_extensions():
 @bot.event
 async def setup_hook():
     try:
+        await bot.scheduler.start()
         await load_extensions()
         logger.info("Setup hook completed")
     except Exception as e:
@@ -120,6 +172,86 @@ async def ping(ctx):
     latency = round(bot.latency * 1000)
     await ctx.send(f"Pong! 🏓 Bot latency: {latency}ms")
 
+@bot.command(name="httpstats")
+@commands.is_owner()
+async def httpstats(ctx):
+    """Show per-host request counts, errors and latency for outbound API calls."""
+    stats = bot.http_client.stats()
+    if not stats:
+        await ctx.send("No outbound HTTP requests have been made yet.")
+        return
+
+    lines = [
+        f"`{host or 'unknown'}` - {data['requests']} req, {data['errors']} errors, "
+        f"{data['http_errors']} HTTP errors, avg {data['avg_ms']}ms, max {data['max_ms']}ms"
+        for host, data in stats.items()
+    ]
+    await ctx.send("\n".join(lines)[:2000])
+
+@bot.command(name="feedstats")
+@commands.is_owner()
+async def feedstats(ctx):
+    """Show polling counts, errors and adaptive intervals for the social feed notifiers."""
+    stats = bot.feeds.stats()
+    if not stats:
+        await ctx.send("No feed notifiers are registered.")
+        return
+
+    lines = [
+        f"`{name}` - {data['accounts']} accounts, {data['polls']} polls, {data['new_items']} new, "
+        f"{data['errors']} errors, {data['sent']} sent ({data['send_failed']} failed), "
+        f"avg fetch {data['avg_fetch_ms']}ms, avg interval {data['avg_interval_min']}min"
+        for name, data in stats.items()
+    ]
+    await ctx.send("\n".join(lines)[:2000])
+
+@bot.command(name="storestats")
+@commands.is_owner()
+async def storestats(ctx):
+    """Show save requests, writes and write latency per JSON data directory."""
+    stats = bot.json_store.stats()
+    if not stats:
+        await ctx.send("No JSON files have been saved yet.")
+        return
+
+    lines = [
+        f"`{directory}/` - {data['requests']} saves, {data['writes']} writes ({data['coalesced']} coalesced), "
+        f"{data['errors']} errors, avg {data['avg_ms']}ms, max {data['max_ms']}ms"
+        for directory, data in stats.items()
+    ]
+    await ctx.send("\n".join(lines)[:2000])
+
+@bot.command(name="joinstats")
+@commands.is_owner()
+async def joinstats(ctx):
+    """Show per-stage timings for the member join pipeline."""
+    stats = bot.joins.stats()
+    lines = [
+        f"{stats['joins']} joins, {stats['removed']} removed by gates, {stats['edits']} role edits "
+        f"carrying {stats['merged_roles']} roles"
+    ]
+    lines.extend(
+        f"`{stage}` - {data['runs']} runs, {data['errors']} errors, avg {data['avg_ms']}ms, max {data['max_ms']}ms"
+        for stage, data in stats["stages"].items()
+    )
+    await ctx.send("\n".join(lines)[:2000])
+
+@bot.command(name="bulkstats")
+@commands.is_owner()
+async def bulkstats(ctx):
+    """Show running bulk moderation jobs and how many API calls they made."""
+    stats = bot.bulk_actions.stats()
+    lines = [
+        f"{stats['bulk_calls']} bulk ban calls, {stats['single_calls']} single calls, "
+        f"{stats['backoffs']} rate limit backoffs"
+    ]
+    lines.extend(
+        f"`{key}` - {data['action']} {data['done']}/{data['total']}, "
+        f"{data['succeeded']} succeeded, {data['failed']} failed"
+        for key, data in stats["jobs"].items()
+    )
+    await ctx.send("\n".join(lines)[:2000])
+
 # Run the bot
 if __name__ == "__main__":
     token = os.getenv("TOKEN")
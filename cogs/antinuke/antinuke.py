@@ -3,8 +3,14 @@ from discord.ext import commands
 import json
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 import asyncio
+import time
+
+from .detector import (
+    AUDIT_ACTIONS, PERMISSION_ACTIONS, DEFAULT_THRESHOLD, PERMISSION_THRESHOLD,
+    SlidingWindowCounter, granted_permissions
+)
 
 logger = logging.getLogger('bot')
 
@@ -21,6 +27,9 @@ ACTIONS = {
     "PERMISSION_CHANGE": "permission_change"
 }
 
+# Seconds a punished user is not punished again
+PUNISH_COOLDOWN = 300
+
 class AntiNuke(commands.Cog):
     """Commands to protect your server against nuking and mass destructive actions"""
     
@@ -28,8 +37,12 @@ class AntiNuke(commands.Cog):
         self.bot = bot
         self.config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'antinuke')
         self.settings = {}
-        self.action_counters = {}
-        self.recently_punished = set()
+        # Sliding-window action counts keyed by (guild_id, user_id, action_type)
+        self.action_counters = SlidingWindowCounter()
+        # Structure: {(guild_id, user_id): monotonic time punished}
+        self.recently_punished = {}
+        # Milliseconds from audit log event to punishment, for the most recent detections
+        self.detection_latency = []
         
         # Create directory if it doesn't exist
         os.makedirs(self.config_path, exist_ok=True)
@@ -37,12 +50,16 @@ class AntiNuke(commands.Cog):
         # Load settings
         self._load_settings()
         
-        # Start cleanup task
-        self.cleanup_task = bot.loop.create_task(self._cleanup_counters())
+        self.cleanup_task = None
+    
+    async def cog_load(self):
+        """Start the counter cleanup task"""
+        self.cleanup_task = asyncio.create_task(self._cleanup_counters())
     
     def cog_unload(self):
         """Called when the cog is unloaded"""
-        self.cleanup_task.cancel()
+        if self.cleanup_task:
+            self.cleanup_task.cancel()
     
     def _load_settings(self):
         """Load antinuke settings from file"""
@@ -58,8 +75,7 @@ class AntiNuke(commands.Cog):
         """Save antinuke settings to file"""
         try:
             filepath = f"{self.config_path}/settings.json"
-            with open(filepath, "w") as f:
-                json.dump(self.settings, f, indent=4)
+            self.bot.json_store.save(filepath, self.settings)
         except Exception as e:
             logger.error(f"Error saving antinuke settings: {str(e)}")
     
@@ -129,127 +145,100 @@ class AntiNuke(commands.Cog):
         settings = self._get_guild_settings(guild_id)
         return str(bot_id) in settings["bot_whitelist"]
     
-    async def _increment_counter(self, guild_id, user_id, action_type):
-        """Increment action counter for a user"""
-        guild_id = str(guild_id)
-        user_id = str(user_id)
+    def _record_action(self, guild_id, user_id, action_type, threshold, timeframe):
+        """Count an action against a user; returns how many they made inside the timeframe"""
+        return self.action_counters.hit((guild_id, user_id, action_type), threshold, timeframe)
         
-        if guild_id not in self.action_counters:
-            self.action_counters[guild_id] = {}
+    def _is_exempt(self, guild, settings, user_id):
+        """Actions by the owner, the bot itself and whitelisted users are never counted"""
+        if user_id is None or user_id == guild.owner_id or user_id == self.bot.user.id:
+            return True
+        return str(user_id) in settings["whitelist"]
             
-        if user_id not in self.action_counters[guild_id]:
-            self.action_counters[guild_id][user_id] = {}
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry):
+        """Feed destructive audit log actions into the sliding-window counters"""
+        received = time.perf_counter()
+        guild = entry.guild
             
-        if action_type not in self.action_counters[guild_id][user_id]:
-            self.action_counters[guild_id][user_id][action_type] = {
-                "count": 0,
-                "first_action": datetime.utcnow()
-            }
-        
-        # Update counter
-        self.action_counters[guild_id][user_id][action_type]["count"] += 1
-        
-        # Check if we need to reset the counter based on timeframe
-        settings = self._get_guild_settings(guild_id)
-        timeframe = settings["timeframe"]
-        first_action = self.action_counters[guild_id][user_id][action_type]["first_action"]
+        # Guilds that never configured AntiNuke have every module disabled
+        settings = self.settings.get(str(guild.id))
+        if settings is None:
+            return
         
-        if (datetime.utcnow() - first_action).total_seconds() > timeframe:
-            # Reset counter if outside timeframe
-            self.action_counters[guild_id][user_id][action_type] = {
-                "count": 1,
-                "first_action": datetime.utcnow()
-            }
-    
-    def _check_threshold_exceeded(self, guild_id, user_id, action_type):
-        """Check if a user has exceeded the threshold for an action"""
-        guild_id = str(guild_id)
-        user_id = str(user_id)
+        if entry.action in PERMISSION_ACTIONS:
+            permissions_module = settings["modules"]["permissions"]
+            if not permissions_module["enabled"]:
+                return
+            granted = granted_permissions(entry, permissions_module["monitored"])
+            if not granted:
+                return
+            action_type = ACTIONS["PERMISSION_CHANGE"]
+            threshold = settings["thresholds"].get(action_type, PERMISSION_THRESHOLD)
+            detail = f"granted {', '.join(perm.replace('_', ' ') for perm in granted)}"
+        else:
+            mapping = AUDIT_ACTIONS.get(entry.action)
+            if mapping is None:
+                return
+            module, action_type = mapping
+            if not settings["modules"].get(module):
+                return
+            if action_type == ACTIONS["BOT_ADD"] and entry.target is not None and self._is_bot_whitelisted(guild.id, entry.target.id):
+                return
+            threshold = settings["thresholds"].get(action_type, DEFAULT_THRESHOLD)
+            detail = None
         
-        if guild_id not in self.action_counters:
-            return False
-            
-        if user_id not in self.action_counters[guild_id]:
-            return False
-            
-        if action_type not in self.action_counters[guild_id][user_id]:
-            return False
+        if self._is_exempt(guild, settings, entry.user_id):
+            return
         
-        settings = self._get_guild_settings(guild_id)
-        threshold = settings["thresholds"].get(action_type, 3)
         timeframe = settings["timeframe"]
-        counter = self.action_counters[guild_id][user_id][action_type]
+        count = self._record_action(guild.id, entry.user_id, action_type, threshold, timeframe)
+        if count < threshold:
+            return
         
-        # Check if counter is within timeframe
-        if (datetime.utcnow() - counter["first_action"]).total_seconds() <= timeframe:
-            return counter["count"] >= threshold
-            
-        return False
+        self.action_counters.reset((guild.id, entry.user_id, action_type))
+        if detail is None:
+            detail = f"{count} {action_type.replace('_', ' ')} actions within {timeframe} seconds"
+        await self._take_antinuke_action(guild, entry.user_id, action_type, detail, detected_at=received)
     
     async def _cleanup_counters(self):
-        """Periodically clean up old counters"""
+        """Periodically drop idle counters and expired punishment cooldowns"""
         while not self.bot.is_closed():
             try:
-                now = datetime.utcnow()
-                for guild_id in list(self.action_counters.keys()):
-                    for user_id in list(self.action_counters[guild_id].keys()):
-                        for action_type in list(self.action_counters[guild_id][user_id].keys()):
-                            counter = self.action_counters[guild_id][user_id][action_type]
-                            timeframe = self.settings[guild_id]["timeframe"] if guild_id in self.settings else 10
+                timeframes = [settings.get("timeframe", 10) for settings in self.settings.values()]
+                self.action_counters.prune(max(timeframes, default=10))
                             
-                            if (now - counter["first_action"]).total_seconds() > timeframe:
-                                del self.action_counters[guild_id][user_id][action_type]
-                                
-                        # Clean up empty user entries
-                        if not self.action_counters[guild_id][user_id]:
-                            del self.action_counters[guild_id][user_id]
-                            
-                    # Clean up empty guild entries
-                    if not self.action_counters[guild_id]:
-                        del self.action_counters[guild_id]
+                now = time.monotonic()
+                for key, punished_at in list(self.recently_punished.items()):
+                    if now - punished_at >= PUNISH_COOLDOWN:
+                        del self.recently_punished[key]
             except Exception as e:
                 logger.error(f"Error cleaning up counters: {str(e)}")
                 
-            # Clear recently punished set after 5 minutes
-            now = datetime.utcnow()
-            new_recently_punished = set()
-            for entry in self.recently_punished:
-                if isinstance(entry, tuple) and len(entry) == 2:
-                    user_id, timestamp = entry
-                    if now - timestamp < timedelta(minutes=5):
-                        new_recently_punished.add(entry)
-            self.recently_punished = new_recently_punished
-            
             await asyncio.sleep(60)  # Run cleanup every minute
     
-    async def _take_antinuke_action(self, guild, user_id, action_type, reason):
+    async def _take_antinuke_action(self, guild, user_id, action_type, reason, detected_at=None):
         """Take action against a user who triggered antinuke"""
         try:
-            # Skip if already punished recently
-            for punished in self.recently_punished:
-                if punished[0] == user_id and (datetime.utcnow() - punished[1]) < timedelta(minutes=5):
-                    return
-            
-            # If punishment has already been applied within 5 minutes, don't apply again
-            punish_key = (user_id, guild.id, action_type)
-            if punish_key in self.recently_punished:
+            # Skip if already punished recently; marked before any await so a burst of
+            # events for the same user only punishes once
+            punish_key = (guild.id, int(user_id))
+            punished_at = self.recently_punished.get(punish_key)
+            if punished_at is not None and time.monotonic() - punished_at < PUNISH_COOLDOWN:
                 return
+            self.recently_punished[punish_key] = time.monotonic()
                 
             settings = self._get_guild_settings(guild.id)
             punishment = settings["punishment"]
             
-            # Get the user
-            user = await self.bot.fetch_user(int(user_id))
-            if not user:
-                return
-                
-            # Get the member
+            # Get the member from cache so the punishment is not held up by an API call
             member = guild.get_member(int(user_id))
             if not member:
-                # If member not found but user exists, they might have left
+                # If member not found, they might have left
                 if punishment == "ban":
-                    await guild.ban(user, reason=f"AntiNuke: {reason}")
-                    logger.warning(f"AntiNuke banned user {user.name} ({user.id}) from {guild.name}: {reason}")
+                    await guild.ban(discord.Object(id=int(user_id)), reason=f"AntiNuke: {reason}")
+                    self._record_latency(detected_at)
+                    logger.warning(f"AntiNuke banned user {user_id} from {guild.name}: {reason}")
                 return
             
             # Take action based on punishment setting
@@ -266,9 +255,7 @@ class AntiNuke(commands.Cog):
                 if roles_to_remove:
                     await member.remove_roles(*roles_to_remove, reason=f"AntiNuke: {reason}")
                     logger.warning(f"AntiNuke removed roles from {member.name} ({member.id}) in {guild.name}: {reason}")
-            
-            # Mark as recently punished
-            self.recently_punished.add((user_id, datetime.utcnow()))
+            self._record_latency(detected_at)
             
             # Send alert to system channel if available
             if guild.system_channel:
@@ -279,7 +266,7 @@ class AntiNuke(commands.Cog):
                     timestamp=datetime.utcnow()
                 )
                 
-                embed.add_field(name="User", value=f"{user.mention} ({user.name})", inline=True)
+                embed.add_field(name="User", value=f"{member.mention} ({member.name})", inline=True)
                 embed.add_field(name="Action Type", value=action_type.replace("_", " ").title(), inline=True)
                 embed.add_field(name="Punishment", value=punishment.replace("_", " ").title(), inline=True)
                 embed.add_field(name="Reason", value=reason, inline=False)
@@ -289,6 +276,13 @@ class AntiNuke(commands.Cog):
         except Exception as e:
             logger.error(f"Error taking antinuke action: {str(e)}")
     
+    def _record_latency(self, detected_at):
+        """Remember how long a detection took to turn into a punishment"""
+        if detected_at is None:
+            return
+        self.detection_latency.append((time.perf_counter() - detected_at) * 1000)
+        del self.detection_latency[:-100]
+    
     @commands.group(name="antinuke", invoke_without_command=True)
     @commands.has_permissions(send_messages=True)
     async def antinuke(self, ctx):
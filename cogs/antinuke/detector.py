@@ -0,0 +1,87 @@
+import time
+import discord
+from collections import deque
+
+# Audit log actions AntiNuke watches: action -> (module setting, threshold key)
+AUDIT_ACTIONS = {
+    discord.AuditLogAction.ban: ("ban", "ban"),
+    discord.AuditLogAction.kick: ("kick", "kick"),
+    discord.AuditLogAction.channel_delete: ("channel", "channel_delete"),
+    discord.AuditLogAction.channel_create: ("channel", "channel_create"),
+    discord.AuditLogAction.role_delete: ("role", "role_delete"),
+    discord.AuditLogAction.emoji_delete: ("emoji", "emoji_delete"),
+    discord.AuditLogAction.webhook_create: ("webhook", "webhook_create"),
+    discord.AuditLogAction.bot_add: ("botadd", "bot_add"),
+}
+
+# Role changes checked by the permissions module
+PERMISSION_ACTIONS = (discord.AuditLogAction.role_create, discord.AuditLogAction.role_update)
+
+# Threshold used when a guild's settings have none for an action
+DEFAULT_THRESHOLD = 3
+# Granting a monitored permission is punished on the first occurrence
+PERMISSION_THRESHOLD = 1
+
+
+class SlidingWindowCounter:
+    """Per-key event counts over a sliding time window.
+    
+    Each key keeps a ring buffer of the times of its last ``limit`` events,
+    so recording an event is O(limit) at worst and the limit is reached the
+    moment ``limit`` events fall inside any ``window``-second span. Unlike
+    a window that restarts at the first action, a burst straddling the
+    boundary of an earlier window is still caught.
+    """
+    
+    def __init__(self):
+        # Structure: {key: deque([monotonic time of recent events], maxlen=limit)}
+        self._events = {}
+    
+    def __len__(self):
+        return len(self._events)
+    
+    def hit(self, key, limit, window, now=None):
+        """Record an event for ``key``; returns how many of its events are inside the window"""
+        now = time.monotonic() if now is None else now
+        events = self._events.get(key)
+        if events is None or events.maxlen != limit:
+            # New key, or the threshold changed since the buffer was sized
+            events = self._events[key] = deque(events or (), maxlen=limit)
+        events.append(now)
+        
+        cutoff = now - window
+        count = len(events)
+        for timestamp in events:
+            if timestamp >= cutoff:
+                break
+            count -= 1
+        return count
+    
+    def reset(self, key):
+        """Forget a key's events (after it has been acted on)"""
+        self._events.pop(key, None)
+    
+    def prune(self, max_age, now=None):
+        """Drop keys whose newest event is older than ``max_age`` seconds"""
+        now = time.monotonic() if now is None else now
+        cutoff = now - max_age
+        stale = [key for key, events in self._events.items() if not events or events[-1] < cutoff]
+        for key in stale:
+            del self._events[key]
+        return len(stale)
+
+
+def granted_permissions(entry, monitored):
+    """Monitored permission names a role create/update audit entry turned on"""
+    after = getattr(entry.after, 'permissions', None)
+    if after is None:
+        return []
+    before = getattr(entry.before, 'permissions', None)
+    before_value = before.value if before is not None else 0
+    gained = discord.Permissions(after.value & ~before_value)
+    return [perm for perm in monitored if getattr(gained, perm, False)]
+
+
+async def setup(bot):
+    # This is a helper module, no cog to add
+    pass
@@ -6,6 +6,7 @@ import logging
 import json
 import os
 from .mass_join_handler import MassJoinHandler
+from core.joins import JoinVerdict, KICK, BAN, TIMEOUT
 
 logger = logging.getLogger('bot')
 
@@ -27,6 +28,14 @@ class AntiRaid(commands.Cog):
         
         # Initialize mass join handler
         self.mass_join_handler = MassJoinHandler(self)
+    
+    async def cog_load(self):
+        """Judge joining members before any other join handling"""
+        self.bot.joins.add_gate("antiraid", self.join_gate)
+    
+    def cog_unload(self):
+        """Stop judging joins"""
+        self.bot.joins.remove("antiraid")
         
     def _load_settings(self):
         """Load antiraid settings from file"""
@@ -48,14 +57,9 @@ class AntiRaid(commands.Cog):
     def _save_settings(self):
         """Save antiraid settings to file"""
         try:
-            with open(f"{self.config_path}/settings.json", "w") as f:
-                json.dump(self.raid_settings, f, indent=4)
-                
-            with open(f"{self.config_path}/whitelist.json", "w") as f:
-                json.dump(self.whitelist, f, indent=4)
-                
-            with open(f"{self.config_path}/raid_state.json", "w") as f:
-                json.dump(self.raid_state, f, indent=4)
+            self.bot.json_store.save(f"{self.config_path}/settings.json", self.raid_settings)
+            self.bot.json_store.save(f"{self.config_path}/whitelist.json", self.whitelist)
+            self.bot.json_store.save(f"{self.config_path}/raid_state.json", self.raid_state)
         except Exception as e:
             logger.error(f"Error saving antiraid settings: {str(e)}")
     
@@ -485,9 +489,20 @@ class AntiRaid(commands.Cog):
         
         await ctx.send(embed=embed)
 
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        """Check joining members against antiraid settings"""
+    async def _remove_member(self, member, action, reason):
+        """Kick or ban a joining member; the verdict says what actually happened"""
+        try:
+            if action == KICK:
+                await member.kick(reason=reason)
+            else:
+                await member.ban(reason=reason)
+        except Exception as e:
+            logger.error(f"Failed to {action} {member} from {member.guild.name}: {str(e)}")
+            return JoinVerdict()
+        return JoinVerdict(action, reason)
+
+    async def join_gate(self, member):
+        """Check joining members against antiraid settings (first stage of the join pipeline)"""
         guild_id = str(member.guild.id)
         settings = self._get_guild_settings(guild_id)
         whitelist = self._get_guild_whitelist(guild_id)
@@ -498,7 +513,7 @@ class AntiRaid(commands.Cog):
             # Remove from whitelist since it's one-time use
             whitelist.remove(str(member.id))
             self._save_settings()
-            return
+            return JoinVerdict()
             
         # Check for active raid state
         if raid_state["active"]:
@@ -525,16 +540,13 @@ class AntiRaid(commands.Cog):
                 pass
                 
             # Kick the member
-            try:
-                await member.kick(reason="Server in raid protection mode")
-            except:
-                pass
+            return await self._remove_member(member, KICK, "Server in raid protection mode")
                 
-            return
+        verdict = JoinVerdict()
                 
         # Check for new account
         if settings["newaccounts"]["enabled"]:
-            account_age = (datetime.utcnow() - member.created_at).days
+            account_age = (datetime.utcnow() - member.created_at.replace(tzinfo=None)).days
             
             if account_age < settings["newaccounts"]["min_age"]:
                 action = settings["newaccounts"]["action"]
@@ -560,27 +572,15 @@ class AntiRaid(commands.Cog):
                 except:
                     pass
                     
-                # Take action based on settings
-                if action == "kick":
-                    try:
-                        await member.kick(reason=f"Account too new ({account_age} days)")
-                    except:
-                        pass
-                elif action == "ban":
-                    try:
-                        await member.ban(reason=f"Account too new ({account_age} days)")
-                    except:
-                        pass
-                elif action == "timeout":
-                    try:
-                        # Set timeout duration
-                        duration = timedelta(hours=settings["newaccounts"]["timeout_duration"])
-                        await member.timeout_for(duration, reason=f"Account too new ({account_age} days)")
-                    except:
-                        pass
+                # Take action based on settings; timeouts are applied with the join roles
+                reason = f"Account too new ({account_age} days)"
+                if action in (KICK, BAN):
+                    verdict = await self._remove_member(member, action, reason)
+                elif action == TIMEOUT:
+                    verdict = JoinVerdict(TIMEOUT, reason, timedelta(hours=settings["newaccounts"]["timeout_duration"]))
                         
         # Check for no avatar
-        if settings["avatar"]["enabled"]:
+        if settings["avatar"]["enabled"] and not verdict.removed:
             if member.avatar is None:
                 action = settings["avatar"]["action"]
                 
@@ -601,26 +601,16 @@ class AntiRaid(commands.Cog):
                     pass
                     
                 # Take action based on settings
-                if action == "kick":
-                    try:
-                        await member.kick(reason="No profile picture")
-                    except:
-                        pass
-                elif action == "ban":
-                    try:
-                        await member.ban(reason="No profile picture")
-                    except:
-                        pass
-                elif action == "timeout":
-                    try:
-                        # Set timeout for 24 hours
-                        duration = timedelta(hours=24)
-                        await member.timeout_for(duration, reason="No profile picture")
-                    except:
-                        pass
+                if action in (KICK, BAN):
+                    verdict = await self._remove_member(member, action, "No profile picture")
+                elif action == TIMEOUT and verdict.action != TIMEOUT:
+                    # Time out for 24 hours
+                    verdict = JoinVerdict(TIMEOUT, "No profile picture", timedelta(hours=24))
                         
         # Process mass join detection
         await self.mass_join_handler.handle_member_join(member)
 
+        return verdict
+
 async def setup(bot):
     await bot.add_cog(AntiRaid(bot)) 
\ No newline at end of file
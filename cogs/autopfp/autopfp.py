@@ -5,7 +5,6 @@ import os
 import logging
 from datetime import datetime
 import random
-import aiohttp
 import asyncio
 
 logger = logging.getLogger('bot')
@@ -50,8 +49,7 @@ class AutoPfp(commands.Cog):
         """Save profile picture settings to file"""
         try:
             filepath = f"{self.config_path}/pfp_channels.json"
-            with open(filepath, "w") as f:
-                json.dump(self.pfp_config, f, indent=4)
+            self.bot.json_store.save(filepath, self.pfp_config)
         except Exception as e:
             logger.error(f"Error saving profile picture settings: {str(e)}")
     
@@ -70,8 +68,7 @@ class AutoPfp(commands.Cog):
         """Save banner settings to file"""
         try:
             filepath = f"{self.config_path}/banner_channels.json"
-            with open(filepath, "w") as f:
-                json.dump(self.banner_config, f, indent=4)
+            self.bot.json_store.save(filepath, self.banner_config)
         except Exception as e:
             logger.error(f"Error saving banner settings: {str(e)}")
     
@@ -146,24 +143,23 @@ class AutoPfp(commands.Cog):
             category = random.choice(categories)
             
             # Get a random image URL 
-            async with aiohttp.ClientSession() as session:
-                # Using a placeholder API for demo purposes
-                # In real implementation, you'd use a proper API service
-                async with session.get(f"https://source.unsplash.com/random/512x512/?{category}") as resp:
-                    if resp.status == 200:
-                        # Create an embed with the image
-                        embed = discord.Embed(
-                            title=f"Random {category.capitalize()} Profile Picture",
-                            color=discord.Color.blue(),
-                            timestamp=datetime.utcnow()
-                        )
-                        embed.set_image(url=str(resp.url))
-                        embed.set_footer(text=f"Category: {category.capitalize()}")
-                        
-                        # Send the embed
-                        await channel.send(embed=embed)
-                    else:
-                        logger.error(f"Failed to fetch profile picture: {resp.status}")
+            # Using a placeholder API for demo purposes
+            # In real implementation, you'd use a proper API service
+            async with self.bot.http_client.get(f"https://source.unsplash.com/random/512x512/?{category}") as resp:
+                if resp.status == 200:
+                    # Create an embed with the image
+                    embed = discord.Embed(
+                        title=f"Random {category.capitalize()} Profile Picture",
+                        color=discord.Color.blue(),
+                        timestamp=datetime.utcnow()
+                    )
+                    embed.set_image(url=str(resp.url))
+                    embed.set_footer(text=f"Category: {category.capitalize()}")
+                    
+                    # Send the embed
+                    await channel.send(embed=embed)
+                else:
+                    logger.error(f"Failed to fetch profile picture: {resp.status}")
         except Exception as e:
             logger.error(f"Error posting new profile picture: {str(e)}")
     
@@ -177,24 +173,23 @@ class AutoPfp(commands.Cog):
             category = random.choice(categories)
             
             # Get a random image URL
-            async with aiohttp.ClientSession() as session:
-                # Using a placeholder API for demo purposes
-                # In real implementation, you'd use a proper API service
-                async with session.get(f"https://source.unsplash.com/random/1500x500/?{category}") as resp:
-                    if resp.status == 200:
-                        # Create an embed with the image
-                        embed = discord.Embed(
-                            title=f"Random {category.capitalize()} Banner",
-                            color=discord.Color.blue(),
-                            timestamp=datetime.utcnow()
-                        )
-                        embed.set_image(url=str(resp.url))
-                        embed.set_footer(text=f"Category: {category.capitalize()}")
-                        
-                        # Send the embed
-                        await channel.send(embed=embed)
-                    else:
-                        logger.error(f"Failed to fetch banner: {resp.status}")
+            # Using a placeholder API for demo purposes
+            # In real implementation, you'd use a proper API service
+            async with self.bot.http_client.get(f"https://source.unsplash.com/random/1500x500/?{category}") as resp:
+                if resp.status == 200:
+                    # Create an embed with the image
+                    embed = discord.Embed(
+                        title=f"Random {category.capitalize()} Banner",
+                        color=discord.Color.blue(),
+                        timestamp=datetime.utcnow()
+                    )
+                    embed.set_image(url=str(resp.url))
+                    embed.set_footer(text=f"Category: {category.capitalize()}")
+                    
+                    # Send the embed
+                    await channel.send(embed=embed)
+                else:
+                    logger.error(f"Failed to fetch banner: {resp.status}")
         except Exception as e:
             logger.error(f"Error posting new banner: {str(e)}")
 
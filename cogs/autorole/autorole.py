@@ -20,6 +20,14 @@ class AutoRole(commands.Cog):
         
         # Load auto roles
         self._load_auto_roles()
+    
+    async def cog_load(self):
+        """Contribute auto roles to the bot's join pipeline"""
+        self.bot.joins.add_role_provider("autorole", self.join_roles)
+    
+    def cog_unload(self):
+        """Stop contributing auto roles"""
+        self.bot.joins.remove("autorole")
         
     def _load_auto_roles(self):
         """Load autorole settings from file"""
@@ -35,8 +43,7 @@ class AutoRole(commands.Cog):
         """Save autorole settings to file"""
         try:
             filepath = f"{self.config_path}/autoroles.json"
-            with open(filepath, "w") as f:
-                json.dump(self.auto_roles, f, indent=4)
+            self.bot.json_store.save(filepath, self.auto_roles)
         except Exception as e:
             logger.error(f"Error saving autorole settings: {str(e)}")
     
@@ -231,28 +238,20 @@ class AutoRole(commands.Cog):
             await message.delete()
             await ctx.send("❌ Auto role reset timed out.")
     
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        """Assign auto roles to new members"""
+    def join_roles(self, member):
+        """Auto roles for a new member; the join pipeline applies them with the other join roles"""
         # Skip bots if desired (can be made configurable)
         # if member.bot:
-        #     return
-        
-        auto_roles = self._get_guild_auto_roles(member.guild.id)
+        #     return []
         
-        # If no auto roles, skip
-        if not auto_roles:
-            return
+        auto_roles = self.auto_roles.get(str(member.guild.id), [])
         
-        # Try to assign each auto role
+        roles = []
         for role_id in auto_roles:
             role = member.guild.get_role(int(role_id))
             if role and role < member.guild.me.top_role:
-                try:
-                    await member.add_roles(role, reason="Auto role assignment")
-                    logger.info(f"Assigned auto role {role.name} to {member.name} in {member.guild.name}")
-                except Exception as e:
-                    logger.error(f"Failed to assign auto role {role.name} to {member.name}: {str(e)}")
+                roles.append(role)
+        return roles
 
 async def setup(bot):
     await bot.add_cog(AutoRole(bot)) 
\ No newline at end of file
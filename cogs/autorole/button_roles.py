@@ -128,8 +128,7 @@ class ButtonRoles(commands.Cog):
         """Save button role settings to file"""
         try:
             filepath = f"{self.config_path}/buttonroles.json"
-            with open(filepath, "w") as f:
-                json.dump(self.button_roles, f, indent=4)
+            self.bot.json_store.save(filepath, self.button_roles)
         except Exception as e:
             logger.error(f"Error saving button role settings: {str(e)}")
     
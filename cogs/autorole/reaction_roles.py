@@ -35,8 +35,7 @@ class ReactionRoles(commands.Cog):
         """Save reaction role settings to file"""
         try:
             filepath = f"{self.config_path}/reactionroles.json"
-            with open(filepath, "w") as f:
-                json.dump(self.reaction_roles, f, indent=4)
+            self.bot.json_store.save(filepath, self.reaction_roles)
         except Exception as e:
             logger.error(f"Error saving reaction role settings: {str(e)}")
     
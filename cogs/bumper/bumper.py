@@ -1,5 +1,5 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import logging
 import datetime
 import asyncio
@@ -15,55 +15,63 @@ class BumpReminder(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = BumperDB()
-        self.check_reminders.start()
         
     async def cog_load(self):
         """Initialize the cog on load"""
         await self.db.initialize()
+        guilds = await self.db.load_settings()
         
-    def cog_unload(self):
+        # Reminders fire from the bot's scheduler at each guild's next_bump
+        self.bot.scheduler.register("bump", self.send_reminder)
+        now = datetime.datetime.now()
+        for settings in guilds:
+            if settings['next_bump'] and not self.bot.scheduler.get("bump", settings['guild_id']):
+                next_bump = datetime.datetime.fromisoformat(settings['next_bump'])
+                # Past bump times were already reminded about before this restart
+                if next_bump > now:
+                    await self.schedule_reminder(settings['guild_id'], next_bump)
+        
+    async def cog_unload(self):
         """Clean up on cog unload"""
-        self.check_reminders.cancel()
+        self.bot.scheduler.unregister("bump")
+        await self.db.close()
         
-    @tasks.loop(minutes=1)
-    async def check_reminders(self):
-        """Check for reminders that need to be sent"""
-        try:
-            due_reminders = await self.db.get_due_reminders()
+    async def schedule_reminder(self, guild_id, next_bump):
+        """Wake up exactly when a guild can bump again"""
+        # next_bump is naive local time, so take its timestamp directly
+        await self.bot.scheduler.schedule("bump", str(guild_id), next_bump.timestamp())
+            
+    async def send_reminder(self, job):
+        """Send a guild's bump reminder when its scheduler job comes due"""
+        reminder = self.db.cached_settings(job.key)
+        if not reminder or not reminder['enabled'] or not reminder['channel_id']:
+            return
             
-            for reminder in due_reminders:
-                guild = self.bot.get_guild(int(reminder['guild_id']))
-                if not guild:
-                    continue
+        guild = self.bot.get_guild(int(reminder['guild_id']))
+        if not guild:
+            return
                     
-                channel = guild.get_channel(int(reminder['channel_id']))
-                if not channel:
-                    continue
+        channel = guild.get_channel(int(reminder['channel_id']))
+        if not channel:
+            return
                     
-                # Send reminder message
-                try:
-                    message = reminder['reminder_message'] or "Time to bump the server! Type /bump"
-                    await channel.send(message)
+        # Send reminder message
+        try:
+            message = reminder['reminder_message'] or "Time to bump the server! Type /bump"
+            await channel.send(message)
                     
-                    # Handle autolock if enabled
-                    if reminder['autolock']:
-                        # Set channel permissions to allow /bump but restrict general messages
-                        try:
-                            overwrites = channel.overwrites_for(guild.default_role)
-                            overwrites.send_messages = False
-                            await channel.set_permissions(guild.default_role, overwrite=overwrites)
-                            await channel.send("Channel locked until the server is bumped. Only `/bump` command will work.")
-                        except discord.Forbidden:
-                            await channel.send("I don't have permission to lock the channel. Please give me 'Manage Channels' permission.")
-                except Exception as e:
-                    logger.error(f"Error sending reminder for guild {guild.id}: {e}")
+            # Handle autolock if enabled
+            if reminder['autolock']:
+                # Set channel permissions to allow /bump but restrict general messages
+                try:
+                    overwrites = channel.overwrites_for(guild.default_role)
+                    overwrites.send_messages = False
+                    await channel.set_permissions(guild.default_role, overwrite=overwrites)
+                    await channel.send("Channel locked until the server is bumped. Only `/bump` command will work.")
+                except discord.Forbidden:
+                    await channel.send("I don't have permission to lock the channel. Please give me 'Manage Channels' permission.")
         except Exception as e:
-            logger.error(f"Error in check_reminders task: {e}")
-    
-    @check_reminders.before_loop
-    async def before_check_reminders(self):
-        """Wait for the bot to be ready before starting the loop"""
-        await self.bot.wait_until_ready()
+            logger.error(f"Error sending reminder for guild {guild.id}: {e}")
         
     @commands.group(name="bumpreminder", aliases=["bump", "br"], invoke_without_command=True)
     @commands.has_permissions(manage_channels=True)
@@ -362,7 +370,8 @@ class BumpReminder(commands.Cog):
             if not message.guild:
                 return
                 
-            settings = await self.db.get_guild_settings(message.guild.id)
+            # Served from memory, so messages outside bump channels never wait on anything
+            settings = self.db.cached_settings(message.guild.id)
             if not settings or not settings.get('channel_id') or int(settings['channel_id']) != message.channel.id:
                 return
                 
@@ -377,7 +386,7 @@ class BumpReminder(commands.Cog):
         # Check if this is a successful bump message from Disboard
         if "bump done" in message.content.lower():
             # Looks like a successful bump
-            settings = await self.db.get_guild_settings(message.guild.id)
+            settings = self.db.cached_settings(message.guild.id)
             if not settings:
                 return
                 
@@ -385,7 +394,9 @@ class BumpReminder(commands.Cog):
             async for msg in message.channel.history(limit=5, before=message):
                 if msg.content == "/bump" and not msg.author.bot:
                     # This user did the bump
-                    await self.db.log_bump(message.guild.id, msg.author.id)
+                    next_bump = await self.db.log_bump(message.guild.id, msg.author.id)
+                    if next_bump:
+                        await self.schedule_reminder(message.guild.id, next_bump)
                     
                     # Send thank you message
                     thank_you = settings.get('thankyou_message') or "Thanks for bumping the server! I will remind you in 2 hours."
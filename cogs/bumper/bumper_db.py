@@ -1,8 +1,9 @@
 import os
 import logging
-import aiosqlite
 import datetime
 
+from core.database import get_pool, close_pool
+
 logger = logging.getLogger('bot')
 
 class BumperDB:
@@ -11,13 +12,20 @@ class BumperDB:
     def __init__(self):
         self.data_folder = 'data'
         self.db_path = os.path.join(self.data_folder, 'bumper.db')
+        self.pool = get_pool(self.db_path)
+        # Settings rows keyed by guild id string; None marks a guild known to have no row
+        self._settings = {}
         
+    async def close(self):
+        """Close the pooled connections for this database"""
+        await close_pool(self.db_path)
+    
     async def initialize(self):
         """Initialize the BumpReminder database"""
         if not os.path.exists(self.data_folder):
             os.makedirs(self.data_folder)
             
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.write() as db:
             # Create server settings table
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS bumper_settings (
@@ -47,29 +55,47 @@ class BumperDB:
             
             await db.commit()
     
+    async def load_settings(self):
+        """Load every guild's settings into memory"""
+        async with self.pool.read() as db:
+            async with db.execute("SELECT * FROM bumper_settings") as cursor:
+                rows = await cursor.fetchall()
+        self._settings = {row['guild_id']: dict(row) for row in rows}
+        return list(self._settings.values())
+    
+    def cached_settings(self, guild_id):
+        """A guild's settings from memory, without touching the database (None if not set up)"""
+        return self._settings.get(str(guild_id))
+    
+    async def _fetch_guild_settings(self, guild_id):
+        async with self.pool.read() as db:
+            async with db.execute(
+                "SELECT * FROM bumper_settings WHERE guild_id = ?",
+                (str(guild_id),)
+            ) as cursor:
+                result = await cursor.fetchone()
+                return dict(result) if result else None
+    
     async def get_guild_settings(self, guild_id):
         """Get a guild's BumpReminder settings"""
+        key = str(guild_id)
+        if key in self._settings:
+            return self._settings[key]
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                async with db.execute(
-                    "SELECT * FROM bumper_settings WHERE guild_id = ?",
-                    (str(guild_id),)
-                ) as cursor:
-                    result = await cursor.fetchone()
-                    if result:
-                        return dict(result)
-                    return None
+            settings = await self._fetch_guild_settings(guild_id)
         except Exception as e:
             logger.error(f"Error getting guild BumpReminder settings: {e}")
             return None
+        # Remember misses too, so unconfigured guilds are only looked up once
+        self._settings[key] = settings
+        return settings
             
     async def create_or_update_guild(self, guild_id, **kwargs):
         """Create or update a guild's BumpReminder settings"""
         try:
             settings = await self.get_guild_settings(guild_id)
             
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 if not settings:
                     # Create new settings
                     placeholders = ", ".join(["?"] * (len(kwargs) + 1))
@@ -91,7 +117,10 @@ class BumperDB:
                     )
                 
                 await db.commit()
-                return True
+            
+            # Refresh the cached row so column defaults are filled in for new guilds
+            self._settings[str(guild_id)] = await self._fetch_guild_settings(guild_id)
+            return True
         except Exception as e:
             logger.error(f"Error updating guild BumpReminder settings: {e}")
             return False
@@ -117,12 +146,12 @@ class BumperDB:
         return await self.create_or_update_guild(guild_id, thankyou_message=message)
     
     async def log_bump(self, guild_id, user_id):
-        """Log a bump and update next bump time"""
+        """Log a bump and update next bump time; returns the next bump time, or None on failure"""
         try:
             now = datetime.datetime.now()
             next_bump = now + datetime.timedelta(hours=2)
             
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 # Update guild settings
                 await db.execute(
                     "UPDATE bumper_settings SET last_bumped = ?, next_bump = ?, last_user_id = ? WHERE guild_id = ?",
@@ -136,34 +165,25 @@ class BumperDB:
                 )
                 
                 await db.commit()
-                return True
-        except Exception as e:
-            logger.error(f"Error logging bump: {e}")
-            return False
-    
-    async def get_due_reminders(self):
-        """Get all guilds that are due for a bump reminder"""
-        try:
-            now = datetime.datetime.now().isoformat()
             
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
-                async with db.execute(
-                    "SELECT * FROM bumper_settings WHERE next_bump <= ? AND enabled = TRUE",
-                    (now,)
-                ) as cursor:
-                    results = await cursor.fetchall()
-                    return [dict(result) for result in results]
+            settings = self._settings.get(str(guild_id))
+            if settings:
+                settings.update(
+                    last_bumped=now.isoformat(),
+                    next_bump=next_bump.isoformat(),
+                    last_user_id=str(user_id)
+                )
+            return next_bump
         except Exception as e:
-            logger.error(f"Error getting due reminders: {e}")
-            return []
+            logger.error(f"Error logging bump: {e}")
+            return None
     
     async def get_bump_stats(self, guild_id, days=30):
         """Get bump statistics for a guild"""
         try:
             cutoff_date = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
             
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 # Get total bumps
                 async with db.execute(
                     "SELECT COUNT(*) FROM bump_logs WHERE guild_id = ? AND timestamp >= ?",
@@ -172,7 +192,6 @@ class BumperDB:
                     total_bumps = (await cursor.fetchone())[0]
                 
                 # Get top bumpers
-                db.row_factory = aiosqlite.Row
                 async with db.execute(
                     """
                     SELECT user_id, COUNT(*) as count
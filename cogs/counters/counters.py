@@ -6,6 +6,8 @@ import logging
 from datetime import datetime
 import asyncio
 
+from .updater import CounterUpdater
+
 logger = logging.getLogger('bot')
 
 class Counters(commands.Cog):
@@ -15,7 +17,9 @@ class Counters(commands.Cog):
         self.bot = bot
         self.config_path = "data/counters"
         self.counters = {}
-        self.update_task = None
+        self.sync_task = None
+        # Counter renames are debounced and kept within Discord's rename limit
+        self.updater = CounterUpdater(bot, self._counter_name)
         
         # Create directory if it doesn't exist
         os.makedirs(self.config_path, exist_ok=True)
@@ -25,12 +29,13 @@ class Counters(commands.Cog):
         
     def cog_unload(self):
         """Called when the cog is unloaded"""
-        if self.update_task:
-            self.update_task.cancel()
+        if self.sync_task:
+            self.sync_task.cancel()
+        self.updater.close()
     
     async def cog_load(self):
         """Called when the cog is loaded"""
-        self.update_task = self.bot.loop.create_task(self._update_counters_loop())
+        self.sync_task = self.bot.loop.create_task(self._sync_counters())
     
     def _load_counters(self):
         """Load counters from file"""
@@ -47,8 +52,7 @@ class Counters(commands.Cog):
         """Save counters to file"""
         try:
             filepath = f"{self.config_path}/counters.json"
-            with open(filepath, "w") as f:
-                json.dump(self.counters, f, indent=4)
+            self.bot.json_store.save(filepath, self.counters)
         except Exception as e:
             logger.error(f"Error saving counters: {str(e)}")
     
@@ -60,19 +64,9 @@ class Counters(commands.Cog):
             self._save_counters()
         return self.counters[guild_id]
     
-    async def _update_counters_loop(self):
-        """Loop to periodically update all counters"""
+    async def _sync_counters(self):
+        """Bring every counter up to date once on startup; events keep them current after that"""
         await self.bot.wait_until_ready()
-        while not self.bot.is_closed():
-            try:
-                await self._update_all_counters()
-                await asyncio.sleep(300)  # Update every 5 minutes
-            except Exception as e:
-                logger.error(f"Error in counter update loop: {str(e)}")
-                await asyncio.sleep(60)  # Shorter wait if there was an error
-    
-    async def _update_all_counters(self):
-        """Update all counters for all guilds"""
         for guild_id, guild_counters in self.counters.items():
             try:
                 guild = self.bot.get_guild(int(guild_id))
@@ -80,39 +74,27 @@ class Counters(commands.Cog):
                     continue
                 
                 for counter in guild_counters:
-                    try:
-                        await self._update_counter(guild, counter)
-                    except Exception as e:
-                        logger.error(f"Error updating counter in guild {guild_id}: {str(e)}")
+                    self._update_counter(guild, counter)
             except Exception as e:
                 logger.error(f"Error processing guild {guild_id}: {str(e)}")
     
-    async def _update_counter(self, guild, counter):
-        """Update a specific counter"""
-        try:
-            channel_id = counter["channel_id"]
-            channel = guild.get_channel(int(channel_id))
-            
-            if not channel:
-                return  # Channel no longer exists
-            
-            counter_type = counter["type"]
-            
-            if counter_type == "members":
-                count = guild.member_count
-                name = counter["format"].replace("{count}", str(count))
-            elif counter_type == "boosters":
-                count = len(guild.premium_subscribers)
-                name = counter["format"].replace("{count}", str(count))
-            else:
-                return  # Unknown counter type
-            
-            if channel.name != name:
-                await channel.edit(name=name)
-                logger.info(f"Updated counter for {guild.name} ({guild.id}): {name}")
+    def _counter_name(self, guild, counter):
+        """The name a counter channel should currently have"""
+        counter_type = counter["type"]
         
-        except discord.Forbidden:
-            logger.warning(f"Missing permissions to update counter in {guild.name} ({guild.id})")
+        if counter_type == "members":
+            count = guild.member_count
+        elif counter_type == "boosters":
+            count = len(guild.premium_subscribers)
+        else:
+            return None  # Unknown counter type
+        
+        return counter["format"].replace("{count}", str(count))
+    
+    def _update_counter(self, guild, counter):
+        """Mark a counter dirty; the updater renames it once the burst settles"""
+        try:
+            self.updater.mark_dirty(guild, counter)
         except Exception as e:
             logger.error(f"Error updating counter: {str(e)}")
     
@@ -133,6 +115,7 @@ class Counters(commands.Cog):
                 "`counter add` - Create a new counter channel\n"
                 "`counter remove` - Remove an existing counter\n"
                 "`counter list` - View all counters in this server\n"
+                "`counter stats` - View how many renames were sent or saved\n"
             ),
             inline=False
         )
@@ -302,6 +285,26 @@ class Counters(commands.Cog):
             )
         
         await ctx.send(embed=embed)
+    
+    @counter.command(name="stats")
+    @commands.has_permissions(manage_channels=True)
+    async def counter_stats(self, ctx):
+        """View how many counter renames were sent versus coalesced or skipped"""
+        stats = self.updater.stats()
+        
+        embed = discord.Embed(
+            title="Counter Updates",
+            description="Renames are limited to 2 per channel every 10 minutes, so bursts are coalesced",
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+        
+        embed.add_field(name="Renames Requested", value=stats["requested"], inline=True)
+        embed.add_field(name="Renames Performed", value=stats["performed"], inline=True)
+        embed.add_field(name="Renames Saved", value=stats["saved"], inline=True)
+        embed.add_field(name="Pending", value=stats["pending"], inline=True)
+        
+        await ctx.send(embed=embed)
 
 async def setup(bot):
     counters_cog = Counters(bot)
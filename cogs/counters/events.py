@@ -11,8 +11,15 @@ class CounterEvents(commands.Cog):
         self.bot = bot
         self.counters = counters_cog
     
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
+    async def cog_load(self):
+        """Update counters last in the bot's join pipeline, once the member has stayed"""
+        self.bot.joins.add_follower("counters", self.count_join)
+    
+    def cog_unload(self):
+        """Stop following joins"""
+        self.bot.joins.remove("counters")
+    
+    def count_join(self, member):
         """Update member count when a member joins"""
         try:
             # Get all counters for this guild
@@ -21,7 +28,7 @@ class CounterEvents(commands.Cog):
             # Find member count counters
             for counter in guild_counters:
                 if counter["type"] == "members":
-                    await self.counters._update_counter(member.guild, counter)
+                    self.counters._update_counter(member.guild, counter)
         except Exception as e:
             logger.error(f"Error updating counter on member join: {str(e)}")
     
@@ -35,7 +42,7 @@ class CounterEvents(commands.Cog):
             # Find member count counters
             for counter in guild_counters:
                 if counter["type"] == "members":
-                    await self.counters._update_counter(member.guild, counter)
+                    self.counters._update_counter(member.guild, counter)
         except Exception as e:
             logger.error(f"Error updating counter on member remove: {str(e)}")
     
@@ -51,7 +58,7 @@ class CounterEvents(commands.Cog):
                 # Find booster count counters
                 for counter in guild_counters:
                     if counter["type"] == "boosters":
-                        await self.counters._update_counter(after.guild, counter)
+                        self.counters._update_counter(after.guild, counter)
             except Exception as e:
                 logger.error(f"Error updating counter on boost status change: {str(e)}")
 
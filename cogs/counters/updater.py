@@ -0,0 +1,128 @@
+import discord
+import time
+import asyncio
+import logging
+from collections import deque
+
+logger = logging.getLogger('bot')
+
+# Discord allows two renames per channel every ten minutes
+RENAME_LIMIT = 2
+RENAME_WINDOW = 600
+# Seconds to let a burst of joins/leaves settle before renaming
+DEBOUNCE_DELAY = 5
+
+
+class CounterUpdater:
+    """Debounced, rate-limit-aware renames for counter channels.
+    
+    Events only mark a counter dirty. Each dirty channel gets one worker that
+    waits for the burst to settle and for a free slot in the channel's rename
+    bucket, then renames it once to whatever the count is at that moment.
+    Renames that would not change the name are skipped.
+    """
+    
+    def __init__(self, bot, get_name, debounce=DEBOUNCE_DELAY):
+        self.bot = bot
+        # Callable (guild, counter) -> channel name, or None for unknown types
+        self.get_name = get_name
+        self.debounce = debounce
+        
+        # Structure: {channel_id: (guild_id, counter)}
+        self._dirty = {}
+        self._tasks = {}
+        # Structure: {channel_id: deque([monotonic time of recent renames])}
+        self._renames = {}
+        
+        # Renames the old per-event updater would have sent vs. ones actually sent
+        self.requested = 0
+        self.performed = 0
+    
+    def mark_dirty(self, guild, counter):
+        """Queue a rename for a counter if its name is out of date"""
+        channel_id = int(counter["channel_id"])
+        channel = guild.get_channel(channel_id)
+        if not channel:
+            return  # Channel no longer exists
+        
+        name = self.get_name(guild, counter)
+        if name is None:
+            return
+        
+        if channel.name != name:
+            self.requested += 1
+        elif channel_id not in self._dirty:
+            return
+        
+        # Only the latest value matters; the worker reads the count when it runs
+        self._dirty[channel_id] = (guild.id, counter)
+        if channel_id not in self._tasks:
+            self._tasks[channel_id] = asyncio.create_task(self._run(channel_id))
+    
+    def _bucket_delay(self, channel_id):
+        """Seconds until the channel's rename bucket has a free slot"""
+        renames = self._renames.get(channel_id)
+        if not renames or len(renames) < RENAME_LIMIT:
+            return 0
+        return max(0, renames[0] + RENAME_WINDOW - time.monotonic())
+    
+    def _record_rename(self, channel_id):
+        renames = self._renames.get(channel_id)
+        if renames is None:
+            renames = deque(maxlen=RENAME_LIMIT)
+            self._renames[channel_id] = renames
+        renames.append(time.monotonic())
+    
+    async def _run(self, channel_id):
+        try:
+            while channel_id in self._dirty:
+                await asyncio.sleep(max(self.debounce, self._bucket_delay(channel_id)))
+                
+                guild_id, counter = self._dirty.pop(channel_id)
+                guild = self.bot.get_guild(guild_id)
+                channel = guild.get_channel(channel_id) if guild else None
+                if not channel:
+                    continue
+                
+                name = self.get_name(guild, counter)
+                if name is None or channel.name == name:
+                    continue
+                
+                try:
+                    await channel.edit(name=name)
+                    self.performed += 1
+                    logger.info(f"Updated counter for {guild.name} ({guild.id}): {name}")
+                except discord.Forbidden:
+                    logger.warning(f"Missing permissions to update counter in {guild.name} ({guild.id})")
+                except discord.HTTPException as e:
+                    logger.error(f"Error updating counter: {str(e)}")
+                finally:
+                    self._record_rename(channel_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in counter updater for channel {channel_id}: {str(e)}")
+        finally:
+            self._tasks.pop(channel_id, None)
+    
+    def stats(self):
+        """Rename counts for diagnostics"""
+        pending = len(self._dirty)
+        return {
+            "requested": self.requested,
+            "performed": self.performed,
+            "saved": max(0, self.requested - self.performed - pending),
+            "pending": pending
+        }
+    
+    def close(self):
+        """Cancel all pending renames"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._dirty.clear()
+
+
+async def setup(bot):
+    # This is a helper module, no cog to add
+    pass
@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands, tasks
 import aiohttp
+import asyncio
 import json
 import logging
 import datetime
@@ -42,26 +43,15 @@ class Crypto(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.session = None
         self.btc_subscriptions: Dict[str, List[discord.TextChannel]] = {}  # tx_hash -> list of channels
         self.completed_transactions: Set[str] = set()
         
         # Start the background tasks
-        self.create_session.start()
         self.check_subscriptions.start()
     
     def cog_unload(self):
-        # Clean up tasks and session when cog is unloaded
+        # Clean up tasks when cog is unloaded (the shared HTTP client is closed by the bot)
         self.check_subscriptions.cancel()
-        self.create_session.cancel()
-        if self.session and not self.session.closed:
-            self.bot.loop.create_task(self.session.close())
-            
-    @tasks.loop(seconds=1, count=1)
-    async def create_session(self):
-        """Create an aiohttp session when the cog starts"""
-        self.session = aiohttp.ClientSession()
-        logger.info("Created aiohttp session for crypto cog")
             
     @tasks.loop(minutes=1)
     async def check_subscriptions(self):
@@ -101,47 +91,38 @@ class Crypto(commands.Cog):
         
     async def get_btc_transaction(self, tx_hash: str) -> Optional[Dict]:
         """Get information about a Bitcoin transaction"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
         url = f"{BLOCKCHAIN_INFO_API_URL}/rawtx/{tx_hash}"
         
         try:
-            async with self.session.get(url) as response:
+            async with self.bot.http_client.get(url) as response:
                 if response.status == 200:
                     data = await response.json()
                     return data
                 else:
                     logger.warning(f"BTC transaction API returned status {response.status}")
                     return None
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logger.error(f"Error fetching BTC transaction {tx_hash}: {e}")
             return None
             
     async def get_eth_transaction(self, tx_hash: str) -> Optional[Dict]:
         """Get information about an Ethereum transaction"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
         url = f"{BLOCKCHAIR_API_URL}/ethereum/dashboards/transaction/{tx_hash}"
         
         try:
-            async with self.session.get(url) as response:
+            async with self.bot.http_client.get(url) as response:
                 if response.status == 200:
                     data = await response.json()
                     return data
                 else:
                     logger.warning(f"ETH transaction API returned status {response.status}")
                     return None
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logger.error(f"Error fetching ETH transaction {tx_hash}: {e}")
             return None
             
     async def get_crypto_price(self, coin_id: str) -> Optional[Dict]:
         """Get price information for a cryptocurrency"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
         url = f"{COINGECKO_API_URL}/coins/{coin_id}"
         params = {
             "localization": "false",
@@ -152,14 +133,14 @@ class Crypto(commands.Cog):
         }
         
         try:
-            async with self.session.get(url, params=params) as response:
+            async with self.bot.http_client.get(url, params=params) as response:
                 if response.status == 200:
                     data = await response.json()
                     return data
                 else:
                     logger.warning(f"Crypto price API returned status {response.status}")
                     return None
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logger.error(f"Error fetching price for {coin_id}: {e}")
             return None
             
@@ -14,11 +14,19 @@ class Economy(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db = EconomyDB()
+    
+    async def cog_load(self):
+        """Create the economy tables and import economy.json if present"""
+        await self.db.initialize()
+    
+    async def cog_unload(self):
+        """Close database connections on unload"""
+        await self.db.close()
         
     @commands.command(name="open")
     async def open(self, ctx):
         """Open an account to start gambling"""
-        if self.db.account_exists(ctx.author.id):
+        if await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="Account Exists",
                 description="You already have an economy account!",
@@ -27,7 +35,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        success = self.db.create_account(ctx.author.id, ctx.author.name)
+        success = await self.db.create_account(ctx.author.id, ctx.author.name)
         
         if success:
             embed = discord.Embed(
@@ -51,7 +59,7 @@ class Economy(commands.Cog):
         """Show your wallet, bank and graph of growth through gambling"""
         target = member or ctx.author
         
-        if not self.db.account_exists(target.id):
+        if not await self.db.account_exists(target.id):
             if target.id == ctx.author.id:
                 embed = discord.Embed(
                     title="No Account",
@@ -67,7 +75,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        balance = self.db.get_balance(target.id)
+        balance = await self.db.get_balance(target.id)
         
         embed = discord.Embed(
             title=f"{target.name}'s Balance",
@@ -78,7 +86,7 @@ class Economy(commands.Cog):
         embed.add_field(name="🏦 Bank", value=f"{balance['bank']}/{balance['bank_capacity']} bucks", inline=True)
         embed.add_field(name="💰 Total", value=f"{balance['total']} bucks", inline=True)
         
-        user_data = self.db._get_user_data(target.id)
+        user_data = await self.db._get_user_data(target.id)
         if user_data:
             embed.add_field(name="📈 Total Earnings", value=f"{user_data['total_earnings']} bucks", inline=True)
             embed.add_field(name="📉 Total Losses", value=f"{user_data['total_losses']} bucks", inline=True)
@@ -101,7 +109,7 @@ class Economy(commands.Cog):
     @commands.command(name="daily")
     async def daily(self, ctx):
         """Collect your daily bucks"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -110,7 +118,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        result = self.db.claim_daily(ctx.author.id)
+        result = await self.db.claim_daily(ctx.author.id)
         
         if result['success']:
             embed = discord.Embed(
@@ -119,7 +127,7 @@ class Economy(commands.Cog):
                 color=discord.Color.green()
             )
             
-            balance = self.db.get_balance(ctx.author.id)
+            balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="New Balance", value=f"{balance['wallet']} bucks in wallet", inline=False)
             
             await ctx.send(embed=embed)
@@ -137,7 +145,7 @@ class Economy(commands.Cog):
     @commands.command(name="deposit", aliases=["dep"])
     async def deposit(self, ctx, amount: str):
         """Deposit bucks from your wallet to your bank"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -146,7 +154,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        balance = self.db.get_balance(ctx.author.id)
+        balance = await self.db.get_balance(ctx.author.id)
         
         # Handle "all" as input
         if amount.lower() == "all":
@@ -174,10 +182,10 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        deposited = self.db.deposit(ctx.author.id, amount)
+        deposited = await self.db.deposit(ctx.author.id, amount)
         
         if deposited:
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             
             embed = discord.Embed(
                 title="Deposit Successful",
@@ -208,7 +216,7 @@ class Economy(commands.Cog):
     @commands.command(name="withdraw", aliases=["wd"])
     async def withdraw(self, ctx, amount: str):
         """Withdraw bucks from your bank to your wallet"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -217,7 +225,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        balance = self.db.get_balance(ctx.author.id)
+        balance = await self.db.get_balance(ctx.author.id)
         
         # Handle "all" as input
         if amount.lower() == "all":
@@ -245,10 +253,10 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        success = self.db.withdraw(ctx.author.id, amount)
+        success = await self.db.withdraw(ctx.author.id, amount)
         
         if success:
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             
             embed = discord.Embed(
                 title="Withdrawal Successful",
@@ -289,7 +297,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -298,7 +306,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        if not self.db.account_exists(member.id):
+        if not await self.db.account_exists(member.id):
             embed = discord.Embed(
                 title="No Account",
                 description=f"{member.name} doesn't have an economy account!",
@@ -316,7 +324,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        balance = self.db.get_balance(ctx.author.id)
+        balance = await self.db.get_balance(ctx.author.id)
         
         if amount > balance['wallet']:
             embed = discord.Embed(
@@ -327,7 +335,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        success = self.db.transfer(ctx.author.id, member.id, amount)
+        success = await self.db.transfer(ctx.author.id, member.id, amount)
         
         if success:
             embed = discord.Embed(
@@ -336,7 +344,7 @@ class Economy(commands.Cog):
                 color=discord.Color.green()
             )
             
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="Your New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=False)
                 
             await ctx.send(embed=embed)
@@ -369,7 +377,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -378,7 +386,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        if not self.db.account_exists(member.id):
+        if not await self.db.account_exists(member.id):
             embed = discord.Embed(
                 title="No Account",
                 description=f"{member.name} doesn't have an economy account!",
@@ -388,7 +396,7 @@ class Economy(commands.Cog):
             return
             
         # Check if user has minimum amount in wallet
-        robber_balance = self.db.get_balance(ctx.author.id)
+        robber_balance = await self.db.get_balance(ctx.author.id)
         if robber_balance['wallet'] < 50:
             embed = discord.Embed(
                 title="Insufficient Funds",
@@ -399,7 +407,7 @@ class Economy(commands.Cog):
             return
             
         # Attempt the robbery
-        result = self.db.rob_user(ctx.author.id, member.id)
+        result = await self.db.rob_user(ctx.author.id, member.id)
         
         if result['success']:
             embed = discord.Embed(
@@ -408,7 +416,7 @@ class Economy(commands.Cog):
                 color=discord.Color.green()
             )
             
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="Your New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=False)
                 
             await ctx.send(embed=embed)
@@ -439,7 +447,7 @@ class Economy(commands.Cog):
                         inline=False
                     )
                     
-                    new_balance = self.db.get_balance(ctx.author.id)
+                    new_balance = await self.db.get_balance(ctx.author.id)
                     embed.add_field(
                         name="Your New Balance", 
                         value=f"{new_balance['wallet']} bucks in wallet", 
@@ -466,7 +474,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        leaderboard = self.db.get_leaderboard(board_type.lower(), 10)
+        leaderboard = await self.db.get_leaderboard(board_type.lower(), 10)
         
         if not leaderboard:
             embed = discord.Embed(
@@ -503,6 +511,10 @@ class Economy(commands.Cog):
             
         embed.description = description
         
+        rank = self.db.get_rank(ctx.author.id, board_type.lower())
+        if rank is not None:
+            embed.set_footer(text=f"Your rank: #{rank}")
+        
         await ctx.send(embed=embed)
         
     @commands.command(name="bag", aliases=["inventory", "inv"])
@@ -510,7 +522,7 @@ class Economy(commands.Cog):
         """Show items in your bag"""
         target = member or ctx.author
         
-        if not self.db.account_exists(target.id):
+        if not await self.db.account_exists(target.id):
             if target.id == ctx.author.id:
                 embed = discord.Embed(
                     title="No Account",
@@ -526,7 +538,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        inventory = self.db.get_inventory(target.id)
+        inventory = await self.db.get_inventory(target.id)
         
         if not inventory:
             if target.id == ctx.author.id:
@@ -569,7 +581,7 @@ class Economy(commands.Cog):
     @commands.command(name="gamble", aliases=["bet"])
     async def gamble(self, ctx, amount: str):
         """Gamble your bucks with a 45% chance to win double"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -578,7 +590,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        balance = self.db.get_balance(ctx.author.id)
+        balance = await self.db.get_balance(ctx.author.id)
         
         # Handle "all" as input
         if amount.lower() == "all":
@@ -619,7 +631,7 @@ class Economy(commands.Cog):
         await asyncio.sleep(2)
         
         # Process the gamble
-        result = self.db.gamble(ctx.author.id, amount, game_type='gamble')
+        result = await self.db.gamble(ctx.author.id, amount, game_type='gamble')
         
         if result['won']:
             embed = discord.Embed(
@@ -632,7 +644,7 @@ class Economy(commands.Cog):
             embed.add_field(name="Net Profit", value=f"+{result['net_winnings']} bucks", inline=True)
             
             # New balance
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=True)
         else:
             embed = discord.Embed(
@@ -642,7 +654,7 @@ class Economy(commands.Cog):
             )
             
             # New balance
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=True)
         
         await message.edit(embed=embed)
@@ -650,7 +662,7 @@ class Economy(commands.Cog):
     @commands.command(name="dice")
     async def dice(self, ctx, amount: str):
         """Roll dice with a 50% chance to win 1.8x your bet"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -659,7 +671,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        balance = self.db.get_balance(ctx.author.id)
+        balance = await self.db.get_balance(ctx.author.id)
         
         # Handle "all" as input
         if amount.lower() == "all":
@@ -714,7 +726,7 @@ class Economy(commands.Cog):
         await asyncio.sleep(1)
         
         # Process the gamble
-        result = self.db.gamble(ctx.author.id, amount, game_type='dice')
+        result = await self.db.gamble(ctx.author.id, amount, game_type='dice')
         
         if result['won']:
             embed = discord.Embed(
@@ -727,7 +739,7 @@ class Economy(commands.Cog):
             embed.add_field(name="Net Profit", value=f"+{result['net_winnings']} bucks", inline=True)
             
             # New balance
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=True)
         else:
             embed = discord.Embed(
@@ -737,7 +749,7 @@ class Economy(commands.Cog):
             )
             
             # New balance
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=True)
         
         await message.edit(embed=embed)
@@ -757,7 +769,7 @@ class Economy(commands.Cog):
         # Normalize choice
         choice = "heads" if choice.lower() in ["heads", "h"] else "tails"
         
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -766,7 +778,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        balance = self.db.get_balance(ctx.author.id)
+        balance = await self.db.get_balance(ctx.author.id)
         
         # Handle "all" as input
         if amount.lower() == "all":
@@ -807,7 +819,7 @@ class Economy(commands.Cog):
         await asyncio.sleep(2)
         
         # Process the gamble
-        result = self.db.gamble(ctx.author.id, amount, game_type='coinflip')
+        result = await self.db.gamble(ctx.author.id, amount, game_type='coinflip')
         
         # Determine flip result (just for visual)
         flip_result = "heads" if random.random() < 0.5 else "tails"
@@ -824,7 +836,7 @@ class Economy(commands.Cog):
             embed.add_field(name="Net Profit", value=f"+{result['net_winnings']} bucks", inline=True)
             
             # New balance
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=True)
         else:
             embed = discord.Embed(
@@ -834,7 +846,7 @@ class Economy(commands.Cog):
             )
             
             # New balance
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=True)
         
         await message.edit(embed=embed)
@@ -842,7 +854,7 @@ class Economy(commands.Cog):
     @commands.command(name="shop", aliases=["store"])
     async def shop(self, ctx):
         """View items available in the shop"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -875,7 +887,7 @@ class Economy(commands.Cog):
                 inline=False
             )
             
-        balance = self.db.get_balance(ctx.author.id)
+        balance = await self.db.get_balance(ctx.author.id)
         embed.set_footer(text=f"Your wallet balance: {balance['wallet']} bucks")
         
         await ctx.send(embed=embed)
@@ -883,7 +895,7 @@ class Economy(commands.Cog):
     @commands.command(name="buy")
     async def buy(self, ctx, item_id: str, quantity: int = 1):
         """Buy an item from the shop"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -901,7 +913,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        result = self.db.buy_item(ctx.author.id, item_id, quantity)
+        result = await self.db.buy_item(ctx.author.id, item_id, quantity)
         
         if result['success']:
             embed = discord.Embed(
@@ -911,7 +923,7 @@ class Economy(commands.Cog):
             )
             
             # New balance
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="Remaining Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=True)
                 
             await ctx.send(embed=embed)
@@ -946,7 +958,7 @@ class Economy(commands.Cog):
     @commands.command(name="use")
     async def use(self, ctx, *, item_name: str):
         """Use an item from your inventory"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -979,7 +991,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        result = self.db.use_item(ctx.author.id, item_id)
+        result = await self.db.use_item(ctx.author.id, item_id)
         
         if result['success']:
             embed = discord.Embed(
@@ -1053,7 +1065,7 @@ class Economy(commands.Cog):
     @commands.command(name="effects")
     async def effects(self, ctx):
         """View all active effects on your account"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -1062,7 +1074,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        active_effects = self.db.get_active_effects(ctx.author.id)
+        active_effects = await self.db.get_active_effects(ctx.author.id)
         
         if not active_effects:
             embed = discord.Embed(
@@ -1122,7 +1134,7 @@ class Economy(commands.Cog):
     @commands.command(name="supergamble", aliases=["sg", "highroller"])
     async def supergamble(self, ctx, amount: str):
         """High risk gambling with 30% chance to win 3x your bet"""
-        if not self.db.account_exists(ctx.author.id):
+        if not await self.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -1131,7 +1143,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        balance = self.db.get_balance(ctx.author.id)
+        balance = await self.db.get_balance(ctx.author.id)
         
         # Handle "all" as input
         if amount.lower() == "all":
@@ -1186,7 +1198,7 @@ class Economy(commands.Cog):
             await message.edit(embed=embed)
         
         # Process the gamble
-        result = self.db.gamble(ctx.author.id, amount, game_type='supergamble')
+        result = await self.db.gamble(ctx.author.id, amount, game_type='supergamble')
         
         if result['won']:
             embed = discord.Embed(
@@ -1199,7 +1211,7 @@ class Economy(commands.Cog):
             embed.add_field(name="Net Profit", value=f"+{result['net_winnings']} bucks", inline=True)
             
             # New balance
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=True)
         else:
             embed = discord.Embed(
@@ -1209,7 +1221,7 @@ class Economy(commands.Cog):
             )
             
             # New balance
-            new_balance = self.db.get_balance(ctx.author.id)
+            new_balance = await self.db.get_balance(ctx.author.id)
             embed.add_field(name="New Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=True)
         
         await message.edit(embed=embed)
@@ -1219,7 +1231,7 @@ class Economy(commands.Cog):
         """View detailed gambling stats for a user"""
         target = member or ctx.author
         
-        if not self.db.account_exists(target.id):
+        if not await self.db.account_exists(target.id):
             if target.id == ctx.author.id:
                 embed = discord.Embed(
                     title="No Account",
@@ -1235,7 +1247,7 @@ class Economy(commands.Cog):
             await ctx.send(embed=embed)
             return
             
-        user_data = self.db._get_user_data(target.id)
+        user_data = await self.db._get_user_data(target.id)
         
         if user_data is None:
             embed = discord.Embed(
@@ -1325,7 +1337,7 @@ class Economy(commands.Cog):
     @commands.command(name="richest")
     async def richest(self, ctx):
         """Show the richest user in the server"""
-        leaderboard = self.db.get_leaderboard('balance', 1)
+        leaderboard = await self.db.get_leaderboard('balance', 1)
         
         if not leaderboard:
             embed = discord.Embed(
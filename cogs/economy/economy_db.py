@@ -4,15 +4,44 @@ import random
 import logging
 from datetime import datetime, timedelta
 
+from core.database import get_pool, close_pool
+from core.ranking import RankIndex
+
 logger = logging.getLogger('bot')
 
+# Per-game counters kept alongside each account (exposed as user_data['stats'])
+STAT_COLUMNS = (
+    'dice_plays', 'dice_wins',
+    'coinflip_plays', 'coinflip_wins',
+    'blackjack_plays', 'blackjack_wins',
+    'gamble_plays', 'gamble_wins',
+    'supergamble_plays', 'supergamble_wins',
+    'rob_attempts', 'successful_robs', 'times_robbed'
+)
+
+# Account totals stored as plain columns on economy_users
+ACCOUNT_COLUMNS = (
+    'username', 'wallet', 'bank', 'bank_capacity', 'daily_last_claimed',
+    'total_earnings', 'total_losses', 'total_gambles', 'wins', 'losses', 'created_at'
+)
+
+GAME_TYPES = ('gamble', 'supergamble', 'dice', 'coinflip', 'blackjack')
+
+LEADERBOARD_TYPES = ('balance', 'earnings')
+
 class EconomyDB:
     """Handles database operations for the economy system"""
     
     def __init__(self):
         self.data_folder = 'data'
         self.economy_file = os.path.join(self.data_folder, 'economy.json')
-        self.economy_data = self._load_data()
+        self.db_path = os.path.join(self.data_folder, 'economy.db')
+        self.pool = get_pool(self.db_path)
+        
+        # In-memory leaderboards, rebuilt from SQLite on startup and kept
+        # current as balances change; they are never written to disk
+        self.leaderboards = {board_type: RankIndex() for board_type in LEADERBOARD_TYPES}
+        self._usernames = {}
         self.shop_items = {
             'lucky_charm': {
                 'name': 'Lucky Charm 🍀',
@@ -45,556 +74,701 @@ class EconomyDB:
                 'effect': {'type': 'bank_capacity', 'value': 20000, 'duration': -1}
             }
         }
-        
-    def _load_data(self):
-        """Load economy data from JSON file"""
+    
+    async def close(self):
+        """Close the pooled connections for this database"""
+        await close_pool(self.db_path)
+    
+    async def initialize(self):
+        """Create the economy tables and import any legacy economy.json"""
         if not os.path.exists(self.data_folder):
             os.makedirs(self.data_folder)
             
+        stat_columns = ",\n".join(f"                    {column} INTEGER NOT NULL DEFAULT 0" for column in STAT_COLUMNS)
+        
+        async with self.pool.write() as db:
+            await db.execute(f'''
+                CREATE TABLE IF NOT EXISTS economy_users (
+                    user_id TEXT PRIMARY KEY,
+                    username TEXT,
+                    wallet INTEGER NOT NULL DEFAULT 100,
+                    bank INTEGER NOT NULL DEFAULT 0,
+                    bank_capacity INTEGER NOT NULL DEFAULT 10000,
+                    daily_last_claimed TEXT,
+                    total_earnings INTEGER NOT NULL DEFAULT 100,
+                    total_losses INTEGER NOT NULL DEFAULT 0,
+                    total_gambles INTEGER NOT NULL DEFAULT 0,
+                    wins INTEGER NOT NULL DEFAULT 0,
+                    losses INTEGER NOT NULL DEFAULT 0,
+{stat_columns},
+                    created_at TEXT
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS economy_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    name TEXT,
+                    purchased_at TEXT,
+                    used INTEGER NOT NULL DEFAULT 0,
+                    used_at TEXT
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS economy_effects (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    value NUMERIC,
+                    duration INTEGER NOT NULL
+                )
+            ''')
+            
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_economy_items_user ON economy_items(user_id, item_id, used)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_economy_effects_user ON economy_effects(user_id)")
+            
+        await self._import_json()
+        await self._load_leaderboards()
+    
+    async def _import_json(self):
+        """One-shot import of the legacy economy.json file.
+        
+        The file is renamed to economy.json.imported afterwards so the import
+        never runs twice; accounts that already exist in SQLite are left alone.
+        """
+        if not os.path.exists(self.economy_file):
+            return
+            
         try:
-            if os.path.exists(self.economy_file):
-                with open(self.economy_file, 'r') as f:
-                    return json.load(f)
-            else:
-                return {'users': {}, 'leaderboard': {'balance': [], 'earnings': []}}
+            with open(self.economy_file, 'r') as f:
+                data = json.load(f)
         except json.JSONDecodeError:
-            logger.error(f"Error decoding {self.economy_file}. Using empty data.")
-            return {'users': {}, 'leaderboard': {'balance': [], 'earnings': []}}
+            logger.error(f"Error decoding {self.economy_file}. Skipping economy import.")
+            return
+        
+        users = data.get('users', {})
+        account_rows = []
+        item_rows = []
+        effect_rows = []
+        
+        for user_id, user_data in users.items():
+            stats = user_data.get('stats', {})
+            account_rows.append((
+                str(user_id),
+                user_data.get('username'),
+                user_data.get('wallet', 0),
+                user_data.get('bank', 0),
+                user_data.get('bank_capacity', 10000),
+                user_data.get('daily_last_claimed'),
+                user_data.get('total_earnings', 0),
+                user_data.get('total_losses', 0),
+                user_data.get('total_gambles', 0),
+                user_data.get('wins', 0),
+                user_data.get('losses', 0),
+                user_data.get('created_at') or datetime.utcnow().isoformat(),
+                *(stats.get(column, 0) for column in STAT_COLUMNS)
+            ))
+            
+            for item in user_data.get('items', []):
+                item_rows.append((
+                    str(user_id),
+                    item.get('id'),
+                    item.get('name'),
+                    item.get('purchased_at'),
+                    1 if item.get('used') else 0,
+                    item.get('used_at')
+                ))
+                
+            for effect in user_data.get('active_effects', []):
+                if effect.get('duration', 0) == 0:
+                    continue
+                effect_rows.append((str(user_id), effect['type'], effect.get('value'), effect['duration']))
+        
+        columns = ('user_id',) + ACCOUNT_COLUMNS + STAT_COLUMNS
+        placeholders = ", ".join("?" for _ in columns)
+        
+        try:
+            async with self.pool.write() as db:
+                async with db.execute("SELECT user_id FROM economy_users") as cursor:
+                    existing = {row['user_id'] for row in await cursor.fetchall()}
+                
+                account_rows = [row for row in account_rows if row[0] not in existing]
+                item_rows = [row for row in item_rows if row[0] not in existing]
+                effect_rows = [row for row in effect_rows if row[0] not in existing]
+                
+                await db.executemany(
+                    f"INSERT INTO economy_users ({', '.join(columns)}) VALUES ({placeholders})",
+                    account_rows
+                )
+                await db.executemany(
+                    "INSERT INTO economy_items (user_id, item_id, name, purchased_at, used, used_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    item_rows
+                )
+                await db.executemany(
+                    "INSERT INTO economy_effects (user_id, type, value, duration) VALUES (?, ?, ?, ?)",
+                    effect_rows
+                )
+        except Exception as e:
+            logger.error(f"Error importing {self.economy_file}: {e}")
+            return
+        
+        os.replace(self.economy_file, self.economy_file + '.imported')
+        logger.info(f"Imported {len(account_rows)} economy accounts from {self.economy_file}")
     
-    def _save_data(self):
-        """Save economy data to JSON file"""
-        with open(self.economy_file, 'w') as f:
-            json.dump(self.economy_data, f, indent=4)
+    async def _load_leaderboards(self):
+        """Build the leaderboard indexes from every account"""
+        async with self.pool.read() as db:
+            async with db.execute(
+                "SELECT user_id, username, wallet + bank AS balance, total_earnings FROM economy_users"
+            ) as cursor:
+                rows = await cursor.fetchall()
+        
+        self._usernames = {row['user_id']: row['username'] for row in rows}
+        self.leaderboards['balance'].load((row['user_id'], row['balance']) for row in rows)
+        self.leaderboards['earnings'].load((row['user_id'], row['total_earnings']) for row in rows)
     
-    def _get_user_data(self, user_id):
-        """Get a user's economy data, creating it if it doesn't exist"""
+    def _index_row(self, row):
+        """Update the leaderboard indexes from an economy_users row"""
+        self._usernames[row['user_id']] = row['username']
+        self.leaderboards['balance'].update(row['user_id'], row['balance'])
+        self.leaderboards['earnings'].update(row['user_id'], row['total_earnings'])
+    
+    async def _refresh_leaderboards(self, db, *user_ids):
+        """Re-index the given accounts after their balances changed"""
+        placeholders = ", ".join("?" for _ in user_ids)
+        async with db.execute(
+            "SELECT user_id, username, wallet + bank AS balance, total_earnings "
+            f"FROM economy_users WHERE user_id IN ({placeholders})",
+            user_ids
+        ) as cursor:
+            for row in await cursor.fetchall():
+                self._index_row(row)
+    
+    async def _get_effects(self, db, user_id):
+        """Load a user's active effects in the order they were applied"""
+        async with db.execute(
+            "SELECT id, type, value, duration FROM economy_effects WHERE user_id = ? ORDER BY id",
+            (user_id,)
+        ) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+    
+    async def _get_user_data(self, user_id):
+        """Get a user's economy data in the legacy dict shape, or None"""
         user_id = str(user_id)
         
-        if user_id not in self.economy_data['users']:
-            return None
-        
-        return self.economy_data['users'][user_id]
+        async with self.pool.read() as db:
+            async with db.execute("SELECT * FROM economy_users WHERE user_id = ?", (user_id,)) as cursor:
+                row = await cursor.fetchone()
+                
+            if row is None:
+                return None
+                
+            async with db.execute(
+                "SELECT item_id, name, purchased_at, used, used_at FROM economy_items WHERE user_id = ? ORDER BY id",
+                (user_id,)
+            ) as cursor:
+                item_rows = await cursor.fetchall()
+                
+            effects = await self._get_effects(db, user_id)
+        
+        user_data = {column: row[column] for column in ACCOUNT_COLUMNS}
+        user_data['stats'] = {column: row[column] for column in STAT_COLUMNS}
+        user_data['items'] = []
+        for item in item_rows:
+            entry = {
+                'id': item['item_id'],
+                'name': item['name'],
+                'purchased_at': item['purchased_at'],
+                'used': bool(item['used'])
+            }
+            if item['used_at']:
+                entry['used_at'] = item['used_at']
+            user_data['items'].append(entry)
+        user_data['active_effects'] = [
+            {'type': effect['type'], 'value': effect['value'], 'duration': effect['duration']}
+            for effect in effects
+        ]
+        
+        return user_data
     
-    def create_account(self, user_id, username):
+    async def create_account(self, user_id, username):
         """Create a new economy account for a user"""
-        user_id = str(user_id)
-        
-        if user_id in self.economy_data['users']:
-            return False
-        
-        # Create new user data
-        self.economy_data['users'][user_id] = {
-            'username': username,
-            'wallet': 100,
-            'bank': 0,
-            'bank_capacity': 10000,
-            'items': [],
-            'active_effects': [],
-            'daily_last_claimed': None,
-            'total_earnings': 100, # Starting amount counts as earnings
-            'total_losses': 0,
-            'total_gambles': 0,
-            'wins': 0,
-            'losses': 0,
-            'stats': {
-                'dice_plays': 0,
-                'dice_wins': 0,
-                'coinflip_plays': 0,
-                'coinflip_wins': 0,
-                'blackjack_plays': 0,
-                'blackjack_wins': 0,
-                'gamble_plays': 0,
-                'gamble_wins': 0,
-                'supergamble_plays': 0,
-                'supergamble_wins': 0,
-                'rob_attempts': 0,
-                'successful_robs': 0,
-                'times_robbed': 0
-            },
-            'created_at': datetime.utcnow().isoformat()
-        }
-        
-        self._save_data()
-        return True
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "INSERT OR IGNORE INTO economy_users (user_id, username, created_at) VALUES (?, ?, ?)",
+                (str(user_id), username, datetime.utcnow().isoformat())
+            )
+            if cursor.rowcount == 0:
+                return False
+                
+            await self._refresh_leaderboards(db, str(user_id))
+            return True
     
-    def account_exists(self, user_id):
+    async def account_exists(self, user_id):
         """Check if a user has an economy account"""
-        return str(user_id) in self.economy_data['users']
+        async with self.pool.read() as db:
+            async with db.execute("SELECT 1 FROM economy_users WHERE user_id = ?", (str(user_id),)) as cursor:
+                return await cursor.fetchone() is not None
     
-    def get_balance(self, user_id):
+    async def get_balance(self, user_id):
         """Get a user's wallet and bank balance"""
-        user_data = self._get_user_data(user_id)
-        
-        if user_data is None:
+        async with self.pool.read() as db:
+            async with db.execute(
+                "SELECT wallet, bank, bank_capacity FROM economy_users WHERE user_id = ?",
+                (str(user_id),)
+            ) as cursor:
+                row = await cursor.fetchone()
+        
+        if row is None:
             return None
         
         return {
-            'wallet': user_data['wallet'],
-            'bank': user_data['bank'],
-            'bank_capacity': user_data['bank_capacity'],
-            'total': user_data['wallet'] + user_data['bank']
+            'wallet': row['wallet'],
+            'bank': row['bank'],
+            'bank_capacity': row['bank_capacity'],
+            'total': row['wallet'] + row['bank']
         }
     
-    def add_to_wallet(self, user_id, amount):
+    async def add_to_wallet(self, user_id, amount):
         """Add funds to a user's wallet"""
-        user_id = str(user_id)
-        
-        if user_id not in self.economy_data['users']:
-            return False
-        
-        self.economy_data['users'][user_id]['wallet'] += amount
-        self.economy_data['users'][user_id]['total_earnings'] += amount
-        
-        self._save_data()
-        self._update_leaderboard()
-        return True
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "UPDATE economy_users SET wallet = wallet + ?, total_earnings = total_earnings + ? WHERE user_id = ?",
+                (amount, amount, str(user_id))
+            )
+            if cursor.rowcount == 0:
+                return False
+                
+            await self._refresh_leaderboards(db, str(user_id))
+            return True
     
-    def remove_from_wallet(self, user_id, amount):
+    async def remove_from_wallet(self, user_id, amount):
         """Remove funds from a user's wallet"""
-        user_id = str(user_id)
-        
-        if user_id not in self.economy_data['users']:
-            return False
-        
-        if self.economy_data['users'][user_id]['wallet'] < amount:
-            return False
-        
-        self.economy_data['users'][user_id]['wallet'] -= amount
-        self.economy_data['users'][user_id]['total_losses'] += amount
-        
-        self._save_data()
-        self._update_leaderboard()
-        return True
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "UPDATE economy_users SET wallet = wallet - ?, total_losses = total_losses + ? "
+                "WHERE user_id = ? AND wallet >= ?",
+                (amount, amount, str(user_id), amount)
+            )
+            if cursor.rowcount == 0:
+                return False
+                
+            await self._refresh_leaderboards(db, str(user_id))
+            return True
     
-    def deposit(self, user_id, amount):
+    async def deposit(self, user_id, amount):
         """Deposit funds from wallet to bank"""
-        user_id = str(user_id)
-        
-        if user_id not in self.economy_data['users']:
-            return False
-        
-        user_data = self.economy_data['users'][user_id]
-        
-        if user_data['wallet'] < amount:
-            return False
-        
-        # Check if this would exceed bank capacity
-        available_space = user_data['bank_capacity'] - user_data['bank']
-        if amount > available_space:
-            depositable_amount = available_space
-        else:
-            depositable_amount = amount
+        async with self.pool.write() as db:
+            async with db.execute(
+                "SELECT wallet, bank, bank_capacity FROM economy_users WHERE user_id = ?",
+                (str(user_id),)
+            ) as cursor:
+                row = await cursor.fetchone()
+                
+            if row is None or row['wallet'] < amount:
+                return False
             
-        if depositable_amount <= 0:
-            return False
-        
-        user_data['wallet'] -= depositable_amount
-        user_data['bank'] += depositable_amount
-        
-        self._save_data()
-        self._update_leaderboard()
-        return depositable_amount
+            # Check if this would exceed bank capacity
+            available_space = row['bank_capacity'] - row['bank']
+            depositable_amount = min(amount, available_space)
+                
+            if depositable_amount <= 0:
+                return False
+            
+            await db.execute(
+                "UPDATE economy_users SET wallet = wallet - ?, bank = bank + ? WHERE user_id = ?",
+                (depositable_amount, depositable_amount, str(user_id))
+            )
+            return depositable_amount
     
-    def withdraw(self, user_id, amount):
+    async def withdraw(self, user_id, amount):
         """Withdraw funds from bank to wallet"""
-        user_id = str(user_id)
-        
-        if user_id not in self.economy_data['users']:
-            return False
-        
-        if self.economy_data['users'][user_id]['bank'] < amount:
-            return False
-        
-        self.economy_data['users'][user_id]['bank'] -= amount
-        self.economy_data['users'][user_id]['wallet'] += amount
-        
-        self._save_data()
-        return True
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "UPDATE economy_users SET bank = bank - ?, wallet = wallet + ? WHERE user_id = ? AND bank >= ?",
+                (amount, amount, str(user_id), amount)
+            )
+            return cursor.rowcount > 0
     
-    def transfer(self, sender_id, receiver_id, amount):
-        """Transfer funds from one user to another"""
+    async def transfer(self, sender_id, receiver_id, amount):
+        """Transfer funds from one user to another in a single transaction"""
         sender_id = str(sender_id)
         receiver_id = str(receiver_id)
         
-        if sender_id not in self.economy_data['users'] or receiver_id not in self.economy_data['users']:
-            return False
-        
-        if self.economy_data['users'][sender_id]['wallet'] < amount:
-            return False
-        
-        self.economy_data['users'][sender_id]['wallet'] -= amount
-        self.economy_data['users'][receiver_id]['wallet'] += amount
-        
-        self._save_data()
-        self._update_leaderboard()
-        return True
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "UPDATE economy_users SET wallet = wallet + ? WHERE user_id = ?",
+                (amount, receiver_id)
+            )
+            if cursor.rowcount == 0:
+                await db.rollback()
+                return False
+                
+            cursor = await db.execute(
+                "UPDATE economy_users SET wallet = wallet - ? WHERE user_id = ? AND wallet >= ?",
+                (amount, sender_id, amount)
+            )
+            if cursor.rowcount == 0:
+                await db.rollback()
+                return False
+                
+            await self._refresh_leaderboards(db, sender_id, receiver_id)
+            return True
     
-    def claim_daily(self, user_id):
+    async def claim_daily(self, user_id):
         """Claim daily rewards"""
         user_id = str(user_id)
         
-        if user_id not in self.economy_data['users']:
-            return None
-        
-        user_data = self.economy_data['users'][user_id]
-        
-        # Check if daily was already claimed
-        if user_data['daily_last_claimed'] is not None:
-            last_claimed = datetime.fromisoformat(user_data['daily_last_claimed'])
+        async with self.pool.write() as db:
+            async with db.execute(
+                "SELECT daily_last_claimed FROM economy_users WHERE user_id = ?",
+                (user_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                
+            if row is None:
+                return None
+            
             now = datetime.utcnow()
             
-            # Check if 24 hours have passed
-            if now - last_claimed < timedelta(days=1):
-                time_remaining = timedelta(days=1) - (now - last_claimed)
-                hours, remainder = divmod(time_remaining.seconds, 3600)
-                minutes, _ = divmod(remainder, 60)
+            # Check if daily was already claimed
+            if row['daily_last_claimed'] is not None:
+                last_claimed = datetime.fromisoformat(row['daily_last_claimed'])
                 
-                return {
-                    'success': False,
-                    'time_remaining': {'hours': hours, 'minutes': minutes}
-                }
-        
-        # Calculate daily amount (random between 200-500)
-        amount = random.randint(200, 500)
-        
-        # Update user data
-        user_data['wallet'] += amount
-        user_data['total_earnings'] += amount
-        user_data['daily_last_claimed'] = datetime.utcnow().isoformat()
-        
-        self._save_data()
-        self._update_leaderboard()
+                # Check if 24 hours have passed
+                if now - last_claimed < timedelta(days=1):
+                    time_remaining = timedelta(days=1) - (now - last_claimed)
+                    hours, remainder = divmod(time_remaining.seconds, 3600)
+                    minutes, _ = divmod(remainder, 60)
+                    
+                    return {
+                        'success': False,
+                        'time_remaining': {'hours': hours, 'minutes': minutes}
+                    }
+            
+            # Calculate daily amount (random between 200-500)
+            amount = random.randint(200, 500)
+            
+            await db.execute(
+                "UPDATE economy_users SET wallet = wallet + ?, total_earnings = total_earnings + ?, "
+                "daily_last_claimed = ? WHERE user_id = ?",
+                (amount, amount, now.isoformat(), user_id)
+            )
+            await self._refresh_leaderboards(db, user_id)
         
         return {
             'success': True,
             'amount': amount
         }
     
-    def rob_user(self, robber_id, victim_id):
-        """Attempt to rob another user"""
+    async def rob_user(self, robber_id, victim_id):
+        """Attempt to rob another user; both sides are updated in one transaction"""
         robber_id = str(robber_id)
         victim_id = str(victim_id)
         
-        if robber_id not in self.economy_data['users'] or victim_id not in self.economy_data['users']:
-            return {'success': False, 'reason': 'Invalid user IDs'}
-        
-        robber = self.economy_data['users'][robber_id]
-        victim = self.economy_data['users'][victim_id]
-        
-        # Update statistics
-        robber['stats']['rob_attempts'] += 1
-        
-        # Check if victim has protection
-        if any(effect['type'] == 'rob_protection' for effect in victim.get('active_effects', [])):
-            return {'success': False, 'reason': 'protected'}
-        
-        # Check if victim has money in wallet
-        if victim['wallet'] <= 0:
-            return {'success': False, 'reason': 'no_money'}
-        
-        # 40% chance of success
-        if random.random() > 0.4:
-            # Rob failed
-            penalty = min(robber['wallet'], random.randint(50, 200))
-            if penalty > 0:
-                robber['wallet'] -= penalty
-                robber['total_losses'] += penalty
+        async with self.pool.write() as db:
+            async with db.execute(
+                "SELECT user_id, wallet FROM economy_users WHERE user_id IN (?, ?)",
+                (robber_id, victim_id)
+            ) as cursor:
+                wallets = {row['user_id']: row['wallet'] for row in await cursor.fetchall()}
                 
-            return {'success': False, 'reason': 'failed', 'penalty': penalty}
-        
-        # Rob successful
-        # Can steal up to 30% of victim's wallet
-        max_steal = int(victim['wallet'] * 0.3)
-        amount = random.randint(1, max_steal) if max_steal > 0 else 1
-        
-        victim['wallet'] -= amount
-        victim['stats']['times_robbed'] += 1
-        robber['wallet'] += amount
-        robber['total_earnings'] += amount
-        robber['stats']['successful_robs'] += 1
-        
-        self._save_data()
-        self._update_leaderboard()
+            if robber_id not in wallets or victim_id not in wallets:
+                return {'success': False, 'reason': 'Invalid user IDs'}
+            
+            # Update statistics
+            await db.execute(
+                "UPDATE economy_users SET rob_attempts = rob_attempts + 1 WHERE user_id = ?",
+                (robber_id,)
+            )
+            
+            # Check if victim has protection
+            async with db.execute(
+                "SELECT 1 FROM economy_effects WHERE user_id = ? AND type = 'rob_protection' LIMIT 1",
+                (victim_id,)
+            ) as cursor:
+                if await cursor.fetchone() is not None:
+                    return {'success': False, 'reason': 'protected'}
+            
+            # Check if victim has money in wallet
+            if wallets[victim_id] <= 0:
+                return {'success': False, 'reason': 'no_money'}
+            
+            # 40% chance of success
+            if random.random() > 0.4:
+                # Rob failed
+                penalty = min(wallets[robber_id], random.randint(50, 200))
+                if penalty > 0:
+                    await db.execute(
+                        "UPDATE economy_users SET wallet = wallet - ?, total_losses = total_losses + ? WHERE user_id = ?",
+                        (penalty, penalty, robber_id)
+                    )
+                    await self._refresh_leaderboards(db, robber_id)
+                    
+                return {'success': False, 'reason': 'failed', 'penalty': penalty}
+            
+            # Rob successful
+            # Can steal up to 30% of victim's wallet
+            max_steal = int(wallets[victim_id] * 0.3)
+            amount = random.randint(1, max_steal) if max_steal > 0 else 1
+            
+            await db.execute(
+                "UPDATE economy_users SET wallet = wallet - ?, times_robbed = times_robbed + 1 WHERE user_id = ?",
+                (amount, victim_id)
+            )
+            await db.execute(
+                "UPDATE economy_users SET wallet = wallet + ?, total_earnings = total_earnings + ?, "
+                "successful_robs = successful_robs + 1 WHERE user_id = ?",
+                (amount, amount, robber_id)
+            )
+            await self._refresh_leaderboards(db, robber_id, victim_id)
         
         return {'success': True, 'amount': amount}
     
-    def gamble(self, user_id, amount, game_type='gamble'):
+    async def gamble(self, user_id, amount, game_type='gamble'):
         """Process a gambling attempt"""
         user_id = str(user_id)
         
-        if user_id not in self.economy_data['users']:
-            return {'success': False, 'reason': 'no_account'}
-        
-        user_data = self.economy_data['users'][user_id]
-        
-        if user_data['wallet'] < amount:
-            return {'success': False, 'reason': 'insufficient_funds'}
-        
-        # Determine win chance based on game type and active effects
-        base_win_chance = {
-            'gamble': 0.45,
-            'supergamble': 0.3,
-            'dice': 0.5,
-            'coinflip': 0.49,
-            'blackjack': 0.47
-        }.get(game_type, 0.45)
-        
-        # Apply effects
-        win_chance = base_win_chance
-        win_multiplier = 1.0
-        
-        # Process active effects
-        new_active_effects = []
-        for effect in user_data.get('active_effects', []):
-            # Skip expired effects
-            if effect.get('duration', 0) == 0:
-                continue
+        async with self.pool.write() as db:
+            async with db.execute("SELECT wallet FROM economy_users WHERE user_id = ?", (user_id,)) as cursor:
+                row = await cursor.fetchone()
                 
-            # Apply effect based on type
-            if effect['type'] == 'win_chance' and game_type in ['gamble', 'supergamble', 'dice', 'coinflip', 'blackjack']:
-                win_chance += effect['value'] / 100  # Convert percentage to decimal
+            if row is None:
+                return {'success': False, 'reason': 'no_account'}
+            
+            if row['wallet'] < amount:
+                return {'success': False, 'reason': 'insufficient_funds'}
+            
+            # Determine win chance based on game type and active effects
+            base_win_chance = {
+                'gamble': 0.45,
+                'supergamble': 0.3,
+                'dice': 0.5,
+                'coinflip': 0.49,
+                'blackjack': 0.47
+            }.get(game_type, 0.45)
+            
+            # Apply effects
+            win_chance = base_win_chance
+            win_multiplier = 1.0
+            
+            for effect in await self._get_effects(db, user_id):
+                # Skip expired effects
+                if effect['duration'] == 0:
+                    continue
+                    
+                # Apply effect based on type
+                if effect['type'] == 'win_chance' and game_type in GAME_TYPES:
+                    win_chance += effect['value'] / 100  # Convert percentage to decimal
+                    
+                if effect['type'] == 'win_multiplier' and game_type in GAME_TYPES:
+                    win_multiplier *= effect['value']
+                    
+                if effect['type'] == 'dice_boost' and game_type == 'dice':
+                    win_chance += effect['value'] / 100  # Convert percentage to decimal
+            
+            # Decrease duration for temporary effects and drop the expired ones
+            await db.execute(
+                "UPDATE economy_effects SET duration = duration - 1 WHERE user_id = ? AND duration > 0",
+                (user_id,)
+            )
+            await db.execute(
+                "DELETE FROM economy_effects WHERE user_id = ? AND duration = 0",
+                (user_id,)
+            )
+            
+            # Update statistics
+            plays_column = f"{game_type}_plays" if game_type in GAME_TYPES else None
+            plays_update = f", {plays_column} = {plays_column} + 1" if plays_column else ""
+            
+            # Determine result
+            if random.random() < win_chance:
+                # Won
+                multiplier = {
+                    'gamble': 2.0,
+                    'supergamble': 3.0,
+                    'dice': 1.8,
+                    'coinflip': 1.95,
+                    'blackjack': 2.0
+                }.get(game_type, 2.0)
                 
-            if effect['type'] == 'win_multiplier' and game_type in ['gamble', 'supergamble', 'dice', 'coinflip', 'blackjack']:
-                win_multiplier *= effect['value']
+                # Apply win multiplier from effects
+                multiplier *= win_multiplier
                 
-            if effect['type'] == 'dice_boost' and game_type == 'dice':
-                win_chance += effect['value'] / 100  # Convert percentage to decimal
-            
-            # Decrease duration for temporary effects
-            if effect['duration'] > 0:
-                effect['duration'] -= 1
+                winnings = int(amount * multiplier)
+                net_winnings = winnings - amount  # Already had amount in wallet
+                wins_update = f", {game_type}_wins = {game_type}_wins + 1" if plays_column else ""
                 
-            # Keep non-expired effects
-            if effect['duration'] != 0:
-                new_active_effects.append(effect)
+                await db.execute(
+                    "UPDATE economy_users SET wallet = wallet + ?, total_earnings = total_earnings + ?, "
+                    f"total_gambles = total_gambles + 1, wins = wins + 1{plays_update}{wins_update} "
+                    "WHERE user_id = ?",
+                    (net_winnings, net_winnings, user_id)
+                )
+                await self._refresh_leaderboards(db, user_id)
                 
-        # Update active effects
-        user_data['active_effects'] = new_active_effects
-        
-        # Update statistics
-        user_data['total_gambles'] += 1
-        
-        if game_type == 'gamble':
-            user_data['stats']['gamble_plays'] += 1
-        elif game_type == 'supergamble':
-            user_data['stats']['supergamble_plays'] += 1
-        elif game_type == 'dice':
-            user_data['stats']['dice_plays'] += 1
-        elif game_type == 'coinflip':
-            user_data['stats']['coinflip_plays'] += 1
-        elif game_type == 'blackjack':
-            user_data['stats']['blackjack_plays'] += 1
-        
-        # Determine result
-        if random.random() < win_chance:
-            # Won
-            multiplier = {
-                'gamble': 2.0,
-                'supergamble': 3.0,
-                'dice': 1.8,
-                'coinflip': 1.95,
-                'blackjack': 2.0
-            }.get(game_type, 2.0)
-            
-            # Apply win multiplier from effects
-            multiplier *= win_multiplier
-            
-            winnings = int(amount * multiplier)
-            user_data['wallet'] += winnings - amount  # Add net winnings (already had amount in wallet)
-            user_data['total_earnings'] += winnings - amount  # Add net winnings to total earnings
-            user_data['wins'] += 1
-            
-            if game_type == 'gamble':
-                user_data['stats']['gamble_wins'] += 1
-            elif game_type == 'supergamble':
-                user_data['stats']['supergamble_wins'] += 1
-            elif game_type == 'dice':
-                user_data['stats']['dice_wins'] += 1
-            elif game_type == 'coinflip':
-                user_data['stats']['coinflip_wins'] += 1
-            elif game_type == 'blackjack':
-                user_data['stats']['blackjack_wins'] += 1
-            
-            self._save_data()
-            self._update_leaderboard()
-            
-            return {
-                'success': True, 
-                'won': True, 
-                'net_winnings': winnings - amount,
-                'total_winnings': winnings
-            }
-        else:
-            # Lost
-            user_data['wallet'] -= amount
-            user_data['total_losses'] += amount
-            user_data['losses'] += 1
+                return {
+                    'success': True, 
+                    'won': True, 
+                    'net_winnings': net_winnings,
+                    'total_winnings': winnings
+                }
             
-            self._save_data()
-            self._update_leaderboard()
+            # Lost
+            await db.execute(
+                "UPDATE economy_users SET wallet = wallet - ?, total_losses = total_losses + ?, "
+                f"total_gambles = total_gambles + 1, losses = losses + 1{plays_update} "
+                "WHERE user_id = ?",
+                (amount, amount, user_id)
+            )
+            await self._refresh_leaderboards(db, user_id)
             
             return {'success': True, 'won': False, 'amount_lost': amount}
     
-    def buy_item(self, user_id, item_id, quantity=1):
+    async def buy_item(self, user_id, item_id, quantity=1):
         """Buy an item from the shop"""
         user_id = str(user_id)
         
-        if user_id not in self.economy_data['users']:
-            return {'success': False, 'reason': 'no_account'}
-        
         if item_id not in self.shop_items:
+            if not await self.account_exists(user_id):
+                return {'success': False, 'reason': 'no_account'}
             return {'success': False, 'reason': 'invalid_item'}
         
-        user_data = self.economy_data['users'][user_id]
         item = self.shop_items[item_id]
         total_cost = item['price'] * quantity
         
-        if user_data['wallet'] < total_cost:
-            return {'success': False, 'reason': 'insufficient_funds'}
-        
-        # Process purchase
-        user_data['wallet'] -= total_cost
-        
-        # Add item to inventory
-        for _ in range(quantity):
-            user_data['items'].append({
-                'id': item_id,
-                'name': item['name'],
-                'purchased_at': datetime.utcnow().isoformat(),
-                'used': False
-            })
-        
-        self._save_data()
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "UPDATE economy_users SET wallet = wallet - ? WHERE user_id = ? AND wallet >= ?",
+                (total_cost, user_id, total_cost)
+            )
+            
+            if cursor.rowcount == 0:
+                async with db.execute("SELECT 1 FROM economy_users WHERE user_id = ?", (user_id,)) as cursor:
+                    exists = await cursor.fetchone() is not None
+                return {'success': False, 'reason': 'insufficient_funds' if exists else 'no_account'}
+            
+            # Add item to inventory
+            purchased_at = datetime.utcnow().isoformat()
+            await db.executemany(
+                "INSERT INTO economy_items (user_id, item_id, name, purchased_at) VALUES (?, ?, ?, ?)",
+                [(user_id, item_id, item['name'], purchased_at)] * quantity
+            )
+            await self._refresh_leaderboards(db, user_id)
         
         return {'success': True, 'cost': total_cost, 'item': item, 'quantity': quantity}
     
-    def use_item(self, user_id, item_id):
+    async def use_item(self, user_id, item_id):
         """Use an item from inventory"""
         user_id = str(user_id)
         
-        if user_id not in self.economy_data['users']:
+        if not await self.account_exists(user_id):
             return {'success': False, 'reason': 'no_account'}
         
         if item_id not in self.shop_items:
             return {'success': False, 'reason': 'invalid_item'}
         
-        user_data = self.economy_data['users'][user_id]
-        
-        # Find the first unused item of this type
-        found_item_index = None
-        for i, item in enumerate(user_data['items']):
-            if item['id'] == item_id and not item['used']:
-                found_item_index = i
-                break
-        
-        if found_item_index is None:
-            return {'success': False, 'reason': 'no_item'}
-        
-        # Mark item as used
-        user_data['items'][found_item_index]['used'] = True
-        user_data['items'][found_item_index]['used_at'] = datetime.utcnow().isoformat()
-        
-        # Apply item effect
-        item_effect = self.shop_items[item_id]['effect'].copy()
-        
-        if item_effect['type'] == 'bank_capacity':
-            # Permanent effect on bank capacity
-            user_data['bank_capacity'] += item_effect['value']
-        else:
-            # Add to active effects
-            if 'active_effects' not in user_data:
-                user_data['active_effects'] = []
+        async with self.pool.write() as db:
+            # Find the first unused item of this type
+            async with db.execute(
+                "SELECT id FROM economy_items WHERE user_id = ? AND item_id = ? AND used = 0 ORDER BY id LIMIT 1",
+                (user_id, item_id)
+            ) as cursor:
+                row = await cursor.fetchone()
                 
-            user_data['active_effects'].append(item_effect)
-        
-        self._save_data()
+            if row is None:
+                return {'success': False, 'reason': 'no_item'}
+            
+            # Mark item as used
+            await db.execute(
+                "UPDATE economy_items SET used = 1, used_at = ? WHERE id = ?",
+                (datetime.utcnow().isoformat(), row['id'])
+            )
+            
+            # Apply item effect
+            item_effect = self.shop_items[item_id]['effect']
+            
+            if item_effect['type'] == 'bank_capacity':
+                # Permanent effect on bank capacity
+                await db.execute(
+                    "UPDATE economy_users SET bank_capacity = bank_capacity + ? WHERE user_id = ?",
+                    (item_effect['value'], user_id)
+                )
+            else:
+                # Add to active effects
+                await db.execute(
+                    "INSERT INTO economy_effects (user_id, type, value, duration) VALUES (?, ?, ?, ?)",
+                    (user_id, item_effect['type'], item_effect['value'], item_effect['duration'])
+                )
         
         return {'success': True, 'item': self.shop_items[item_id]}
     
-    def get_inventory(self, user_id):
+    async def get_inventory(self, user_id):
         """Get a user's inventory"""
         user_id = str(user_id)
         
-        if user_id not in self.economy_data['users']:
+        if not await self.account_exists(user_id):
             return None
         
-        user_data = self.economy_data['users'][user_id]
-        
         # Group items by type and count unused ones
-        inventory = {}
-        for item in user_data['items']:
-            if not item['used']:
-                if item['id'] not in inventory:
-                    inventory[item['id']] = {
-                        'id': item['id'],
-                        'name': item['name'],
-                        'count': 1,
-                        'description': self.shop_items[item['id']]['description']
-                    }
-                else:
-                    inventory[item['id']]['count'] += 1
-        
-        return list(inventory.values())
+        async with self.pool.read() as db:
+            async with db.execute(
+                "SELECT item_id, MIN(name) AS name, COUNT(*) AS count FROM economy_items "
+                "WHERE user_id = ? AND used = 0 GROUP BY item_id ORDER BY MIN(id)",
+                (user_id,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+        
+        return [
+            {
+                'id': row['item_id'],
+                'name': row['name'],
+                'count': row['count'],
+                'description': self.shop_items[row['item_id']]['description']
+            }
+            for row in rows
+        ]
     
-    def get_active_effects(self, user_id):
+    async def get_active_effects(self, user_id):
         """Get a user's active effects"""
         user_id = str(user_id)
         
-        if user_id not in self.economy_data['users']:
-            return None
-        
-        return self.economy_data['users'][user_id].get('active_effects', [])
+        async with self.pool.read() as db:
+            async with db.execute("SELECT 1 FROM economy_users WHERE user_id = ?", (user_id,)) as cursor:
+                if await cursor.fetchone() is None:
+                    return None
+                    
+            effects = await self._get_effects(db, user_id)
+        
+        return [
+            {'type': effect['type'], 'value': effect['value'], 'duration': effect['duration']}
+            for effect in effects
+        ]
     
     def get_shop_items(self):
         """Get all available shop items"""
         return self.shop_items
     
-    def get_leaderboard(self, board_type='balance', limit=10):
+    async def get_leaderboard(self, board_type='balance', limit=10):
         """Get the leaderboard for either balance or earnings"""
-        if board_type not in ['balance', 'earnings']:
+        if board_type not in LEADERBOARD_TYPES:
             return []
         
-        # Update leaderboard first
-        self._update_leaderboard()
-        
-        # Return leaderboard
-        return self.economy_data['leaderboard'][board_type][:limit]
+        return [
+            {'user_id': user_id, 'username': self._usernames.get(user_id), 'amount': amount}
+            for user_id, amount in self.leaderboards[board_type].top(limit)
+        ]
     
-    def _update_leaderboard(self):
-        """Update the leaderboard"""
-        # Balance leaderboard
-        balance_leaderboard = []
-        for user_id, user_data in self.economy_data['users'].items():
-            total_balance = user_data['wallet'] + user_data['bank']
-            balance_leaderboard.append({
-                'user_id': user_id,
-                'username': user_data['username'],
-                'amount': total_balance
-            })
-        
-        # Sort by balance
-        balance_leaderboard.sort(key=lambda x: x['amount'], reverse=True)
-        
-        # Earnings leaderboard
-        earnings_leaderboard = []
-        for user_id, user_data in self.economy_data['users'].items():
-            earnings_leaderboard.append({
-                'user_id': user_id,
-                'username': user_data['username'],
-                'amount': user_data['total_earnings']
-            })
-        
-        # Sort by earnings
-        earnings_leaderboard.sort(key=lambda x: x['amount'], reverse=True)
-        
-        # Update leaderboard data
-        self.economy_data['leaderboard'] = {
-            'balance': balance_leaderboard,
-            'earnings': earnings_leaderboard
-        }
+    def get_rank(self, user_id, board_type='balance'):
+        """Get a user's 1-based leaderboard position, or None"""
+        if board_type not in LEADERBOARD_TYPES:
+            return None
         
-        # No need to save as this is called from methods that already save 
+        return self.leaderboards[board_type].rank(str(user_id))
 
 async def setup(bot):
     # This is a database module, no cog to add
-    pass 
\ No newline at end of file
+    pass
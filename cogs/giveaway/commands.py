@@ -198,6 +198,7 @@ class GiveawayCommands(Giveaway):
             
             self.active_giveaways[guild_id][str(giveaway_message.id)] = giveaway_data
             self.save_giveaways(guild_id)
+            await self.schedule_giveaway(guild_id, str(giveaway_message.id), giveaway_data)
             
             # Confirmation message
             await ctx.send(f"✅ Giveaway created successfully in {channel.mention}!")
@@ -257,6 +258,7 @@ class GiveawayCommands(Giveaway):
         # Remove from active giveaways
         del self.active_giveaways[guild_id][message_id]
         self.save_giveaways(guild_id)
+        await self.bot.scheduler.cancel("giveaway", message_id)
         
         await ctx.send("✅ Giveaway cancelled successfully!")
     
@@ -720,6 +722,7 @@ class GiveawayCommands(Giveaway):
         # Update message
         if await self._update_giveaway_message(ctx, message_id, giveaway):
             self.save_giveaways(guild_id)
+            await self.schedule_giveaway(guild_id, message_id, giveaway)
             formatted_time = self.format_time(duration_seconds)
             await ctx.send(f"✅ Giveaway duration updated. New duration: {formatted_time}")
     
@@ -32,12 +32,15 @@ class Giveaway(commands.Cog):
         
         # Start the background tasks
         self.load_active_giveaways.start()
-        self.check_ended_giveaways.start()
+    
+    async def cog_load(self):
+        """Giveaways end through the bot's scheduler"""
+        self.bot.scheduler.register("giveaway", self.end_scheduled_giveaway)
         
     def cog_unload(self):
         """Cleanup when cog is unloaded"""
-        self.check_ended_giveaways.cancel()
         self.load_active_giveaways.cancel()
+        self.bot.scheduler.unregister("giveaway")
         
         # Save all active giveaways when unloaded
         for guild_id in self.active_giveaways:
@@ -65,9 +68,10 @@ class Giveaway(commands.Cog):
                     if guild_id not in self.ended_giveaways:
                         self.ended_giveaways[guild_id] = {}
                         
-                    # Load active giveaways
+                    # Load active giveaways, (re)arming their scheduler jobs from end_time
                     for message_id, giveaway in data.get("active", {}).items():
                         self.active_giveaways[guild_id][message_id] = giveaway
+                        await self.schedule_giveaway(guild_id, message_id, giveaway)
                         
                     # Load ended giveaways
                     for message_id, giveaway in data.get("ended", {}).items():
@@ -83,34 +87,34 @@ class Giveaway(commands.Cog):
         """Wait for the bot to be ready before loading giveaways"""
         await self.bot.wait_until_ready()
     
-    @tasks.loop(seconds=60)  # Check every minute
-    async def check_ended_giveaways(self):
-        """Check for giveaways that have ended"""
-        current_time = datetime.datetime.utcnow().timestamp()
+    async def schedule_giveaway(self, guild_id: int, message_id: str, giveaway: dict):
+        """Schedule (or move) the job that ends a giveaway at its end time"""
+        # end_time is utcnow().timestamp(), i.e. naive UTC read as local time;
+        # fromtimestamp turns it back into the naive UTC datetime the scheduler expects
+        await self.bot.scheduler.schedule(
+            "giveaway",
+            message_id,
+            datetime.datetime.fromtimestamp(giveaway["end_time"]),
+            {"guild_id": guild_id, "message_id": message_id}
+        )
         
-        for guild_id, giveaways in list(self.active_giveaways.items()):
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                continue
+    async def end_scheduled_giveaway(self, job):
+        """End a giveaway when its scheduler job comes due"""
+        guild_id = job.payload["guild_id"]
+        message_id = job.payload["message_id"]
+        
+        giveaway = self.active_giveaways.get(guild_id, {}).get(message_id)
+        if not giveaway:
+            return  # Ended early or cancelled
+        
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return
                 
-            for message_id, giveaway in list(giveaways.items()):
-                # Check if the giveaway has ended
-                if giveaway["end_time"] <= current_time:
-                    try:
-                        # Get the channel and message
-                        channel_id = giveaway["channel_id"]
-                        channel = guild.get_channel(channel_id)
-                        
-                        if channel:
-                            # Try to end the giveaway
-                            await self.end_giveaway(guild, channel, message_id, giveaway)
-                    except Exception as e:
-                        logger.error(f"Error processing ended giveaway in guild {guild_id}, message {message_id}: {e}")
-    
-    @check_ended_giveaways.before_loop
-    async def before_check_ended_giveaways(self):
-        """Wait for giveaways to be loaded before checking for ended ones"""
-        await self.load_active_giveaways.wait()
+        # Get the channel and end the giveaway
+        channel = guild.get_channel(giveaway["channel_id"])
+        if channel:
+            await self.end_giveaway(guild, channel, message_id, giveaway)
     
     def save_giveaways(self, guild_id: int):
         """Save active and ended giveaways for a guild"""
@@ -122,9 +126,8 @@ class Giveaway(commands.Cog):
         }
         
         try:
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=4)
-            logger.debug(f"Saved giveaways for guild {guild_id}")
+            self.bot.json_store.save(filepath, data)
+            logger.debug(f"Queued giveaway save for guild {guild_id}")
         except Exception as e:
             logger.error(f"Error saving giveaways for guild {guild_id}: {e}")
     
@@ -1,14 +1,35 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import json
 import os
 import logging
 import aiohttp
-import asyncio
 from datetime import datetime, timedelta
 
+from core.feeds import FeedProvider, SubscriptionIndex, normalize_handle
+
 logger = logging.getLogger('bot')
 
+class InstagramFeed(FeedProvider):
+    """Feeds Instagram posts from subscribed accounts into the shared feed engine"""
+    
+    name = "instagram"
+    interval = 30 * 60
+    
+    def __init__(self, cog):
+        self.cog = cog
+        
+    def accounts(self):
+        """Every Instagram user subscribed to in any guild, without the '@'"""
+        return self.cog.subscriptions.accounts()
+        
+    async def fetch(self, username):
+        return await self.cog.get_recent_posts(username, limit=5)
+        
+    async def on_new(self, username, posts):
+        for post in posts:
+            await self.cog.send_post_notifications(username, post)
+
 class InstagramCommands(commands.Cog):
     """Commands for Instagram feed notifications"""
     
@@ -17,13 +38,8 @@ class InstagramCommands(commands.Cog):
         self.data_folder = 'data'
         self.config_file = os.path.join(self.data_folder, 'instagram_config.json')
         self.instagram_config = self.load_config()
-        
-        # Check interval for new posts (default: 30 minutes)
-        self.check_interval = 30 * 60  
-        self.last_post_data = {}  # username -> {post_ids: []}
-        
-        # Start the background task
-        self.check_new_posts.start()
+        # Followed account -> [(guild_id, channel_id, message template)]
+        self.subscriptions = SubscriptionIndex(self.instagram_config, normalize=normalize_handle)
         
     def load_config(self):
         """Load the Instagram configuration from file"""
@@ -42,12 +58,15 @@ class InstagramCommands(commands.Cog):
             
     def save_config(self):
         """Save the Instagram configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.instagram_config, f, indent=4)
+        self.bot.json_store.save(self.config_file, self.instagram_config)
             
+    async def cog_load(self):
+        """Poll the subscribed accounts through the shared feed engine"""
+        self.bot.feeds.register(InstagramFeed(self))
+        
     def cog_unload(self):
         """Clean up when the cog is unloaded"""
-        self.check_new_posts.cancel()
+        self.bot.feeds.unregister("instagram")
         
     async def get_user_info(self, username):
         """Get the Instagram user info for a username"""
@@ -109,152 +128,82 @@ class InstagramCommands(commands.Cog):
         
         return mock_posts
         
-    @tasks.loop(minutes=30)
-    async def check_new_posts(self):
-        """Check for new posts and send notifications"""
-        logger.info("Checking for new Instagram posts...")
+    async def send_post_notifications(self, username, post):
+        """Send notifications for a new post to every channel following the user"""
+        subscriptions = self.subscriptions.get(username)
+        if not subscriptions:
+            return
+            
+        # Create the embed once; every channel gets the same one
+        embed = discord.Embed(
+            title=f"New Instagram Post from @{username}",
+            url=post['permalink'],
+            description=post['caption'],
+            color=0xE1306C,  # Instagram pink
+            timestamp=datetime.fromisoformat(post['created_at'])
+        )
         
-        all_users = set()
+        user_info = await self.get_user_info(username)
         
-        # Collect all Instagram users across all guilds
-        for guild_id, guild_data in self.instagram_config.items():
-            if "channels" in guild_data:
-                for discord_channel_id, instagram_users in guild_data["channels"].items():
-                    all_users.update([u.lower() for u in instagram_users])
+        # Set author with profile image
+        embed.set_author(
+            name=f"{user_info['full_name']} (@{username})",
+            icon_url=user_info['profile_pic_url'],
+            url=f"https://www.instagram.com/{username}"
+        )
         
-        if not all_users:
-            return
-            
-        for instagram_user in all_users:
-            try:
-                # Remove '@' from the username if present
-                clean_username = instagram_user[1:] if instagram_user.startswith('@') else instagram_user
-                
-                recent_posts = await self.get_recent_posts(clean_username, limit=5)
-                
-                # Initialize if this is a new user
-                if clean_username not in self.last_post_data:
-                    self.last_post_data[clean_username] = {
-                        'post_ids': [post['id'] for post in recent_posts]
-                    }
-                    continue
-                
-                # Get previously seen post IDs
-                known_post_ids = self.last_post_data[clean_username]['post_ids']
-                
-                # Find new posts
-                for post in recent_posts:
-                    if post['id'] not in known_post_ids:
-                        await self.send_post_notifications(clean_username, post)
-                        known_post_ids.append(post['id'])
-                
-                # Update last post data (keep only last 20 posts to prevent unlimited growth)
-                self.last_post_data[clean_username]['post_ids'] = known_post_ids[:20]
-                
-                # Small delay between API calls to avoid rate limits
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error checking posts for {instagram_user}: {str(e)}")
-    
-    @check_new_posts.before_loop
-    async def before_check_new_posts(self):
-        """Wait until the bot is ready before starting the task"""
-        await self.bot.wait_until_ready()
-        logger.info("Starting Instagram post check task")
+        # Add stats to the footer
+        embed.set_footer(
+            text=f"❤️ {post['like_count']:,} | 💬 {post['comment_count']:,}",
+            icon_url="https://www.instagram.com/static/images/ico/favicon-192.png/68d99ba29cc8.png"
+        )
         
-    async def send_post_notifications(self, username, post):
-        """Send notifications for a new post"""
-        username_lower = username.lower()
+        # Add image or video thumbnail
+        if post['is_carousel']:
+            embed.add_field(
+                name="📸 Type",
+                value="Multiple Photos/Videos",
+                inline=True
+            )
+            if post['carousel_media'] and len(post['carousel_media']) > 0:
+                embed.set_image(url=post['carousel_media'][0]['image_url'])
+        elif post['is_video']:
+            embed.add_field(
+                name="📸 Type",
+                value="Video",
+                inline=True
+            )
+            embed.set_image(url=post['thumbnail_url'])
+        else:
+            embed.add_field(
+                name="📸 Type",
+                value="Photo",
+                inline=True
+            )
+            embed.set_image(url=post['image_url'])
         
-        for guild_id, guild_data in self.instagram_config.items():
-            if "channels" not in guild_data:
-                continue
-                
-            for discord_channel_id, instagram_users in guild_data["channels"].items():
-                if username_lower not in [u.lower() for u in instagram_users]:
-                    continue
-                    
-                # Get the Discord channel
-                channel = self.bot.get_channel(int(discord_channel_id))
-                if not channel:
-                    logger.warning(f"Channel {discord_channel_id} not found, skipping")
-                    continue
-                
-                # Create embed
-                embed = discord.Embed(
-                    title=f"New Instagram Post from @{username}",
-                    url=post['permalink'],
-                    description=post['caption'],
-                    color=0xE1306C,  # Instagram pink
-                    timestamp=datetime.fromisoformat(post['created_at'])
-                )
-                
-                user_info = await self.get_user_info(username)
-                
-                # Set author with profile image
-                embed.set_author(
-                    name=f"{user_info['full_name']} (@{username})",
-                    icon_url=user_info['profile_pic_url'],
-                    url=f"https://www.instagram.com/{username}"
-                )
-                
-                # Add stats to the footer
-                embed.set_footer(
-                    text=f"❤️ {post['like_count']:,} | 💬 {post['comment_count']:,}",
-                    icon_url="https://www.instagram.com/static/images/ico/favicon-192.png/68d99ba29cc8.png"
-                )
-                
-                # Add image or video thumbnail
-                if post['is_carousel']:
-                    embed.add_field(
-                        name="📸 Type",
-                        value="Multiple Photos/Videos",
-                        inline=True
-                    )
-                    if post['carousel_media'] and len(post['carousel_media']) > 0:
-                        embed.set_image(url=post['carousel_media'][0]['image_url'])
-                elif post['is_video']:
-                    embed.add_field(
-                        name="📸 Type",
-                        value="Video",
-                        inline=True
-                    )
-                    embed.set_image(url=post['thumbnail_url'])
-                else:
-                    embed.add_field(
-                        name="📸 Type",
-                        value="Photo",
-                        inline=True
-                    )
-                    embed.set_image(url=post['image_url'])
-                
-                # Add location if available
-                if post['location']:
-                    embed.add_field(
-                        name="📍 Location",
-                        value=f"{post['location']['name']}, {post['location']['city']}",
-                        inline=True
-                    )
-                
-                # Get custom message if set
-                custom_message = None
-                if "messages" in guild_data and username_lower in guild_data["messages"]:
-                    custom_message = guild_data["messages"][username_lower]
-                
-                # Format the message content
-                content = custom_message or f"📸 New Instagram post from **@{username}**"
-                
-                # Send notification
-                try:
-                    await channel.send(content=content, embed=embed)
-                    logger.info(f"Sent Instagram notification for @{username} in guild {guild_id}, channel {discord_channel_id}")
-                except Exception as e:
-                    logger.error(f"Error sending notification: {str(e)}")
+        # Add location if available
+        if post['location']:
+            embed.add_field(
+                name="📍 Location",
+                value=f"{post['location']['name']}, {post['location']['city']}",
+                inline=True
+            )
+        
+        async def send(guild_id, discord_channel_id, custom_message):
+            # Get the Discord channel
+            channel = self.bot.get_channel(int(discord_channel_id))
+            if not channel:
+                logger.warning(f"Channel {discord_channel_id} not found, skipping")
+                return False
                 
-                # Small delay between notifications
-                await asyncio.sleep(1) 
-
+            # Format the message content
+            content = custom_message or f"📸 New Instagram post from **@{username}**"
+            await channel.send(content=content, embed=embed)
+            
+        sent, failed = await self.bot.feeds.deliver("instagram", subscriptions, send)
+        logger.info(f"Sent Instagram notification for @{username} to {sent} channels ({failed} failed)")
+            
     @commands.command(name="instagram")
     async def instagram_user(self, ctx, username: str = None):
         """Lookup an Instagram user or follow their timeline"""
@@ -475,11 +424,13 @@ class InstagramCommands(commands.Cog):
             
         if clean_username.lower() not in [name.lower() for name in self.instagram_config[guild_id]["channels"][channel_id]]:
             self.instagram_config[guild_id]["channels"][channel_id].append(clean_username)
+            self.subscriptions.add(guild_id, channel_id, clean_username, self.instagram_config[guild_id].get("messages"))
             await ctx.send(f"✅ Added Instagram feed for `@{clean_username}` in {channel.mention}")
         else:
             await ctx.send(f"Instagram feed for `@{clean_username}` already exists in {channel.mention}")
             
         self.save_config()
+        self.bot.feeds.refresh()
 
     @instagram_group.command(name="remove")
     @commands.has_permissions(manage_channels=True)
@@ -499,6 +450,7 @@ class InstagramCommands(commands.Cog):
             for i, name in enumerate(instagram_users):
                 if name.lower() == clean_username.lower():
                     self.instagram_config[guild_id]["channels"][channel_id].pop(i)
+                    self.subscriptions.remove(guild_id, channel_id, name)
                     await ctx.send(f"✅ Removed Instagram feed for `@{name}` from {channel.mention}")
                     
                     # Clean up empty entries
@@ -554,6 +506,7 @@ class InstagramCommands(commands.Cog):
         
         if guild_id in self.instagram_config:
             del self.instagram_config[guild_id]
+            self.subscriptions.remove_guild(guild_id)
             self.save_config()
             await ctx.send("✅ All Instagram feed configurations have been reset.")
         else:
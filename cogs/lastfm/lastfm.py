@@ -29,6 +29,10 @@ class LastFM(commands.Cog):
     async def cog_load(self):
         """Initialize the cog on load"""
         await self.db.initialize()
+    
+    async def cog_unload(self):
+        """Close database connections on unload"""
+        await self.db.close()
         
     @commands.group(name="lastfm", aliases=["fm", "lf"], invoke_without_command=True)
     async def lastfm(self, ctx):
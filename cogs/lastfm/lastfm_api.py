@@ -1,10 +1,11 @@
-import aiohttp
 import os
 import logging
 import datetime
 import json
 from urllib.parse import quote
 
+from core.http import get_http_client
+
 logger = logging.getLogger('bot')
 
 class LastFMAPI:
@@ -30,17 +31,16 @@ class LastFMAPI:
             "format": "json"
         })
         
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            try:
-                async with session.get(self.base_url, params=params) as response:
-                    if response.status != 200:
-                        logger.error(f"Last.fm API error: {response.status} - {await response.text()}")
-                        return None
-                    
-                    return await response.json()
-            except Exception as e:
-                logger.error(f"Error making Last.fm API request: {e}")
-                return None
+        try:
+            async with get_http_client().get(self.base_url, params=params, headers=self.headers) as response:
+                if response.status != 200:
+                    logger.error(f"Last.fm API error: {response.status} - {await response.text()}")
+                    return None
+                
+                return await response.json()
+        except Exception as e:
+            logger.error(f"Error making Last.fm API request: {e}")
+            return None
     
     async def get_user_info(self, username):
         """Get information about a Last.fm user"""
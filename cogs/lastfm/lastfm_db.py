@@ -1,9 +1,10 @@
 import json
 import os
 import logging
-import aiosqlite
 import datetime
 
+from core.database import get_pool, close_pool
+
 logger = logging.getLogger('bot')
 
 class LastFMDB:
@@ -12,13 +13,18 @@ class LastFMDB:
     def __init__(self):
         self.data_folder = 'data'
         self.db_path = os.path.join(self.data_folder, 'lastfm.db')
+        self.pool = get_pool(self.db_path)
         
+    async def close(self):
+        """Close the pooled connections for this database"""
+        await close_pool(self.db_path)
+    
     async def initialize(self):
         """Initialize the LastFM database"""
         if not os.path.exists(self.data_folder):
             os.makedirs(self.data_folder)
             
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.write() as db:
             # Create users table
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS lastfm_users (
@@ -86,7 +92,7 @@ class LastFMDB:
     async def register_user(self, user_id, username, lastfm_username):
         """Register a user with their Last.fm username"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "INSERT OR REPLACE INTO lastfm_users (user_id, username, lastfm_username) VALUES (?, ?, ?)",
                     (str(user_id), username, lastfm_username)
@@ -100,7 +106,7 @@ class LastFMDB:
     async def get_lastfm_username(self, user_id):
         """Get a user's Last.fm username"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT lastfm_username FROM lastfm_users WHERE user_id = ?",
                     (str(user_id),)
@@ -114,7 +120,7 @@ class LastFMDB:
     async def remove_user(self, user_id):
         """Remove a user's Last.fm registration"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "DELETE FROM lastfm_users WHERE user_id = ?",
                     (str(user_id),)
@@ -128,7 +134,7 @@ class LastFMDB:
     async def set_custom_command(self, user_id, command):
         """Set a custom command for a user"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 # Update user's custom command
                 await db.execute(
                     "UPDATE lastfm_users SET custom_command = ? WHERE user_id = ?",
@@ -150,7 +156,7 @@ class LastFMDB:
     async def get_custom_command(self, user_id):
         """Get a user's custom command"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT custom_command FROM lastfm_users WHERE user_id = ?",
                     (str(user_id),)
@@ -164,7 +170,7 @@ class LastFMDB:
     async def remove_custom_command(self, user_id):
         """Remove a user's custom command"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 # Get the current custom command
                 async with db.execute(
                     "SELECT custom_command FROM lastfm_users WHERE user_id = ?",
@@ -193,7 +199,7 @@ class LastFMDB:
     async def set_custom_reactions(self, user_id, upvote_emoji, downvote_emoji):
         """Set custom upvote and downvote reactions for a user"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "INSERT OR REPLACE INTO lastfm_reactions (user_id, upvote_emoji, downvote_emoji) VALUES (?, ?, ?)",
                     (str(user_id), upvote_emoji, downvote_emoji)
@@ -207,7 +213,7 @@ class LastFMDB:
     async def get_custom_reactions(self, user_id):
         """Get a user's custom reactions"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT upvote_emoji, downvote_emoji FROM lastfm_reactions WHERE user_id = ?",
                     (str(user_id),)
@@ -223,7 +229,7 @@ class LastFMDB:
     async def set_embed_color(self, user_id, color):
         """Set a custom embed color for a user"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "UPDATE lastfm_users SET color = ? WHERE user_id = ?",
                     (color, str(user_id))
@@ -237,7 +243,7 @@ class LastFMDB:
     async def get_embed_color(self, user_id):
         """Get a user's custom embed color"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT color FROM lastfm_users WHERE user_id = ?",
                     (str(user_id),)
@@ -251,7 +257,7 @@ class LastFMDB:
     async def set_mode(self, user_id, mode):
         """Set a custom mode for a user"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "UPDATE lastfm_users SET mode = ? WHERE user_id = ?",
                     (mode, str(user_id))
@@ -265,7 +271,7 @@ class LastFMDB:
     async def get_mode(self, user_id):
         """Get a user's custom mode"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT mode FROM lastfm_users WHERE user_id = ?",
                     (str(user_id),)
@@ -279,7 +285,7 @@ class LastFMDB:
     async def add_to_blacklist(self, user_id):
         """Add a user to the blacklist"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "INSERT OR REPLACE INTO lastfm_blacklist (user_id) VALUES (?)",
                     (str(user_id),)
@@ -293,7 +299,7 @@ class LastFMDB:
     async def remove_from_blacklist(self, user_id):
         """Remove a user from the blacklist"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "DELETE FROM lastfm_blacklist WHERE user_id = ?",
                     (str(user_id),)
@@ -307,7 +313,7 @@ class LastFMDB:
     async def is_blacklisted(self, user_id):
         """Check if a user is blacklisted"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT 1 FROM lastfm_blacklist WHERE user_id = ?",
                     (str(user_id),)
@@ -321,7 +327,7 @@ class LastFMDB:
     async def get_blacklist(self):
         """Get all blacklisted users"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT user_id FROM lastfm_blacklist"
                 ) as cursor:
@@ -334,7 +340,7 @@ class LastFMDB:
     async def add_crown(self, guild_id, artist, user_id, play_count):
         """Add or update a crown"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "INSERT OR REPLACE INTO lastfm_crowns (guild_id, artist, user_id, play_count) VALUES (?, ?, ?, ?)",
                     (str(guild_id), artist.lower(), str(user_id), play_count)
@@ -348,7 +354,7 @@ class LastFMDB:
     async def get_crown(self, guild_id, artist):
         """Get the crown holder for an artist in a guild"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT user_id, play_count FROM lastfm_crowns WHERE guild_id = ? AND artist = ?",
                     (str(guild_id), artist.lower())
@@ -362,7 +368,7 @@ class LastFMDB:
     async def get_user_crowns(self, guild_id, user_id):
         """Get all crowns for a user in a guild"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT artist, play_count FROM lastfm_crowns WHERE guild_id = ? AND user_id = ? ORDER BY play_count DESC",
                     (str(guild_id), str(user_id))
@@ -376,7 +382,7 @@ class LastFMDB:
     async def add_favorite(self, user_id, track, artist):
         """Add a track to a user's favorites"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "INSERT OR REPLACE INTO lastfm_favorites (user_id, track, artist) VALUES (?, ?, ?)",
                     (str(user_id), track, artist)
@@ -390,7 +396,7 @@ class LastFMDB:
     async def remove_favorite(self, user_id, track, artist):
         """Remove a track from a user's favorites"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "DELETE FROM lastfm_favorites WHERE user_id = ? AND track = ? AND artist = ?",
                     (str(user_id), track, artist)
@@ -404,7 +410,7 @@ class LastFMDB:
     async def get_favorites(self, user_id):
         """Get a user's favorite tracks"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT track, artist, added_at FROM lastfm_favorites WHERE user_id = ? ORDER BY added_at DESC",
                     (str(user_id),)
@@ -418,7 +424,7 @@ class LastFMDB:
     async def is_favorite(self, user_id, track, artist):
         """Check if a track is in a user's favorites"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT 1 FROM lastfm_favorites WHERE user_id = ? AND track = ? AND artist = ?",
                     (str(user_id), track, artist)
@@ -432,7 +438,7 @@ class LastFMDB:
     async def get_all_custom_commands(self):
         """Get all custom commands"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT command, user_id, is_public FROM lastfm_custom_commands"
                 ) as cursor:
@@ -445,7 +451,7 @@ class LastFMDB:
     async def set_public_custom_command(self, command, is_public):
         """Set a custom command as public or private"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "UPDATE lastfm_custom_commands SET is_public = ? WHERE command = ?",
                     (is_public, command)
@@ -459,7 +465,7 @@ class LastFMDB:
     async def cleanup_custom_commands(self, active_member_ids):
         """Remove custom commands from users who are no longer in the guild"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 # Get all users with custom commands
                 async with db.execute(
                     "SELECT user_id FROM lastfm_custom_commands"
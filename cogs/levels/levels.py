@@ -1,5 +1,5 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import logging
 import datetime
 import os
@@ -20,9 +20,30 @@ class Levels(commands.Cog):
         self.bot = bot
         self.db = LevelsDB()
         
+        # Durability window: at most this many seconds of XP can be lost on a crash
+        self.flush_interval = float(getattr(bot, 'config', {}).get('levels_flush_interval', 30))
+        
     async def cog_load(self):
         """Initialize the cog on load"""
         await self.db.initialize()
+        self.flush_xp_task.change_interval(seconds=self.flush_interval)
+        self.flush_xp_task.start()
+    
+    async def cog_unload(self):
+        """Stop the flush timer and write any buffered XP to disk"""
+        self.flush_xp_task.stop()
+        flushed = await self.db.flush_xp()
+        pending = self.db.pending_xp_rows()
+        if pending:
+            logger.error(f"Levels unloaded with {pending} unsaved XP rows")
+        else:
+            logger.info(f"Flushed {flushed} buffered XP rows on unload")
+        await self.db.close()
+    
+    @tasks.loop(seconds=30)
+    async def flush_xp_task(self):
+        """Periodically write accumulated XP to the database"""
+        await self.db.flush_xp()
     
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -1,26 +1,49 @@
 import os
 import logging
-import aiosqlite
 import datetime
 import json
 import random
 import math
+import asyncio
+import time
+
+from core.database import get_pool, close_pool
 
 logger = logging.getLogger('bot')
 
+# Columns of user_levels that the XP accumulator owns and flushes
+BUFFERED_COLUMNS = ("level", "xp", "messages_since_xp", "last_xp_earned")
+
 class LevelsDB:
     """Handles database operations for the Levels module"""
     
     def __init__(self):
         self.data_folder = 'data'
         self.db_path = os.path.join(self.data_folder, 'levels.db')
+        self.pool = get_pool(self.db_path)
+        
+        # Write-behind XP accumulator.
+        # (guild_id, user_id) -> row dict holding BUFFERED_COLUMNS + show_messages
+        self._user_cache = {}
+        self._dirty = set()  # keys of _user_cache not yet written to disk
+        self._last_seen = {}  # key -> monotonic time of last message
+        self._flush_lock = asyncio.Lock()
+        self.idle_ttl = 3600  # seconds before a clean cached row is evicted
         
+        # Read-mostly lookups used on every message
+        self._settings_cache = {}  # guild_id -> settings dict
+        self._ignore_cache = {}  # guild_id -> set of ignored entity ids
+        
+    async def close(self):
+        """Close the pooled connections for this database"""
+        await close_pool(self.db_path)
+    
     async def initialize(self):
         """Initialize the Levels database"""
         if not os.path.exists(self.data_folder):
             os.makedirs(self.data_folder)
             
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.write() as db:
             # Create guild settings table
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS levels_settings (
@@ -71,9 +94,20 @@ class LevelsDB:
     
     async def get_guild_settings(self, guild_id):
         """Get a guild's levels settings"""
+        cached = self._settings_cache.get(str(guild_id))
+        if cached is not None:
+            return dict(cached)
+            
+        settings = await self._load_guild_settings(guild_id)
+        if settings is not None:
+            self._settings_cache[str(guild_id)] = settings
+            return dict(settings)
+        return None
+    
+    async def _load_guild_settings(self, guild_id):
+        """Read a guild's levels settings from disk, creating defaults if missing"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT * FROM levels_settings WHERE guild_id = ?",
                     (str(guild_id),)
@@ -81,23 +115,24 @@ class LevelsDB:
                     result = await cursor.fetchone()
                     if result:
                         return dict(result)
-                    
-                    # Create default settings if they don't exist
-                    await db.execute(
-                        "INSERT INTO levels_settings (guild_id) VALUES (?)",
-                        (str(guild_id),)
-                    )
-                    await db.commit()
-                    
-                    # Return default settings
-                    return {
-                        "guild_id": str(guild_id),
-                        "enabled": True,
-                        "stack_roles": False,
-                        "message_mode": "channel",
-                        "level_up_message": "Congratulations {user}, you reached level {level}!",
-                        "xp_rate": 1.0
-                    }
+            
+            # Create default settings if they don't exist
+            async with self.pool.write() as db:
+                await db.execute(
+                    "INSERT OR IGNORE INTO levels_settings (guild_id) VALUES (?)",
+                    (str(guild_id),)
+                )
+                await db.commit()
+            
+            # Return default settings
+            return {
+                "guild_id": str(guild_id),
+                "enabled": True,
+                "stack_roles": False,
+                "message_mode": "channel",
+                "level_up_message": "Congratulations {user}, you reached level {level}!",
+                "xp_rate": 1.0
+            }
         except Exception as e:
             logger.error(f"Error getting guild levels settings: {e}")
             return None
@@ -109,13 +144,14 @@ class LevelsDB:
             if not settings:
                 return False
                 
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     f"UPDATE levels_settings SET {setting} = ? WHERE guild_id = ?",
                     (value, str(guild_id))
                 )
                 await db.commit()
-                return True
+            self._settings_cache.pop(str(guild_id), None)
+            return True
         except Exception as e:
             logger.error(f"Error updating guild levels setting: {e}")
             return False
@@ -152,7 +188,7 @@ class LevelsDB:
     async def add_level_role(self, guild_id, level, role_id):
         """Add a role reward for a level"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "INSERT OR REPLACE INTO level_roles (guild_id, level, role_id) VALUES (?, ?, ?)",
                     (str(guild_id), level, str(role_id))
@@ -166,7 +202,7 @@ class LevelsDB:
     async def remove_level_role(self, guild_id, level):
         """Remove a role reward for a level"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "DELETE FROM level_roles WHERE guild_id = ? AND level = ?",
                     (str(guild_id), level)
@@ -180,8 +216,7 @@ class LevelsDB:
     async def get_level_roles(self, guild_id):
         """Get all level roles for a guild"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT level, role_id FROM level_roles WHERE guild_id = ? ORDER BY level",
                     (str(guild_id),)
@@ -195,13 +230,14 @@ class LevelsDB:
     async def ignore_entity(self, guild_id, entity_id, entity_type):
         """Ignore a channel or role for XP gain"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "INSERT OR REPLACE INTO level_ignores (guild_id, entity_id, entity_type) VALUES (?, ?, ?)",
                     (str(guild_id), str(entity_id), entity_type)
                 )
                 await db.commit()
-                return True
+            self._ignore_cache.pop(str(guild_id), None)
+            return True
         except Exception as e:
             logger.error(f"Error ignoring entity: {e}")
             return False
@@ -209,13 +245,14 @@ class LevelsDB:
     async def unignore_entity(self, guild_id, entity_id):
         """Unignore a channel or role for XP gain"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 await db.execute(
                     "DELETE FROM level_ignores WHERE guild_id = ? AND entity_id = ?",
                     (str(guild_id), str(entity_id))
                 )
                 await db.commit()
-                return True
+            self._ignore_cache.pop(str(guild_id), None)
+            return True
         except Exception as e:
             logger.error(f"Error unignoring entity: {e}")
             return False
@@ -223,8 +260,7 @@ class LevelsDB:
     async def get_ignored_entities(self, guild_id):
         """Get all ignored channels and roles for a guild"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT entity_id, entity_type FROM level_ignores WHERE guild_id = ?",
                     (str(guild_id),)
@@ -238,7 +274,7 @@ class LevelsDB:
     async def is_entity_ignored(self, guild_id, entity_id):
         """Check if a channel or role is ignored for XP gain"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT 1 FROM level_ignores WHERE guild_id = ? AND entity_id = ?",
                     (str(guild_id), str(entity_id))
@@ -249,11 +285,23 @@ class LevelsDB:
             logger.error(f"Error checking if entity is ignored: {e}")
             return False
     
+    async def _get_ignored_ids(self, guild_id):
+        """Get the set of ignored channel and role ids for a guild (cached)"""
+        ignored = self._ignore_cache.get(str(guild_id))
+        if ignored is None:
+            entities = await self.get_ignored_entities(guild_id)
+            ignored = {entity_id for entity_id, _ in entities}
+            self._ignore_cache[str(guild_id)] = ignored
+        return ignored
+    
     async def get_user_level(self, guild_id, user_id):
         """Get a user's level information"""
+        cached = self._user_cache.get((str(guild_id), str(user_id)))
+        if cached is not None:
+            return {"guild_id": str(guild_id), "user_id": str(user_id), **cached}
+            
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 async with db.execute(
                     "SELECT * FROM user_levels WHERE guild_id = ? AND user_id = ?",
                     (str(guild_id), str(user_id))
@@ -261,29 +309,30 @@ class LevelsDB:
                     result = await cursor.fetchone()
                     if result:
                         return dict(result)
-                    
-                    # Create user entry if it doesn't exist
-                    now = datetime.datetime.now().isoformat()
-                    await db.execute(
-                        """
-                        INSERT INTO user_levels 
-                        (guild_id, user_id, level, xp, messages_since_xp, last_xp_earned, show_messages) 
-                        VALUES (?, ?, 1, 0, 0, ?, TRUE)
-                        """,
-                        (str(guild_id), str(user_id), now)
-                    )
-                    await db.commit()
-                    
-                    # Return default values
-                    return {
-                        "guild_id": str(guild_id),
-                        "user_id": str(user_id),
-                        "level": 1,
-                        "xp": 0,
-                        "messages_since_xp": 0,
-                        "last_xp_earned": now,
-                        "show_messages": True
-                    }
+            
+            # Create user entry if it doesn't exist
+            now = datetime.datetime.now().isoformat()
+            async with self.pool.write() as db:
+                await db.execute(
+                    """
+                    INSERT OR IGNORE INTO user_levels 
+                    (guild_id, user_id, level, xp, messages_since_xp, last_xp_earned, show_messages) 
+                    VALUES (?, ?, 1, 0, 0, ?, TRUE)
+                    """,
+                    (str(guild_id), str(user_id), now)
+                )
+                await db.commit()
+            
+            # Return default values
+            return {
+                "guild_id": str(guild_id),
+                "user_id": str(user_id),
+                "level": 1,
+                "xp": 0,
+                "messages_since_xp": 0,
+                "last_xp_earned": now,
+                "show_messages": True
+            }
         except Exception as e:
             logger.error(f"Error getting user level: {e}")
             return None
@@ -295,7 +344,7 @@ class LevelsDB:
             if not user_level:
                 return False
                 
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 set_clause = ", ".join([f"{key} = ?" for key in kwargs.keys()])
                 values = list(kwargs.values()) + [str(guild_id), str(user_id)]
                 
@@ -304,7 +353,16 @@ class LevelsDB:
                     values
                 )
                 await db.commit()
-                return True
+            
+            # Keep the accumulator's copy in step with direct writes, and mark it
+            # dirty so a flush that snapshotted the old values can't win
+            key = (str(guild_id), str(user_id))
+            cached = self._user_cache.get(key)
+            if cached is not None:
+                cached.update({column: value for column, value in kwargs.items() if column in cached})
+                if any(column in BUFFERED_COLUMNS for column in kwargs):
+                    self._dirty.add(key)
+            return True
         except Exception as e:
             logger.error(f"Error updating user level: {e}")
             return False
@@ -402,7 +460,11 @@ class LevelsDB:
         return user_level['show_messages']
     
     async def process_message(self, guild_id, user_id, channel_id, member_roles):
-        """Process a message for XP gain"""
+        """Process a message for XP gain.
+        
+        XP is accumulated in memory and written to disk by flush_xp(), so
+        the common path touches no database connection at all.
+        """
         try:
             # Check if leveling is enabled
             settings = await self.get_guild_settings(guild_id)
@@ -410,22 +472,22 @@ class LevelsDB:
                 return None
                 
             # Check if the channel or any of the member's roles are ignored
-            if await self.is_entity_ignored(guild_id, channel_id):
+            ignored = await self._get_ignored_ids(guild_id)
+            if ignored and (str(channel_id) in ignored or not ignored.isdisjoint(member_roles)):
                 return None
-                
-            for role_id in member_roles:
-                if await self.is_entity_ignored(guild_id, role_id):
-                    return None
             
             # Get user level
-            user_level = await self.get_user_level(guild_id, user_id)
+            key = (str(guild_id), str(user_id))
+            user_level = await self._get_cached_user(key)
             if not user_level:
                 return None
+            
+            self._last_seen[key] = time.monotonic()
+            self._dirty.add(key)
                 
             # Check cooldown (add XP every 5 messages)
-            messages_since_xp = user_level['messages_since_xp'] + 1
-            if messages_since_xp < 5:
-                await self.update_user_level(guild_id, user_id, messages_since_xp=messages_since_xp)
+            user_level['messages_since_xp'] += 1
+            if user_level['messages_since_xp'] < 5:
                 return None
                 
             # Random XP between 15-25, modified by rate
@@ -433,17 +495,111 @@ class LevelsDB:
             xp_to_add = int(random.randint(15, 25) * xp_rate)
             
             # Add XP
-            level_up = await self.add_user_xp(guild_id, user_id, xp_to_add)
-            return level_up
+            current_level = user_level['level']
+            user_level['xp'] += xp_to_add
+            user_level['level'] = self.level_for_xp(user_level['xp'])
+            user_level['last_xp_earned'] = datetime.datetime.now().isoformat()
+            user_level['messages_since_xp'] = 0
+            
+            # Check if leveled up
+            if user_level['level'] > current_level:
+                return user_level['level']
+            return None
         except Exception as e:
             logger.error(f"Error processing message for XP: {e}")
             return None
     
+    async def _get_cached_user(self, key):
+        """Get the accumulator row for a user, loading it from disk on first use"""
+        cached = self._user_cache.get(key)
+        if cached is not None:
+            return cached
+            
+        row = await self.get_user_level(*key)
+        if not row:
+            return None
+        
+        # Another message may have loaded the row while we were waiting
+        return self._user_cache.setdefault(key, {
+            "level": row['level'],
+            "xp": row['xp'],
+            "messages_since_xp": row['messages_since_xp'],
+            "last_xp_earned": row['last_xp_earned'],
+            "show_messages": row['show_messages']
+        })
+    
+    async def flush_xp(self):
+        """Write all dirty accumulator rows to disk in a single transaction.
+        
+        Returns the number of rows written. If the write fails the rows stay
+        dirty so the next flush retries them.
+        """
+        async with self._flush_lock:
+            if not self._dirty:
+                self._evict_idle()
+                return 0
+                
+            pending = self._dirty
+            self._dirty = set()
+            rows = []
+            for key in pending:
+                cached = self._user_cache.get(key)
+                if cached is not None:
+                    rows.append((*key, *(cached[column] for column in BUFFERED_COLUMNS)))
+            
+            try:
+                async with self.pool.write() as db:
+                    await db.executemany(
+                        """
+                        INSERT INTO user_levels
+                        (guild_id, user_id, level, xp, messages_since_xp, last_xp_earned)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                            level = excluded.level,
+                            xp = excluded.xp,
+                            messages_since_xp = excluded.messages_since_xp,
+                            last_xp_earned = excluded.last_xp_earned
+                        """,
+                        rows
+                    )
+                    await db.commit()
+            except Exception as e:
+                self._dirty |= pending
+                logger.error(f"Error flushing XP accumulator ({len(rows)} rows): {e}")
+                return 0
+            except BaseException:
+                # Cancelled mid-write: keep the rows for the final flush
+                self._dirty |= pending
+                raise
+            
+            self._evict_idle()
+            return len(rows)
+    
+    def pending_xp_rows(self):
+        """Number of accumulated rows not yet written to disk"""
+        return len(self._dirty)
+    
+    def _evict_idle(self):
+        """Drop clean cached rows that have not seen a message within idle_ttl"""
+        cutoff = time.monotonic() - self.idle_ttl
+        for key, last_seen in list(self._last_seen.items()):
+            if last_seen < cutoff and key not in self._dirty:
+                del self._last_seen[key]
+                self._user_cache.pop(key, None)
+    
+    def _drop_cached_guild(self, guild_id, user_ids=None):
+        """Forget accumulator rows for a guild (optionally only some users)"""
+        for key in list(self._user_cache):
+            if key[0] == str(guild_id) and (user_ids is None or key[1] in user_ids):
+                self._user_cache.pop(key, None)
+                self._last_seen.pop(key, None)
+                self._dirty.discard(key)
+    
     async def get_leaderboard(self, guild_id, limit=10):
         """Get the top users by level and XP"""
+        await self.flush_xp()
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self.pool.read() as db:
                 async with db.execute(
                     """
                     SELECT user_id, level, xp 
@@ -463,7 +619,8 @@ class LevelsDB:
     async def reset_levels(self, guild_id):
         """Reset all levels for a guild"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            # Held so no flush can write stale rows back after the DELETE
+            async with self._flush_lock, self.pool.write() as db:
                 # Delete all user levels
                 await db.execute(
                     "DELETE FROM user_levels WHERE guild_id = ?",
@@ -497,6 +654,11 @@ class LevelsDB:
                 )
                 
                 await db.commit()
+                
+                # Dropped after the DELETE so nothing re-caches the old rows meanwhile
+                self._drop_cached_guild(guild_id)
+                self._settings_cache.pop(str(guild_id), None)
+                self._ignore_cache.pop(str(guild_id), None)
                 return True
         except Exception as e:
             logger.error(f"Error resetting levels: {e}")
@@ -504,10 +666,10 @@ class LevelsDB:
     
     async def cleanup_absent_members(self, guild_id, member_ids):
         """Remove level data for members who are no longer in the guild"""
+        await self.flush_xp()
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 # Get all user IDs in the database for this guild
-                db.row_factory = aiosqlite.Row
                 async with db.execute(
                     "SELECT user_id FROM user_levels WHERE guild_id = ?",
                     (str(guild_id),)
@@ -526,7 +688,9 @@ class LevelsDB:
                     )
                 
                 await db.commit()
-                return len(absent_user_ids)
+            
+            self._drop_cached_guild(guild_id, set(absent_user_ids))
+            return len(absent_user_ids)
         except Exception as e:
             logger.error(f"Error cleaning up absent members: {e}")
             return 0
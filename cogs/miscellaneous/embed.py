@@ -41,8 +41,7 @@ class EmbedManager(commands.Cog):
         guild_id_str = str(guild_id)
         if guild_id_str in self.embeds:
             try:
-                with open(os.path.join(self.config_path, f"{guild_id_str}.json"), 'w') as f:
-                    json.dump(self.embeds[guild_id_str], f, indent=4)
+                self.bot.json_store.save(os.path.join(self.config_path, f"{guild_id_str}.json"), self.embeds[guild_id_str])
             except Exception as e:
                 logger.error(f"Error saving embeds for guild {guild_id}: {str(e)}")
     
@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import json
 import os
 import logging
 from datetime import datetime
@@ -44,8 +43,7 @@ class UserHistory(commands.Cog):
         user_id_str = str(user_id)
         if user_id_str in self.name_history:
             try:
-                with open(os.path.join(self.config_path, "names", f"{user_id_str}.json"), 'w') as f:
-                    json.dump(self.name_history[user_id_str], f, indent=4)
+                self.bot.json_store.save(os.path.join(self.config_path, "names", f"{user_id_str}.json"), self.name_history[user_id_str])
             except Exception as e:
                 logger.error(f"Error saving name history for user {user_id}: {str(e)}")
     
@@ -54,8 +52,7 @@ class UserHistory(commands.Cog):
         user_id_str = str(user_id)
         if user_id_str in self.avatar_history:
             try:
-                with open(os.path.join(self.config_path, "avatars", f"{user_id_str}.json"), 'w') as f:
-                    json.dump(self.avatar_history[user_id_str], f, indent=4)
+                self.bot.json_store.save(os.path.join(self.config_path, "avatars", f"{user_id_str}.json"), self.avatar_history[user_id_str])
             except Exception as e:
                 logger.error(f"Error saving avatar history for user {user_id}: {str(e)}")
     
@@ -64,8 +61,7 @@ class UserHistory(commands.Cog):
         guild_id_str = str(guild_id)
         if guild_id_str in self.guild_name_history:
             try:
-                with open(os.path.join(self.config_path, "guilds", f"{guild_id_str}.json"), 'w') as f:
-                    json.dump(self.guild_name_history[guild_id_str], f, indent=4)
+                self.bot.json_store.save(os.path.join(self.config_path, "guilds", f"{guild_id_str}.json"), self.guild_name_history[guild_id_str])
             except Exception as e:
                 logger.error(f"Error saving guild name history for guild {guild_id}: {str(e)}")
     
@@ -74,8 +70,7 @@ class UserHistory(commands.Cog):
         user_id_str = str(user_id)
         if user_id_str in self.user_seen:
             try:
-                with open(os.path.join(self.config_path, "seen", f"{user_id_str}.json"), 'w') as f:
-                    json.dump({"timestamp": self.user_seen[user_id_str]}, f)
+                self.bot.json_store.save(os.path.join(self.config_path, "seen", f"{user_id_str}.json"), {"timestamp": self.user_seen[user_id_str]}, indent=None)
             except Exception as e:
                 logger.error(f"Error saving last seen for user {user_id}: {str(e)}")
     
@@ -84,8 +79,7 @@ class UserHistory(commands.Cog):
         user_id_str = str(user_id)
         if user_id_str in self.user_screentime:
             try:
-                with open(os.path.join(self.config_path, "screentime", f"{user_id_str}.json"), 'w') as f:
-                    json.dump(self.user_screentime[user_id_str], f, indent=4)
+                self.bot.json_store.save(os.path.join(self.config_path, "screentime", f"{user_id_str}.json"), self.user_screentime[user_id_str])
             except Exception as e:
                 logger.error(f"Error saving screentime for user {user_id}: {str(e)}")
     
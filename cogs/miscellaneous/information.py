@@ -4,7 +4,6 @@ import json
 import os
 import logging
 from datetime import datetime
-import aiohttp
 import re
 import tempfile
 import io
@@ -123,13 +122,12 @@ class Information(commands.Cog):
         
         try:
             # Download emoji image
-            async with aiohttp.ClientSession() as session:
-                async with session.get(emoji_url) as response:
-                    if response.status != 200:
-                        await ctx.send(f"❌ Failed to download emoji image. Status code: {response.status}")
-                        return
-                    
-                    image_data = await response.read()
+            async with self.bot.http_client.get(emoji_url) as response:
+                if response.status != 200:
+                    await ctx.send(f"❌ Failed to download emoji image. Status code: {response.status}")
+                    return
+                
+                image_data = await response.read()
             
             # Create the emoji
             created_emoji = await ctx.guild.create_custom_emoji(name=name, image=image_data)
@@ -568,8 +566,10 @@ class Information(commands.Cog):
         
         # Get member counts by status
         total = guild.member_count
-        online = len([m for m in guild.members if m.status != discord.Status.offline and not m.bot])
-        bots = len([m for m in guild.members if m.bot])
+        stats = self.bot.member_stats.get(guild)
+        human_statuses = stats.status_counts(bots=False)
+        online = stats.humans - human_statuses["offline"]
+        bots = stats.bots
         humans = total - bots
         
         # Create embed
@@ -597,7 +597,7 @@ class Information(commands.Cog):
         guild = ctx.guild
         
         # Get all bots in the guild
-        bots = [m for m in guild.members if m.bot]
+        bots = self.bot.member_stats.get(guild).bot_members()
         
         if not bots:
             await ctx.send("❌ There are no bots in this server.")
@@ -986,12 +986,13 @@ class Information(commands.Cog):
         )
         
         # Member information
+        stats = self.bot.member_stats.get(guild)
         embed.add_field(
             name="Member Information",
             value=(
                 f"**Total Members:** {guild.member_count}\n"
-                f"**Humans:** {len([m for m in guild.members if not m.bot])}\n"
-                f"**Bots:** {len([m for m in guild.members if m.bot])}\n"
+                f"**Humans:** {stats.humans}\n"
+                f"**Bots:** {stats.bots}\n"
                 f"**Boost Tier:** {guild.premium_tier}\n"
                 f"**Boosts:** {guild.premium_subscription_count or 0}"
             ),
@@ -1182,13 +1183,12 @@ class Information(commands.Cog):
         async with ctx.typing():
             try:
                 # GitHub's API is public for basic user information
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(f"https://api.github.com/users/{username}") as response:
-                        if response.status != 200:
-                            await ctx.send(f"❌ GitHub user `{username}` not found or API error occurred.")
-                            return
-                            
-                        data = await response.json()
+                async with self.bot.http_client.get(f"https://api.github.com/users/{username}") as response:
+                    if response.status != 200:
+                        await ctx.send(f"❌ GitHub user `{username}` not found or API error occurred.")
+                        return
+                        
+                    data = await response.json()
                 
                 # Create embed with GitHub profile information
                 embed = discord.Embed(
@@ -1338,13 +1338,12 @@ class Information(commands.Cog):
         async with ctx.typing():
             try:
                 # Urban Dictionary has a public API
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(f"https://api.urbandictionary.com/v0/define?term={word}") as response:
-                        if response.status != 200:
-                            await ctx.send(f"❌ Failed to look up definition for `{word}`.")
-                            return
-                            
-                        data = await response.json()
+                async with self.bot.http_client.get(f"https://api.urbandictionary.com/v0/define?term={word}") as response:
+                    if response.status != 200:
+                        await ctx.send(f"❌ Failed to look up definition for `{word}`.")
+                        return
+                        
+                    data = await response.json()
                 
                 # Check if there are any definitions
                 if not data["list"]:
@@ -1426,13 +1425,12 @@ class Information(commands.Cog):
             try:
                 # There are several free dictionary APIs, this is just an example
                 # In a full implementation, you would need to register for an API key
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}") as response:
-                        if response.status != 200:
-                            await ctx.send(f"❌ No definition found for `{word}`.")
-                            return
-                            
-                        data = await response.json()
+                async with self.bot.http_client.get(f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}") as response:
+                    if response.status != 200:
+                        await ctx.send(f"❌ No definition found for `{word}`.")
+                        return
+                        
+                    data = await response.json()
                 
                 if not data or not isinstance(data, list):
                     await ctx.send(f"❌ No definition found for `{word}`.")
@@ -1704,13 +1702,12 @@ class Information(commands.Cog):
         
         try:
             # Download the sticker
-            async with aiohttp.ClientSession() as session:
-                async with session.get(sticker.url) as response:
-                    if response.status != 200:
-                        await ctx.send(f"❌ Failed to download sticker. Status code: {response.status}")
-                        return
-                        
-                    sticker_data = await response.read()
+            async with self.bot.http_client.get(sticker.url) as response:
+                if response.status != 200:
+                    await ctx.send(f"❌ Failed to download sticker. Status code: {response.status}")
+                    return
+                    
+                sticker_data = await response.read()
             
             # Get file info
             if sticker.format == discord.StickerFormatType.png or sticker.format == discord.StickerFormatType.apng:
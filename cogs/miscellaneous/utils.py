@@ -4,7 +4,6 @@ import json
 import os
 import logging
 import asyncio
-import aiohttp
 import tempfile
 from datetime import datetime
 import subprocess
@@ -67,13 +66,12 @@ class MiscUtils(commands.Cog):
         async with ctx.typing():
             try:
                 # Download image
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(image_url) as response:
-                        if response.status != 200:
-                            await ctx.send(f"❌ Failed to download image. Status code: {response.status}")
-                            return
-                            
-                        image_data = await response.read()
+                async with self.bot.http_client.get(image_url) as response:
+                    if response.status != 200:
+                        await ctx.send(f"❌ Failed to download image. Status code: {response.status}")
+                        return
+                        
+                    image_data = await response.read()
                 
                 # Update guild icon
                 await ctx.guild.edit(icon=image_data)
@@ -113,13 +111,12 @@ class MiscUtils(commands.Cog):
         async with ctx.typing():
             try:
                 # Download image
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(image_url) as response:
-                        if response.status != 200:
-                            await ctx.send(f"❌ Failed to download image. Status code: {response.status}")
-                            return
-                            
-                        image_data = await response.read()
+                async with self.bot.http_client.get(image_url) as response:
+                    if response.status != 200:
+                        await ctx.send(f"❌ Failed to download image. Status code: {response.status}")
+                        return
+                        
+                    image_data = await response.read()
                 
                 # Update guild banner
                 await ctx.guild.edit(banner=image_data)
@@ -160,13 +157,12 @@ class MiscUtils(commands.Cog):
         async with ctx.typing():
             try:
                 # Download image
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(image_url) as response:
-                        if response.status != 200:
-                            await ctx.send(f"❌ Failed to download image. Status code: {response.status}")
-                            return
-                            
-                        image_data = await response.read()
+                async with self.bot.http_client.get(image_url) as response:
+                    if response.status != 200:
+                        await ctx.send(f"❌ Failed to download image. Status code: {response.status}")
+                        return
+                        
+                    image_data = await response.read()
                 
                 # Update guild splash
                 await ctx.guild.edit(splash=image_data)
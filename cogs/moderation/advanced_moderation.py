@@ -26,7 +26,6 @@ class AdvancedModeration(commands.Cog):
         self.hardbans = self.load_hardbans()
         self.temproles = self.load_temproles()
         # Active tasks
-        self.unban_all_tasks = {}
         self.purge_tasks = {}
         # Start background tasks
         self.check_temproles_task = self.bot.loop.create_task(self.check_temproles())
@@ -45,8 +44,7 @@ class AdvancedModeration(commands.Cog):
     
     def save_hardbans(self):
         """Save the hardbans to file"""
-        with open(self.hardbans_file, 'w') as f:
-            json.dump(self.hardbans, f, indent=4)
+        self.bot.json_store.save(self.hardbans_file, self.hardbans)
     
     def load_temproles(self):
         """Load the temporary roles from file"""
@@ -62,8 +60,7 @@ class AdvancedModeration(commands.Cog):
     
     def save_temproles(self):
         """Save the temporary roles to file"""
-        with open(self.temproles_file, 'w') as f:
-            json.dump(self.temproles, f, indent=4)
+        self.bot.json_store.save(self.temproles_file, self.temproles)
 
     @commands.command(name="hardban")
     @has_any_of(commands.has_permissions(administrator=True), commands.has_role("Antinuke Admin"))
@@ -271,21 +268,31 @@ class AdvancedModeration(commands.Cog):
     async def unbanall(self, ctx):
         """Unbans every member in a guild"""
         # Check if a task is already running
-        if ctx.guild.id in self.unban_all_tasks:
+        if self.bot.bulk_actions.get("unbanall", ctx.guild.id):
             await ctx.send("❌ An unban all task is already running for this server. Use `unbanall cancel` to cancel it.")
             return
         
         try:
-            # Fetch all bans
-            bans = [entry async for entry in ctx.guild.bans()]
-            
-            if not bans:
-                await ctx.send("❌ There are no banned users in this server.")
+            # Fetch all bans, leaving out hardbanned users
+            hardbanned = self.hardbans.get(str(ctx.guild.id), {})
+            user_ids = []
+            skipped = 0
+            async for ban_entry in ctx.guild.bans(limit=None):
+                if str(ban_entry.user.id) in hardbanned:
+                    skipped += 1
+                else:
+                    user_ids.append(ban_entry.user.id)
+            
+            if not user_ids:
+                if skipped:
+                    await ctx.send(f"❌ All {skipped} banned users are hardbanned, so there is nobody to unban.")
+                else:
+                    await ctx.send("❌ There are no banned users in this server.")
                 return
             
             # Create a confirmation message
             confirm_msg = await ctx.send(
-                f"⚠️ Are you sure you want to unban all {len(bans)} banned users? "
+                f"⚠️ Are you sure you want to unban all {len(user_ids)} banned users? "
                 f"React with ✅ to confirm or ❌ to cancel."
             )
             
@@ -304,49 +311,17 @@ class AdvancedModeration(commands.Cog):
                     return
                 
                 # Create a status message
-                status_msg = await ctx.send(f"🔄 Unbanning {len(bans)} users... This may take a while.")
+                status_msg = await ctx.send(f"🔄 Unbanning {len(user_ids)} users... This may take a while.")
                 
-                # Create and start the unban all task
-                async def unban_all_task():
-                    unbanned = 0
-                    failed = 0
-                    
-                    for ban_entry in bans:
-                        try:
-                            # Skip hardbanned users
-                            guild_id = str(ctx.guild.id)
-                            if (guild_id in self.hardbans and 
-                                str(ban_entry.user.id) in self.hardbans[guild_id]):
-                                failed += 1
-                                continue
-                            
-                            await ctx.guild.unban(ban_entry.user, reason=f"Mass unban by {ctx.author}")
-                            unbanned += 1
-                            
-                            # Update status every 10 unbans
-                            if unbanned % 10 == 0:
-                                await status_msg.edit(
-                                    content=f"🔄 Unbanned {unbanned}/{len(bans)} users..."
-                                )
-                            
-                            # Sleep briefly to avoid rate limits
-                            await asyncio.sleep(0.5)
-                            
-                        except Exception as e:
-                            logger.error(f"Error unbanning user {ban_entry.user.id}: {str(e)}")
-                            failed += 1
-                    
-                    # Final update
-                    await status_msg.edit(
-                        content=f"✅ Unban all operation completed! Unbanned {unbanned} users. Failed to unban {failed} users."
-                    )
-                    
-                    # Remove from active tasks
-                    del self.unban_all_tasks[ctx.guild.id]
-                
-                # Start the task
-                task = self.bot.loop.create_task(unban_all_task())
-                self.unban_all_tasks[ctx.guild.id] = task
+                # Unbans run with adaptive concurrency and resume after a restart
+                await self.bot.bulk_actions.submit(
+                    "unbanall",
+                    ctx.guild,
+                    "unban",
+                    user_ids,
+                    reason=f"Mass unban by {ctx.author}",
+                    payload={"channel_id": ctx.channel.id, "message_id": status_msg.id, "skipped": skipped}
+                )
                 
             except asyncio.TimeoutError:
                 await confirm_msg.edit(content="❌ Unban all operation timed out. No users were unbanned.")
@@ -357,18 +332,29 @@ class AdvancedModeration(commands.Cog):
             logger.error(f"Error in unban all: {str(e)}")
             await ctx.send(f"❌ An error occurred during the unban all operation: {str(e)}")
     
+    async def unbanall_progress(self, job):
+        """Keep an unban all run's status message up to date"""
+        channel = self.bot.get_channel(job.payload.get("channel_id"))
+        if channel is None:
+            return
+        
+        if job.finished:
+            # Hardbanned users count as failed, as they always have
+            failed = job.failed + job.payload.get("skipped", 0)
+            content = f"✅ Unban all operation completed! Unbanned {job.succeeded} users. Failed to unban {failed} users."
+        else:
+            content = f"🔄 Unbanned {job.succeeded}/{job.total} users..."
+        await channel.get_partial_message(job.payload["message_id"]).edit(content=content)
+    
     @commands.command(name="unbanall_cancel", aliases=["unbanallcancel"])
     @commands.has_permissions(administrator=True)
     async def unbanall_cancel(self, ctx):
         """Cancels a unban all task running"""
-        if ctx.guild.id not in self.unban_all_tasks:
+        # Cancel the task, if there is one
+        if not await self.bot.bulk_actions.cancel("unbanall", ctx.guild.id):
             await ctx.send("❌ There is no unban all task running for this server.")
             return
         
-        # Cancel the task
-        self.unban_all_tasks[ctx.guild.id].cancel()
-        del self.unban_all_tasks[ctx.guild.id]
-        
         await ctx.send("✅ Unban all task cancelled.")
     
     @commands.command(name="temprole")
@@ -571,9 +557,14 @@ class AdvancedModeration(commands.Cog):
             # Check every minute
             await asyncio.sleep(60)
     
+    async def cog_load(self):
+        """Report unban all progress, resuming a run cut off by a restart"""
+        self.bot.bulk_actions.register("unbanall", self.unbanall_progress)
+    
     def cog_unload(self):
         """Clean up when the cog is unloaded"""
         self.check_temproles_task.cancel()
+        self.bot.bulk_actions.unregister("unbanall")
 
     # Event to maintain hardbans
     @commands.Cog.listener()
@@ -33,8 +33,7 @@ class CommandRestrictions(commands.Cog):
     
     def save_restrictions(self):
         """Save the command restrictions to file"""
-        with open(self.restrictions_file, 'w') as f:
-            json.dump(self.restrictions, f, indent=4)
+        self.bot.json_store.save(self.restrictions_file, self.restrictions)
 
     @commands.group(name="restrictcommand", aliases=["restrictcmd"], invoke_without_command=True)
     @commands.has_permissions(manage_guild=True)
@@ -42,8 +42,7 @@ class KickCommands(commands.Cog):
             
     def save_config(self):
         """Save the kick configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.kick_config, f, indent=4)
+        self.bot.json_store.save(self.config_file, self.kick_config)
             
     def cog_unload(self):
         """Clean up when the cog is unloaded"""
@@ -55,29 +54,28 @@ class KickCommands(commands.Cog):
             # Kick.com API endpoint (unofficial)
             url = f"https://kick.com/api/v1/channels/{username}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=10) as response:
-                    if response.status != 200:
-                        logger.warning(f"Failed to get stream status for {username}. Status code: {response.status}")
-                        return None
+            async with self.bot.http_client.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status != 200:
+                    logger.warning(f"Failed to get stream status for {username}. Status code: {response.status}")
+                    return None
+                
+                try:
+                    data = await response.json()
+                    is_live = data.get('livestream') is not None
                     
-                    try:
-                        data = await response.json()
-                        is_live = data.get('livestream') is not None
-                        
-                        return {
-                            'is_live': is_live,
-                            'title': data.get('livestream', {}).get('session_title', 'No Title') if is_live else None,
-                            'game': data.get('livestream', {}).get('categories', [{}])[0].get('name', 'No Game') if is_live else None,
-                            'viewer_count': data.get('livestream', {}).get('viewer_count', 0) if is_live else 0,
-                            'thumbnail': data.get('livestream', {}).get('thumbnail', {}).get('url') if is_live else None,
-                            'started_at': data.get('livestream', {}).get('created_at') if is_live else None,
-                            'streamer_name': data.get('user', {}).get('username', username),
-                            'avatar': data.get('user', {}).get('profile_pic')
-                        }
-                    except (KeyError, ValueError, json.JSONDecodeError) as e:
-                        logger.error(f"Error parsing JSON response for {username}: {str(e)}")
-                        return None
+                    return {
+                        'is_live': is_live,
+                        'title': data.get('livestream', {}).get('session_title', 'No Title') if is_live else None,
+                        'game': data.get('livestream', {}).get('categories', [{}])[0].get('name', 'No Game') if is_live else None,
+                        'viewer_count': data.get('livestream', {}).get('viewer_count', 0) if is_live else 0,
+                        'thumbnail': data.get('livestream', {}).get('thumbnail', {}).get('url') if is_live else None,
+                        'started_at': data.get('livestream', {}).get('created_at') if is_live else None,
+                        'streamer_name': data.get('user', {}).get('username', username),
+                        'avatar': data.get('user', {}).get('profile_pic')
+                    }
+                except (KeyError, ValueError, json.JSONDecodeError) as e:
+                    logger.error(f"Error parsing JSON response for {username}: {str(e)}")
+                    return None
         except asyncio.TimeoutError:
             logger.warning(f"Timeout while checking stream status for {username}")
             return None
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 
 # Import custom check for has_any_of
 from custom_checks import has_any_of
+from core.overwrites import OverwriteExecutor, OverwriteChange, DEFAULT_CONCURRENCY
 
 logger = logging.getLogger('bot')
 
@@ -22,6 +23,8 @@ class LockdownCommands(commands.Cog):
         os.makedirs(self.data_folder, exist_ok=True)
         # Load data
         self.lockdown_settings = self.load_settings()
+        # Applies server-wide overwrite changes concurrently
+        self.overwrites = OverwriteExecutor(bot.config.get("overwrite_concurrency", DEFAULT_CONCURRENCY))
     
     def load_settings(self):
         """Load lockdown settings from file"""
@@ -37,8 +40,11 @@ class LockdownCommands(commands.Cog):
     
     def save_settings(self):
         """Save lockdown settings to file"""
-        with open(self.lockdown_file, 'w') as f:
-            json.dump(self.lockdown_settings, f, indent=4)
+        self.bot.json_store.save(self.lockdown_file, self.lockdown_settings)
+    
+    def notices_enabled(self, guild_id):
+        """Whether server-wide lockdowns post a notice in each channel"""
+        return self.lockdown_settings.get(guild_id, {}).get("notices", True)
     
     @commands.command(name="lockdown")
     @commands.has_permissions(manage_channels=True)
@@ -192,6 +198,28 @@ class LockdownCommands(commands.Cog):
         
         await ctx.send(embed=embed)
     
+    @commands.command(name="lockdown_notices", aliases=["lockdownnotices"])
+    @commands.has_permissions(manage_channels=True)
+    async def lockdown_notices(self, ctx, enabled: bool = None):
+        """Turn the per-channel notices of lockdown all/unlockdown all on or off"""
+        guild_id = str(ctx.guild.id)
+        
+        if enabled is None:
+            state = "on" if self.notices_enabled(guild_id) else "off"
+            await ctx.send(f"Server-wide lockdown notices are **{state}**.")
+            return
+            
+        if guild_id not in self.lockdown_settings:
+            self.lockdown_settings[guild_id] = {}
+            
+        self.lockdown_settings[guild_id]["notices"] = enabled
+        self.save_settings()
+        
+        if enabled:
+            await ctx.send("✅ Server-wide lockdowns will post a notice in each channel once every channel is updated.")
+        else:
+            await ctx.send("✅ Server-wide lockdowns will no longer post notices in each channel.")
+    
     @commands.command(name="lockdown_all", aliases=["lockdownall"])
     @commands.has_permissions(manage_channels=True)
     async def lockdown_all(self, ctx, *, reason="No reason provided"):
@@ -212,14 +240,9 @@ class LockdownCommands(commands.Cog):
                 ignored_channels = self.lockdown_settings[guild_id]["ignored_channels"]
             
             # Initialize counters
-            locked = 0
             already_locked = 0
-            failed = 0
             ignored = 0
             
-            # Create initial status message
-            status_msg = await ctx.send(f"🔄 Locking all text channels... 0/{len(text_channels)} completed")
-            
             # Initialize server lockdown status
             if guild_id not in self.lockdown_settings:
                 self.lockdown_settings[guild_id] = {}
@@ -236,8 +259,9 @@ class LockdownCommands(commands.Cog):
             server_lockdown["locked_at"] = datetime.utcnow().isoformat()
             server_lockdown["reason"] = reason
             
-            # Lock all channels
-            for i, channel in enumerate(text_channels):
+            # Work out every overwrite first, then apply them all at once
+            changes = []
+            for channel in text_channels:
                 channel_id = str(channel.id)
                 
                 # Skip ignored channels
@@ -245,57 +269,41 @@ class LockdownCommands(commands.Cog):
                     ignored += 1
                     continue
                 
-                try:
-                    # Get current permissions
-                    current_perms = channel.overwrites_for(everyone_role)
-                    
-                    # Skip if already locked
-                    if current_perms.send_messages is False:
-                        already_locked += 1
-                        continue
+                # Get current permissions
+                current_perms = channel.overwrites_for(everyone_role)
                     
-                    # Store original permissions
-                    server_lockdown["channels"][channel_id] = {
-                        "original_send": current_perms.send_messages
-                    }
+                # Skip if already locked
+                if current_perms.send_messages is False:
+                    already_locked += 1
+                    continue
                     
-                    # Update permissions
-                    overwrite = discord.PermissionOverwrite(**{k: v for k, v in current_perms})
-                    overwrite.send_messages = False
+                # Store original permissions
+                server_lockdown["channels"][channel_id] = {
+                    "original_send": current_perms.send_messages
+                }
                     
-                    await channel.set_permissions(
-                        everyone_role, 
-                        overwrite=overwrite,
-                        reason=f"Server-wide lockdown by {ctx.author.name}: {reason}"
-                    )
+                # Update permissions
+                overwrite = discord.PermissionOverwrite(**{k: v for k, v in current_perms})
+                overwrite.send_messages = False
                     
-                    locked += 1
+                changes.append(OverwriteChange(
+                    channel,
+                    everyone_role,
+                    overwrite,
+                    reason=f"Server-wide lockdown by {ctx.author.name}: {reason}"
+                ))
                     
-                    # Send lockdown notice in the channel
-                    embed = discord.Embed(
-                        title="🔒 Server Lockdown",
-                        description=f"This channel has been locked due to a server-wide lockdown.",
-                        color=discord.Color.red(),
-                        timestamp=datetime.utcnow()
-                    )
+            # Create initial status message
+            status_msg = await ctx.send(f"🔄 Locking all text channels... 0/{len(changes)} completed")
                     
-                    embed.add_field(name="Locked by", value=ctx.author.mention)
-                    embed.add_field(name="Reason", value=reason)
+            async def progress(done, total):
+                await status_msg.edit(content=f"🔄 Locking all text channels... {done}/{total} completed")
                     
-                    try:
-                        await channel.send(embed=embed)
-                    except:
-                        # Can't send message, but the channel is still locked
-                        pass
+            result = await self.overwrites.apply(changes, on_progress=progress)
                     
-                except:
-                    failed += 1
-                
-                # Update status every 5 channels
-                if (i + 1) % 5 == 0 or i + 1 == len(text_channels):
-                    await status_msg.edit(
-                        content=f"🔄 Locking all text channels... {i+1}/{len(text_channels)} completed"
-                    )
+            # Channels that could not be locked have nothing to restore
+            for change in result.failed:
+                server_lockdown["channels"].pop(str(change.channel.id), None)
             
             # Save changes
             self.save_settings()
@@ -310,10 +318,10 @@ class LockdownCommands(commands.Cog):
             
             embed.add_field(name="Locked by", value=ctx.author.mention)
             embed.add_field(name="Reason", value=reason)
-            embed.add_field(name="Channels Locked", value=str(locked), inline=True)
+            embed.add_field(name="Channels Locked", value=str(result.applied), inline=True)
             embed.add_field(name="Already Locked", value=str(already_locked), inline=True)
             embed.add_field(name="Ignored", value=str(ignored), inline=True)
-            embed.add_field(name="Failed", value=str(failed), inline=True)
+            embed.add_field(name="Failed", value=str(len(result.failed)), inline=True)
             embed.add_field(
                 name="Unlock Command", 
                 value="`!unlockdown_all`", 
@@ -322,6 +330,24 @@ class LockdownCommands(commands.Cog):
             
             await status_msg.edit(content=None, embed=embed)
             
+            # Lockdown notices go out only after every channel is locked
+            if self.notices_enabled(guild_id):
+                notice = discord.Embed(
+                    title="🔒 Server Lockdown",
+                    description=f"This channel has been locked due to a server-wide lockdown.",
+                    color=discord.Color.red(),
+                    timestamp=datetime.utcnow()
+                )
+                
+                notice.add_field(name="Locked by", value=ctx.author.mention)
+                notice.add_field(name="Reason", value=reason)
+                
+                failed_ids = {change.channel.id for change in result.failed}
+                await self.overwrites.post(
+                    [change.channel for change in changes if change.channel.id not in failed_ids],
+                    embed=notice
+                )
+            
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to manage channel permissions.")
         except Exception as e:
@@ -444,68 +470,37 @@ class LockdownCommands(commands.Cog):
                 return
             
             # Initialize counters
-            unlocked = 0
-            failed = 0
+            missing = 0
             
-            # Create initial status message
-            status_msg = await ctx.send(f"🔄 Unlocking all locked channels... 0/{len(locked_channels)} completed")
-            
-            # Unlock all channels
-            for i, (channel_id, data) in enumerate(list(locked_channels.items())):
+            # Work out every overwrite first, then apply them all at once
+            changes = []
+            for channel_id, data in locked_channels.items():
                 channel = ctx.guild.get_channel(int(channel_id))
                 if not channel:
-                    failed += 1
+                    missing += 1
                     continue
                 
-                try:
-                    # Get current permissions
-                    current_perms = channel.overwrites_for(everyone_role)
-                    
-                    # Update permissions
-                    overwrite = discord.PermissionOverwrite(**{k: v for k, v in current_perms})
-                    overwrite.send_messages = data.get("original_send")  # None, True, or False based on original state
+                # Get current permissions
+                current_perms = channel.overwrites_for(everyone_role)
                     
-                    # If all permissions are None (default), remove the override entirely
-                    if all(getattr(overwrite, attr) is None for attr in dir(overwrite) if not attr.startswith('_')):
-                        await channel.set_permissions(
-                            everyone_role, 
-                            overwrite=None,
-                            reason=f"Server-wide unlock by {ctx.author.name}: {reason}"
-                        )
-                    else:
-                        await channel.set_permissions(
-                            everyone_role, 
-                            overwrite=overwrite,
-                            reason=f"Server-wide unlock by {ctx.author.name}: {reason}"
-                        )
+                # Update permissions; an override left empty is removed entirely
+                overwrite = discord.PermissionOverwrite(**{k: v for k, v in current_perms})
+                overwrite.send_messages = data.get("original_send")  # None, True, or False based on original state
                     
-                    unlocked += 1
+                changes.append(OverwriteChange(
+                    channel,
+                    everyone_role,
+                    overwrite,
+                    reason=f"Server-wide unlock by {ctx.author.name}: {reason}"
+                ))
                     
-                    # Send unlock notice in the channel
-                    embed = discord.Embed(
-                        title="🔓 Server Lockdown Lifted",
-                        description=f"This channel has been unlocked as the server-wide lockdown has ended.",
-                        color=discord.Color.green(),
-                        timestamp=datetime.utcnow()
-                    )
-                    
-                    embed.add_field(name="Unlocked by", value=ctx.author.mention)
-                    embed.add_field(name="Reason", value=reason)
+            # Create initial status message
+            status_msg = await ctx.send(f"🔄 Unlocking all locked channels... 0/{len(changes)} completed")
                     
-                    try:
-                        await channel.send(embed=embed)
-                    except:
-                        # Can't send message, but the channel is still unlocked
-                        pass
+            async def progress(done, total):
+                await status_msg.edit(content=f"🔄 Unlocking channels... {done}/{total} completed")
                     
-                except:
-                    failed += 1
-                
-                # Update status every 5 channels
-                if (i + 1) % 5 == 0 or i + 1 == len(locked_channels):
-                    await status_msg.edit(
-                        content=f"🔄 Unlocking channels... {i+1}/{len(locked_channels)} completed"
-                    )
+            result = await self.overwrites.apply(changes, on_progress=progress)
             
             # Reset server lockdown
             self.lockdown_settings[guild_id]["server_lockdown"] = {
@@ -526,11 +521,29 @@ class LockdownCommands(commands.Cog):
             
             embed.add_field(name="Unlocked by", value=ctx.author.mention)
             embed.add_field(name="Reason", value=reason)
-            embed.add_field(name="Channels Unlocked", value=str(unlocked), inline=True)
-            embed.add_field(name="Failed", value=str(failed), inline=True)
+            embed.add_field(name="Channels Unlocked", value=str(result.applied), inline=True)
+            embed.add_field(name="Failed", value=str(len(result.failed) + missing), inline=True)
             
             await status_msg.edit(content=None, embed=embed)
             
+            # Unlock notices go out only after every channel is unlocked
+            if self.notices_enabled(guild_id):
+                notice = discord.Embed(
+                    title="🔓 Server Lockdown Lifted",
+                    description=f"This channel has been unlocked as the server-wide lockdown has ended.",
+                    color=discord.Color.green(),
+                    timestamp=datetime.utcnow()
+                )
+                
+                notice.add_field(name="Unlocked by", value=ctx.author.mention)
+                notice.add_field(name="Reason", value=reason)
+                
+                failed_ids = {change.channel.id for change in result.failed}
+                await self.overwrites.post(
+                    [change.channel for change in changes if change.channel.id not in failed_ids],
+                    embed=notice
+                )
+            
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to manage channel permissions.")
         except Exception as e:
@@ -558,9 +571,10 @@ class LockdownCommands(commands.Cog):
             overwrite = discord.PermissionOverwrite(**{k: v for k, v in current_perms})
             overwrite.view_channel = False
             
-            await channel.set_permissions(
-                target, 
-                overwrite=overwrite,
+            await self.overwrites.apply_one(
+                channel,
+                target,
+                overwrite,
                 reason=f"Channel hidden by {ctx.author.name}"
             )
             
@@ -593,19 +607,13 @@ class LockdownCommands(commands.Cog):
             overwrite = discord.PermissionOverwrite(**{k: v for k, v in current_perms})
             overwrite.view_channel = None  # Reset to role default
             
-            # If all permissions are None (default), remove the override entirely
-            if all(getattr(overwrite, attr) is None for attr in dir(overwrite) if not attr.startswith('_')):
-                await channel.set_permissions(
-                    target, 
-                    overwrite=None,
-                    reason=f"Channel unhidden by {ctx.author.name}"
-                )
-            else:
-                await channel.set_permissions(
-                    target, 
-                    overwrite=overwrite,
-                    reason=f"Channel unhidden by {ctx.author.name}"
-                )
+            # If all permissions are None (default), the override is removed entirely
+            await self.overwrites.apply_one(
+                channel,
+                target,
+                overwrite,
+                reason=f"Channel unhidden by {ctx.author.name}"
+            )
             
             await ctx.send(f"✅ {channel.mention} has been unhidden from {target.mention}.")
             
@@ -1,13 +1,17 @@
 import discord
 from discord.ext import commands
-import asyncio
 import logging
 from datetime import datetime, timedelta
 import json
 import os
 
+from core.overwrites import OverwriteExecutor, OverwriteChange, DEFAULT_CONCURRENCY
+
 logger = logging.getLogger('bot')
 
+# How long to wait before retrying a jail release that Discord rejected
+JAIL_RELEASE_RETRY = timedelta(minutes=5)
+
 class MemberRestrictions(commands.Cog):
     """Commands for restricting members in various ways"""
     
@@ -23,8 +27,29 @@ class MemberRestrictions(commands.Cog):
         self.jail_data = self.load_data(self.jail_file)
         self.stfu_data = self.load_data(self.stfu_file)
         self.forcenick_data = self.load_data(self.forcenick_file)
-        # Background task for checking jail timeouts
-        self.check_jail_task = self.bot.loop.create_task(self.check_jail_timeouts())
+        # Applies per-channel overwrite changes concurrently
+        self.overwrites = OverwriteExecutor(bot.config.get("overwrite_concurrency", DEFAULT_CONCURRENCY))
+    
+    async def cog_load(self):
+        """Hand jail and tempban timers to the bot's scheduler"""
+        self.bot.scheduler.register("jail", self.release_jail)
+        self.bot.scheduler.register("tempban", self.release_tempban)
+        
+        # Arm timed jails saved before they had a scheduler job
+        for guild_id, members in self.jail_data.items():
+            for member_id, data in members.items():
+                if data["expires"] and not self.bot.scheduler.get("jail", f"{guild_id}:{member_id}"):
+                    await self.bot.scheduler.schedule(
+                        "jail",
+                        f"{guild_id}:{member_id}",
+                        datetime.fromisoformat(data["expires"]),
+                        {"guild_id": guild_id, "member_id": member_id}
+                    )
+    
+    def cog_unload(self):
+        """Clean up when the cog is unloaded"""
+        self.bot.scheduler.unregister("jail")
+        self.bot.scheduler.unregister("tempban")
     
     def load_data(self, file_path):
         """Load data from file"""
@@ -40,8 +65,7 @@ class MemberRestrictions(commands.Cog):
     
     def save_data(self, data, file_path):
         """Save data to file"""
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        self.bot.json_store.save(file_path, data)
     
     @commands.command(name="jail")
     @commands.has_permissions(manage_messages=True)
@@ -102,29 +126,27 @@ class MemberRestrictions(commands.Cog):
                     reason="Creating jail role"
                 )
                 
-                # Set permissions for the jail role in all text channels
-                for channel in ctx.guild.text_channels:
-                    try:
-                        await channel.set_permissions(
-                            jail_role,
-                            send_messages=False,
-                            add_reactions=False,
-                            reason="Setting up jail role permissions"
-                        )
-                    except:
-                        continue
-                        
-                # Set permissions for the jail role in all voice channels
-                for channel in ctx.guild.voice_channels:
-                    try:
-                        await channel.set_permissions(
-                            jail_role,
-                            connect=False,
-                            speak=False,
-                            reason="Setting up jail role permissions"
-                        )
-                    except:
-                        continue
+                # Set permissions for the jail role in all text and voice channels at once;
+                # channels that fail are skipped
+                changes = [
+                    OverwriteChange(
+                        channel,
+                        jail_role,
+                        discord.PermissionOverwrite(send_messages=False, add_reactions=False),
+                        reason="Setting up jail role permissions"
+                    )
+                    for channel in ctx.guild.text_channels
+                ]
+                changes.extend(
+                    OverwriteChange(
+                        channel,
+                        jail_role,
+                        discord.PermissionOverwrite(connect=False, speak=False),
+                        reason="Setting up jail role permissions"
+                    )
+                    for channel in ctx.guild.voice_channels
+                )
+                await self.overwrites.apply(changes)
             
             # Store the member's roles before jailing
             stored_roles = [role.id for role in member.roles if role.id != ctx.guild.default_role.id]
@@ -147,6 +169,15 @@ class MemberRestrictions(commands.Cog):
             
             self.save_data(self.jail_data, self.jail_file)
             
+            # Release the member when the jail expires
+            jail_key = f"{guild_id}:{member.id}"
+            if expires:
+                await self.bot.scheduler.schedule(
+                    "jail", jail_key, expires, {"guild_id": guild_id, "member_id": str(member.id)}
+                )
+            else:
+                await self.bot.scheduler.cancel("jail", jail_key)
+            
             # Create an embed for the jail confirmation
             embed = discord.Embed(
                 title="Member Jailed",
@@ -272,6 +303,7 @@ class MemberRestrictions(commands.Cog):
                 del self.jail_data[guild_id]
                 
             self.save_data(self.jail_data, self.jail_file)
+            await self.bot.scheduler.cancel("jail", f"{guild_id}:{member_id}")
             
             # Create an embed for the unjail confirmation
             embed = discord.Embed(
@@ -373,42 +405,20 @@ class MemberRestrictions(commands.Cog):
             
             await ctx.send(embed=embed)
             
-            # Schedule unban task
-            async def unban_later():
-                await asyncio.sleep(duration_seconds)
-                try:
-                    # Check if the guild still exists
-                    if ctx.guild in self.bot.guilds:
-                        # Get the ban entry
-                        banned_users = [entry async for entry in ctx.guild.bans()]
-                        for ban_entry in banned_users:
-                            if ban_entry.user.id == member.id:
-                                await ctx.guild.unban(ban_entry.user, reason=f"Temporary ban for {duration_str} expired")
-                                logger.info(f"Unbanned {member.name} ({member.id}) in {ctx.guild.name} - temporary ban expired")
-                                
-                                # Try to send notification to mod log channel or original channel
-                                try:
-                                    user_mention = f"<@{member.id}>"  # Use direct mention format instead of member.mention
-                                    notification = discord.Embed(
-                                        title="Temporary Ban Expired",
-                                        description=f"The temporary ban for {user_mention} has expired.",
-                                        color=discord.Color.green(),
-                                        timestamp=datetime.utcnow()
-                                    )
-                                    notification.add_field(name="Originally banned by", value=ctx.author.mention)
-                                    notification.add_field(name="Original reason", value=reason)
-                                    notification.add_field(name="Ban duration", value=duration_str)
-                                    notification.set_footer(text=f"User ID: {member.id}")
-                                    
-                                    await ctx.channel.send(embed=notification)
-                                except:
-                                    pass
-                                break
-                except Exception as e:
-                    logger.error(f"Error during scheduled unban: {str(e)}")
-                    
-            # Start the unban task
-            self.bot.loop.create_task(unban_later())
+            # Schedule the unban; the scheduler keeps it across restarts
+            await self.bot.scheduler.schedule(
+                "tempban",
+                f"{ctx.guild.id}:{member.id}",
+                expires,
+                {
+                    "guild_id": ctx.guild.id,
+                    "user_id": member.id,
+                    "channel_id": ctx.channel.id,
+                    "moderator_id": ctx.author.id,
+                    "reason": reason,
+                    "duration": duration_str
+                }
+            )
             
         except discord.Forbidden:
             await ctx.send("❌ I don't have permission to ban that member.")
@@ -416,71 +426,84 @@ class MemberRestrictions(commands.Cog):
             logger.error(f"Error when temp banning user: {str(e)}")
             await ctx.send(f"❌ An error occurred: {str(e)}")
             
-    async def check_jail_timeouts(self):
-        """Background task to check and release expired jails"""
-        await self.bot.wait_until_ready()
+    async def release_tempban(self, job):
+        """Unban a member when their temporary ban's scheduler job comes due"""
+        data = job.payload
+        guild = self.bot.get_guild(data["guild_id"])
+        if not guild:
+            return
         
-        while not self.bot.is_closed():
-            try:
-                current_time = datetime.utcnow()
-                guilds_to_update = []
+        try:
+            # Unban by id directly instead of scanning the guild's ban list
+            await guild.unban(discord.Object(id=data["user_id"]), reason=f"Temporary ban for {data['duration']} expired")
+        except discord.NotFound:
+            return  # Already unbanned
                 
-                for guild_id, members in self.jail_data.items():
-                    guild = self.bot.get_guild(int(guild_id))
-                    if not guild:
-                        continue
+        logger.info(f"Unbanned {data['user_id']} in {guild.name} - temporary ban expired")
+        
+        # Try to send notification to the original channel
+        try:
+            channel = guild.get_channel(data["channel_id"])
+            if channel:
+                user_mention = f"<@{data['user_id']}>"
+                notification = discord.Embed(
+                    title="Temporary Ban Expired",
+                    description=f"The temporary ban for {user_mention} has expired.",
+                    color=discord.Color.green(),
+                    timestamp=datetime.utcnow()
+                )
+                notification.add_field(name="Originally banned by", value=f"<@{data['moderator_id']}>")
+                notification.add_field(name="Original reason", value=data["reason"])
+                notification.add_field(name="Ban duration", value=data["duration"])
+                notification.set_footer(text=f"User ID: {data['user_id']}")
+                
+                await channel.send(embed=notification)
+        except:
+            pass
+            
+    async def release_jail(self, job):
+        """Release a jailed member when their jail's scheduler job comes due"""
+        guild_id = job.payload["guild_id"]
+        member_id = job.payload["member_id"]
+        
+        data = self.jail_data.get(guild_id, {}).get(member_id)
+        if not data:
+            return  # Unjailed since it was scheduled
+            
+        guild = self.bot.get_guild(int(guild_id))
+        if not guild:
+            return
                         
-                    members_to_unjail = []
-                    
-                    for member_id, data in members.items():
-                        if data["expires"]:
-                            expires = datetime.fromisoformat(data["expires"])
-                            
-                            if current_time >= expires:
-                                # Time to unjail
-                                member = guild.get_member(int(member_id))
-                                if member:
-                                    try:
-                                        # Get the stored roles
-                                        stored_role_ids = data["roles"]
-                                        roles_to_add = []
-                                        
-                                        for role_id in stored_role_ids:
-                                            role = guild.get_role(int(role_id))
-                                            if role and role.is_assignable():
-                                                roles_to_add.append(role)
-                                        
-                                        # Remove the jail role by setting the roles back to the stored ones
-                                        await member.edit(roles=roles_to_add, reason="Jail period expired")
-                                        logger.info(f"Unjailed {member.name} in {guild.name} - jail period expired")
+        member = guild.get_member(int(member_id))
+        if member:
+            # Get the stored roles
+            roles_to_add = []
+            for role_id in data["roles"]:
+                role = guild.get_role(int(role_id))
+                if role and role.is_assignable():
+                    roles_to_add.append(role)
                                         
-                                        # Add to the list of members to remove from jail data
-                                        members_to_unjail.append(member_id)
+            # Remove the jail role by setting the roles back to the stored ones
+            try:
+                await member.edit(roles=roles_to_add, reason="Jail period expired")
+            except discord.HTTPException as e:
+                # Keep the jail entry and try again later rather than leaving them jailed
+                logger.warning(f"Couldn't unjail {member.name} in {guild.name}, retrying later: {e}")
+                await self.bot.scheduler.schedule(
+                    job.kind,
+                    job.key,
+                    datetime.utcnow() + JAIL_RELEASE_RETRY,
+                    job.payload
+                )
+                return
+            logger.info(f"Unjailed {member.name} in {guild.name} - jail period expired")
                                         
-                                    except Exception as e:
-                                        logger.error(f"Error auto-unjailing member: {str(e)}")
+        # Remove the member from jail data
+        del self.jail_data[guild_id][member_id]
+        if not self.jail_data[guild_id]:
+            del self.jail_data[guild_id]
                     
-                    # Remove unjailed members from data
-                    for member_id in members_to_unjail:
-                        del self.jail_data[guild_id][member_id]
-                        
-                    # If the guild has no more jailed members, mark it for removal
-                    if not self.jail_data[guild_id]:
-                        guilds_to_update.append(guild_id)
-                
-                # Remove empty guilds
-                for guild_id in guilds_to_update:
-                    del self.jail_data[guild_id]
-                    
-                # Save if changes were made
-                if guilds_to_update or any(members_to_unjail):
-                    self.save_data(self.jail_data, self.jail_file)
-                    
-            except Exception as e:
-                logger.error(f"Error in check_jail_timeouts task: {str(e)}")
-                
-            # Check every minute
-            await asyncio.sleep(60)
+        self.save_data(self.jail_data, self.jail_file)
     
     @commands.command(name="stfu")
     @commands.has_permissions(manage_messages=True)
@@ -524,7 +547,8 @@ class MemberRestrictions(commands.Cog):
         default_role = ctx.guild.default_role
         
         try:
-            # Get the channel permissions
+            # Build the change for every channel, then apply them concurrently
+            changes = []
             for channel in ctx.guild.text_channels:
                 # Get current permissions
                 overwrites = channel.overwrites_for(member)
@@ -533,11 +557,11 @@ class MemberRestrictions(commands.Cog):
                 overwrites.attach_files = False
                 overwrites.embed_links = False
                 
-                await channel.set_permissions(
-                    member,
-                    overwrite=overwrites,
-                    reason=f"Image muted by {ctx.author}: {reason}"
-                )
+                changes.append(OverwriteChange(channel, member, overwrites, reason=f"Image muted by {ctx.author}: {reason}"))
+                
+            result = await self.overwrites.apply(changes)
+            if changes and not result.applied:
+                raise result.failed[0].error
                 
             embed = discord.Embed(
                 title="Member Image Muted",
@@ -547,6 +571,9 @@ class MemberRestrictions(commands.Cog):
             )
             embed.add_field(name="Reason", value=reason)
             embed.add_field(name="Muted by", value=ctx.author.mention)
+            if result.failed:
+                # Some channels kept the old permissions; say so rather than claim success
+                embed.add_field(name="Failed", value=f"{len(result.failed)} of {len(changes)} channels", inline=False)
             embed.set_thumbnail(url=member.display_avatar.url)
             
             await ctx.send(embed=embed)
@@ -562,7 +589,8 @@ class MemberRestrictions(commands.Cog):
     async def iunmute(self, ctx, member: discord.Member, *, reason="No reason provided"):
         """Restores a member's attach files & embed links permission"""
         try:
-            # Get the channel permissions
+            # Build the change for every channel, then apply them concurrently
+            changes = []
             for channel in ctx.guild.text_channels:
                 # Get current permissions
                 overwrites = channel.overwrites_for(member)
@@ -571,19 +599,12 @@ class MemberRestrictions(commands.Cog):
                 overwrites.attach_files = None
                 overwrites.embed_links = None
                 
-                # If all permissions are now none, remove the overwrite completely
-                if all(getattr(overwrites, attr) is None for attr in dir(overwrites) if not attr.startswith('_')):
-                    await channel.set_permissions(
-                        member,
-                        overwrite=None,
-                        reason=f"Image unmuted by {ctx.author}: {reason}"
-                    )
-                else:
-                    await channel.set_permissions(
-                        member,
-                        overwrite=overwrites,
-                        reason=f"Image unmuted by {ctx.author}: {reason}"
-                    )
+                # If all permissions are now none, the overwrite is removed completely
+                changes.append(OverwriteChange(channel, member, overwrites, reason=f"Image unmuted by {ctx.author}: {reason}"))
+                
+            result = await self.overwrites.apply(changes)
+            if changes and not result.applied:
+                raise result.failed[0].error
                 
             embed = discord.Embed(
                 title="Member Image Unmuted",
@@ -593,6 +614,8 @@ class MemberRestrictions(commands.Cog):
             )
             embed.add_field(name="Reason", value=reason)
             embed.add_field(name="Unmuted by", value=ctx.author.mention)
+            if result.failed:
+                embed.add_field(name="Failed", value=f"{len(result.failed)} of {len(changes)} channels", inline=False)
             embed.set_thumbnail(url=member.display_avatar.url)
             
             await ctx.send(embed=embed)
@@ -608,7 +631,8 @@ class MemberRestrictions(commands.Cog):
     async def rmute(self, ctx, member: discord.Member, *, reason="No reason provided"):
         """Remove a member's add reactions & use external emotes permission"""
         try:
-            # Get the channel permissions
+            # Build the change for every channel, then apply them concurrently
+            changes = []
             for channel in ctx.guild.text_channels:
                 # Get current permissions
                 overwrites = channel.overwrites_for(member)
@@ -617,11 +641,11 @@ class MemberRestrictions(commands.Cog):
                 overwrites.add_reactions = False
                 overwrites.use_external_emojis = False
                 
-                await channel.set_permissions(
-                    member,
-                    overwrite=overwrites,
-                    reason=f"Reaction muted by {ctx.author}: {reason}"
-                )
+                changes.append(OverwriteChange(channel, member, overwrites, reason=f"Reaction muted by {ctx.author}: {reason}"))
+                
+            result = await self.overwrites.apply(changes)
+            if changes and not result.applied:
+                raise result.failed[0].error
                 
             embed = discord.Embed(
                 title="Member Reaction Muted",
@@ -631,6 +655,8 @@ class MemberRestrictions(commands.Cog):
             )
             embed.add_field(name="Reason", value=reason)
             embed.add_field(name="Muted by", value=ctx.author.mention)
+            if result.failed:
+                embed.add_field(name="Failed", value=f"{len(result.failed)} of {len(changes)} channels", inline=False)
             embed.set_thumbnail(url=member.display_avatar.url)
             
             await ctx.send(embed=embed)
@@ -646,7 +672,8 @@ class MemberRestrictions(commands.Cog):
     async def runmute(self, ctx, member: discord.Member, *, reason="No reason provided"):
         """Restores a member's add reactions & use external emotes permission"""
         try:
-            # Get the channel permissions
+            # Build the change for every channel, then apply them concurrently
+            changes = []
             for channel in ctx.guild.text_channels:
                 # Get current permissions
                 overwrites = channel.overwrites_for(member)
@@ -655,19 +682,12 @@ class MemberRestrictions(commands.Cog):
                 overwrites.add_reactions = None
                 overwrites.use_external_emojis = None
                 
-                # If all permissions are now none, remove the overwrite completely
-                if all(getattr(overwrites, attr) is None for attr in dir(overwrites) if not attr.startswith('_')):
-                    await channel.set_permissions(
-                        member,
-                        overwrite=None,
-                        reason=f"Reaction unmuted by {ctx.author}: {reason}"
-                    )
-                else:
-                    await channel.set_permissions(
-                        member,
-                        overwrite=overwrites,
-                        reason=f"Reaction unmuted by {ctx.author}: {reason}"
-                    )
+                # If all permissions are now none, the overwrite is removed completely
+                changes.append(OverwriteChange(channel, member, overwrites, reason=f"Reaction unmuted by {ctx.author}: {reason}"))
+                
+            result = await self.overwrites.apply(changes)
+            if changes and not result.applied:
+                raise result.failed[0].error
                 
             embed = discord.Embed(
                 title="Member Reaction Unmuted",
@@ -677,6 +697,8 @@ class MemberRestrictions(commands.Cog):
             )
             embed.add_field(name="Reason", value=reason)
             embed.add_field(name="Unmuted by", value=ctx.author.mention)
+            if result.failed:
+                embed.add_field(name="Failed", value=f"{len(result.failed)} of {len(changes)} channels", inline=False)
             embed.set_thumbnail(url=member.display_avatar.url)
             
             await ctx.send(embed=embed)
@@ -817,9 +839,5 @@ class MemberRestrictions(commands.Cog):
                     # We might not have permissions
                     pass
     
-    def cog_unload(self):
-        """Clean up when the cog is unloaded"""
-        self.check_jail_task.cancel()
-
 async def setup(bot):
     await bot.add_cog(MemberRestrictions(bot)) 
\ No newline at end of file
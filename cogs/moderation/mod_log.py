@@ -0,0 +1,194 @@
+import os
+import json
+import logging
+import datetime
+import discord
+
+from core.database import get_pool, close_pool
+
+logger = logging.getLogger('bot')
+
+# Audit log actions recorded in the moderation log
+LOGGED_ACTIONS = {
+    discord.AuditLogAction.ban: "ban",
+    discord.AuditLogAction.unban: "unban",
+    discord.AuditLogAction.kick: "kick",
+}
+
+# Sentinel for audit log diffs that don't carry an attribute
+_MISSING = object()
+
+
+def action_from_entry(entry):
+    """Moderation action name for an audit log entry, or None if it isn't one we log"""
+    action = LOGGED_ACTIONS.get(entry.action)
+    if action is not None:
+        return action
+    if entry.action == discord.AuditLogAction.member_update:
+        # Timeouts show up as member updates that touch timed_out_until
+        after = getattr(entry.after, 'timed_out_until', _MISSING)
+        if after is _MISSING:
+            return None
+        return "timeout" if after is not None else "untimeout"
+    return None
+
+
+class ModLogDB:
+    """Append-only moderation action log.
+    
+    Every action is one row; nothing is updated or trimmed, so history is
+    unlimited. Rows carry the audit log entry id, which makes recording the
+    same entry twice a no-op. Queries page newest-first with a
+    ``(created_at, id)`` cursor, served by the per-moderator, per-target and
+    time indexes.
+    """
+    
+    def __init__(self):
+        self.data_folder = 'data'
+        self.db_path = os.path.join(self.data_folder, 'mod_log.db')
+        self.pool = get_pool(self.db_path)
+    
+    async def close(self):
+        """Close the pooled connections for this database"""
+        await close_pool(self.db_path)
+    
+    async def initialize(self):
+        """Initialize the moderation log database"""
+        if not os.path.exists(self.data_folder):
+            os.makedirs(self.data_folder)
+        
+        async with self.pool.write() as db:
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS mod_actions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id INTEGER NOT NULL,
+                    moderator_id INTEGER NOT NULL,
+                    target_id INTEGER,
+                    action TEXT NOT NULL,
+                    reason TEXT,
+                    created_at REAL NOT NULL,
+                    audit_id INTEGER UNIQUE
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_mod_actions_moderator
+                ON mod_actions (guild_id, moderator_id, created_at)
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_mod_actions_target
+                ON mod_actions (guild_id, target_id, created_at)
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_mod_actions_time
+                ON mod_actions (created_at)
+            ''')
+            
+            await db.commit()
+    
+    async def import_json(self, file_path):
+        """One-time import of the old mod_history.json; the file is renamed afterwards"""
+        if not os.path.exists(file_path):
+            return 0
+        try:
+            with open(file_path, 'r') as f:
+                history = json.load(f)
+        except json.JSONDecodeError:
+            logger.error(f"Error decoding {file_path}. Skipping import.")
+            return 0
+        
+        rows = []
+        for guild_id, moderators in history.items():
+            for mod_id, actions in moderators.items():
+                for action in actions:
+                    try:
+                        created_at = datetime.datetime.fromisoformat(action["timestamp"])
+                    except (KeyError, ValueError):
+                        continue
+                    if created_at.tzinfo is None:
+                        created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+                    rows.append((
+                        int(guild_id), int(mod_id), int(action["target"]),
+                        action["action"], action.get("reason"), created_at.timestamp()
+                    ))
+        
+        async with self.pool.write() as db:
+            await db.executemany(
+                "INSERT INTO mod_actions (guild_id, moderator_id, target_id, action, reason, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            await db.commit()
+        
+        os.replace(file_path, file_path + '.imported')
+        logger.info(f"Imported {len(rows)} moderation actions from {file_path}")
+        return len(rows)
+    
+    async def add_action(self, guild_id, moderator_id, action, target_id, reason=None, created_at=None, audit_id=None):
+        """Append one moderation action; returns False if the audit entry was already logged"""
+        if created_at is None:
+            created_at = discord.utils.utcnow()
+        try:
+            async with self.pool.write() as db:
+                cursor = await db.execute(
+                    "INSERT OR IGNORE INTO mod_actions "
+                    "(guild_id, moderator_id, target_id, action, reason, created_at, audit_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (guild_id, moderator_id, target_id, action, reason, created_at.timestamp(), audit_id)
+                )
+                await db.commit()
+                return cursor.rowcount > 0
+        except Exception as e:
+            logger.error(f"Error logging {action} in guild {guild_id}: {e}")
+            return False
+    
+    @staticmethod
+    def _filters(guild_id, moderator_id=None, target_id=None, action=None):
+        clauses = ["guild_id = ?"]
+        params = [guild_id]
+        if moderator_id is not None:
+            clauses.append("moderator_id = ?")
+            params.append(moderator_id)
+        if target_id is not None:
+            clauses.append("target_id = ?")
+            params.append(target_id)
+        if action is not None:
+            clauses.append("action = ?")
+            params.append(action.lower())
+        return clauses, params
+    
+    async def count_actions(self, guild_id, moderator_id=None, target_id=None, action=None):
+        """Number of logged actions matching the filters"""
+        clauses, params = self._filters(guild_id, moderator_id, target_id, action)
+        async with self.pool.read() as db:
+            async with db.execute(
+                f"SELECT COUNT(*) FROM mod_actions WHERE {' AND '.join(clauses)}",
+                params
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0]
+    
+    async def get_actions(self, guild_id, moderator_id=None, target_id=None, action=None, before=None, limit=5):
+        """One page of actions, newest first.
+        
+        ``before`` is the ``(created_at, id)`` of the last row of the previous
+        page; pass None for the first page.
+        """
+        clauses, params = self._filters(guild_id, moderator_id, target_id, action)
+        if before is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(before)
+        params.append(limit)
+        async with self.pool.read() as db:
+            async with db.execute(
+                f"SELECT * FROM mod_actions WHERE {' AND '.join(clauses)} "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                params
+            ) as cursor:
+                rows = await cursor.fetchall()
+                return [dict(row) for row in rows]
+
+
+async def setup(bot):
+    # This is a helper module, no cog to add
+    pass
@@ -2,10 +2,11 @@ import discord
 from discord.ext import commands
 import logging
 import asyncio
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
 import os
 
+from .mod_log import ModLogDB, action_from_entry
+
 logger = logging.getLogger('bot')
 
 class ModUtils(commands.Cog):
@@ -15,157 +16,42 @@ class ModUtils(commands.Cog):
         self.bot = bot
         self.data_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'moderation')
         self.mod_history_file = os.path.join(self.data_folder, 'mod_history.json')
-        # Create data directory if it doesn't exist
-        os.makedirs(self.data_folder, exist_ok=True)
-        # Load data
-        self.mod_history = self.load_data(self.mod_history_file)
+        # Moderation actions live in an append-only SQLite log
+        self.db = ModLogDB()
         
-        # Register listeners for tracking mod actions
-        self.register_listeners()
-    
-    def load_data(self, file_path):
-        """Load data from file"""
-        try:
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    return json.load(f)
-            else:
-                return {}
-        except json.JSONDecodeError:
-            logger.error(f"Error decoding {file_path}. Using empty config.")
-            return {}
+    async def cog_load(self):
+        """Open the moderation log and import the old JSON history once"""
+        await self.db.initialize()
+        await self.db.import_json(self.mod_history_file)
     
-    def save_data(self, data, file_path):
-        """Save data to file"""
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+    async def cog_unload(self):
+        """Close the moderation log"""
+        await self.db.close()
     
-    def register_listeners(self):
-        """Register listeners to track moderator actions"""
-        self.bot.add_listener(self.on_member_ban, 'on_member_ban')
-        self.bot.add_listener(self.on_member_unban, 'on_member_unban')
-        
-        # Special handling for kicks since there's no specific kick event
-        self.bot.add_listener(self.on_member_remove, 'on_member_remove')
-    
-    def add_mod_action(self, guild_id, mod_id, action_type, target_id, reason=None):
+    async def add_mod_action(self, guild_id, mod_id, action_type, target_id, reason=None, created_at=None, audit_id=None):
         """Add a moderation action to the history"""
-        guild_id = str(guild_id)
-        mod_id = str(mod_id)
-        
-        if guild_id not in self.mod_history:
-            self.mod_history[guild_id] = {}
-            
-        if mod_id not in self.mod_history[guild_id]:
-            self.mod_history[guild_id][mod_id] = []
-        
-        # Add the action to history
-        self.mod_history[guild_id][mod_id].append({
-            "action": action_type,
-            "target": str(target_id),
-            "timestamp": datetime.utcnow().isoformat(),
-            "reason": reason
-        })
-        
-        # Keep only the last 100 actions per mod to prevent excessive storage
-        if len(self.mod_history[guild_id][mod_id]) > 100:
-            self.mod_history[guild_id][mod_id] = self.mod_history[guild_id][mod_id][-100:]
-            
-        self.save_data(self.mod_history, self.mod_history_file)
+        return await self.db.add_action(
+            int(guild_id), int(mod_id), action_type, int(target_id) if target_id is not None else None,
+            reason, created_at=created_at, audit_id=audit_id
+        )
     
-    async def on_member_ban(self, guild, user):
-        """Track member bans"""
-        try:
-            # Fetch ban information to get the moderator
-            await asyncio.sleep(1)  # Wait for audit log to be updated
-            
-            # Get recent bans within the last minute
-            one_minute_ago = datetime.utcnow() - timedelta(minutes=1)
-            
-            async for entry in guild.audit_logs(limit=5, action=discord.AuditLogAction.ban, after=one_minute_ago):
-                if entry.target.id == user.id:
-                    self.add_mod_action(
-                        guild.id, 
-                        entry.user.id, 
-                        "ban", 
-                        user.id, 
-                        entry.reason
-                    )
-                    break
-        except Exception as e:
-            logger.error(f"Error tracking ban action: {str(e)}")
-    
-    async def on_member_unban(self, guild, user):
-        """Track member unbans"""
-        try:
-            # Fetch unban information to get the moderator
-            await asyncio.sleep(1)  # Wait for audit log to be updated
-            
-            # Get recent unbans within the last minute
-            one_minute_ago = datetime.utcnow() - timedelta(minutes=1)
-            
-            async for entry in guild.audit_logs(limit=5, action=discord.AuditLogAction.unban, after=one_minute_ago):
-                if entry.target.id == user.id:
-                    self.add_mod_action(
-                        guild.id, 
-                        entry.user.id, 
-                        "unban", 
-                        user.id, 
-                        entry.reason
-                    )
-                    break
-        except Exception as e:
-            logger.error(f"Error tracking unban action: {str(e)}")
-    
-    async def on_member_remove(self, member):
-        """Handle member leave/kick events"""
-        try:
-            # Ignore bot leaves
-            if member.bot:
-                return
-                
-            # Wait a bit for audit logs to update
-            await asyncio.sleep(1)
-            
-            # Check if this was a kick or a ban (don't track regular leaves)
-            one_minute_ago = datetime.utcnow() - timedelta(minutes=1)
-            
-            # First check if it was a ban
-            ban_found = False
-            try:
-                async for entry in member.guild.audit_logs(limit=5, action=discord.AuditLogAction.ban, after=one_minute_ago):
-                    if entry.target.id == member.id:
-                        ban_found = True
-                        # Ban event will be handled by on_member_ban, so we don't need to do anything here
-                        logger.debug(f"Member {member} was banned, not kicked")
-                        break
-            except Exception as e:
-                logger.error(f"Error checking ban logs: {str(e)}")
-            
-            # If it wasn't a ban, check if it was a kick
-            if not ban_found:
-                kick_found = False
-                try:
-                    async for entry in member.guild.audit_logs(limit=5, action=discord.AuditLogAction.kick, after=one_minute_ago):
-                        if entry.target.id == member.id:
-                            kick_found = True
-                            self.add_mod_action(
-                                member.guild.id, 
-                                entry.user.id, 
-                                "kick", 
-                                member.id, 
-                                entry.reason
-                            )
-                            logger.info(f"Tracked kick of {member} by {entry.user} in {member.guild}")
-                            break
-                except Exception as e:
-                    logger.error(f"Error checking kick logs: {str(e)}")
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry):
+        """Track bans, unbans, kicks and timeouts as their audit log entries arrive"""
+        action = action_from_entry(entry)
+        if action is None or entry.user_id is None:
+            return
                 
-                if not kick_found:
-                    # This was likely a regular leave
-                    logger.debug(f"Member {member} left {member.guild} (regular leave)")
-        except Exception as e:
-            logger.error(f"Error in on_member_remove: {str(e)}")
+        target_id = entry.target.id if entry.target is not None else None
+        await self.add_mod_action(
+            entry.guild.id,
+            entry.user_id,
+            action,
+            target_id,
+            entry.reason,
+            created_at=entry.created_at,
+            audit_id=entry.id
+        )
     
     @commands.command(name="moderationhistory")
     @commands.has_permissions(manage_messages=True)
@@ -174,92 +60,93 @@ class ModUtils(commands.Cog):
         if member is None:
             member = ctx.author
             
-        guild_id = str(ctx.guild.id)
-        member_id = str(member.id)
+        await self.send_history(
+            ctx,
+            title=f"Moderation History for {member.display_name}",
+            description=f"Showing moderation actions by {member.mention}",
+            empty=f"moderation history found for {member.mention}",
+            subject=member,
+            command=command,
+            moderator_id=member.id
+        )
         
-        if (guild_id not in self.mod_history or 
-            member_id not in self.mod_history[guild_id] or
-            not self.mod_history[guild_id][member_id]):
-            await ctx.send(f"❌ No moderation history found for {member.mention}.")
+    @commands.command(name="punishmenthistory")
+    @commands.has_permissions(manage_messages=True)
+    async def punishmenthistory(self, ctx, user: discord.User, command: str = None):
+        """View moderation actions taken against a user"""
+        await self.send_history(
+            ctx,
+            title=f"Punishment History for {user.display_name}",
+            description=f"Showing moderation actions against {user.mention}",
+            empty=f"punishment history found for {user.mention}",
+            subject=user,
+            command=command,
+            target_id=user.id
+        )
+    
+    async def send_history(self, ctx, title, description, empty, subject, command=None, moderator_id=None, target_id=None):
+        """Send a paginated view over the moderation log.
+        
+        Pages are queried from the log as they are opened, newest first, so
+        only the pages someone actually looks at are ever read.
+        """
+        filters = {"moderator_id": moderator_id, "target_id": target_id, "action": command}
+        total = await self.db.count_actions(ctx.guild.id, **filters)
+        if not total:
+            if command:
+                await ctx.send(f"❌ No '{command}' actions found for {subject.mention}.")
+            else:
+                await ctx.send(f"❌ No {empty}.")
             return
             
-        # Filter by command if specified
-        actions = self.mod_history[guild_id][member_id]
-        if command:
-            actions = [action for action in actions if action["action"].lower() == command.lower()]
-            
-            if not actions:
-                await ctx.send(f"❌ No '{command}' actions found for {member.mention}.")
-                return
-        
-        # Sort actions by timestamp (newest first)
-        try:
-            actions = sorted(actions, key=lambda x: datetime.fromisoformat(x["timestamp"]), reverse=True)
-        except Exception as e:
-            logger.error(f"Error sorting mod actions: {str(e)}")
-                
-        # Create paginated embeds for the actions
         actions_per_page = 5
-        pages = []
+        total_pages = (total - 1) // actions_per_page + 1
+        # cursors[n] is where page n starts; pages are built once and reused
+        cursors = [None]
+        pages = {}
+            
+        async def get_page(index):
+            if index in pages:
+                return pages[index]
         
-        for i in range(0, len(actions), actions_per_page):
-            page_actions = actions[i:i+actions_per_page]
+            actions = await self.db.get_actions(ctx.guild.id, before=cursors[index], limit=actions_per_page, **filters)
+            if actions and len(cursors) == index + 1:
+                cursors.append((actions[-1]["created_at"], actions[-1]["id"]))
             
             embed = discord.Embed(
-                title=f"Moderation History for {member.display_name}",
-                description=f"Showing moderation actions by {member.mention}",
+                title=title,
+                description=description,
                 color=discord.Color.blue(),
                 timestamp=datetime.utcnow()
             )
             
-            for action in page_actions:
-                # Try to get the target user
+            for action in actions:
                 try:
-                    target_id = int(action["target"])
-                    target = ctx.guild.get_member(target_id)
-                    if not target:
-                        try:
-                            target = await self.bot.fetch_user(target_id)
-                        except:
-                            target = f"Unknown User ({target_id})"
-                            
-                    target_display = target.mention if isinstance(target, (discord.Member, discord.User)) else target
-                    action_type = action["action"].capitalize()
-                    timestamp = datetime.fromisoformat(action["timestamp"])
-                    reason = action["reason"] or "No reason provided"
-                    
                     embed.add_field(
-                        name=f"{action_type} - <t:{int(timestamp.timestamp())}:R>",
-                        value=f"**Target:** {target_display}\n**Reason:** {reason}",
+                        name=f"{action['action'].capitalize()} - <t:{int(action['created_at'])}:R>",
+                        value=await self._format_action(ctx, action, moderator_id is None),
                         inline=False
                     )
                 except Exception as e:
                     # If there's an error processing one action, add an error field but continue
-                    logger.error(f"Error processing action in moderationhistory: {str(e)}")
+                    logger.error(f"Error processing action in moderation history: {str(e)}")
                     embed.add_field(
                         name=f"Error Processing Action",
                         value=f"There was an error processing an action in the moderation history.",
                         inline=False
                     )
                 
-            embed.set_thumbnail(url=member.display_avatar.url)
-            # Calculate total pages and current page safely
-            total_pages = max(1, (len(actions) - 1) // actions_per_page + 1)
-            current_page = i // actions_per_page + 1
-            embed.set_footer(text=f"Page {current_page}/{total_pages}")
-            
-            pages.append(embed)
-            
-        if not pages:
-            await ctx.send(f"❌ No moderation history found for {member.mention}.")
-            return
+            embed.set_thumbnail(url=subject.display_avatar.url)
+            embed.set_footer(text=f"Page {index + 1}/{total_pages} • {total} actions")
+            pages[index] = embed
+            return embed
             
         # Send the first page
         current_page = 0
-        message = await ctx.send(embed=pages[current_page])
+        message = await ctx.send(embed=await get_page(current_page))
         
         # Add reactions for pagination if there are multiple pages
-        if len(pages) > 1:
+        if total_pages > 1:
             reactions = ['⬅️', '➡️']
             for reaction in reactions:
                 try:
@@ -274,12 +161,13 @@ class ModUtils(commands.Cog):
                 try:
                     reaction, user = await self.bot.wait_for('reaction_add', timeout=60.0, check=check)
                     
+                    # Pages are read in order, so stop at either end instead of wrapping
                     if str(reaction.emoji) == '⬅️':
-                        current_page = (current_page - 1) % len(pages)
+                        current_page = max(current_page - 1, 0)
                     elif str(reaction.emoji) == '➡️':
-                        current_page = (current_page + 1) % len(pages)
+                        current_page = min(current_page + 1, total_pages - 1)
                         
-                    await message.edit(embed=pages[current_page])
+                    await message.edit(embed=await get_page(current_page))
                     await message.remove_reaction(reaction.emoji, user)
                     
                 except asyncio.TimeoutError:
@@ -294,6 +182,25 @@ class ModUtils(commands.Cog):
                     logger.error(f"Error in pagination: {str(e)}")
                     break
 
+    async def _display_user(self, ctx, user_id):
+        """Mention for a user id, falling back to the raw id if they can't be found"""
+        if user_id is None:
+            return "Unknown"
+        user = ctx.guild.get_member(user_id) or self.bot.get_user(user_id)
+        if not user:
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.HTTPException:
+                return f"Unknown User ({user_id})"
+        return user.mention
+    
+    async def _format_action(self, ctx, action, show_moderator):
+        """Embed field text for one logged action"""
+        reason = action["reason"] or "No reason provided"
+        if show_moderator:
+            return f"**Moderator:** {await self._display_user(ctx, action['moderator_id'])}\n**Reason:** {reason}"
+        return f"**Target:** {await self._display_user(ctx, action['target_id'])}\n**Reason:** {reason}"
+
 async def setup(bot):
     """Set up the moderator utilities cog"""
     await bot.add_cog(ModUtils(bot)) 
\ No newline at end of file
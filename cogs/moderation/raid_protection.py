@@ -13,16 +13,47 @@ class RaidProtection(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        # Active tasks
-        self.raid_tasks = {}
-        self.recentban_tasks = {}
+    
+    async def cog_load(self):
+        """Report progress for raid cleanups and recent bans, resuming any cut off by a restart"""
+        self.bot.bulk_actions.register("raid", self.raid_progress)
+        self.bot.bulk_actions.register("recentban", self.recentban_progress)
+    
+    async def cog_unload(self):
+        """Stop reporting progress; running jobs carry on"""
+        self.bot.bulk_actions.unregister("raid")
+        self.bot.bulk_actions.unregister("recentban")
+    
+    async def _edit_status(self, job, content):
+        """Edit the status message a bulk job was started with"""
+        channel = self.bot.get_channel(job.payload.get("channel_id"))
+        if channel is None:
+            return
+        await channel.get_partial_message(job.payload["message_id"]).edit(content=content)
+    
+    async def raid_progress(self, job):
+        """Keep a raid cleanup's status message up to date"""
+        if job.finished:
+            final_action = "kicked" if job.action == "kick" else "banned"
+            content = f"✅ Raid cleanup complete! Successfully {final_action} {job.succeeded} members. Failed: {job.failed}"
+        else:
+            content = f"🔄 Processing raid cleanup... {job.done}/{job.total} members processed."
+        await self._edit_status(job, content)
+    
+    async def recentban_progress(self, job):
+        """Keep a recent member ban's status message up to date"""
+        if job.finished:
+            content = f"✅ Recent member ban complete! Successfully banned {job.succeeded} members. Failed: {job.failed}"
+        else:
+            content = f"🔄 Banning recent members... {job.done}/{job.total} members processed."
+        await self._edit_status(job, content)
     
     @commands.command(name="raid")
     @commands.has_permissions(administrator=True)
     async def raid(self, ctx, time: str, action: str = "kick", *, reason="Raid cleanup"):
         """Remove all members that joined in the time provided in the event of a raid"""
         # Check if a task is already running for this guild
-        if ctx.guild.id in self.raid_tasks:
+        if self.bot.bulk_actions.get("raid", ctx.guild.id):
             await ctx.send("❌ A raid cleanup task is already running for this server. Use `raid cancel` to cancel it.")
             return
             
@@ -64,17 +95,12 @@ class RaidProtection(commands.Cog):
             
         action = action.lower()
         
-        # Create a confirmation message
-        members_to_process = []
-        
-        # Get members who joined within the specified time
-        for member in ctx.guild.members:
-            if member.joined_at and member.joined_at > cutoff_time:
-                # Skip bots, members with roles, and moderators
-                if member.bot or len(member.roles) > 1 or member.guild_permissions.kick_members:
-                    continue
-                    
-                members_to_process.append(member)
+        # Get members who joined within the specified time from the join index,
+        # skipping bots, members with roles, and moderators
+        members_to_process = self.bot.member_stats.get(ctx.guild).joined_since(
+            cutoff_time,
+            lambda member: not (member.bot or len(member.roles) > 1 or member.guild_permissions.kick_members)
+        )
                 
         if not members_to_process:
             await ctx.send(f"❌ No members found who joined within the last {time}.")
@@ -104,47 +130,15 @@ class RaidProtection(commands.Cog):
                 f"🔄 Processing raid cleanup... 0/{len(members_to_process)} members processed."
             )
             
-            # Define the task
-            async def process_raid_members():
-                processed = 0
-                success = 0
-                failed = 0
-                
-                for i, member in enumerate(members_to_process):
-                    try:
-                        if action == "kick":
-                            await member.kick(reason=f"{reason} | Raid cleanup by {ctx.author}")
-                        else:  # ban
-                            await member.ban(reason=f"{reason} | Raid cleanup by {ctx.author}")
-                            
-                        success += 1
-                    except Exception as e:
-                        logger.error(f"Error processing member in raid cleanup: {str(e)}")
-                        failed += 1
-                        
-                    processed += 1
-                    
-                    # Update status every few members
-                    if (i + 1) % 5 == 0 or i + 1 == len(members_to_process):
-                        await status_msg.edit(
-                            content=f"🔄 Processing raid cleanup... {processed}/{len(members_to_process)} members processed."
-                        )
-                        
-                    # Sleep briefly to avoid rate limits
-                    await asyncio.sleep(0.5)
-                    
-                # Final update
-                final_action = "kicked" if action == "kick" else "banned"
-                await status_msg.edit(
-                    content=f"✅ Raid cleanup complete! Successfully {final_action} {success} members. Failed: {failed}"
-                )
-                
-                # Remove from active tasks
-                del self.raid_tasks[ctx.guild.id]
-                
-            # Start the task
-            task = self.bot.loop.create_task(process_raid_members())
-            self.raid_tasks[ctx.guild.id] = task
+            # Bans go out in bulk, kicks with adaptive concurrency; progress is saved as it goes
+            await self.bot.bulk_actions.submit(
+                "raid",
+                ctx.guild,
+                action,
+                [member.id for member in members_to_process],
+                reason=f"{reason} | Raid cleanup by {ctx.author}",
+                payload={"channel_id": ctx.channel.id, "message_id": status_msg.id}
+            )
             
         except asyncio.TimeoutError:
             await confirm_msg.edit(content="❌ Raid cleanup timed out.")
@@ -153,13 +147,10 @@ class RaidProtection(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def raid_cancel(self, ctx):
         """End a chunkban of raid members"""
-        if ctx.guild.id not in self.raid_tasks:
+        # Cancel the task, if there is one
+        if not await self.bot.bulk_actions.cancel("raid", ctx.guild.id):
             await ctx.send("❌ There is no active raid cleanup task for this server.")
             return
-            
-        # Cancel the task
-        self.raid_tasks[ctx.guild.id].cancel()
-        del self.raid_tasks[ctx.guild.id]
         
         await ctx.send("✅ Raid cleanup task cancelled.")
     
@@ -168,7 +159,7 @@ class RaidProtection(commands.Cog):
     async def recentban(self, ctx, count: int = 10, *, reason="Mass ban of recent joins"):
         """Chunk ban recently joined members"""
         # Check if a task is already running for this guild
-        if ctx.guild.id in self.recentban_tasks:
+        if self.bot.bulk_actions.get("recentban", ctx.guild.id):
             await ctx.send("❌ A recent member ban task is already running for this server. Use `recentban cancel` to cancel it.")
             return
             
@@ -182,11 +173,10 @@ class RaidProtection(commands.Cog):
             count = 100
             
         # Get the most recently joined members
-        members = sorted(
-            [m for m in ctx.guild.members if not m.bot and len(m.roles) <= 1],
-            key=lambda m: m.joined_at if m.joined_at else discord.utils.utcnow(),
-            reverse=True
-        )[:count]
+        members = self.bot.member_stats.get(ctx.guild).recent(
+            count,
+            lambda m: not m.bot and len(m.roles) <= 1
+        )
         
         if not members:
             await ctx.send("❌ No eligible members found to ban.")
@@ -226,42 +216,14 @@ class RaidProtection(commands.Cog):
                 f"🔄 Banning recent members... 0/{len(members)} members processed."
             )
             
-            # Define the task
-            async def process_recent_bans():
-                processed = 0
-                success = 0
-                failed = 0
-                
-                for i, member in enumerate(members):
-                    try:
-                        await member.ban(reason=f"{reason} | Recent member ban by {ctx.author}")
-                        success += 1
-                    except Exception as e:
-                        logger.error(f"Error banning member in recentban: {str(e)}")
-                        failed += 1
-                        
-                    processed += 1
-                    
-                    # Update status every few members
-                    if (i + 1) % 5 == 0 or i + 1 == len(members):
-                        await status_msg.edit(
-                            content=f"🔄 Banning recent members... {processed}/{len(members)} members processed."
-                        )
-                        
-                    # Sleep briefly to avoid rate limits
-                    await asyncio.sleep(0.5)
-                    
-                # Final update
-                await status_msg.edit(
-                    content=f"✅ Recent member ban complete! Successfully banned {success} members. Failed: {failed}"
-                )
-                
-                # Remove from active tasks
-                del self.recentban_tasks[ctx.guild.id]
-                
-            # Start the task
-            task = self.bot.loop.create_task(process_recent_bans())
-            self.recentban_tasks[ctx.guild.id] = task
+            await self.bot.bulk_actions.submit(
+                "recentban",
+                ctx.guild,
+                "ban",
+                [member.id for member in members],
+                reason=f"{reason} | Recent member ban by {ctx.author}",
+                payload={"channel_id": ctx.channel.id, "message_id": status_msg.id}
+            )
             
         except asyncio.TimeoutError:
             await confirm_msg.edit(content="❌ Recent member ban timed out.")
@@ -270,13 +232,10 @@ class RaidProtection(commands.Cog):
     @commands.has_permissions(ban_members=True)
     async def recentban_cancel(self, ctx):
         """Stop a chunk banning task"""
-        if ctx.guild.id not in self.recentban_tasks:
+        # Cancel the task, if there is one
+        if not await self.bot.bulk_actions.cancel("recentban", ctx.guild.id):
             await ctx.send("❌ There is no active recent member ban task for this server.")
             return
-            
-        # Cancel the task
-        self.recentban_tasks[ctx.guild.id].cancel()
-        del self.recentban_tasks[ctx.guild.id]
         
         await ctx.send("✅ Recent member ban task cancelled.")
     
@@ -293,11 +252,7 @@ class RaidProtection(commands.Cog):
             count = 50
             
         # Get the most recently joined members
-        members = sorted(
-            [m for m in ctx.guild.members],
-            key=lambda m: m.joined_at if m.joined_at else discord.utils.utcnow(),
-            reverse=True
-        )[:count]
+        members = self.bot.member_stats.get(ctx.guild).recent(count)
         
         if not members:
             await ctx.send("❌ No members found.")
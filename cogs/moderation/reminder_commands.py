@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import asyncio
 import logging
 from datetime import datetime, timedelta
 import json
@@ -19,8 +18,29 @@ class ReminderCommands(commands.Cog):
         os.makedirs(self.data_folder, exist_ok=True)
         # Load data
         self.reminders = self.load_reminders()
-        # Start background task
-        self.check_reminders_task = self.bot.loop.create_task(self.check_reminders())
+    
+    async def cog_load(self):
+        """Hand reminder timers to the bot's scheduler"""
+        self.bot.scheduler.register("reminder", self.send_reminder)
+        
+        # Arm reminders saved before they had a scheduler job
+        for user_id, reminders in self.reminders.items():
+            for reminder in reminders:
+                if not self.bot.scheduler.get("reminder", f"{user_id}:{reminder['id']}"):
+                    await self.schedule_reminder(user_id, reminder)
+    
+    def cog_unload(self):
+        """Clean up when the cog is unloaded"""
+        self.bot.scheduler.unregister("reminder")
+    
+    async def schedule_reminder(self, user_id, reminder):
+        """Schedule the timer that delivers a reminder"""
+        await self.bot.scheduler.schedule(
+            "reminder",
+            f"{user_id}:{reminder['id']}",
+            datetime.fromisoformat(reminder["expires"]),
+            {"user_id": user_id, "reminder_id": reminder["id"]}
+        )
     
     def load_reminders(self):
         """Load reminders from file"""
@@ -36,8 +56,7 @@ class ReminderCommands(commands.Cog):
     
     def save_reminders(self):
         """Save reminders to file"""
-        with open(self.reminders_file, 'w') as f:
-            json.dump(self.reminders, f, indent=4)
+        self.bot.json_store.save(self.reminders_file, self.reminders)
 
     @commands.command(name="remind")
     async def remind(self, ctx, timeframe: str, *, reason: str = "No reason provided"):
@@ -91,16 +110,18 @@ class ReminderCommands(commands.Cog):
             reminder_id = 1
             
         # Add the reminder
-        self.reminders[user_id].append({
+        reminder = {
             "id": str(reminder_id),
             "reason": reason,
             "channel_id": str(ctx.channel.id),
             "guild_id": str(ctx.guild.id) if ctx.guild else None,
             "created_at": datetime.utcnow().isoformat(),
             "expires": expiry_time.isoformat()
-        })
+        }
+        self.reminders[user_id].append(reminder)
         
         self.save_reminders()
+        await self.schedule_reminder(user_id, reminder)
         
         # Create an embed for the reminder confirmation
         embed = discord.Embed(
@@ -146,6 +167,7 @@ class ReminderCommands(commands.Cog):
             del self.reminders[user_id]
             
         self.save_reminders()
+        await self.bot.scheduler.cancel("reminder", f"{user_id}:{reminder_str_id}")
         
         # Create an embed for the removal confirmation
         embed = discord.Embed(
@@ -194,84 +216,58 @@ class ReminderCommands(commands.Cog):
             
         await ctx.send(embed=embed)
 
-    async def check_reminders(self):
-        """Background task to check and send reminders"""
-        await self.bot.wait_until_ready()
+    async def send_reminder(self, job):
+        """Deliver a reminder when its scheduler job comes due"""
+        user_id = job.payload["user_id"]
+        reminder_id = job.payload["reminder_id"]
         
-        while not self.bot.is_closed():
-            try:
-                current_time = datetime.utcnow()
-                users_to_update = []
+        reminder = None
+        for r in self.reminders.get(user_id, []):
+            if r["id"] == reminder_id:
+                reminder = r
+                break
                 
-                for user_id, reminders in self.reminders.items():
-                    reminders_to_remove = []
+        if not reminder:
+            return  # Removed since it was scheduled
                     
-                    for reminder in reminders:
-                        expires = datetime.fromisoformat(reminder["expires"])
-                        
-                        if current_time >= expires:
-                            # Time to send the reminder
-                            try:
-                                channel_id = int(reminder["channel_id"])
-                                channel = self.bot.get_channel(channel_id)
+        try:
+            channel_id = int(reminder["channel_id"])
+            channel = self.bot.get_channel(channel_id)
                                 
-                                if not channel:
-                                    # Try to fetch the channel if it's not in cache
-                                    try:
-                                        channel = await self.bot.fetch_channel(channel_id)
-                                    except:
-                                        channel = None
+            if not channel:
+                # Try to fetch the channel if it's not in cache
+                try:
+                    channel = await self.bot.fetch_channel(channel_id)
+                except:
+                    channel = None
                                         
-                                if channel:
-                                    user = await self.bot.fetch_user(int(user_id))
+            if channel:
+                user = await self.bot.fetch_user(int(user_id))
                                     
-                                    # Create an embed for the reminder
-                                    embed = discord.Embed(
-                                        title="Reminder",
-                                        description=f"{user.mention}, you asked me to remind you:",
-                                        color=discord.Color.blue(),
-                                        timestamp=datetime.utcnow()
-                                    )
-                                    embed.add_field(name="Reason", value=reminder["reason"])
-                                    embed.add_field(
-                                        name="Originally Set", 
-                                        value=f"<t:{int(datetime.fromisoformat(reminder['created_at']).timestamp())}:R>"
-                                    )
+                # Create an embed for the reminder
+                embed = discord.Embed(
+                    title="Reminder",
+                    description=f"{user.mention}, you asked me to remind you:",
+                    color=discord.Color.blue(),
+                    timestamp=datetime.utcnow()
+                )
+                embed.add_field(name="Reason", value=reminder["reason"])
+                embed.add_field(
+                    name="Originally Set", 
+                    value=f"<t:{int(datetime.fromisoformat(reminder['created_at']).timestamp())}:R>"
+                )
                                     
-                                    await channel.send(user.mention, embed=embed)
-                                    logger.info(f"Sent reminder to {user.name}: {reminder['reason']}")
+                await channel.send(user.mention, embed=embed)
+                logger.info(f"Sent reminder to {user.name}: {reminder['reason']}")
                                     
-                            except Exception as e:
-                                logger.error(f"Error sending reminder: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error sending reminder: {str(e)}")
                                 
-                            # Mark the reminder for removal
-                            reminders_to_remove.append(reminder)
-                    
-                    # Remove completed reminders
-                    for reminder in reminders_to_remove:
-                        self.reminders[user_id].remove(reminder)
-                        
-                    # If the user has no more reminders, mark them for removal
-                    if not self.reminders[user_id]:
-                        users_to_update.append(user_id)
-                
-                # Remove users with no reminders
-                for user_id in users_to_update:
-                    del self.reminders[user_id]
-                    
-                # Save if changes were made
-                if users_to_update or any(reminders_to_remove):
-                    self.save_reminders()
-                    
-            except Exception as e:
-                logger.error(f"Error in check_reminders task: {str(e)}")
-                
-            # Check every minute
-            await asyncio.sleep(60)
-    
-    def cog_unload(self):
-        """Clean up when the cog is unloaded"""
-        self.check_reminders_task.cancel()
+        # Remove the completed reminder
+        self.reminders[user_id].remove(reminder)
+        if not self.reminders[user_id]:
+            del self.reminders[user_id]
+        self.save_reminders()
 
 async def setup(bot):
     await bot.add_cog(ReminderCommands(bot)) 
\ No newline at end of file
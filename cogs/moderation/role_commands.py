@@ -22,6 +22,14 @@ class RoleCommands(commands.Cog):
         # Active tasks
         self.role_tasks = {}
     
+    async def cog_load(self):
+        """Contribute sticky roles to the bot's join pipeline"""
+        self.bot.joins.add_role_provider("stickyroles", self.sticky_join_roles)
+    
+    def cog_unload(self):
+        """Stop contributing sticky roles"""
+        self.bot.joins.remove("stickyroles")
+    
     def load_stickyroles(self):
         """Load the sticky roles from file"""
         try:
@@ -36,8 +44,7 @@ class RoleCommands(commands.Cog):
     
     def save_stickyroles(self):
         """Save the sticky roles to file"""
-        with open(self.stickyroles_file, 'w') as f:
-            json.dump(self.stickyroles, f, indent=4)
+        self.bot.json_store.save(self.stickyroles_file, self.stickyroles)
 
     @commands.group(name="role", invoke_without_command=True)
     @commands.has_permissions(manage_roles=True)
@@ -419,17 +426,16 @@ class RoleCommands(commands.Cog):
             
         await ctx.send(embed=embed)
 
-    # Event listener for sticky roles
-    @commands.Cog.listener()
-    async def on_member_join(self, member):
-        """Reapply sticky roles when a member joins"""
+    # Join pipeline role provider for sticky roles
+    def sticky_join_roles(self, member):
+        """Sticky roles to reapply when a member joins"""
         guild_id = str(member.guild.id)
         member_id = str(member.id)
         
         # Check if the member has any sticky roles
         if (guild_id not in self.stickyroles or
             member_id not in self.stickyroles[guild_id]):
-            return
+            return []
             
         # Get the sticky roles
         role_ids = self.stickyroles[guild_id][member_id]
@@ -440,12 +446,7 @@ class RoleCommands(commands.Cog):
             if role and role.is_assignable():
                 roles_to_add.append(role)
                 
-        if roles_to_add:
-            try:
-                await member.add_roles(*roles_to_add, reason="Reapplying sticky roles")
-                logger.info(f"Reapplied {len(roles_to_add)} sticky roles to {member.name} in {member.guild.name}")
-            except Exception as e:
-                logger.error(f"Error reapplying sticky roles: {str(e)}")
+        return roles_to_add
 
 async def setup(bot):
     await bot.add_cog(RoleCommands(bot)) 
\ No newline at end of file
@@ -0,0 +1,207 @@
+import json
+import asyncio
+import logging
+
+from core.http import get_http_client
+
+logger = logging.getLogger('bot')
+
+POKEAPI_URL = "https://pokeapi.co/api/v2"
+
+# Species available to get_random_wild_pokemon (Gen 1-3)
+MAX_SPECIES_ID = 386
+
+# Concurrent requests used by the bulk prefetch
+PREFETCH_CONCURRENCY = 8
+
+
+def _trim_pokemon(data):
+    """Keep only the /pokemon fields the cog reads, in PokeAPI's own shape"""
+    return {
+        'id': data['id'],
+        'name': data['name'],
+        'height': data.get('height', 0),
+        'weight': data.get('weight', 0),
+        'types': [{'slot': t.get('slot'), 'type': {'name': t['type']['name']}} for t in data['types']],
+        'stats': [{'base_stat': s['base_stat'], 'stat': {'name': s['stat']['name']}} for s in data['stats']],
+        'abilities': [
+            {'ability': {'name': a['ability']['name']}, 'is_hidden': a.get('is_hidden', False)}
+            for a in data.get('abilities', [])
+        ],
+        'moves': [{'move': {'name': m['move']['name'], 'url': m['move']['url']}} for m in data.get('moves', [])],
+        'sprites': {'front_default': data.get('sprites', {}).get('front_default')},
+        'species': {'name': data['species']['name'], 'url': data['species']['url']}
+    }
+
+
+def _trim_species(data):
+    """Keep only the /pokemon-species fields needed to find the evolution chain"""
+    chain = data.get('evolution_chain') or {}
+    return {
+        'id': data['id'],
+        'name': data['name'],
+        'evolution_chain': {'url': chain['url']} if chain.get('url') else None
+    }
+
+
+def _trim_chain_link(link):
+    return {
+        'species': {'name': link['species']['name'], 'url': link['species']['url']},
+        'evolves_to': [_trim_chain_link(child) for child in link.get('evolves_to', [])]
+    }
+
+
+def _trim_evolution_chain(data):
+    """Keep only species names and the evolves_to tree"""
+    return {'id': data['id'], 'chain': _trim_chain_link(data['chain'])}
+
+
+class PokeAPICache:
+    """On-disk cache of PokeAPI pokemon, species and evolution chain data.
+    
+    Entries live in the ``pokeapi_cache`` table of pokemon.db and are loaded
+    into memory once, so lookups after a prefetch never leave the process.
+    In offline mode a cache miss returns None instead of calling the API.
+    """
+    
+    KINDS = ('pokemon', 'species', 'evolution_chain')
+    
+    def __init__(self, pool, offline=False):
+        self.pool = pool
+        self.offline = offline
+        self._entries = {kind: {} for kind in self.KINDS}
+        self._names = {}  # pokemon name -> id (as str)
+        self.hits = 0
+        self.misses = 0
+    
+    async def initialize(self):
+        """Create the cache table and load every entry into memory"""
+        async with self.pool.write() as db:
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS pokeapi_cache (
+                    kind TEXT,
+                    key TEXT,
+                    data TEXT, -- trimmed JSON payload
+                    fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (kind, key)
+                )
+            ''')
+            await db.commit()
+        
+        async with self.pool.read() as db:
+            async with db.execute("SELECT kind, key, data FROM pokeapi_cache") as cursor:
+                rows = await cursor.fetchall()
+        
+        for row in rows:
+            if row['kind'] in self._entries:
+                self._remember(row['kind'], row['key'], json.loads(row['data']))
+        
+        logger.info(f"Loaded {len(self._entries['pokemon'])} cached Pokemon from pokemon.db")
+    
+    def _remember(self, kind, key, data):
+        self._entries[kind][key] = data
+        if kind == 'pokemon':
+            self._names[data['name']] = key
+    
+    async def _store(self, kind, key, data):
+        self._remember(kind, key, data)
+        async with self.pool.write() as db:
+            await db.execute(
+                "INSERT OR REPLACE INTO pokeapi_cache (kind, key, data) VALUES (?, ?, ?)",
+                (kind, key, json.dumps(data, separators=(',', ':')))
+            )
+            await db.commit()
+    
+    def _pokemon_key(self, pokemon_id):
+        """Normalise an id or name to the cache key (the numeric id as str)"""
+        key = str(pokemon_id).strip().lower()
+        if key.isdigit():
+            return str(int(key))
+        return self._names.get(key, key)
+    
+    def cached_count(self, kind='pokemon'):
+        return len(self._entries[kind])
+    
+    async def _fetch_json(self, url):
+        async with get_http_client().get(url) as response:
+            if response.status != 200:
+                logger.error(f"PokeAPI request failed ({response.status}): {url}")
+                return None
+            return await response.json()
+    
+    async def _get(self, kind, key, url, trim):
+        """Serve an entry from memory, fetching and storing it on a miss"""
+        cached = self._entries[kind].get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        
+        self.misses += 1
+        if self.offline:
+            return None
+        
+        try:
+            data = await self._fetch_json(url)
+        except Exception as e:
+            logger.error(f"Error fetching {kind} {key} from PokeAPI: {e}")
+            return None
+        
+        if not data:
+            return None
+        
+        trimmed = trim(data)
+        await self._store(kind, str(trimmed['id']), trimmed)
+        return trimmed
+    
+    async def get_pokemon(self, pokemon_id):
+        """Get /pokemon data by national dex id or name"""
+        key = self._pokemon_key(pokemon_id)
+        return await self._get('pokemon', key, f"{POKEAPI_URL}/pokemon/{key}", _trim_pokemon)
+    
+    async def get_species(self, species_url):
+        """Get /pokemon-species data from its URL"""
+        key = species_url.rstrip('/').rsplit('/', 1)[-1]
+        return await self._get('species', key, species_url, _trim_species)
+    
+    async def get_evolution_chain(self, chain_url):
+        """Get /evolution-chain data from its URL"""
+        key = chain_url.rstrip('/').rsplit('/', 1)[-1]
+        return await self._get('evolution_chain', key, chain_url, _trim_evolution_chain)
+    
+    async def prefetch(self, last_id=MAX_SPECIES_ID, progress=None):
+        """Fill the cache for every species up to last_id (one-shot bulk load).
+        
+        ``progress`` is an optional coroutine function called with
+        (done, total) roughly every 25 species. Returns the number of
+        species that could not be fetched.
+        """
+        if self.offline:
+            raise RuntimeError("PokeAPI cache is in offline mode")
+        
+        semaphore = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+        done = 0
+        failed = 0
+        
+        async def fetch_one(pokemon_id):
+            nonlocal done, failed
+            async with semaphore:
+                pokemon = await self.get_pokemon(pokemon_id)
+                species = await self.get_species(pokemon['species']['url']) if pokemon else None
+                if species and species['evolution_chain']:
+                    await self.get_evolution_chain(species['evolution_chain']['url'])
+                if not species:
+                    failed += 1
+            done += 1
+            if progress and done % 25 == 0:
+                await progress(done, last_id)
+        
+        await asyncio.gather(*(fetch_one(pokemon_id) for pokemon_id in range(1, last_id + 1)))
+        
+        if progress:
+            await progress(done, last_id)
+        return failed
+
+
+async def setup(bot):
+    # This is a helper module, no cog to add
+    pass
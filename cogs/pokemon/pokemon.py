@@ -5,7 +5,6 @@ import asyncio
 from datetime import datetime
 import logging
 from .pokemon_db import PokemonDB
-import sqlite3
 
 logger = logging.getLogger('bot')
 
@@ -14,7 +13,8 @@ class PokemonCog(commands.Cog, name="Pokemon"):
     
     def __init__(self, bot):
         self.bot = bot
-        self.db = PokemonDB()
+        # Offline mode serves Pokemon data only from the local PokeAPI cache
+        self.db = PokemonDB(offline=getattr(bot, 'config', {}).get('pokemon_offline', False))
         self.shop_items = {
             'pokeballs': {
                 'name': 'Pokeball',
@@ -107,11 +107,19 @@ class PokemonCog(commands.Cog, name="Pokemon"):
                 'description': 'Revives a fainted Pokemon and restores half its HP'
             }
         }
+    
+    async def cog_load(self):
+        """Initialize the database on load"""
+        await self.db.initialize()
+    
+    async def cog_unload(self):
+        """Close database connections on unload"""
+        await self.db.close()
         
     @commands.command(name="journey")
     async def journey(self, ctx):
         """Start your Pokemon journey"""
-        if self.db.trainer_exists(ctx.author.id):
+        if await self.db.trainer_exists(ctx.author.id):
             embed = discord.Embed(
                 title="Trainer Profile Exists",
                 description="You have already started your Pokemon journey!",
@@ -120,7 +128,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             await ctx.send(embed=embed)
             return
             
-        success = self.db.create_trainer(ctx.author.id, ctx.author.name)
+        success = await self.db.create_trainer(ctx.author.id, ctx.author.name)
         
         if success:
             embed = discord.Embed(
@@ -143,7 +151,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
     @commands.command(name="catch")
     async def catch(self, ctx):
         """Try to catch a wild Pokemon"""
-        if not self.db.trainer_exists(ctx.author.id):
+        if not await self.db.trainer_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Trainer Profile",
                 description="You haven't started your Pokemon journey yet! Use `!journey` to begin.",
@@ -167,7 +175,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             return
             
         # Check for Pokeballs
-        inventory = self.db.get_inventory(ctx.author.id)
+        inventory = await self.db.get_inventory(ctx.author.id)
         
         # Check if the user has any Pokéballs
         has_pokeballs = False
@@ -289,7 +297,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
                 break
             
         # Remove the ball from inventory
-        self.db.remove_from_inventory(ctx.author.id, ball_type, 1)
+        await self.db.remove_from_inventory(ctx.author.id, ball_type, 1)
         
         # Collect encounter data for special Pokéball effects
         encounter_data = {
@@ -328,14 +336,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
         await asyncio.sleep(1)
         
         # Update the last catch timestamp
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE trainers SET last_catch = ? WHERE user_id = ?",
-            (datetime.now().isoformat(), str(ctx.author.id))
-        )
-        conn.commit()
-        conn.close()
+        await self.db.update_last_catch(ctx.author.id)
         
         # Determine if caught
         caught = random.random() < catch_chance
@@ -442,7 +443,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
         """Look up a Pokemon's stats"""
         if pokemon_name is None:
             # If no Pokemon specified, show user's primary Pokemon
-            if not self.db.trainer_exists(ctx.author.id):
+            if not await self.db.trainer_exists(ctx.author.id):
                 embed = discord.Embed(
                     title="No Trainer Profile",
                     description="You haven't started your Pokemon journey yet! Use `!journey` to begin.",
@@ -451,7 +452,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
                 await ctx.send(embed=embed)
                 return
                 
-            primary_pokemon = self.db.get_primary_pokemon(ctx.author.id)
+            primary_pokemon = await self.db.get_primary_pokemon(ctx.author.id)
             if not primary_pokemon:
                 embed = discord.Embed(
                     title="No Primary Pokemon",
@@ -547,7 +548,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
     @commands.command(name="battle")
     async def battle(self, ctx):
         """Battle with your primary Pokemon to gain XP"""
-        if not self.db.trainer_exists(ctx.author.id):
+        if not await self.db.trainer_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Trainer Profile",
                 description="You haven't started your Pokemon journey yet! Use `!journey` to begin.",
@@ -556,7 +557,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             await ctx.send(embed=embed)
             return
             
-        primary_pokemon = self.db.get_primary_pokemon(ctx.author.id)
+        primary_pokemon = await self.db.get_primary_pokemon(ctx.author.id)
         if not primary_pokemon:
             embed = discord.Embed(
                 title="No Primary Pokemon",
@@ -632,7 +633,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             
             # Check if trainer leveled up
             if battle_result['trainer_leveled']:
-                trainer_data = self.db._get_trainer_data(ctx.author.id)
+                trainer_data = await self.db._get_trainer_data(ctx.author.id)
                 result_embed.add_field(
                     name="Trainer Level Up!", 
                     value=f"You are now level {trainer_data['level']}!",
@@ -665,7 +666,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
     @commands.command(name="evolve")
     async def evolve(self, ctx):
         """Evolve your primary Pokemon if eligible"""
-        if not self.db.trainer_exists(ctx.author.id):
+        if not await self.db.trainer_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Trainer Profile",
                 description="You haven't started your Pokemon journey yet! Use `!journey` to begin.",
@@ -674,7 +675,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             await ctx.send(embed=embed)
             return
             
-        primary_pokemon = self.db.get_primary_pokemon(ctx.author.id)
+        primary_pokemon = await self.db.get_primary_pokemon(ctx.author.id)
         if not primary_pokemon:
             embed = discord.Embed(
                 title="No Primary Pokemon",
@@ -743,7 +744,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
         """See a member's Pokedex"""
         target = member or ctx.author
         
-        if not self.db.trainer_exists(target.id):
+        if not await self.db.trainer_exists(target.id):
             if target.id == ctx.author.id:
                 embed = discord.Embed(
                     title="No Trainer Profile",
@@ -759,7 +760,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             await ctx.send(embed=embed)
             return
             
-        pokedex = self.db.get_pokedex(target.id)
+        pokedex = await self.db.get_pokedex(target.id)
         
         if not pokedex:
             embed = discord.Embed(
@@ -820,7 +821,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
     @commands.command(name="pokeshop", aliases=["pshop"])
     async def shop(self, ctx):
         """Buy pokemon balls to higher your chances of catching a pokemon"""
-        if not self.db.trainer_exists(ctx.author.id):
+        if not await self.db.trainer_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Trainer Profile",
                 description="You haven't started your Pokemon journey yet! Use `!journey` to begin.",
@@ -842,7 +843,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             return
             
         # Check if user has an economy account
-        if not economy_cog.db.account_exists(ctx.author.id):
+        if not await economy_cog.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Economy Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -851,7 +852,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             await ctx.send(embed=embed)
             return
             
-        balance = economy_cog.db.get_balance(ctx.author.id)
+        balance = await economy_cog.db.get_balance(ctx.author.id)
         
         embed = discord.Embed(
             title="Pokemon Shop",
@@ -876,7 +877,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
     @commands.command(name="pokebuy")
     async def buy(self, ctx, item: str, quantity: int = 1):
         """Buy items from the Pokeshop"""
-        if not self.db.trainer_exists(ctx.author.id):
+        if not await self.db.trainer_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Trainer Profile",
                 description="You haven't started your Pokemon journey yet! Use `!journey` to begin.",
@@ -917,7 +918,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             return
             
         # Check if user has an economy account
-        if not economy_cog.db.account_exists(ctx.author.id):
+        if not await economy_cog.db.account_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Economy Account",
                 description="You don't have an economy account! Use `!open` to create one.",
@@ -931,7 +932,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
         total_cost = item_data['price'] * quantity
         
         # Check if user has enough money
-        balance = economy_cog.db.get_balance(ctx.author.id)
+        balance = await economy_cog.db.get_balance(ctx.author.id)
         
         if balance['wallet'] < total_cost:
             embed = discord.Embed(
@@ -944,7 +945,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             
         # Process the purchase
         # 1. Remove the money
-        success = economy_cog.db.remove_from_wallet(ctx.author.id, total_cost)
+        success = await economy_cog.db.remove_from_wallet(ctx.author.id, total_cost)
         
         if not success:
             embed = discord.Embed(
@@ -956,7 +957,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             return
             
         # 2. Add the items to inventory
-        self.db.add_to_inventory(ctx.author.id, item.lower(), quantity)
+        await self.db.add_to_inventory(ctx.author.id, item.lower(), quantity)
         
         # 3. Send confirmation
         embed = discord.Embed(
@@ -965,10 +966,10 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             color=discord.Color.green()
         )
         
-        new_balance = economy_cog.db.get_balance(ctx.author.id)
+        new_balance = await economy_cog.db.get_balance(ctx.author.id)
         embed.add_field(name="Remaining Balance", value=f"{new_balance['wallet']} bucks in wallet", inline=False)
         
-        inventory = self.db.get_inventory(ctx.author.id)
+        inventory = await self.db.get_inventory(ctx.author.id)
         embed.add_field(name=f"You now have", value=f"{inventory[item.lower()]}x {item_data['emoji']} {item_data['name']}", inline=False)
         
         await ctx.send(embed=embed)
@@ -978,7 +979,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
         """View your pokemon inventory"""
         target = member or ctx.author
         
-        if not self.db.trainer_exists(target.id):
+        if not await self.db.trainer_exists(target.id):
             if target.id == ctx.author.id:
                 embed = discord.Embed(
                     title="No Trainer Profile",
@@ -994,7 +995,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             await ctx.send(embed=embed)
             return
             
-        inventory = self.db.get_inventory(target.id)
+        inventory = await self.db.get_inventory(target.id)
         
         embed = discord.Embed(
             title=f"{target.name}'s Inventory",
@@ -1062,7 +1063,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
     @commands.command(name="party")
     async def party(self, ctx):
         """View your primary Pokemon for battles"""
-        if not self.db.trainer_exists(ctx.author.id):
+        if not await self.db.trainer_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Trainer Profile",
                 description="You haven't started your Pokemon journey yet! Use `!journey` to begin.",
@@ -1071,7 +1072,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             await ctx.send(embed=embed)
             return
             
-        party = self.db.get_party(ctx.author.id)
+        party = await self.db.get_party(ctx.author.id)
         
         if not party:
             embed = discord.Embed(
@@ -1088,7 +1089,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             color=discord.Color.blue()
         )
         
-        primary_pokemon = self.db.get_primary_pokemon(ctx.author.id)
+        primary_pokemon = await self.db.get_primary_pokemon(ctx.author.id)
         
         for i, pokemon in enumerate(party):
             is_primary = primary_pokemon and pokemon['id'] == primary_pokemon['id']
@@ -1125,7 +1126,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
     @commands.command(name="pc")
     async def pc(self, ctx, page: int = 1):
         """View all Pokemon in your PC storage (collection)"""
-        if not self.db.trainer_exists(ctx.author.id):
+        if not await self.db.trainer_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Trainer Profile",
                 description="You haven't started your Pokemon journey yet! Use `!journey` to begin.",
@@ -1134,7 +1135,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             await ctx.send(embed=embed)
             return
             
-        trainer = self.db._get_trainer_data(ctx.author.id)
+        trainer = await self.db._get_trainer_data(ctx.author.id)
         
         if not trainer or not trainer['pokemon']:
             embed = discord.Embed(
@@ -1231,9 +1232,9 @@ class PokemonCog(commands.Cog, name="Pokemon"):
         )
         
         # Fetch different leaderboards
-        pokedex_leaderboard = self.db.get_leaderboard('pokedex', amount)
-        level_leaderboard = self.db.get_leaderboard('level', amount)
-        battles_leaderboard = self.db.get_leaderboard('battles', amount)
+        pokedex_leaderboard = await self.db.get_leaderboard('pokedex', amount)
+        level_leaderboard = await self.db.get_leaderboard('level', amount)
+        battles_leaderboard = await self.db.get_leaderboard('battles', amount)
         
         # Format the pokedex leaderboard
         if pokedex_leaderboard:
@@ -1273,7 +1274,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
     @commands.command(name="moves")
     async def moves(self, ctx):
         """Check new moves and reassign moves"""
-        if not self.db.trainer_exists(ctx.author.id):
+        if not await self.db.trainer_exists(ctx.author.id):
             embed = discord.Embed(
                 title="No Trainer Profile",
                 description="You haven't started your Pokemon journey yet! Use `!journey` to begin.",
@@ -1282,7 +1283,7 @@ class PokemonCog(commands.Cog, name="Pokemon"):
             await ctx.send(embed=embed)
             return
             
-        primary_pokemon = self.db.get_primary_pokemon(ctx.author.id)
+        primary_pokemon = await self.db.get_primary_pokemon(ctx.author.id)
         if not primary_pokemon:
             embed = discord.Embed(
                 title="No Primary Pokemon",
@@ -1321,6 +1322,26 @@ class PokemonCog(commands.Cog, name="Pokemon"):
         )
         
         await ctx.send(embed=embed)
+    
+    @commands.command(name="pokeprefetch")
+    @commands.is_owner()
+    async def pokeprefetch(self, ctx):
+        """Download all Gen 1-3 Pokemon data into the local cache"""
+        if self.db.species_cache.offline:
+            await ctx.send("The Pokemon cache is in offline mode, so it cannot download data.")
+            return
+        
+        message = await ctx.send("Prefetching Pokemon data from PokeAPI...")
+        
+        async def progress(done, total):
+            await message.edit(content=f"Prefetching Pokemon data from PokeAPI... {done}/{total}")
+        
+        failed = await self.db.prefetch_species(progress=progress)
+        cached = self.db.species_cache.cached_count()
+        if failed:
+            await message.edit(content=f"Prefetch finished with {failed} failures. {cached} Pokemon cached; run it again to retry.")
+        else:
+            await message.edit(content=f"Prefetch complete. {cached} Pokemon cached locally.")
 
 async def setup(bot):
     await bot.add_cog(PokemonCog(bot)) 
\ No newline at end of file
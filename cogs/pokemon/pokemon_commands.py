@@ -110,6 +110,14 @@ POKEMON_COMMANDS = {
         "arguments": ["none"],
         "permissions": "None",
         "category": "pokemon"
+    },
+    "pokeprefetch": {
+        "description": "Download all Gen 1-3 Pokemon data into the local cache",
+        "usage": "!pokeprefetch",
+        "examples": ["!pokeprefetch"],
+        "arguments": ["none"],
+        "permissions": "Bot Owner",
+        "category": "pokemon"
     }
 }
 
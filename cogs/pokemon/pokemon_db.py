@@ -4,92 +4,229 @@ import random
 import logging
 from datetime import datetime, timedelta
 import asyncio
-import aiohttp
-import sqlite3
+
+from core.database import get_pool, close_pool
+from .pokeapi_cache import PokeAPICache
 
 logger = logging.getLogger('bot')
 
+# PRAGMA user_version once party/pokedex/inventory/moves live in child tables
+RELATIONAL_SCHEMA_VERSION = 2
+
+# Maximum number of Pokemon in a trainer's party
+PARTY_SIZE = 6
+
 class PokemonDB:
     """Handles database operations for the Pokemon system"""
     
-    def __init__(self):
+    def __init__(self, offline=False):
         self.data_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
         self.db_path = os.path.join(self.data_folder, 'pokemon.db')
-        self._initialize_db()
+        self.pool = get_pool(self.db_path)
+        self.species_cache = PokeAPICache(self.pool, offline=offline)
         self.pokemon_api_url = "https://pokeapi.co/api/v2"
         self.pokemon_types = [
             "normal", "fire", "water", "electric", "grass", "ice", "fighting", 
             "poison", "ground", "flying", "psychic", "bug", "rock", "ghost", 
             "dragon", "dark", "steel", "fairy"
         ]
+    
+    async def close(self):
+        """Close the pooled connections for this database"""
+        await close_pool(self.db_path)
         
-    def _initialize_db(self):
+    async def initialize(self):
         """Initialize the Pokemon database"""
         if not os.path.exists(self.data_folder):
             os.makedirs(self.data_folder)
             
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        async with self.pool.write() as db:
+            # Create trainer table
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS trainers (
+                    user_id TEXT PRIMARY KEY,
+                    username TEXT,
+                    level INTEGER DEFAULT 1,
+                    xp INTEGER DEFAULT 0,
+                    xp_to_level INTEGER DEFAULT 100,
+                    primary_pokemon TEXT,
+                    party TEXT, -- legacy JSON, superseded by trainer_party
+                    pokedex TEXT, -- legacy JSON, superseded by trainer_pokedex
+                    inventory TEXT, -- legacy JSON, superseded by trainer_inventory
+                    last_catch TIMESTAMP,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Create Pokemon table
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS pokemon (
+                    id TEXT PRIMARY KEY,
+                    trainer_id TEXT,
+                    pokemon_id INTEGER,
+                    level INTEGER DEFAULT 5,
+                    xp INTEGER DEFAULT 0,
+                    xp_to_level INTEGER DEFAULT 100,
+                    display_name TEXT,
+                    nickname TEXT,
+                    types TEXT, -- JSON array
+                    stats TEXT, -- JSON object
+                    moves TEXT, -- legacy JSON, superseded by pokemon_moves
+                    current_hp INTEGER,
+                    sprite_url TEXT,
+                    caught_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (trainer_id) REFERENCES trainers(user_id)
+                )
+            ''')
+            
+            # Older databases were created without the last_catch column
+            async with db.execute("PRAGMA table_info(trainers)") as cursor:
+                columns = {row['name'] for row in await cursor.fetchall()}
+            if 'last_catch' not in columns:
+                await db.execute("ALTER TABLE trainers ADD COLUMN last_catch TIMESTAMP")
+            
+            # Child tables for what used to be JSON-in-TEXT columns
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS trainer_party (
+                    user_id TEXT,
+                    slot INTEGER,
+                    pokemon_instance_id TEXT,
+                    PRIMARY KEY (user_id, slot)
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS trainer_pokedex (
+                    user_id TEXT,
+                    pokemon_id INTEGER,
+                    PRIMARY KEY (user_id, pokemon_id)
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS trainer_inventory (
+                    user_id TEXT,
+                    item TEXT,
+                    quantity INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, item)
+                )
+            ''')
+            
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS pokemon_moves (
+                    pokemon_instance_id TEXT,
+                    slot INTEGER,
+                    name TEXT,
+                    url TEXT,
+                    PRIMARY KEY (pokemon_instance_id, slot)
+                )
+            ''')
+            
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_pokemon_trainer ON pokemon (trainer_id)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_trainers_level ON trainers (level DESC)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_trainer_pokedex_species ON trainer_pokedex (pokemon_id)")
+            
+            await self._migrate_json_columns(db)
+            
+            await db.commit()
         
-        # Create trainer table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trainers (
-                user_id TEXT PRIMARY KEY,
-                username TEXT,
-                level INTEGER DEFAULT 1,
-                xp INTEGER DEFAULT 0,
-                xp_to_level INTEGER DEFAULT 100,
-                primary_pokemon TEXT,
-                party TEXT, -- JSON array of Pokemon IDs
-                pokedex TEXT, -- JSON array of caught Pokemon IDs
-                inventory TEXT, -- JSON object with inventory items
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        await self.species_cache.initialize()
+    
+    async def _migrate_json_columns(self, db):
+        """One-time copy of the legacy JSON columns into the child tables"""
+        async with db.execute("PRAGMA user_version") as cursor:
+            version = (await cursor.fetchone())[0]
+        if version >= RELATIONAL_SCHEMA_VERSION:
+            return
+        
+        migrated_trainers = 0
+        async with db.execute("SELECT user_id, party, pokedex, inventory FROM trainers") as cursor:
+            trainers = await cursor.fetchall()
+        
+        for trainer in trainers:
+            user_id = trainer['user_id']
+            party = json.loads(trainer['party'] or '[]')
+            pokedex = json.loads(trainer['pokedex'] or '[]')
+            inventory = json.loads(trainer['inventory'] or '{}')
+            
+            await db.executemany(
+                "INSERT OR IGNORE INTO trainer_party (user_id, slot, pokemon_instance_id) VALUES (?, ?, ?)",
+                [(user_id, slot, instance_id) for slot, instance_id in enumerate(party[:PARTY_SIZE])]
+            )
+            await db.executemany(
+                "INSERT OR IGNORE INTO trainer_pokedex (user_id, pokemon_id) VALUES (?, ?)",
+                [(user_id, int(pokemon_id)) for pokemon_id in pokedex]
             )
-        ''')
+            await db.executemany(
+                "INSERT OR IGNORE INTO trainer_inventory (user_id, item, quantity) VALUES (?, ?, ?)",
+                [(user_id, item, quantity) for item, quantity in inventory.items()]
+            )
+            migrated_trainers += 1
+        
+        migrated_pokemon = 0
+        async with db.execute("SELECT id, moves FROM pokemon") as cursor:
+            pokemon_rows = await cursor.fetchall()
         
-        # Create Pokemon table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS pokemon (
-                id TEXT PRIMARY KEY,
-                trainer_id TEXT,
-                pokemon_id INTEGER,
-                level INTEGER DEFAULT 5,
-                xp INTEGER DEFAULT 0,
-                xp_to_level INTEGER DEFAULT 100,
-                display_name TEXT,
-                nickname TEXT,
-                types TEXT, -- JSON array
-                stats TEXT, -- JSON object
-                moves TEXT, -- JSON array
-                current_hp INTEGER,
-                sprite_url TEXT,
-                caught_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (trainer_id) REFERENCES trainers(user_id)
+        for row in pokemon_rows:
+            moves = json.loads(row['moves'] or '[]')
+            await db.executemany(
+                "INSERT OR IGNORE INTO pokemon_moves (pokemon_instance_id, slot, name, url) VALUES (?, ?, ?, ?)",
+                [(row['id'], slot, move['name'], move.get('url')) for slot, move in enumerate(moves)]
             )
-        ''')
+            migrated_pokemon += 1
         
-        conn.commit()
-        conn.close()
+        await db.execute(f"PRAGMA user_version = {RELATIONAL_SCHEMA_VERSION}")
+        if migrated_trainers or migrated_pokemon:
+            logger.info(
+                f"Migrated {migrated_trainers} trainers and {migrated_pokemon} Pokemon "
+                f"from JSON columns to relational tables"
+            )
     
-    def trainer_exists(self, user_id):
-        """Check if a trainer exists"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    async def _load_pokemon(self, db, where, params):
+        """Fetch pokemon rows matching a WHERE clause, with their moves attached"""
+        async with db.execute(f"SELECT * FROM pokemon WHERE {where}", params) as cursor:
+            rows = await cursor.fetchall()
+        if not rows:
+            return []
         
-        cursor.execute("SELECT 1 FROM trainers WHERE user_id = ?", (str(user_id),))
-        result = cursor.fetchone()
+        pokemon_list = []
+        by_id = {}
+        for row in rows:
+            pokemon = dict(row)
+            pokemon['types'] = json.loads(pokemon['types'])
+            pokemon['stats'] = json.loads(pokemon['stats'])
+            pokemon['moves'] = []
+            pokemon_list.append(pokemon)
+            by_id[pokemon['id']] = pokemon
+        
+        placeholders = ", ".join(["?"] * len(by_id))
+        async with db.execute(
+            f"""
+            SELECT pokemon_instance_id, name, url FROM pokemon_moves
+            WHERE pokemon_instance_id IN ({placeholders})
+            ORDER BY pokemon_instance_id, slot
+            """,
+            list(by_id)
+        ) as cursor:
+            for move in await cursor.fetchall():
+                by_id[move['pokemon_instance_id']]['moves'].append({'name': move['name'], 'url': move['url']})
         
-        conn.close()
+        return pokemon_list
+    
+    async def _load_one_pokemon(self, db, instance_id):
+        """Fetch a single pokemon by instance id, or None"""
+        pokemon = await self._load_pokemon(db, "id = ?", (instance_id,))
+        return pokemon[0] if pokemon else None
+    
+    async def trainer_exists(self, user_id):
+        """Check if a trainer exists"""
+        async with self.pool.read() as db:
+            async with db.execute("SELECT 1 FROM trainers WHERE user_id = ?", (str(user_id),)) as cursor:
+                result = await cursor.fetchone()
         return result is not None
     
-    def create_trainer(self, user_id, username):
+    async def create_trainer(self, user_id, username):
         """Create a new trainer"""
-        if self.trainer_exists(user_id):
-            return False
-            
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Default inventory
         inventory = {
             'pokeballs': 5,
@@ -101,118 +238,110 @@ class PokemonDB:
             'revives': 1
         }
         
-        cursor.execute(
-            "INSERT INTO trainers (user_id, username, party, pokedex, inventory) VALUES (?, ?, ?, ?, ?)",
-            (str(user_id), username, '[]', '[]', json.dumps(inventory))
-        )
-        
-        conn.commit()
-        conn.close()
-        return True
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "INSERT OR IGNORE INTO trainers (user_id, username) VALUES (?, ?)",
+                (str(user_id), username)
+            )
+            if cursor.rowcount == 0:
+                return False
+            
+            await db.executemany(
+                "INSERT INTO trainer_inventory (user_id, item, quantity) VALUES (?, ?, ?)",
+                [(str(user_id), item, quantity) for item, quantity in inventory.items()]
+            )
+            await db.commit()
+            return True
     
-    def _get_trainer_data(self, user_id):
+    async def _get_trainer_data(self, user_id):
         """Get a trainer's data"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM trainers WHERE user_id = ?", (str(user_id),))
-        result = cursor.fetchone()
-        
-        if not result:
-            conn.close()
-            return None
+        async with self.pool.read() as db:
+            async with db.execute("SELECT * FROM trainers WHERE user_id = ?", (str(user_id),)) as cursor:
+                result = await cursor.fetchone()
             
-        trainer_data = dict(result)
-        
-        # Parse JSON fields
-        trainer_data['party'] = json.loads(trainer_data['party'])
-        trainer_data['pokedex'] = json.loads(trainer_data['pokedex'])
-        trainer_data['inventory'] = json.loads(trainer_data['inventory'])
-        
-        # Get trainer's Pokemon
-        cursor.execute("SELECT id FROM pokemon WHERE trainer_id = ?", (str(user_id),))
-        pokemon_ids = [row[0] for row in cursor.fetchall()]
-        trainer_data['pokemon'] = []
-        
-        for pokemon_id in pokemon_ids:
-            cursor.execute("SELECT * FROM pokemon WHERE id = ?", (pokemon_id,))
-            pokemon = dict(cursor.fetchone())
+            if not result:
+                return None
+                
+            trainer_data = dict(result)
             
-            # Parse JSON fields
-            pokemon['types'] = json.loads(pokemon['types'])
-            pokemon['stats'] = json.loads(pokemon['stats'])
-            pokemon['moves'] = json.loads(pokemon['moves'])
+            trainer_data['party'] = await self._get_party_ids(db, user_id)
+            trainer_data['pokedex'] = await self._get_pokedex_ids(db, user_id)
+            trainer_data['inventory'] = await self._get_inventory(db, user_id)
             
-            trainer_data['pokemon'].append(pokemon)
+            # Get trainer's Pokemon
+            trainer_data['pokemon'] = await self._load_pokemon(db, "trainer_id = ?", (str(user_id),))
         
-        conn.close()
         return trainer_data
     
-    def get_inventory(self, user_id):
+    async def _get_party_ids(self, db, user_id):
+        async with db.execute(
+            "SELECT pokemon_instance_id FROM trainer_party WHERE user_id = ? ORDER BY slot",
+            (str(user_id),)
+        ) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+    
+    async def _get_pokedex_ids(self, db, user_id):
+        # rowid order is the order species were first caught
+        async with db.execute(
+            "SELECT pokemon_id FROM trainer_pokedex WHERE user_id = ? ORDER BY rowid",
+            (str(user_id),)
+        ) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+    
+    async def _get_inventory(self, db, user_id):
+        async with db.execute(
+            "SELECT item, quantity FROM trainer_inventory WHERE user_id = ?",
+            (str(user_id),)
+        ) as cursor:
+            return {row['item']: row['quantity'] for row in await cursor.fetchall()}
+    
+    async def get_inventory(self, user_id):
         """Get a trainer's inventory"""
-        trainer_data = self._get_trainer_data(user_id)
-        if not trainer_data:
+        if not await self.trainer_exists(user_id):
             return None
         
-        return trainer_data['inventory']
+        async with self.pool.read() as db:
+            return await self._get_inventory(db, user_id)
     
-    def add_to_inventory(self, user_id, item, quantity):
+    async def add_to_inventory(self, user_id, item, quantity):
         """Add items to a trainer's inventory"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT inventory FROM trainers WHERE user_id = ?", (str(user_id),))
-        result = cursor.fetchone()
-        
-        if not result:
-            conn.close()
-            return False
+        async with self.pool.write() as db:
+            async with db.execute("SELECT 1 FROM trainers WHERE user_id = ?", (str(user_id),)) as cursor:
+                if not await cursor.fetchone():
+                    return False
             
-        inventory = json.loads(result[0])
-        
-        if item in inventory:
-            inventory[item] += quantity
-        else:
-            inventory[item] = quantity
+            await db.execute(
+                """
+                INSERT INTO trainer_inventory (user_id, item, quantity) VALUES (?, ?, ?)
+                ON CONFLICT (user_id, item) DO UPDATE SET quantity = quantity + excluded.quantity
+                """,
+                (str(user_id), item, quantity)
+            )
             
-        cursor.execute(
-            "UPDATE trainers SET inventory = ? WHERE user_id = ?",
-            (json.dumps(inventory), str(user_id))
-        )
-        
-        conn.commit()
-        conn.close()
-        return True
+            await db.commit()
+            return True
     
-    def remove_from_inventory(self, user_id, item, quantity):
+    async def remove_from_inventory(self, user_id, item, quantity):
         """Remove items from a trainer's inventory"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT inventory FROM trainers WHERE user_id = ?", (str(user_id),))
-        result = cursor.fetchone()
-        
-        if not result:
-            conn.close()
-            return False
-            
-        inventory = json.loads(result[0])
-        
-        if item in inventory and inventory[item] >= quantity:
-            inventory[item] -= quantity
-            
-            cursor.execute(
-                "UPDATE trainers SET inventory = ? WHERE user_id = ?",
-                (json.dumps(inventory), str(user_id))
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                """
+                UPDATE trainer_inventory SET quantity = quantity - ?
+                WHERE user_id = ? AND item = ? AND quantity >= ?
+                """,
+                (quantity, str(user_id), item, quantity)
             )
-            
-            conn.commit()
-            conn.close()
-            return True
-        
-        conn.close()
-        return False
+            await db.commit()
+            return cursor.rowcount > 0
+    
+    async def update_last_catch(self, user_id):
+        """Record the time of a trainer's latest catch attempt"""
+        async with self.pool.write() as db:
+            await db.execute(
+                "UPDATE trainers SET last_catch = ? WHERE user_id = ?",
+                (datetime.now().isoformat(), str(user_id))
+            )
+            await db.commit()
     
     def get_random_wild_pokemon(self):
         """Get a random Pokemon ID for encounters"""
@@ -220,28 +349,16 @@ class PokemonDB:
         return random.randint(1, 386)
     
     async def fetch_pokemon_data(self, pokemon_id):
-        """Fetch Pokemon data from the PokeAPI"""
-        if isinstance(pokemon_id, str):
-            # If it's a name, convert to lowercase
-            pokemon_id = pokemon_id.lower()
-            
-        url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}"
-        
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        logger.error(f"Error fetching Pokemon data: {response.status}")
-                        return None
-            except Exception as e:
-                logger.error(f"Error fetching Pokemon data: {e}")
-                return None
+        """Get Pokemon data by id or name, from the local cache when possible"""
+        return await self.species_cache.get_pokemon(pokemon_id)
+    
+    async def prefetch_species(self, progress=None):
+        """Download every Gen 1-3 species and evolution chain into the cache"""
+        return await self.species_cache.prefetch(progress=progress)
     
     async def add_pokemon(self, user_id, pokemon_id):
         """Add a caught Pokemon to a trainer's collection"""
-        if not self.trainer_exists(user_id):
+        if not await self.trainer_exists(user_id):
             return None
             
         # Fetch Pokemon data
@@ -277,164 +394,95 @@ class PokemonDB:
             moves = [{'name': move['name'], 'url': move['url']} for move in selected_moves]
         
         # Create Pokemon entry
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            """
-            INSERT INTO pokemon 
-            (id, trainer_id, pokemon_id, level, xp, xp_to_level, display_name, 
-            types, stats, moves, current_hp, sprite_url) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                pokemon_instance_id,
-                str(user_id),
-                pokemon_data['id'],
-                level,
-                0,
-                100,  # Simple XP to level formula
-                pokemon_data['name'].capitalize(),
-                json.dumps(types),
-                json.dumps(stats),
-                json.dumps(moves),
-                stats['hp'],  # Full HP when caught
-                pokemon_data['sprites']['front_default']
+        async with self.pool.write() as db:
+            await db.execute(
+                """
+                INSERT INTO pokemon 
+                (id, trainer_id, pokemon_id, level, xp, xp_to_level, display_name, 
+                types, stats, moves, current_hp, sprite_url) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    pokemon_instance_id,
+                    str(user_id),
+                    pokemon_data['id'],
+                    level,
+                    0,
+                    100,  # Simple XP to level formula
+                    pokemon_data['name'].capitalize(),
+                    json.dumps(types),
+                    json.dumps(stats),
+                    None,  # Moves are stored in pokemon_moves
+                    stats['hp'],  # Full HP when caught
+                    pokemon_data['sprites']['front_default']
+                )
             )
-        )
-        
-        # Add to trainer's party if there's room (max 6)
-        cursor.execute("SELECT party, pokedex FROM trainers WHERE user_id = ?", (str(user_id),))
-        result = cursor.fetchone()
-        
-        if result:
-            party = json.loads(result[0])
-            pokedex = json.loads(result[1])
             
-            # Add to party if there's room
-            if len(party) < 6:
-                party.append(pokemon_instance_id)
-                
-            # Add to Pokedex if this species is new
-            if pokemon_data['id'] not in pokedex:
-                pokedex.append(pokemon_data['id'])
-                
-            # If this is the trainer's first Pokemon, make it primary
-            cursor.execute("SELECT primary_pokemon FROM trainers WHERE user_id = ?", (str(user_id),))
-            primary_result = cursor.fetchone()
+            await db.executemany(
+                "INSERT INTO pokemon_moves (pokemon_instance_id, slot, name, url) VALUES (?, ?, ?, ?)",
+                [(pokemon_instance_id, slot, move['name'], move['url']) for slot, move in enumerate(moves)]
+            )
             
-            if primary_result and (primary_result[0] is None or primary_result[0] == ''):
-                cursor.execute(
-                    "UPDATE trainers SET primary_pokemon = ? WHERE user_id = ?",
-                    (pokemon_instance_id, str(user_id))
+            # Add to trainer's party if there's room
+            party_ids = await self._get_party_ids(db, user_id)
+            if len(party_ids) < PARTY_SIZE:
+                await db.execute(
+                    """
+                    INSERT INTO trainer_party (user_id, slot, pokemon_instance_id)
+                    SELECT ?, COALESCE(MAX(slot) + 1, 0), ? FROM trainer_party WHERE user_id = ?
+                    """,
+                    (str(user_id), pokemon_instance_id, str(user_id))
                 )
             
-            # Update trainer
-            cursor.execute(
-                "UPDATE trainers SET party = ?, pokedex = ? WHERE user_id = ?",
-                (json.dumps(party), json.dumps(pokedex), str(user_id))
+            # Add to Pokedex if this species is new
+            await db.execute(
+                "INSERT OR IGNORE INTO trainer_pokedex (user_id, pokemon_id) VALUES (?, ?)",
+                (str(user_id), pokemon_data['id'])
+            )
+            
+            # If this is the trainer's first Pokemon, make it primary
+            await db.execute(
+                """
+                UPDATE trainers SET primary_pokemon = ?
+                WHERE user_id = ? AND (primary_pokemon IS NULL OR primary_pokemon = '')
+                """,
+                (pokemon_instance_id, str(user_id))
             )
+                
+            await db.commit()
             
-        conn.commit()
-        
-        # Get the full Pokemon data to return
-        cursor.execute("SELECT * FROM pokemon WHERE id = ?", (pokemon_instance_id,))
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM pokemon WHERE id = ?", (pokemon_instance_id,))
-        pokemon = dict(cursor.fetchone())
-        
-        # Parse JSON fields
-        pokemon['types'] = json.loads(pokemon['types'])
-        pokemon['stats'] = json.loads(pokemon['stats'])
-        pokemon['moves'] = json.loads(pokemon['moves'])
-        
-        conn.close()
-        return pokemon
+            # Get the full Pokemon data to return
+            return await self._load_one_pokemon(db, pokemon_instance_id)
     
-    def get_primary_pokemon(self, user_id):
+    async def get_primary_pokemon(self, user_id):
         """Get a trainer's primary Pokemon"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT primary_pokemon FROM trainers WHERE user_id = ?", (str(user_id),))
-        result = cursor.fetchone()
-        
-        if not result or not result['primary_pokemon']:
-            conn.close()
-            return None
-            
-        primary_id = result['primary_pokemon']
-        
-        cursor.execute("SELECT * FROM pokemon WHERE id = ?", (primary_id,))
-        pokemon = cursor.fetchone()
-        
-        if not pokemon:
-            conn.close()
-            return None
-            
-        pokemon_data = dict(pokemon)
-        
-        # Parse JSON fields
-        pokemon_data['types'] = json.loads(pokemon_data['types'])
-        pokemon_data['stats'] = json.loads(pokemon_data['stats'])
-        pokemon_data['moves'] = json.loads(pokemon_data['moves'])
+        async with self.pool.read() as db:
+            pokemon = await self._load_pokemon(
+                db,
+                "id = (SELECT primary_pokemon FROM trainers WHERE user_id = ?)",
+                (str(user_id),)
+            )
         
-        conn.close()
-        return pokemon_data
+        return pokemon[0] if pokemon else None
     
-    def get_party(self, user_id):
+    async def get_party(self, user_id):
         """Get a trainer's party Pokemon"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT party FROM trainers WHERE user_id = ?", (str(user_id),))
-        result = cursor.fetchone()
-        
-        if not result:
-            conn.close()
-            return []
-            
-        party_ids = json.loads(result['party'])
-        if not party_ids:
-            conn.close()
-            return []
+        async with self.pool.read() as db:
+            party_ids = await self._get_party_ids(db, user_id)
+            if not party_ids:
+                return []
             
-        party = []
-        for pokemon_id in party_ids:
-            cursor.execute("SELECT * FROM pokemon WHERE id = ?", (pokemon_id,))
-            pokemon = cursor.fetchone()
-            
-            if pokemon:
-                pokemon_data = dict(pokemon)
-                
-                # Parse JSON fields
-                pokemon_data['types'] = json.loads(pokemon_data['types'])
-                pokemon_data['stats'] = json.loads(pokemon_data['stats'])
-                pokemon_data['moves'] = json.loads(pokemon_data['moves'])
-                
-                party.append(pokemon_data)
+            placeholders = ", ".join(["?"] * len(party_ids))
+            pokemon = await self._load_pokemon(db, f"id IN ({placeholders})", party_ids)
         
-        conn.close()
-        return party
+        # Keep party order
+        by_id = {p['id']: p for p in pokemon}
+        return [by_id[pokemon_id] for pokemon_id in party_ids if pokemon_id in by_id]
     
-    def get_pokedex(self, user_id):
+    async def get_pokedex(self, user_id):
         """Get a trainer's Pokedex"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT pokedex FROM trainers WHERE user_id = ?", (str(user_id),))
-        result = cursor.fetchone()
-        
-        conn.close()
-        
-        if not result:
-            return []
-            
-        return json.loads(result[0])
+        async with self.pool.read() as db:
+            return await self._get_pokedex_ids(db, user_id)
     
     def calculate_catch_chance(self, user_id, ball_type):
         """Calculate the catch chance based on the ball type"""
@@ -449,12 +497,8 @@ class PokemonDB:
     
     async def handle_battle(self, user_id):
         """Handle a Pokemon battle"""
-        trainer_data = self._get_trainer_data(user_id)
-        if not trainer_data or not trainer_data['primary_pokemon']:
-            return {'winner': False}
-            
         # Get primary Pokemon
-        primary_pokemon = self.get_primary_pokemon(user_id)
+        primary_pokemon = await self.get_primary_pokemon(user_id)
         if not primary_pokemon:
             return {'winner': False}
             
@@ -469,36 +513,28 @@ class PokemonDB:
         pokemon_xp = random.randint(10, 20) * (2 if winner else 1)
         trainer_xp = random.randint(5, 10) * (2 if winner else 1)
         
-        # Update Pokemon XP
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT xp, level, xp_to_level FROM pokemon WHERE id = ?", (primary_pokemon['id'],))
-        result = cursor.fetchone()
-        
-        if result:
-            current_xp, current_level, xp_to_level = result
-            new_xp = current_xp + pokemon_xp
+        async with self.pool.write() as db:
+            # Update Pokemon XP
+            async with db.execute(
+                "SELECT xp, level, xp_to_level, stats FROM pokemon WHERE id = ?",
+                (primary_pokemon['id'],)
+            ) as cursor:
+                result = await cursor.fetchone()
             
-            # Check if Pokemon leveled up
             pokemon_leveled = None
-            if new_xp >= xp_to_level:
-                new_level = current_level + 1
-                new_xp_to_level = int(xp_to_level * 1.5)  # Next level requires more XP
+            if result:
+                current_xp, current_level, xp_to_level, stats_json = result
+                new_xp = current_xp + pokemon_xp
                 
-                cursor.execute(
-                    "UPDATE pokemon SET xp = ?, level = ?, xp_to_level = ? WHERE id = ?",
-                    (new_xp - xp_to_level, new_level, new_xp_to_level, primary_pokemon['id'])
-                )
-                
-                pokemon_leveled = new_level
-                
-                # Update stats based on new level
-                cursor.execute("SELECT stats FROM pokemon WHERE id = ?", (primary_pokemon['id'],))
-                stats_result = cursor.fetchone()
-                
-                if stats_result:
-                    stats = json.loads(stats_result[0])
+                # Check if Pokemon leveled up
+                if new_xp >= xp_to_level:
+                    new_level = current_level + 1
+                    new_xp_to_level = int(xp_to_level * 1.5)  # Next level requires more XP
+                    
+                    pokemon_leveled = new_level
+                    
+                    # Update stats based on new level
+                    stats = json.loads(stats_json)
                     
                     # Increase stats with level
                     for stat_name in stats:
@@ -506,44 +542,50 @@ class PokemonDB:
                         increase = random.uniform(0.05, 0.1)
                         stats[stat_name] = int(stats[stat_name] * (1 + increase))
                     
-                    cursor.execute(
-                        "UPDATE pokemon SET stats = ?, current_hp = ? WHERE id = ?",
-                        (json.dumps(stats), stats['hp'], primary_pokemon['id'])
+                    await db.execute(
+                        """
+                        UPDATE pokemon SET xp = ?, level = ?, xp_to_level = ?, stats = ?, current_hp = ?
+                        WHERE id = ?
+                        """,
+                        (new_xp - xp_to_level, new_level, new_xp_to_level,
+                         json.dumps(stats), stats['hp'], primary_pokemon['id'])
                     )
-            else:
-                cursor.execute(
-                    "UPDATE pokemon SET xp = ? WHERE id = ?",
-                    (new_xp, primary_pokemon['id'])
-                )
-        
-        # Update trainer XP
-        cursor.execute("SELECT xp, level, xp_to_level FROM trainers WHERE user_id = ?", (str(user_id),))
-        result = cursor.fetchone()
-        
-        trainer_leveled = None
-        if result:
-            current_xp, current_level, xp_to_level = result
-            new_xp = current_xp + trainer_xp
-            
-            # Check if trainer leveled up
-            if new_xp >= xp_to_level:
-                new_level = current_level + 1
-                new_xp_to_level = int(xp_to_level * 1.2)  # Next level requires more XP
-                
-                cursor.execute(
-                    "UPDATE trainers SET xp = ?, level = ?, xp_to_level = ? WHERE user_id = ?",
-                    (new_xp - xp_to_level, new_level, new_xp_to_level, str(user_id))
-                )
+                else:
+                    await db.execute(
+                        "UPDATE pokemon SET xp = ? WHERE id = ?",
+                        (new_xp, primary_pokemon['id'])
+                    )
+            
+            # Update trainer XP
+            async with db.execute(
+                "SELECT xp, level, xp_to_level FROM trainers WHERE user_id = ?",
+                (str(user_id),)
+            ) as cursor:
+                result = await cursor.fetchone()
+            
+            trainer_leveled = None
+            if result:
+                current_xp, current_level, xp_to_level = result
+                new_xp = current_xp + trainer_xp
                 
-                trainer_leveled = new_level
-            else:
-                cursor.execute(
-                    "UPDATE trainers SET xp = ? WHERE user_id = ?",
-                    (new_xp, str(user_id))
-                )
-        
-        conn.commit()
-        conn.close()
+                # Check if trainer leveled up
+                if new_xp >= xp_to_level:
+                    new_level = current_level + 1
+                    new_xp_to_level = int(xp_to_level * 1.2)  # Next level requires more XP
+                    
+                    await db.execute(
+                        "UPDATE trainers SET xp = ?, level = ?, xp_to_level = ? WHERE user_id = ?",
+                        (new_xp - xp_to_level, new_level, new_xp_to_level, str(user_id))
+                    )
+                    
+                    trainer_leveled = new_level
+                else:
+                    await db.execute(
+                        "UPDATE trainers SET xp = ? WHERE user_id = ?",
+                        (new_xp, str(user_id))
+                    )
+            
+            await db.commit()
         
         return {
             'winner': winner,
@@ -556,7 +598,7 @@ class PokemonDB:
     async def evolve_pokemon(self, user_id):
         """Evolve a Pokemon if it meets the criteria"""
         # This is a simplified implementation
-        primary_pokemon = self.get_primary_pokemon(user_id)
+        primary_pokemon = await self.get_primary_pokemon(user_id)
         if not primary_pokemon:
             return None
             
@@ -566,165 +608,131 @@ class PokemonDB:
             return None
             
         # Fetch the species data which has evolution chain URL
-        species_url = pokemon_data['species']['url']
+        species_data = await self.species_cache.get_species(pokemon_data['species']['url'])
+        if not species_data or not species_data['evolution_chain']:
+            return None
+            
+        # Fetch the evolution chain
+        evolution_data = await self.species_cache.get_evolution_chain(species_data['evolution_chain']['url'])
+        if not evolution_data:
+            return None
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(species_url) as response:
-                    if response.status != 200:
-                        return None
-                        
-                    species_data = await response.json()
-                    
-                    if 'evolution_chain' not in species_data:
-                        return None
-                        
-                    # Fetch the evolution chain
-                    evolution_url = species_data['evolution_chain']['url']
-                    
-                    async with session.get(evolution_url) as ev_response:
-                        if ev_response.status != 200:
-                            return None
-                            
-                        evolution_data = await ev_response.json()
-                        
-                        # Find current Pokemon in the chain
-                        chain = evolution_data['chain']
-                        current_species = pokemon_data['species']['name']
-                        evolution_target = None
-                        
-                        # Check if it's the base form
-                        if chain['species']['name'] == current_species:
-                            if chain['evolves_to']:
-                                evolution_target = chain['evolves_to'][0]['species']
-                        else:
-                            # Check first evolution
-                            for evolution in chain['evolves_to']:
-                                if evolution['species']['name'] == current_species:
-                                    if evolution['evolves_to']:
-                                        evolution_target = evolution['evolves_to'][0]['species']
-                                    break
-                                    
-                                # Check second evolution
-                                for second_evolution in evolution['evolves_to']:
-                                    if second_evolution['species']['name'] == current_species:
-                                        # Already at final evolution
-                                        return None
+        try:
+            # Find current Pokemon in the chain
+            chain = evolution_data['chain']
+            current_species = pokemon_data['species']['name']
+            evolution_target = None
+            
+            # Check if it's the base form
+            if chain['species']['name'] == current_species:
+                if chain['evolves_to']:
+                    evolution_target = chain['evolves_to'][0]['species']
+            else:
+                # Check first evolution
+                for evolution in chain['evolves_to']:
+                    if evolution['species']['name'] == current_species:
+                        if evolution['evolves_to']:
+                            evolution_target = evolution['evolves_to'][0]['species']
+                        break
                         
-                        if not evolution_target:
-                            return None
-                            
-                        # Check level requirement (simplified)
-                        if primary_pokemon['level'] < 20:  # Arbitrary level requirement
-                            return None
-                            
-                        # Fetch the evolution Pokemon data
-                        evolve_to_data = await self.fetch_pokemon_data(evolution_target['name'])
-                        if not evolve_to_data:
+                    # Check second evolution
+                    for second_evolution in evolution['evolves_to']:
+                        if second_evolution['species']['name'] == current_species:
+                            # Already at final evolution
                             return None
-                            
-                        # Update the Pokemon
-                        conn = sqlite3.connect(self.db_path)
-                        conn.row_factory = sqlite3.Row
-                        cursor = conn.cursor()
-                        
-                        # Extract types
-                        types = [t['type']['name'] for t in evolve_to_data['types']]
-                        
-                        # Extract stats and increase them for evolution
-                        new_stats = {}
-                        for stat in evolve_to_data['stats']:
-                            stat_name = stat['stat']['name']
-                            base_value = stat['base_stat']
-                            # Evolution bonus
-                            stat_value = int(base_value * (1 + (primary_pokemon['level'] * 0.05)))
-                            new_stats[stat_name] = stat_value
-                        
-                        # Update the Pokemon
-                        cursor.execute(
-                            """
-                            UPDATE pokemon 
-                            SET pokemon_id = ?, display_name = ?, types = ?, 
-                                stats = ?, current_hp = ?, sprite_url = ? 
-                            WHERE id = ?
-                            """,
-                            (
-                                evolve_to_data['id'],
-                                evolve_to_data['name'].capitalize(),
-                                json.dumps(types),
-                                json.dumps(new_stats),
-                                new_stats['hp'],
-                                evolve_to_data['sprites']['front_default'],
-                                primary_pokemon['id']
-                            )
-                        )
-                        
-                        conn.commit()
-                        
-                        # Get the updated Pokemon data
-                        cursor.execute("SELECT * FROM pokemon WHERE id = ?", (primary_pokemon['id'],))
-                        evolved_pokemon = dict(cursor.fetchone())
-                        
-                        # Parse JSON fields
-                        evolved_pokemon['types'] = json.loads(evolved_pokemon['types'])
-                        evolved_pokemon['stats'] = json.loads(evolved_pokemon['stats'])
-                        evolved_pokemon['moves'] = json.loads(evolved_pokemon['moves'])
-                        
-                        conn.close()
-                        return evolved_pokemon
-                        
-            except Exception as e:
-                logger.error(f"Error in evolve_pokemon: {e}")
+            
+            if not evolution_target:
+                return None
+                
+            # Check level requirement (simplified)
+            if primary_pokemon['level'] < 20:  # Arbitrary level requirement
+                return None
+                
+            # Fetch the evolution Pokemon data
+            evolve_to_data = await self.fetch_pokemon_data(evolution_target['name'])
+            if not evolve_to_data:
                 return None
+                
+            # Extract types
+            types = [t['type']['name'] for t in evolve_to_data['types']]
+            
+            # Extract stats and increase them for evolution
+            new_stats = {}
+            for stat in evolve_to_data['stats']:
+                stat_name = stat['stat']['name']
+                base_value = stat['base_stat']
+                # Evolution bonus
+                stat_value = int(base_value * (1 + (primary_pokemon['level'] * 0.05)))
+                new_stats[stat_name] = stat_value
+            
+            # Update the Pokemon
+            async with self.pool.write() as db:
+                await db.execute(
+                    """
+                    UPDATE pokemon 
+                    SET pokemon_id = ?, display_name = ?, types = ?, 
+                        stats = ?, current_hp = ?, sprite_url = ? 
+                    WHERE id = ?
+                    """,
+                    (
+                        evolve_to_data['id'],
+                        evolve_to_data['name'].capitalize(),
+                        json.dumps(types),
+                        json.dumps(new_stats),
+                        new_stats['hp'],
+                        evolve_to_data['sprites']['front_default'],
+                        primary_pokemon['id']
+                    )
+                )
+                
+                await db.commit()
+                
+                # Get the updated Pokemon data
+                return await self._load_one_pokemon(db, primary_pokemon['id'])
+                    
+        except Exception as e:
+            logger.error(f"Error in evolve_pokemon: {e}")
+            return None
     
-    def get_leaderboard(self, board_type, limit=10):
+    async def get_leaderboard(self, board_type, limit=10):
         """Get leaderboard data"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
         if board_type == 'pokedex':
             # Most Pokemon species caught
-            cursor.execute(
-                """
-                SELECT user_id, username, pokedex, LENGTH(pokedex) - LENGTH(REPLACE(pokedex, ',', '')) + 1 as value
-                FROM trainers
-                WHERE pokedex != '[]'
-                ORDER BY value DESC
+            query = """
+                SELECT trainers.user_id, trainers.username, dex.value
+                FROM (
+                    SELECT user_id, COUNT(*) as value
+                    FROM trainer_pokedex
+                    GROUP BY user_id
+                ) AS dex
+                JOIN trainers ON trainers.user_id = dex.user_id
+                ORDER BY dex.value DESC
                 LIMIT ?
-                """,
-                (limit,)
-            )
+            """
         elif board_type == 'level':
             # Highest trainer level
-            cursor.execute(
-                """
+            query = """
                 SELECT user_id, username, level as value
                 FROM trainers
                 ORDER BY value DESC
                 LIMIT ?
-                """,
-                (limit,)
-            )
-        elif board_type == 'battles':
-            # Most battles (not tracked in this simplified version)
-            return []
+            """
         else:
-            conn.close()
+            # Battles are not tracked in this simplified version
             return []
-            
-        results = cursor.fetchall()
-        leaderboard = []
         
-        for row in results:
-            leaderboard.append({
+        async with self.pool.read() as db:
+            async with db.execute(query, (limit,)) as cursor:
+                results = await cursor.fetchall()
+        
+        return [
+            {
                 'user_id': row['user_id'],
                 'username': row['username'],
                 'value': row['value']
-            })
-            
-        conn.close()
-        return leaderboard
+            }
+            for row in results
+        ]
 
 async def setup(bot):
     # This is a database module, no cog to add
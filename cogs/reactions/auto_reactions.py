@@ -4,9 +4,10 @@ import json
 import os
 import logging
 from datetime import datetime
-import re
 import asyncio
 
+from core.matching import TriggerMatcher
+
 logger = logging.getLogger('bot')
 
 class AutoReactions(commands.Cog):
@@ -18,6 +19,9 @@ class AutoReactions(commands.Cog):
         self.reaction_triggers = {}
         self.message_reactions = {}
         
+        # Compiled trigger matcher per guild, rebuilt after triggers.json changes
+        self._trigger_matchers = {}
+        
         # Create directory if it doesn't exist
         os.makedirs(self.config_path, exist_ok=True)
         
@@ -35,13 +39,14 @@ class AutoReactions(commands.Cog):
         except Exception as e:
             logger.error(f"Error loading reaction triggers: {str(e)}")
             self.reaction_triggers = {}
+        self._trigger_matchers.clear()
     
     def _save_reaction_triggers(self):
         """Save reaction trigger settings to file"""
+        self._trigger_matchers.clear()
         try:
             filepath = f"{self.config_path}/triggers.json"
-            with open(filepath, "w") as f:
-                json.dump(self.reaction_triggers, f, indent=4)
+            self.bot.json_store.save(filepath, self.reaction_triggers)
         except Exception as e:
             logger.error(f"Error saving reaction triggers: {str(e)}")
     
@@ -60,8 +65,7 @@ class AutoReactions(commands.Cog):
         """Save message reaction settings to file"""
         try:
             filepath = f"{self.config_path}/message_reactions.json"
-            with open(filepath, "w") as f:
-                json.dump(self.message_reactions, f, indent=4)
+            self.bot.json_store.save(filepath, self.message_reactions)
         except Exception as e:
             logger.error(f"Error saving message reactions: {str(e)}")
     
@@ -73,6 +77,15 @@ class AutoReactions(commands.Cog):
             self._save_reaction_triggers()
         return self.reaction_triggers[guild_id]
     
+    def _get_trigger_matcher(self, guild_id):
+        """Get the compiled trigger matcher for a guild, building it if needed"""
+        guild_id = str(guild_id)
+        matcher = self._trigger_matchers.get(guild_id)
+        if matcher is None:
+            matcher = TriggerMatcher(self._get_guild_reaction_triggers(guild_id))
+            self._trigger_matchers[guild_id] = matcher
+        return matcher
+    
     def _get_guild_message_reactions(self, guild_id):
         """Get message reactions for a guild"""
         guild_id = str(guild_id)
@@ -104,23 +117,24 @@ class AutoReactions(commands.Cog):
     
     async def _check_reaction_triggers(self, message):
         """Check message for reaction triggers and add reactions if found"""
-        guild_triggers = self._get_guild_reaction_triggers(message.guild.id)
+        matcher = self._get_trigger_matcher(message.guild.id)
         
         # No triggers for this guild
-        if not guild_triggers:
+        if not len(matcher):
             return
             
-        # Check each word in the message against all triggers
-        content = message.content.lower()
+        # Scan the message once for every trigger
+        guild_triggers = self._get_guild_reaction_triggers(message.guild.id)
         
-        for trigger, reaction_data in guild_triggers.items():
-            pattern = re.compile(r'\b' + re.escape(trigger.lower()) + r'\b')
-            if pattern.search(content):
-                try:
-                    emoji = reaction_data["emoji"]
-                    await message.add_reaction(emoji)
-                except Exception as e:
-                    logger.error(f"Failed to add reaction {emoji} to message: {str(e)}")
+        for trigger in matcher.matches(message.content):
+            reaction_data = guild_triggers.get(trigger)
+            if reaction_data is None:
+                continue
+            try:
+                emoji = reaction_data["emoji"]
+                await message.add_reaction(emoji)
+            except Exception as e:
+                logger.error(f"Failed to add reaction {emoji} to message: {str(e)}")
     
     async def _check_channel_reactions(self, message):
         """Add auto reactions to message if channel is configured"""
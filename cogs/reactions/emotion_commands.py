@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 import random
-import aiohttp
 import logging
 
 logger = logging.getLogger('bot')
@@ -64,18 +63,17 @@ class EmotionCommands(commands.Cog):
         
         # Fallback to Tenor API search if no pre-defined GIFs
         try:
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    'q': f"{emotion} anime",
-                    'key': 'LIVDSRZULELA',  # Public Tenor API key for testing
-                    'limit': 10
-                }
-                async with session.get("https://g.tenor.com/v1/search", params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        results = data.get("results", [])
-                        if results:
-                            return random.choice(results)["media"][0]["gif"]["url"]
+            params = {
+                'q': f"{emotion} anime",
+                'key': 'LIVDSRZULELA',  # Public Tenor API key for testing
+                'limit': 10
+            }
+            async with self.bot.http_client.get("https://g.tenor.com/v1/search", params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    results = data.get("results", [])
+                    if results:
+                        return random.choice(results)["media"][0]["gif"]["url"]
         except Exception as e:
             logger.error(f"Error fetching GIF from Tenor: {str(e)}")
             
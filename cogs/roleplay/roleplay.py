@@ -119,34 +119,31 @@ class Roleplay(commands.Cog):
             tenor_api_key = self.bot.config.get('tenor_api_key', None)
             
             if tenor_api_key:
-                import aiohttp
-                
                 # Format the URL
                 url = TENOR_API_BASE.format(search_term, tenor_api_key)
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            results = data.get('results', [])
+                async with self.bot.http_client.get(url) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        results = data.get('results', [])
+                        
+                        if results:
+                            # Extract GIF URLs
+                            gif_urls = []
+                            for result in results:
+                                # Use media_formats to get the best quality GIF
+                                media_formats = result.get('media_formats', {})
+                                if 'gif' in media_formats:
+                                    gif_urls.append(media_formats['gif']['url'])
+                                elif 'mediumgif' in media_formats:
+                                    gif_urls.append(media_formats['mediumgif']['url'])
+                                elif 'tinygif' in media_formats:
+                                    gif_urls.append(media_formats['tinygif']['url'])
                             
-                            if results:
-                                # Extract GIF URLs
-                                gif_urls = []
-                                for result in results:
-                                    # Use media_formats to get the best quality GIF
-                                    media_formats = result.get('media_formats', {})
-                                    if 'gif' in media_formats:
-                                        gif_urls.append(media_formats['gif']['url'])
-                                    elif 'mediumgif' in media_formats:
-                                        gif_urls.append(media_formats['mediumgif']['url'])
-                                    elif 'tinygif' in media_formats:
-                                        gif_urls.append(media_formats['tinygif']['url'])
-                                
-                                if gif_urls:
-                                    # Cache the results
-                                    self.gif_cache[action] = gif_urls
-                                    return random.choice(gif_urls)
+                            if gif_urls:
+                                # Cache the results
+                                self.gif_cache[action] = gif_urls
+                                return random.choice(gif_urls)
         except Exception as e:
             logger.error(f"Error getting GIF from Tenor API: {str(e)}")
             
@@ -7,8 +7,86 @@ import re
 from datetime import datetime
 import asyncio
 
+from core.matching import TriggerMatcher, compile_filter_pattern
+
 logger = logging.getLogger('bot')
 
+# Discord invite links
+INVITE_PATTERN = re.compile(r"(discord\.gg|discordapp\.com\/invite|discord\.com\/invite)\/[a-zA-Z0-9]+", re.IGNORECASE)
+
+# A regex filter search is abandoned after this long and the pattern switched off
+REGEX_TIMEOUT = 0.05
+
+class FilterProgram:
+    """
+    Compiled filters for one guild, built from its config whenever filters.json is saved
+    """
+    
+    def __init__(self, guild_id, guild_config):
+        self.guild_id = guild_id
+        self.channels = {
+            channel_id: set(filters)
+            for channel_id, filters in guild_config.get("channels", {}).items()
+        }
+        self.exempt_roles = {
+            filter_type: set(role_ids)
+            for filter_type, role_ids in guild_config.get("exempt_roles", {}).items()
+        }
+        
+        # Word lists and the invite whitelist are plain substring checks
+        self.words = TriggerMatcher(guild_config.get("words", []), word_boundaries=False)
+        self.invite_whitelist = TriggerMatcher(
+            guild_config.get("invites", {}).get("whitelist", []),
+            word_boundaries=False
+        )
+        
+        self.patterns = []
+        for pattern in guild_config.get("regex", []):
+            try:
+                self.patterns.append((pattern, compile_filter_pattern(pattern)))
+            except ValueError as e:
+                logger.error(f"Skipping regex filter {pattern!r} in guild {guild_id}: {e}")
+    
+    def is_exempt(self, filter_type, member):
+        """Check if a member is exempt from a filter type"""
+        exempt_roles = self.exempt_roles.get(filter_type)
+        if not exempt_roles or member is None:
+            return False
+        return any(str(role.id) in exempt_roles for role in member.roles)
+    
+    def has_invite(self, content):
+        """True if the content has a Discord invite that is not whitelisted"""
+        if not INVITE_PATTERN.search(content):
+            return False
+        return self.invite_whitelist.search(content) is None
+    
+    def matched_word(self, content):
+        """The first filtered word in the content, or None"""
+        return self.words.search(content)
+    
+    def matched_pattern(self, content):
+        """The first regex filter matching the content, or None.
+        
+        Each search runs with a timeout, so a runaway pattern gives up after
+        REGEX_TIMEOUT instead of stalling the event loop; it is then dropped
+        from this program (and logged) so it cannot cost that again.
+        """
+        for entry in list(self.patterns):
+            pattern, compiled = entry
+            try:
+                matched = compiled.search(content, timeout=REGEX_TIMEOUT)
+            except TimeoutError:
+                logger.error(
+                    f"Regex filter {pattern!r} in guild {self.guild_id} timed out after "
+                    f"{REGEX_TIMEOUT * 1000:.0f}ms; disabling it"
+                )
+                self.patterns.remove(entry)
+                continue
+            
+            if matched:
+                return pattern
+        return None
+
 class ServerFilters(commands.Cog):
     """
     Message filtering system for Discord servers
@@ -20,6 +98,9 @@ class ServerFilters(commands.Cog):
         self.filter_config = {}
         self.spam_cooldowns = {}
         
+        # Compiled FilterProgram per guild, rebuilt after filters.json changes
+        self._programs = {}
+        
         # Create directory if it doesn't exist
         os.makedirs(self.config_path, exist_ok=True)
         
@@ -36,13 +117,14 @@ class ServerFilters(commands.Cog):
         except Exception as e:
             logger.error(f"Error loading filter settings: {str(e)}")
             self.filter_config = {}
+        self._programs.clear()
     
     def _save_filter_config(self):
         """Save filter settings to file"""
+        self._programs.clear()
         try:
             filepath = f"{self.config_path}/filters.json"
-            with open(filepath, "w") as f:
-                json.dump(self.filter_config, f, indent=4)
+            self.bot.json_store.save(filepath, self.filter_config)
         except Exception as e:
             logger.error(f"Error saving filter settings: {str(e)}")
     
@@ -65,17 +147,19 @@ class ServerFilters(commands.Cog):
             self._save_filter_config()
         return self.filter_config[guild_id]
     
+    def _get_filter_program(self, guild_id):
+        """Get the compiled filters for a guild, or None if it has no config"""
+        guild_id = str(guild_id)
+        program = self._programs.get(guild_id)
+        if program is None and guild_id in self.filter_config:
+            program = FilterProgram(guild_id, self.filter_config[guild_id])
+            self._programs[guild_id] = program
+        return program
+    
     def _is_exempt(self, filter_type, guild_id, member):
         """Check if a member is exempt from a filter type"""
-        guild_config = self._get_guild_filter_config(guild_id)
-        exempt_roles = guild_config.get("exempt_roles", {}).get(filter_type, [])
-        
-        # Check if the member has any exempt roles
-        for role in member.roles:
-            if str(role.id) in exempt_roles:
-                return True
-                
-        return False
+        program = self._get_filter_program(guild_id)
+        return program is not None and program.is_exempt(filter_type, member)
     
     async def _delete_message_with_reason(self, message, reason):
         """Delete a message and send a temporary notice"""
@@ -133,6 +217,8 @@ class ServerFilters(commands.Cog):
                 "`filter spam #channel on/off` - Enable/disable spam filter\n"
                 "`filter add word1 [word2...]` - Add filtered words\n"
                 "`filter list` - List filtered words\n"
+                "`filter regex add <pattern>` - Add a filtered regex pattern\n"
+                "`filter regex remove <pattern>` - Remove a filtered regex pattern\n"
                 "`filter reset` - Reset all filter settings"
             ),
             inline=False
@@ -246,6 +332,61 @@ class ServerFilters(commands.Cog):
         
         await ctx.send(embed=embed)
         
+    @filter.group(name="regex", invoke_without_command=True)
+    @commands.has_permissions(manage_guild=True)
+    async def filter_regex(self, ctx):
+        """View regex patterns filtered in guild"""
+        guild_config = self._get_guild_filter_config(ctx.guild.id)
+        patterns = guild_config.get("regex", [])
+        
+        if not patterns:
+            await ctx.send("ℹ️ No regex patterns are being filtered. Use `filter regex add <pattern>` to add one.")
+            return
+            
+        await ctx.send("**Regex Patterns**\n" + "\n".join(f"• `{pattern}`" for pattern in patterns))
+        
+    @filter_regex.command(name="add")
+    @commands.has_permissions(manage_guild=True)
+    async def filter_regex_add(self, ctx, *, pattern: str = None):
+        """Add a filtered regex pattern"""
+        if not pattern:
+            await ctx.send("❌ Please specify a regex pattern to filter.")
+            return
+            
+        # Reject bad patterns now rather than at message time
+        try:
+            compile_filter_pattern(pattern)
+        except ValueError as e:
+            await ctx.send(f"❌ That pattern can't be used: {e}")
+            return
+            
+        guild_config = self._get_guild_filter_config(ctx.guild.id)
+        guild_config.setdefault("regex", [])
+        
+        if pattern in guild_config["regex"]:
+            await ctx.send(f"ℹ️ `{pattern}` is already being filtered.")
+            return
+            
+        guild_config["regex"].append(pattern)
+        self._save_filter_config()
+        
+        await ctx.send(f"✅ Added regex filter `{pattern}`.")
+        
+    @filter_regex.command(name="remove")
+    @commands.has_permissions(manage_guild=True)
+    async def filter_regex_remove(self, ctx, *, pattern: str = None):
+        """Remove a filtered regex pattern"""
+        guild_config = self._get_guild_filter_config(ctx.guild.id)
+        
+        if not pattern or pattern not in guild_config.get("regex", []):
+            await ctx.send("❌ That pattern isn't being filtered. Use `filter regex` to see the list.")
+            return
+            
+        guild_config["regex"].remove(pattern)
+        self._save_filter_config()
+        
+        await ctx.send(f"✅ Removed regex filter `{pattern}`.")
+        
     @filter.command(name="reset")
     @commands.has_permissions(manage_guild=True)
     async def filter_reset(self, ctx):
@@ -379,17 +520,16 @@ class ServerFilters(commands.Cog):
         if not message.guild or message.author.bot:
             return
             
-        guild_id = str(message.guild.id)
         channel_id = str(message.channel.id)
         
-        # Get filter config
-        if guild_id not in self.filter_config:
+        # Get the compiled filters for this guild
+        program = self._get_filter_program(message.guild.id)
+        if program is None:
             return
             
-        guild_config = self.filter_config[guild_id]
-        
         # Check if the channel has any filters enabled
-        if channel_id not in guild_config.get("channels", {}):
+        enabled_filters = program.channels.get(channel_id)
+        if enabled_filters is None:
             return
             
         # Allow messages from users with manage messages permission
@@ -397,43 +537,23 @@ class ServerFilters(commands.Cog):
         if member and member.guild_permissions.manage_messages:
             return
             
-        # Get enabled filters for this channel
-        enabled_filters = guild_config["channels"][channel_id]
+        content = message.content
         
         # Check invite links
-        if "invites" in enabled_filters and not self._is_exempt("invites", guild_id, member):
-            # Discord invite regex pattern
-            invite_pattern = r"(discord\.gg|discordapp\.com\/invite|discord\.com\/invite)\/[a-zA-Z0-9]+"
-            if re.search(invite_pattern, message.content, re.IGNORECASE):
-                # Check whitelist
-                is_whitelisted = False
-                for whitelisted in guild_config.get("invites", {}).get("whitelist", []):
-                    if whitelisted.lower() in message.content.lower():
-                        is_whitelisted = True
-                        break
-                        
-                if not is_whitelisted:
-                    await self._delete_message_with_reason(message, "Discord invites are not allowed in this channel.")
-                    return
+        if "invites" in enabled_filters and not program.is_exempt("invites", member):
+            if program.has_invite(content):
+                await self._delete_message_with_reason(message, "Discord invites are not allowed in this channel.")
+                return
         
         # Check word filters
-        if guild_config.get("words", []):
-            content_lower = message.content.lower()
-            for word in guild_config["words"]:
-                if word.lower() in content_lower:
-                    await self._delete_message_with_reason(message, "Your message contained a filtered word.")
-                    return
+        if program.matched_word(content) is not None:
+            await self._delete_message_with_reason(message, "Your message contained a filtered word.")
+            return
                     
         # Check regex filters
-        if guild_config.get("regex", []):
-            for pattern in guild_config["regex"]:
-                try:
-                    if re.search(pattern, message.content, re.IGNORECASE):
-                        await self._delete_message_with_reason(message, "Your message matched a filtered pattern.")
-                        return
-                except:
-                    # Invalid regex pattern
-                    continue
+        if program.matched_pattern(content) is not None:
+            await self._delete_message_with_reason(message, "Your message matched a filtered pattern.")
+            return
 
 async def setup(bot):
     await bot.add_cog(ServerFilters(bot)) 
\ No newline at end of file
@@ -38,8 +38,7 @@ class ImageOnly(commands.Cog):
         """Save image channel settings to file"""
         try:
             filepath = f"{self.config_path}/image_channels.json"
-            with open(filepath, "w") as f:
-                json.dump(self.image_config, f, indent=4)
+            self.bot.json_store.save(filepath, self.image_config)
         except Exception as e:
             logger.error(f"Error saving image channel settings: {str(e)}")
     
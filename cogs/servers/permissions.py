@@ -57,8 +57,7 @@ class FakePermissions(commands.Cog):
         """Save permission settings to file"""
         try:
             filepath = f"{self.config_path}/fake_permissions.json"
-            with open(filepath, "w") as f:
-                json.dump(self.perm_config, f, indent=4)
+            self.bot.json_store.save(filepath, self.perm_config)
         except Exception as e:
             logger.error(f"Error saving permission settings: {str(e)}")
     
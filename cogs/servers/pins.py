@@ -39,8 +39,7 @@ class PinArchive(commands.Cog):
         """Save pin settings to file"""
         try:
             filepath = f"{self.config_path}/pin_config.json"
-            with open(filepath, "w") as f:
-                json.dump(self.pin_config, f, indent=4)
+            self.bot.json_store.save(filepath, self.pin_config)
         except Exception as e:
             logger.error(f"Error saving pin settings: {str(e)}")
     
@@ -1,9 +1,13 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import asyncio
 import datetime
 import logging
-from collections import defaultdict, deque
+
+from .snipe_store import (
+    SnipeStore, DeletedMessage, EditedMessage, RemovedReaction,
+    DELETED, EDITED, REACTIONS, PURGED, DEFAULT_MAX_BYTES, DEFAULT_TTL
+)
 
 logger = logging.getLogger('bot')
 
@@ -13,75 +17,80 @@ MAX_SNIPE_HISTORY = 10
 MAX_EDIT_HISTORY = 10
 # Maximum number of reactions to store per channel
 MAX_REACTION_HISTORY = 10
+# Maximum number of purged messages to store per channel
+MAX_PURGE_HISTORY = 100
 
 class Snipe(commands.Cog):
     """Commands for retrieving deleted and edited messages"""
     
     def __init__(self, bot):
         self.bot = bot
-        # Structure: {guild_id -> {channel_id -> deque([messages])}}
-        self.deleted_messages = defaultdict(lambda: defaultdict(lambda: deque(maxlen=MAX_SNIPE_HISTORY)))
-        # Structure: {guild_id -> {channel_id -> deque([{before, after}])}}
-        self.edited_messages = defaultdict(lambda: defaultdict(lambda: deque(maxlen=MAX_EDIT_HISTORY)))
-        # Structure: {guild_id -> {channel_id -> deque([{message_id, emoji, user}])}}
-        self.deleted_reactions = defaultdict(lambda: defaultdict(lambda: deque(maxlen=MAX_REACTION_HISTORY)))
-        # Structure: {message_id -> {emoji -> [users]}}
-        self.reaction_history = {}
-        # Structure: {guild_id -> {channel_id -> [purged_messages]}}
-        self.purged_messages = defaultdict(lambda: defaultdict(list))
+        # Deleted/edited messages, removed reactions, purges and reaction
+        # history all live in one store with a global memory budget and TTL
+        self.store = SnipeStore(
+            max_bytes=int(bot.config.get("snipe_memory_mb", DEFAULT_MAX_BYTES // (1024 * 1024)) * 1024 * 1024),
+            ttl=bot.config.get("snipe_ttl_minutes", DEFAULT_TTL // 60) * 60
+        )
+    
+    async def cog_load(self):
+        self.prune_expired.start()
+    
+    async def cog_unload(self):
+        self.prune_expired.cancel()
+    
+    @tasks.loop(minutes=5)
+    async def prune_expired(self):
+        """Drop snipes older than the TTL from channels nobody is sniping in"""
+        try:
+            removed = self.store.prune()
+            if removed:
+                logger.debug(f"Pruned {removed} expired snipe entries")
+        except Exception as e:
+            logger.error(f"Error pruning snipe store: {e}")
     
     @commands.Cog.listener()
     async def on_message_delete(self, message):
         """Store deleted messages for sniping"""
-        # Ignore bots and empty messages
-        if message.author.bot or not message.content:
+        # Ignore DMs, bots and empty messages
+        if not message.guild or message.author.bot or not message.content:
             return
             
         # Store the message
-        self.deleted_messages[message.guild.id][message.channel.id].append({
-            'content': message.content,
-            'author': message.author,
-            'created_at': message.created_at,
-            'deleted_at': datetime.datetime.utcnow(),
-            'attachments': [attachment.url for attachment in message.attachments],
-            'embeds': message.embeds
-        })
+        self.store.push(
+            DELETED, message.guild.id, message.channel.id,
+            DeletedMessage(message, datetime.datetime.utcnow()),
+            MAX_SNIPE_HISTORY
+        )
         
         logger.debug(f"Stored deleted message in {message.guild.id}/{message.channel.id} by {message.author.id}")
     
     @commands.Cog.listener()
     async def on_bulk_message_delete(self, messages):
         """Store messages deleted through purge"""
-        if not messages:
+        if not messages or not messages[0].guild:
             return
             
         # Get first message's guild and channel for reference
         first_message = messages[0]
         guild_id = first_message.guild.id
         channel_id = first_message.channel.id
-        
-        # Clear existing purged messages for this channel
-        self.purged_messages[guild_id][channel_id] = []
-        
-        # Store the purged messages
-        for message in messages:
-            if not message.author.bot and message.content:
-                self.purged_messages[guild_id][channel_id].append({
-                    'content': message.content,
-                    'author': message.author,
-                    'created_at': message.created_at,
-                    'deleted_at': datetime.datetime.utcnow(),
-                    'attachments': [attachment.url for attachment in message.attachments],
-                    'embeds': message.embeds
-                })
+        deleted_at = datetime.datetime.utcnow()
+        
+        # Replace existing purged messages for this channel
+        purged = [
+            DeletedMessage(message, deleted_at)
+            for message in messages
+            if not message.author.bot and message.content
+        ]
+        self.store.replace(PURGED, guild_id, channel_id, purged, MAX_PURGE_HISTORY)
                 
-        logger.debug(f"Stored {len(self.purged_messages[guild_id][channel_id])} purged messages in {guild_id}/{channel_id}")
+        logger.debug(f"Stored {len(purged)} purged messages in {guild_id}/{channel_id}")
     
     @commands.Cog.listener()
     async def on_message_edit(self, before, after):
         """Store edited messages for editsnipe"""
-        # Ignore bots and empty messages
-        if before.author.bot or not before.content:
+        # Ignore DMs, bots and empty messages
+        if not before.guild or before.author.bot or not before.content:
             return
             
         # Skip if content didn't change (embed loading, etc.)
@@ -89,19 +98,11 @@ class Snipe(commands.Cog):
             return
             
         # Store the edit
-        self.edited_messages[before.guild.id][before.channel.id].append({
-            'before': {
-                'content': before.content,
-                'author': before.author,
-                'created_at': before.created_at,
-                'attachments': [attachment.url for attachment in before.attachments],
-                'embeds': before.embeds
-            },
-            'after': {
-                'content': after.content,
-                'edited_at': datetime.datetime.utcnow()
-            }
-        })
+        self.store.push(
+            EDITED, before.guild.id, before.channel.id,
+            EditedMessage(before, after, datetime.datetime.utcnow()),
+            MAX_EDIT_HISTORY
+        )
         
         logger.debug(f"Stored edited message in {before.guild.id}/{before.channel.id} by {before.author.id}")
     
@@ -109,20 +110,10 @@ class Snipe(commands.Cog):
     async def on_reaction_add(self, reaction, user):
         """Store reaction for history"""
         message = reaction.message
-        
-        # Initialize if this is a new message
-        if message.id not in self.reaction_history:
-            self.reaction_history[message.id] = {}
-            
         emoji_str = str(reaction.emoji)
         
-        # Initialize if this is a new emoji for this message
-        if emoji_str not in self.reaction_history[message.id]:
-            self.reaction_history[message.id][emoji_str] = []
-            
         # Add user to the list of reactors
-        if user.id not in self.reaction_history[message.id][emoji_str]:
-            self.reaction_history[message.id][emoji_str].append(user.id)
+        self.store.add_reaction(message.id, emoji_str, user.id)
             
         logger.debug(f"Stored reaction {emoji_str} by {user.id} on message {message.id}")
     
@@ -131,24 +122,21 @@ class Snipe(commands.Cog):
         """Store removed reaction for sniping"""
         message = reaction.message
         
-        # Ignore bot reactions
-        if user.bot:
+        # Ignore DMs and bot reactions
+        if not message.guild or user.bot:
             return
             
+        emoji_str = str(reaction.emoji)
+        
         # Store the removed reaction
-        self.deleted_reactions[message.guild.id][message.channel.id].append({
-            'message_id': message.id,
-            'emoji': str(reaction.emoji),
-            'user': user,
-            'removed_at': datetime.datetime.utcnow()
-        })
+        self.store.push(
+            REACTIONS, message.guild.id, message.channel.id,
+            RemovedReaction(message.id, emoji_str, user, datetime.datetime.utcnow()),
+            MAX_REACTION_HISTORY
+        )
         
         # Also update reaction history if we're tracking this message
-        if message.id in self.reaction_history:
-            emoji_str = str(reaction.emoji)
-            if emoji_str in self.reaction_history[message.id]:
-                if user.id in self.reaction_history[message.id][emoji_str]:
-                    self.reaction_history[message.id][emoji_str].remove(user.id)
+        self.store.remove_reaction(message.id, emoji_str, user.id)
                     
         logger.debug(f"Stored removed reaction {str(reaction.emoji)} by {user.id} on message {message.id}")
     
@@ -160,7 +148,7 @@ class Snipe(commands.Cog):
             return await ctx.send("Index must be at least 1.")
             
         # Get the deleted messages for this channel
-        deleted = self.deleted_messages.get(ctx.guild.id, {}).get(ctx.channel.id, deque())
+        deleted = self.store.get(DELETED, ctx.guild.id, ctx.channel.id)
         
         # Check if there are deleted messages
         if not deleted:
@@ -171,25 +159,25 @@ class Snipe(commands.Cog):
             return await ctx.send(f"There are only {len(deleted)} deleted messages in this channel.")
             
         # Get the requested message (convert from 1-indexed to 0-indexed)
-        message = list(deleted)[-index]
+        message = deleted[-index]
         
         # Create embed
         embed = discord.Embed(
-            description=message['content'],
+            description=message.content,
             color=discord.Color.red(),
-            timestamp=message['deleted_at']
+            timestamp=message.deleted_at
         )
         
         embed.set_author(
-            name=f"{message['author'].display_name}",
-            icon_url=message['author'].display_avatar.url
+            name=message.author_name,
+            icon_url=message.author_avatar
         )
         
         embed.set_footer(text=f"Deleted at • Message {index}/{len(deleted)}")
         
         # Add attachment info if any
-        if message['attachments']:
-            attachment_links = "\n".join([f"[Attachment {i+1}]({url})" for i, url in enumerate(message['attachments'])])
+        if message.attachments:
+            attachment_links = "\n".join([f"[Attachment {i+1}]({url})" for i, url in enumerate(message.attachments)])
             embed.add_field(name="Attachments", value=attachment_links, inline=False)
             
         await ctx.send(embed=embed)
@@ -202,7 +190,7 @@ class Snipe(commands.Cog):
             return await ctx.send("Index must be at least 1.")
             
         # Get the edited messages for this channel
-        edited = self.edited_messages.get(ctx.guild.id, {}).get(ctx.channel.id, deque())
+        edited = self.store.get(EDITED, ctx.guild.id, ctx.channel.id)
         
         # Check if there are edited messages
         if not edited:
@@ -213,27 +201,27 @@ class Snipe(commands.Cog):
             return await ctx.send(f"There are only {len(edited)} edited messages in this channel.")
             
         # Get the requested edit (convert from 1-indexed to 0-indexed)
-        edit = list(edited)[-index]
+        edit = edited[-index]
         
         # Create embed
         embed = discord.Embed(
             color=discord.Color.orange(),
-            timestamp=edit['after']['edited_at']
+            timestamp=edit.edited_at
         )
         
         embed.set_author(
-            name=f"{edit['before']['author'].display_name}",
-            icon_url=edit['before']['author'].display_avatar.url
+            name=edit.author_name,
+            icon_url=edit.author_avatar
         )
         
-        embed.add_field(name="Before", value=edit['before']['content'], inline=False)
-        embed.add_field(name="After", value=edit['after']['content'], inline=False)
+        embed.add_field(name="Before", value=edit.before, inline=False)
+        embed.add_field(name="After", value=edit.after, inline=False)
         
         embed.set_footer(text=f"Edited at • Edit {index}/{len(edited)}")
         
         # Add attachment info if any
-        if edit['before']['attachments']:
-            attachment_links = "\n".join([f"[Attachment {i+1}]({url})" for i, url in enumerate(edit['before']['attachments'])])
+        if edit.attachments:
+            attachment_links = "\n".join([f"[Attachment {i+1}]({url})" for i, url in enumerate(edit.attachments)])
             embed.add_field(name="Attachments", value=attachment_links, inline=False)
             
         await ctx.send(embed=embed)
@@ -246,7 +234,7 @@ class Snipe(commands.Cog):
             return await ctx.send("Index must be at least 1.")
             
         # Get the deleted reactions for this channel
-        deleted = self.deleted_reactions.get(ctx.guild.id, {}).get(ctx.channel.id, deque())
+        deleted = self.store.get(REACTIONS, ctx.guild.id, ctx.channel.id)
         
         # Check if there are deleted reactions
         if not deleted:
@@ -257,25 +245,25 @@ class Snipe(commands.Cog):
             return await ctx.send(f"There are only {len(deleted)} deleted reactions in this channel.")
             
         # Get the requested reaction (convert from 1-indexed to 0-indexed)
-        reaction = list(deleted)[-index]
+        reaction = deleted[-index]
         
         # Create embed
         embed = discord.Embed(
-            description=f"{reaction['user'].mention} reacted with {reaction['emoji']} to a message",
+            description=f"<@{reaction.user_id}> reacted with {reaction.emoji} to a message",
             color=discord.Color.blue(),
-            timestamp=reaction['removed_at']
+            timestamp=reaction.removed_at
         )
         
         embed.set_author(
-            name=f"{reaction['user'].display_name}",
-            icon_url=reaction['user'].display_avatar.url
+            name=reaction.user_name,
+            icon_url=reaction.user_avatar
         )
         
         embed.set_footer(text=f"Removed at • Reaction {index}/{len(deleted)}")
         
         # Add message link if we can construct it
-        if ctx.guild.id and ctx.channel.id and reaction['message_id']:
-            message_link = f"https://discord.com/channels/{ctx.guild.id}/{ctx.channel.id}/{reaction['message_id']}"
+        if ctx.guild.id and ctx.channel.id and reaction.message_id:
+            message_link = f"https://discord.com/channels/{ctx.guild.id}/{ctx.channel.id}/{reaction.message_id}"
             embed.add_field(name="Message", value=f"[Jump to Message]({message_link})", inline=False)
             
         await ctx.send(embed=embed)
@@ -284,10 +272,9 @@ class Snipe(commands.Cog):
     async def reactionhistory(self, ctx, message_id: int):
         """See logged reactions for a message"""
         # Check if we have history for this message
-        if message_id not in self.reaction_history:
+        reaction_data = self.store.get_reactions(message_id)
+        if reaction_data is None:
             return await ctx.send("No reaction history found for this message.")
-            
-        reaction_data = self.reaction_history[message_id]
         
         if not reaction_data:
             return await ctx.send("No reactions found for this message.")
@@ -321,21 +308,9 @@ class Snipe(commands.Cog):
     @commands.has_permissions(manage_messages=True)
     async def clearsnipe(self, ctx):
         """Clear all deleted messages from snipe history"""
-        # Clear deleted messages for this channel
-        if ctx.guild.id in self.deleted_messages and ctx.channel.id in self.deleted_messages[ctx.guild.id]:
-            self.deleted_messages[ctx.guild.id][ctx.channel.id].clear()
-            
-        # Clear edited messages for this channel
-        if ctx.guild.id in self.edited_messages and ctx.channel.id in self.edited_messages[ctx.guild.id]:
-            self.edited_messages[ctx.guild.id][ctx.channel.id].clear()
-            
-        # Clear deleted reactions for this channel
-        if ctx.guild.id in self.deleted_reactions and ctx.channel.id in self.deleted_reactions[ctx.guild.id]:
-            self.deleted_reactions[ctx.guild.id][ctx.channel.id].clear()
-            
-        # Clear purged messages for this channel
-        if ctx.guild.id in self.purged_messages and ctx.channel.id in self.purged_messages[ctx.guild.id]:
-            self.purged_messages[ctx.guild.id][ctx.channel.id].clear()
+        # Clear deleted messages, edits, removed reactions and purges for this channel
+        for kind in (DELETED, EDITED, REACTIONS, PURGED):
+            self.store.clear(kind, ctx.guild.id, ctx.channel.id)
             
         await ctx.send("Snipe history for this channel has been cleared.")
     
@@ -348,7 +323,7 @@ class Snipe(commands.Cog):
             return await ctx.send("Index must be at least 1.")
             
         # Check if there are deleted messages
-        deleted = self.deleted_messages.get(ctx.guild.id, {}).get(ctx.channel.id, deque())
+        deleted = self.store.get(DELETED, ctx.guild.id, ctx.channel.id)
         
         if not deleted:
             return await ctx.send("There are no deleted messages to remove.")
@@ -357,19 +332,18 @@ class Snipe(commands.Cog):
         if index > len(deleted):
             return await ctx.send(f"There are only {len(deleted)} deleted messages in this channel.")
             
-        # Convert the deque to a list, remove the item, then convert back to a deque
-        deleted_list = list(deleted)
-        removed = deleted_list.pop(-index)  # Remove from the end (most recent first)
-        self.deleted_messages[ctx.guild.id][ctx.channel.id] = deque(deleted_list, maxlen=MAX_SNIPE_HISTORY)
+        # Index from the end (most recent first)
+        removed = deleted[-index]
+        self.store.remove(DELETED, ctx.guild.id, ctx.channel.id, removed)
         
-        await ctx.send(f"Removed snipe at index {index} from user {removed['author'].display_name}.")
+        await ctx.send(f"Removed snipe at index {index} from user {removed.author_name}.")
     
     @commands.command(name="purgesnipe")
     @commands.has_permissions(manage_messages=True)
     async def purgesnipe(self, ctx):
         """View messages deleted through a purge"""
         # Check if there are purged messages
-        purged = self.purged_messages.get(ctx.guild.id, {}).get(ctx.channel.id, [])
+        purged = self.store.get(PURGED, ctx.guild.id, ctx.channel.id)
         
         if not purged:
             return await ctx.send("There are no purged messages to snipe in this channel.")
@@ -389,8 +363,8 @@ class Snipe(commands.Cog):
             
             for j, message in enumerate(chunk):
                 embed.add_field(
-                    name=f"{i+j+1}. {message['author'].display_name} at {message['created_at'].strftime('%H:%M:%S')}",
-                    value=message['content'][:1024] + ("..." if len(message['content']) > 1024 else ""),
+                    name=f"{i+j+1}. {message.author_name} at {message.created_at.strftime('%H:%M:%S')}",
+                    value=message.content[:1024] + ("..." if len(message.content) > 1024 else ""),
                     inline=False
                 )
                 
@@ -431,6 +405,20 @@ class Snipe(commands.Cog):
                 except asyncio.TimeoutError:
                     await message.clear_reactions()
                     break
+    
+    @commands.command(name="snipestats")
+    @commands.is_owner()
+    async def snipestats(self, ctx):
+        """Show how much memory the snipe store is using"""
+        stats = self.store.stats()
+        per_kind = ", ".join(f"{kind}: {count}" for kind, count in sorted(stats['per_kind'].items())) or "empty"
+        
+        await ctx.send(
+            f"Snipe store: {stats['entries']} entries in {stats['buckets']} buckets, "
+            f"{stats['bytes'] / 1024:.1f} KiB of {stats['max_bytes'] / 1024:.0f} KiB\n"
+            f"By kind: {per_kind}\n"
+            f"Evicted: {stats['evicted']}, expired: {stats['expired']}"
+        )
 
 async def setup(bot):
     await bot.add_cog(Snipe(bot)) 
\ No newline at end of file
@@ -0,0 +1,305 @@
+import sys
+import time
+from collections import OrderedDict, deque
+
+# Default memory budget and record lifetime (seconds)
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL = 2 * 60 * 60
+
+# Rough cost of a bucket (key tuple, deque, OrderedDict slot) on top of its records
+BUCKET_OVERHEAD = 256
+
+# Kinds of snipe data kept per channel
+DELETED = 'deleted'
+EDITED = 'edited'
+REACTIONS = 'reactions'
+PURGED = 'purged'
+# Reaction history is kept per message
+REACTION_HISTORY = 'reaction_history'
+
+
+class SnipeRecord:
+    """Base for compact snipe records: plain ids and strings, no library objects"""
+    
+    __slots__ = ('stored_at',)
+    
+    def __init__(self):
+        self.stored_at = time.monotonic()
+    
+    def size(self):
+        """Approximate memory used by this record and the values it holds"""
+        total = sys.getsizeof(self)
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                value = getattr(self, name, None)
+                total += _value_size(value)
+        return total
+
+
+def _value_size(value):
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(key) + _value_size(item) for key, item in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+class DeletedMessage(SnipeRecord):
+    __slots__ = ('author_id', 'author_name', 'author_avatar', 'content', 'attachments', 'created_at', 'deleted_at')
+    
+    def __init__(self, message, deleted_at):
+        super().__init__()
+        self.author_id = message.author.id
+        self.author_name = message.author.display_name
+        self.author_avatar = str(message.author.display_avatar.url)
+        self.content = message.content
+        self.attachments = tuple(attachment.url for attachment in message.attachments)
+        self.created_at = message.created_at
+        self.deleted_at = deleted_at
+
+
+class EditedMessage(SnipeRecord):
+    __slots__ = ('author_id', 'author_name', 'author_avatar', 'before', 'after', 'attachments', 'created_at', 'edited_at')
+    
+    def __init__(self, before, after, edited_at):
+        super().__init__()
+        self.author_id = before.author.id
+        self.author_name = before.author.display_name
+        self.author_avatar = str(before.author.display_avatar.url)
+        self.before = before.content
+        self.after = after.content
+        self.attachments = tuple(attachment.url for attachment in before.attachments)
+        self.created_at = before.created_at
+        self.edited_at = edited_at
+
+
+class RemovedReaction(SnipeRecord):
+    __slots__ = ('message_id', 'emoji', 'user_id', 'user_name', 'user_avatar', 'removed_at')
+    
+    def __init__(self, message_id, emoji, user, removed_at):
+        super().__init__()
+        self.message_id = message_id
+        self.emoji = emoji
+        self.user_id = user.id
+        self.user_name = user.display_name
+        self.user_avatar = str(user.display_avatar.url)
+        self.removed_at = removed_at
+
+
+class ReactionLog(SnipeRecord):
+    """Who reacted with what on one message: {emoji: [user ids]}"""
+    
+    __slots__ = ('reactions',)
+    
+    def __init__(self):
+        super().__init__()
+        self.reactions = {}
+
+
+class _Bucket:
+    __slots__ = ('records', 'bytes')
+    
+    def __init__(self, maxlen):
+        self.records = deque(maxlen=maxlen)
+        self.bytes = BUCKET_OVERHEAD
+
+
+class SnipeStore:
+    """Memory-bounded storage for snipe data.
+    
+    Records live in buckets keyed by (kind, guild_id, channel_id), or by
+    (REACTION_HISTORY, message_id) for reaction logs. Each bucket keeps at
+    most ``maxlen`` records, every record expires ``ttl`` seconds after it
+    was stored, and when the estimated total passes ``max_bytes`` the oldest
+    records of the least recently used buckets are evicted first.
+    """
+    
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        
+        self._buckets = OrderedDict()
+        self._bytes = 0
+        self._entries = 0
+        self.evicted = 0
+        self.expired = 0
+    
+    def _bucket(self, key, maxlen, create=True):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if not create:
+                return None
+            bucket = _Bucket(maxlen)
+            self._buckets[key] = bucket
+            self._bytes += bucket.bytes
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+    
+    def _drop_bucket(self, key):
+        bucket = self._buckets.pop(key, None)
+        if bucket is not None:
+            self._bytes -= bucket.bytes
+            self._entries -= len(bucket.records)
+    
+    def _append(self, bucket, record):
+        # A full deque silently drops its oldest record on append
+        if bucket.records.maxlen is not None and len(bucket.records) == bucket.records.maxlen:
+            self._discard_oldest(bucket)
+        size = record.size()
+        bucket.records.append(record)
+        bucket.bytes += size
+        self._bytes += size
+        self._entries += 1
+    
+    def _discard_oldest(self, bucket):
+        record = bucket.records.popleft()
+        size = record.size()
+        bucket.bytes -= size
+        self._bytes -= size
+        self._entries -= 1
+    
+    def _prune_bucket(self, key, bucket):
+        """Drop expired records from the front of a bucket"""
+        cutoff = time.monotonic() - self.ttl
+        while bucket.records and bucket.records[0].stored_at < cutoff:
+            self._discard_oldest(bucket)
+            self.expired += 1
+        if not bucket.records:
+            self._drop_bucket(key)
+    
+    def _enforce_budget(self):
+        """Evict from the least recently used buckets until under budget"""
+        while self._bytes > self.max_bytes and self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if bucket.records:
+                self._discard_oldest(bucket)
+                self.evicted += 1
+            if not bucket.records:
+                self._drop_bucket(key)
+    
+    def push(self, kind, guild_id, channel_id, record, maxlen):
+        """Store a record for a channel, newest last"""
+        bucket = self._bucket((kind, guild_id, channel_id), maxlen)
+        self._append(bucket, record)
+        self._enforce_budget()
+    
+    def replace(self, kind, guild_id, channel_id, records, maxlen):
+        """Replace everything stored for a channel with ``records``"""
+        key = (kind, guild_id, channel_id)
+        self._drop_bucket(key)
+        if not records:
+            return
+        bucket = self._bucket(key, maxlen)
+        for record in records:
+            self._append(bucket, record)
+        self._enforce_budget()
+    
+    def get(self, kind, guild_id, channel_id):
+        """Live records for a channel, oldest first"""
+        key = (kind, guild_id, channel_id)
+        bucket = self._bucket(key, None, create=False)
+        if bucket is None:
+            return []
+        self._prune_bucket(key, bucket)
+        return list(bucket.records)
+    
+    def remove(self, kind, guild_id, channel_id, record):
+        """Remove one record from a channel"""
+        key = (kind, guild_id, channel_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return False
+        try:
+            bucket.records.remove(record)
+        except ValueError:
+            return False
+        size = record.size()
+        bucket.bytes -= size
+        self._bytes -= size
+        self._entries -= 1
+        if not bucket.records:
+            self._drop_bucket(key)
+        return True
+    
+    def clear(self, kind, guild_id, channel_id):
+        """Forget everything of one kind stored for a channel"""
+        self._drop_bucket((kind, guild_id, channel_id))
+    
+    def _update_log(self, message_id, change, create):
+        key = (REACTION_HISTORY, message_id)
+        bucket = self._bucket(key, 1, create=create)
+        if bucket is None:
+            return
+        if bucket.records:
+            log = bucket.records[0]
+            old_size = log.size()
+        else:
+            log = ReactionLog()
+            bucket.records.append(log)
+            self._entries += 1
+            old_size = 0
+        
+        change(log.reactions)
+        log.stored_at = time.monotonic()
+        
+        delta = log.size() - old_size
+        bucket.bytes += delta
+        self._bytes += delta
+        self._enforce_budget()
+    
+    def add_reaction(self, message_id, emoji, user_id):
+        """Record that a user reacted to a message"""
+        def change(reactions):
+            users = reactions.setdefault(emoji, [])
+            if user_id not in users:
+                users.append(user_id)
+        self._update_log(message_id, change, create=True)
+    
+    def remove_reaction(self, message_id, emoji, user_id):
+        """Record that a user's reaction was removed, if the message is tracked"""
+        def change(reactions):
+            users = reactions.get(emoji)
+            if users and user_id in users:
+                users.remove(user_id)
+        self._update_log(message_id, change, create=False)
+    
+    def get_reactions(self, message_id):
+        """{emoji: [user ids]} for a message, or None if it is not tracked"""
+        key = (REACTION_HISTORY, message_id)
+        bucket = self._bucket(key, 1, create=False)
+        if bucket is None:
+            return None
+        self._prune_bucket(key, bucket)
+        if not bucket.records:
+            return None
+        return bucket.records[0].reactions
+    
+    def prune(self):
+        """Drop every expired record; returns how many were removed"""
+        before = self.expired
+        for key, bucket in list(self._buckets.items()):
+            self._prune_bucket(key, bucket)
+        return self.expired - before
+    
+    def stats(self):
+        """Current size of the store for diagnostics"""
+        per_kind = {}
+        for key, bucket in self._buckets.items():
+            per_kind[key[0]] = per_kind.get(key[0], 0) + len(bucket.records)
+        return {
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "entries": self._entries,
+            "buckets": len(self._buckets),
+            "per_kind": per_kind,
+            "evicted": self.evicted,
+            "expired": self.expired
+        }
+
+
+async def setup(bot):
+    # This is a helper module, no cog to add
+    pass
@@ -1,6 +1,5 @@
 import discord
-from discord.ext import commands, tasks
-import aiohttp
+from discord.ext import commands
 import json
 import os
 import logging
@@ -9,6 +8,9 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Union
 import re
 
+from core.feeds import FeedProvider
+from core.http import get_http_client
+
 logger = logging.getLogger('bot')
 
 class SoundCloudAPI:
@@ -27,13 +29,12 @@ class SoundCloudAPI:
             'client_id': self.client_id
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{self.base_url}/resolve", params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logger.error(f"Error resolving URL: {response.status}")
-                    return None
+        async with get_http_client().get(f"{self.base_url}/resolve", params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                logger.error(f"Error resolving URL: {response.status}")
+                return None
     
     async def search_tracks(self, query, limit=5):
         """Search for tracks on SoundCloud"""
@@ -43,13 +44,12 @@ class SoundCloudAPI:
             'client_id': self.client_id
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{self.base_url}/tracks", params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logger.error(f"Error searching tracks: {response.status}")
-                    return []
+        async with get_http_client().get(f"{self.base_url}/tracks", params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                logger.error(f"Error searching tracks: {response.status}")
+                return []
     
     async def get_user(self, username):
         """Get a user by username"""
@@ -58,18 +58,17 @@ class SoundCloudAPI:
             'client_id': self.client_id
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{self.base_url}/users", params=params) as response:
-                if response.status == 200:
-                    users = await response.json()
-                    # Find best match
-                    for user in users:
-                        if user.get('username', '').lower() == username.lower():
-                            return user
-                    return users[0] if users else None
-                else:
-                    logger.error(f"Error getting user: {response.status}")
-                    return None
+        async with get_http_client().get(f"{self.base_url}/users", params=params) as response:
+            if response.status == 200:
+                users = await response.json()
+                # Find best match
+                for user in users:
+                    if user.get('username', '').lower() == username.lower():
+                        return user
+                return users[0] if users else None
+            else:
+                logger.error(f"Error getting user: {response.status}")
+                return None
     
     async def get_user_tracks(self, user_id, limit=10):
         """Get a user's tracks"""
@@ -78,13 +77,35 @@ class SoundCloudAPI:
             'client_id': self.client_id
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{self.base_url}/users/{user_id}/tracks", params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logger.error(f"Error getting user tracks: {response.status}")
-                    return []
+        async with get_http_client().get(f"{self.base_url}/users/{user_id}/tracks", params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                logger.error(f"Error getting user tracks: {response.status}")
+                return []
+
+class SoundCloudFeed(FeedProvider):
+    """Feeds new tracks from followed SoundCloud users into the shared feed engine"""
+    
+    name = "soundcloud"
+    interval = 30 * 60
+    
+    def __init__(self, cog):
+        self.cog = cog
+        
+    def accounts(self):
+        """SoundCloud user ids followed in any channel"""
+        user_ids = set()
+        for guild_data in self.cog.notifications.values():
+            for channel_data in guild_data.values():
+                user_ids.update(str(user_data['user_id']) for user_data in channel_data.values())
+        return user_ids
+        
+    async def fetch(self, user_id):
+        return await self.cog.api.get_user_tracks(user_id, limit=3)
+        
+    async def on_new(self, user_id, tracks):
+        await self.cog.notify_new_tracks(user_id, tracks)
 
 class SoundCloud(commands.Cog):
     """SoundCloud integration for Discord"""
@@ -95,7 +116,6 @@ class SoundCloud(commands.Cog):
         self.data_folder = 'data'
         self.data_file = os.path.join(self.data_folder, 'soundcloud.json')
         self.notifications = {}  # guild_id -> { channel_id -> { username -> { message, last_track_id } } }
-        self.check_interval = 30 * 60  # 30 minutes
         
         # Create data directory if it doesn't exist
         if not os.path.exists(self.data_folder):
@@ -103,9 +123,10 @@ class SoundCloud(commands.Cog):
             
         # Load existing data
         self.load_data()
-        
-        # Start background task
-        self.check_for_new_tracks.start()
+    
+    async def cog_load(self):
+        """Poll followed users through the shared feed engine"""
+        self.bot.feeds.register(SoundCloudFeed(self))
     
     def load_data(self):
         """Load notification data from JSON file"""
@@ -123,14 +144,13 @@ class SoundCloud(commands.Cog):
     
     def save_data(self):
         """Save notification data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.notifications, f, indent=4)
-        logger.info("Saved SoundCloud notification data")
+        self.bot.json_store.save(self.data_file, self.notifications)
+        logger.debug("Queued SoundCloud notification data save")
     
     def cog_unload(self):
-        """Save data when cog is unloaded and cancel tasks"""
+        """Save data when cog is unloaded and stop polling"""
         self.save_data()
-        self.check_for_new_tracks.cancel()
+        self.bot.feeds.unregister("soundcloud")
     
     async def get_username_data(self, guild_id, channel_id, username):
         """Get data for a specific username in a channel"""
@@ -182,6 +202,7 @@ class SoundCloud(commands.Cog):
         
         # Save the data
         self.save_data()
+        self.bot.feeds.refresh()
         
         return True, f"Added notification for {user['username']}"
     
@@ -233,47 +254,28 @@ class SoundCloud(commands.Cog):
         
         return True, f"Updated notification message for {username}"
     
-    @tasks.loop(minutes=30)
-    async def check_for_new_tracks(self):
-        """Check for new tracks from monitored users"""
-        logger.info("Checking for new SoundCloud tracks...")
+    async def notify_new_tracks(self, user_id, tracks):
+        """Send new tracks (oldest first) to every channel following a SoundCloud user"""
+        changed = False
         
         for guild_id, guild_data in self.notifications.items():
             for channel_id, channel_data in guild_data.items():
-                # Get the channel
-                channel = self.bot.get_channel(int(channel_id))
-                if not channel:
-                    logger.warning(f"Channel {channel_id} not found, skipping")
-                    continue
-                    
                 for username, user_data in channel_data.items():
-                    try:
-                        # Get the user's tracks
-                        user_id = user_data['user_id']
-                        tracks = await self.api.get_user_tracks(user_id, limit=3)
-                        
-                        if not tracks:
-                            logger.warning(f"No tracks found for {username}, skipping")
-                            continue
-                            
-                        # Check if there are new tracks
-                        last_track_id = user_data.get('last_track_id')
-                        new_tracks = []
+                    if str(user_data['user_id']) != user_id:
+                        continue
                         
-                        for track in tracks:
-                            if str(track['id']) == str(last_track_id):
-                                break
-                            new_tracks.append(track)
-                            
-                        if not new_tracks:
-                            continue
-                            
-                        # Update the last track ID
-                        self.notifications[guild_id][channel_id][username]['last_track_id'] = str(tracks[0]['id'])
-                        self.save_data()
+                    # Update the last track ID
+                    user_data['last_track_id'] = str(tracks[-1]['id'])
+                    changed = True
+                    
+                    # Get the channel
+                    channel = self.bot.get_channel(int(channel_id))
+                    if not channel:
+                        logger.warning(f"Channel {channel_id} not found, skipping")
+                        continue
                         
-                        # Send notifications for new tracks (newest first)
-                        for track in reversed(new_tracks):
+                    for track in tracks:
+                        try:
                             # Format the message
                             message_template = user_data.get('message', "New track from {username}! 🎵")
                             message = message_template.format(
@@ -307,7 +309,7 @@ class SoundCloud(commands.Cog):
                                 # Convert to high-resolution artwork
                                 high_res_artwork = artwork_url.replace('large', 't500x500')
                                 embed.set_thumbnail(url=high_res_artwork)
-                                
+                            
                             # Add footer with timestamp
                             embed.set_footer(
                                 text="SoundCloud", 
@@ -318,18 +320,14 @@ class SoundCloud(commands.Cog):
                             # Send the notification
                             await channel.send(content=message, embed=embed)
                             logger.info(f"Sent notification for new track from {username} in {channel.guild.name}/#{channel.name}")
+                        except Exception as e:
+                            logger.error(f"Error sending track notification for {username}: {str(e)}")
                             
-                            # Small delay between notifications to avoid rate limits
-                            await asyncio.sleep(1)
-                    
-                    except Exception as e:
-                        logger.error(f"Error checking tracks for {username}: {str(e)}")
-    
-    @check_for_new_tracks.before_loop
-    async def before_check_for_new_tracks(self):
-        """Wait for the bot to be ready before starting the task"""
-        await self.bot.wait_until_ready()
-        logger.info("Starting SoundCloud track check task")
+                        # Small delay between notifications to avoid rate limits
+                        await asyncio.sleep(1)
+                        
+        if changed:
+            self.save_data()
     
     @commands.group(name="soundcloud", aliases=["sc"], invoke_without_command=True)
     async def soundcloud(self, ctx, *, query=None):
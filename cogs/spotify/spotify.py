@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import aiohttp
 import base64
 import json
 import os
@@ -9,6 +8,8 @@ import logging
 import asyncio
 from urllib.parse import urlencode
 
+from core.http import get_http_client
+
 logger = logging.getLogger('bot')
 
 class SpotifyAPI:
@@ -50,14 +51,13 @@ class SpotifyAPI:
             'redirect_uri': self.redirect_uri
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.token_url, headers=headers, data=data) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_data = await response.text()
-                    logger.error(f"Error getting token: {error_data}")
-                    return None
+        async with get_http_client().post(self.token_url, headers=headers, data=data) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                error_data = await response.text()
+                logger.error(f"Error getting token: {error_data}")
+                return None
     
     async def refresh_token(self, refresh_token):
         """Refresh an expired access token"""
@@ -75,14 +75,13 @@ class SpotifyAPI:
             'refresh_token': refresh_token
         }
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.token_url, headers=headers, data=data) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    error_data = await response.text()
-                    logger.error(f"Error refreshing token: {error_data}")
-                    return None
+        async with get_http_client().post(self.token_url, headers=headers, data=data) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                error_data = await response.text()
+                logger.error(f"Error refreshing token: {error_data}")
+                return None
     
     async def make_api_request(self, access_token, endpoint, method="GET", data=None, params=None):
         """Make a request to the Spotify API"""
@@ -92,50 +91,24 @@ class SpotifyAPI:
             'Content-Type': 'application/json'
         }
         
-        async with aiohttp.ClientSession() as session:
-            if method == "GET":
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200 or response.status == 201:
-                        return await response.json()
-                    elif response.status == 204:
-                        return True
-                    else:
-                        error_data = await response.text()
-                        logger.error(f"Error making API request: {error_data}")
-                        return None
-            
-            elif method == "POST":
-                async with session.post(url, headers=headers, json=data) as response:
-                    if response.status == 200 or response.status == 201:
-                        return await response.json()
-                    elif response.status == 204:
-                        return True
-                    else:
-                        error_data = await response.text()
-                        logger.error(f"Error making API request: {error_data}")
-                        return None
-            
-            elif method == "PUT":
-                async with session.put(url, headers=headers, json=data) as response:
-                    if response.status == 200 or response.status == 201:
-                        return await response.json()
-                    elif response.status == 204:
-                        return True
-                    else:
-                        error_data = await response.text()
-                        logger.error(f"Error making API request: {error_data}")
-                        return None
-            
-            elif method == "DELETE":
-                async with session.delete(url, headers=headers) as response:
-                    if response.status == 200 or response.status == 201:
-                        return await response.json()
-                    elif response.status == 204:
-                        return True
-                    else:
-                        error_data = await response.text()
-                        logger.error(f"Error making API request: {error_data}")
-                        return None
+        if method == "GET":
+            request_args = {'params': params}
+        elif method in ("POST", "PUT"):
+            request_args = {'json': data}
+        elif method == "DELETE":
+            request_args = {}
+        else:
+            return None
+        
+        async with get_http_client().request(method, url, headers=headers, **request_args) as response:
+            if response.status == 200 or response.status == 201:
+                return await response.json()
+            elif response.status == 204:
+                return True
+            else:
+                error_data = await response.text()
+                logger.error(f"Error making API request: {error_data}")
+                return None
 
 class Spotify(commands.Cog):
     """Control your music on Spotify through commands"""
@@ -175,14 +148,10 @@ class Spotify(commands.Cog):
     
     def save_data(self):
         """Save token data to JSON file"""
-        if not os.path.exists(self.data_folder):
-            os.makedirs(self.data_folder)
-            
-        with open(self.data_file, 'w') as f:
-            data = {
-                'user_tokens': self.user_tokens
-            }
-            json.dump(data, f, indent=4)
+        data = {
+            'user_tokens': self.user_tokens
+        }
+        self.bot.json_store.save(self.data_file, data)
     
     async def cog_unload(self):
         """Save data when cog is unloaded"""
@@ -6,6 +6,8 @@ import os
 import logging
 from datetime import datetime
 
+from .reaction_board import ReactionBoard
+
 logger = logging.getLogger('bot')
 
 # Default clownboard settings
@@ -31,13 +33,26 @@ class ClownBoard(commands.Cog):
         self.bot = bot
         self.data_dir = "data/clownboard"
         self.settings = {}
+        # Structure: {original_message_id: clownboard_message_id}
         self.cached_messages = {}
         
+        # Reaction counts are tallied in memory and board updates coalesced
+        self.tally = ReactionBoard(
+            bot,
+            self.get_guild_settings,
+            self.is_ignored,
+            self.post_to_clownboard,
+            self.remove_from_clownboard
+        )
+        
         # Create data directory if it doesn't exist
         os.makedirs(self.data_dir, exist_ok=True)
         
         # Load settings for all guilds
         self.bot.loop.create_task(self.load_all_settings())
+    
+    def cog_unload(self):
+        self.tally.close()
         
     async def load_all_settings(self):
         """Load settings for all guilds"""
@@ -74,8 +89,7 @@ class ClownBoard(commands.Cog):
         settings_file = os.path.join(self.data_dir, f"{guild_id}.json")
         
         try:
-            with open(settings_file, 'w') as f:
-                json.dump(self.settings[guild_id], f, indent=4)
+            self.bot.json_store.save(settings_file, self.settings[guild_id])
         except Exception as e:
             logger.error(f"Error saving clownboard settings for guild {guild_id}: {e}")
     
@@ -103,101 +117,30 @@ class ClownBoard(commands.Cog):
         if payload.user_id == self.bot.user.id:
             return
             
-        # Get guild settings
-        guild_id = payload.guild_id
-        settings = await self.get_guild_settings(guild_id)
-        
-        # Check if clownboard is set up and not locked
-        if settings["channel_id"] is None or settings["locked"]:
-            return
-            
-        # Check if the emoji matches the clownboard emoji
-        if str(payload.emoji) != settings["emoji"]:
-            return
-            
-        # Get the guild, channel, and message objects
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-            
-        channel = guild.get_channel(payload.channel_id)
-        if not channel:
-            return
-        
-        # Check if the channel is ignored
-        if self.is_ignored(guild_id, channel_id=channel.id):
-            return
-            
-        try:
-            message = await channel.fetch_message(payload.message_id)
-        except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-            return
-            
-        # Check if the message author is ignored
-        author = message.author
-        if self.is_ignored(guild_id, member_id=author.id, role_ids=[role.id for role in author.roles]):
-            return
-            
-        # Get the reaction count for the clownboard emoji
-        reaction_count = 0
-        for reaction in message.reactions:
-            if str(reaction.emoji) == settings["emoji"]:
-                reaction_count = reaction.count
-                break
-                
-        # Check if threshold is met
-        if reaction_count < settings["threshold"]:
-            return
-            
-        # If selfstar is disabled, check if the author reacted to their own message
-        if not settings["selfstar"]:
-            users = [user async for user in reaction.users()]
-            if author in users:
-                reaction_count -= 1
-                if reaction_count < settings["threshold"]:
-                    return
-                    
-        # Post or update the message on the clownboard
-        await self.post_to_clownboard(message, reaction_count, settings)
+        await self.tally.reaction_added(payload)
     
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload):
         """Handle reaction removals for the clownboard"""
-        # Similar logic to on_raw_reaction_add but handles reaction removal
-        guild_id = payload.guild_id
-        settings = await self.get_guild_settings(guild_id)
-        
-        if settings["channel_id"] is None or settings["locked"]:
-            return
-            
-        if str(payload.emoji) != settings["emoji"]:
-            return
-            
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-            
-        channel = guild.get_channel(payload.channel_id)
-        if not channel:
-            return
-            
-        try:
-            message = await channel.fetch_message(payload.message_id)
-        except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+        if payload.user_id == self.bot.user.id:
             return
             
-        reaction_count = 0
-        for reaction in message.reactions:
-            if str(reaction.emoji) == settings["emoji"]:
-                reaction_count = reaction.count
-                break
-                
-        # Check if message needs to be removed from clownboard
-        if reaction_count < settings["threshold"]:
-            await self.remove_from_clownboard(message.id, guild_id, settings)
-        else:
-            # Update the count
-            await self.post_to_clownboard(message, reaction_count, settings)
+        await self.tally.reaction_removed(payload)
+    
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear(self, payload):
+        """Handle all reactions being cleared from a message"""
+        await self.tally.reactions_cleared(payload)
+    
+    @commands.Cog.listener()
+    async def on_raw_reaction_clear_emoji(self, payload):
+        """Handle one emoji being cleared from a message"""
+        await self.tally.reactions_cleared(payload)
+    
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload):
+        """Stop tracking reactions on deleted messages"""
+        self.tally.forget(payload.message_id)
             
     async def post_to_clownboard(self, message, stars, settings):
         """Post or update a message on the clownboard"""
@@ -234,32 +177,21 @@ class ClownBoard(commands.Cog):
             embed.add_field(name="Source", value=f"[Jump to Message]({message.jump_url})", inline=False)
             
         # Check if the message is already in the clownboard
-        clownboard_msg_id = None
-        for key, value in self.cached_messages.items():
-            if value["original_id"] == message.id and value["guild_id"] == message.guild.id:
-                clownboard_msg_id = key
-                break
+        clownboard_msg_id = self.cached_messages.get(message.id)
                 
         try:
             if clownboard_msg_id:
-                # Update existing clownboard message
+                # Update existing clownboard message without fetching it first
                 try:
-                    clownboard_msg = await clownboard_channel.fetch_message(clownboard_msg_id)
-                    await clownboard_msg.edit(embed=embed)
+                    await clownboard_channel.get_partial_message(clownboard_msg_id).edit(embed=embed)
                 except (discord.NotFound, discord.Forbidden, discord.HTTPException):
                     # Message was deleted, create a new one
                     new_msg = await clownboard_channel.send(embed=embed)
-                    self.cached_messages[new_msg.id] = {
-                        "original_id": message.id,
-                        "guild_id": message.guild.id
-                    }
+                    self.cached_messages[message.id] = new_msg.id
             else:
                 # Create new clownboard message
                 new_msg = await clownboard_channel.send(embed=embed)
-                self.cached_messages[new_msg.id] = {
-                    "original_id": message.id,
-                    "guild_id": message.guild.id
-                }
+                self.cached_messages[message.id] = new_msg.id
         except Exception as e:
             logger.error(f"Error posting to clownboard: {e}")
             
@@ -270,18 +202,12 @@ class ClownBoard(commands.Cog):
             return
             
         # Find the clownboard message
-        clownboard_msg_id = None
-        for key, value in self.cached_messages.items():
-            if value["original_id"] == message_id and value["guild_id"] == guild_id:
-                clownboard_msg_id = key
-                break
+        clownboard_msg_id = self.cached_messages.pop(message_id, None)
                 
         if clownboard_msg_id:
             try:
                 # Delete the clownboard message
-                clownboard_msg = await clownboard_channel.fetch_message(clownboard_msg_id)
-                await clownboard_msg.delete()
-                del self.cached_messages[clownboard_msg_id]
+                await clownboard_channel.get_partial_message(clownboard_msg_id).delete()
             except (discord.NotFound, discord.Forbidden, discord.HTTPException):
                 pass
     
@@ -0,0 +1,271 @@
+import discord
+import asyncio
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger('bot')
+
+# Seconds to wait after a reaction before updating the board, so a burst
+# of reactions on one message produces a single edit
+COALESCE_DELAY = 2.0
+# Most messages whose reaction tallies are kept in memory
+MAX_TRACKED_MESSAGES = 5000
+
+
+class MessageTally:
+    """Running reaction count for one message on one board"""
+    
+    __slots__ = ('guild_id', 'channel_id', 'message_id', 'emoji', 'message', 'count',
+                 'author_id', 'author_reacted', 'ignored', 'flush_task', 'stale', 'syncing')
+    
+    def __init__(self, message, emoji, count, ignored):
+        self.guild_id = message.guild.id
+        self.channel_id = message.channel.id
+        self.message_id = message.id
+        self.emoji = emoji
+        self.message = message
+        self.count = count
+        self.author_id = message.author.id
+        # None until we know whether the author reacted to their own message
+        self.author_reacted = None
+        self.ignored = ignored
+        self.flush_task = None
+        # Set when an event raced a fetch, so the count may be off by that event
+        self.stale = False
+        self.syncing = False
+
+
+class ReactionBoard:
+    """Reaction tallying shared by the starboard and the clownboard.
+    
+    The first reaction event for a message fetches it once to seed the
+    count; after that the count is kept up to date from the raw gateway
+    payloads alone, except that an event which raced a fetch makes the next
+    board update re-read the count from the message. Changes are coalesced
+    for ``delay`` seconds and then the board is updated once through the
+    owning cog's ``post`` and ``remove`` callbacks, which take the same
+    arguments as ``post_to_starboard`` and ``remove_from_starboard``.
+    """
+    
+    def __init__(self, bot, get_settings, is_ignored, post, remove,
+                 delay=COALESCE_DELAY, max_tracked=MAX_TRACKED_MESSAGES):
+        self.bot = bot
+        self.get_settings = get_settings
+        self.is_ignored = is_ignored
+        self.post = post
+        self.remove = remove
+        self.delay = delay
+        self.max_tracked = max_tracked
+        
+        self._tallies = OrderedDict()
+        self._seeding = {}
+    
+    async def reaction_added(self, payload):
+        await self._on_reaction(payload, 1)
+    
+    async def reaction_removed(self, payload):
+        await self._on_reaction(payload, -1)
+    
+    async def reactions_cleared(self, payload):
+        """All reactions (or all of one emoji) were removed from a message"""
+        tally = self._tallies.get(payload.message_id)
+        if tally is None:
+            return
+        emoji = getattr(payload, 'emoji', None)
+        if emoji is not None and str(emoji) != tally.emoji:
+            return
+        
+        tally.count = 0
+        tally.author_reacted = False
+        if tally.syncing:
+            tally.stale = True
+        self._schedule(tally)
+    
+    def forget(self, message_id):
+        """Stop tracking a message (e.g. it was deleted)"""
+        tally = self._tallies.pop(message_id, None)
+        if tally is not None and tally.flush_task is not None:
+            tally.flush_task.cancel()
+    
+    def close(self):
+        """Cancel pending board updates (used when the cog unloads)"""
+        for tally in self._tallies.values():
+            if tally.flush_task is not None:
+                tally.flush_task.cancel()
+        self._tallies.clear()
+    
+    async def _on_reaction(self, payload, delta):
+        if not payload.guild_id:
+            return
+        
+        settings = await self.get_settings(payload.guild_id)
+        
+        # Check if the board is set up, not locked, and this is its emoji
+        if settings["channel_id"] is None or settings["locked"]:
+            return
+        
+        emoji = str(payload.emoji)
+        if emoji != settings["emoji"]:
+            return
+        
+        if self.is_ignored(payload.guild_id, channel_id=payload.channel_id):
+            return
+        
+        tally = await self._get_tally(payload, emoji, delta)
+        if tally is None or tally.ignored:
+            return
+        
+        self._schedule(tally)
+    
+    def _apply(self, tally, payload, delta):
+        tally.count = max(0, tally.count + delta)
+        if payload.user_id == tally.author_id:
+            tally.author_reacted = delta > 0
+        if tally.syncing:
+            tally.stale = True
+    
+    async def _get_tally(self, payload, emoji, delta):
+        message_id = payload.message_id
+        
+        tally = self._tallies.get(message_id)
+        if tally is not None and tally.emoji == emoji:
+            self._tallies.move_to_end(message_id)
+            self._apply(tally, payload, delta)
+            return tally
+        
+        # Another event for this message is already fetching it. The fetched
+        # count may or may not include this event, so apply it on top for now
+        # and re-read the count from the message when the board is updated
+        pending = self._seeding.get(message_id)
+        if pending is not None:
+            tally = await asyncio.shield(pending)
+            if tally is not None:
+                self._apply(tally, payload, delta)
+                tally.stale = True
+            return tally
+        
+        task = asyncio.ensure_future(self._seed(payload, emoji, delta))
+        self._seeding[message_id] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._seeding.pop(message_id, None)
+    
+    async def _seed(self, payload, emoji, delta):
+        """Fetch the message once and start tracking its reaction count"""
+        guild = self.bot.get_guild(payload.guild_id)
+        if not guild:
+            return None
+        
+        channel = guild.get_channel_or_thread(payload.channel_id)
+        if not channel:
+            return None
+        
+        try:
+            message = await channel.fetch_message(payload.message_id)
+        except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+            return None
+        
+        # The fetched count already includes the event that triggered the seed
+        count = 0
+        for reaction in message.reactions:
+            if str(reaction.emoji) == emoji:
+                count = reaction.count
+                break
+        
+        author = message.author
+        ignored = self.is_ignored(
+            guild.id,
+            member_id=author.id,
+            role_ids=[role.id for role in getattr(author, 'roles', [])]
+        )
+        
+        tally = MessageTally(message, emoji, count, ignored)
+        if payload.user_id == author.id:
+            tally.author_reacted = delta > 0
+        
+        self._tallies[message.id] = tally
+        while len(self._tallies) > self.max_tracked:
+            self._tallies.popitem(last=False)
+        
+        return tally
+    
+    def _schedule(self, tally):
+        if tally.flush_task is None or tally.flush_task.done():
+            tally.flush_task = asyncio.create_task(self._flush_later(tally))
+    
+    async def _flush_later(self, tally):
+        await asyncio.sleep(self.delay)
+        # Reactions from here on schedule a fresh update
+        tally.flush_task = None
+        try:
+            await self._flush(tally)
+        except Exception as e:
+            logger.error(f"Error updating reaction board for message {tally.message_id}: {e}")
+    
+    async def _author_reacted(self, tally):
+        """Page through the reactors once to see if the author is among them"""
+        for reaction in tally.message.reactions:
+            if str(reaction.emoji) == tally.emoji:
+                async for user in reaction.users():
+                    if user.id == tally.author_id:
+                        return True
+                return False
+        return False
+    
+    async def _resync(self, tally):
+        """Re-read the count from the message after an event raced a fetch"""
+        tally.stale = False
+        guild = self.bot.get_guild(tally.guild_id)
+        channel = guild.get_channel_or_thread(tally.channel_id) if guild else None
+        if not channel:
+            return
+        
+        # Events that arrive during this fetch mark the tally stale again,
+        # and the update they schedule re-syncs once more
+        tally.syncing = True
+        try:
+            message = await channel.fetch_message(tally.message_id)
+        except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+            return
+        finally:
+            tally.syncing = False
+        
+        tally.message = message
+        tally.count = 0
+        for reaction in message.reactions:
+            if str(reaction.emoji) == tally.emoji:
+                tally.count = reaction.count
+                break
+    
+    async def _flush(self, tally):
+        settings = await self.get_settings(tally.guild_id)
+        if settings["channel_id"] is None or settings["locked"] or tally.ignored:
+            return
+        if tally.emoji != settings["emoji"]:
+            return
+        
+        if tally.stale:
+            await self._resync(tally)
+        
+        count = tally.count
+        
+        # If selfstar is disabled, don't count the author's own reaction
+        if not settings["selfstar"] and count >= settings["threshold"]:
+            if tally.author_reacted is None:
+                try:
+                    tally.author_reacted = await self._author_reacted(tally)
+                except (discord.Forbidden, discord.HTTPException):
+                    tally.author_reacted = False
+            if tally.author_reacted:
+                count -= 1
+        
+        if count >= settings["threshold"]:
+            await self.post(tally.message, count, settings)
+        else:
+            await self.remove(tally.message_id, tally.guild_id, settings)
+
+
+async def setup(bot):
+    # This is a helper module, no cog to add
+    pass
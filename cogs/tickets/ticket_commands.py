@@ -37,8 +37,7 @@ class TicketCommands(commands.Cog):
             
     def save_config(self):
         """Save the ticket configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.ticket_config, f, indent=4)
+        self.bot.json_store.save(self.config_file, self.ticket_config)
     
     def get_guild_config(self, guild_id):
         """Get the ticket configuration for a specific guild"""
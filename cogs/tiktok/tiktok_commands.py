@@ -1,14 +1,35 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import json
 import os
 import logging
 import aiohttp
-import asyncio
 from datetime import datetime, timedelta
 
+from core.feeds import FeedProvider, SubscriptionIndex, normalize_handle
+
 logger = logging.getLogger('bot')
 
+class TikTokFeed(FeedProvider):
+    """Feeds TikTok videos from subscribed accounts into the shared feed engine"""
+    
+    name = "tiktok"
+    interval = 30 * 60
+    
+    def __init__(self, cog):
+        self.cog = cog
+        
+    def accounts(self):
+        """Every TikTok user subscribed to in any guild, without the '@'"""
+        return self.cog.subscriptions.accounts()
+        
+    async def fetch(self, username):
+        return await self.cog.get_latest_videos(username, limit=5)
+        
+    async def on_new(self, username, videos):
+        for video in videos:
+            await self.cog.send_video_notifications(username, video)
+
 class TikTokCommands(commands.Cog):
     """Commands for TikTok feed notifications"""
     
@@ -17,13 +38,8 @@ class TikTokCommands(commands.Cog):
         self.data_folder = 'data'
         self.config_file = os.path.join(self.data_folder, 'tiktok_config.json')
         self.tiktok_config = self.load_config()
-        
-        # Check interval for new posts (default: 30 minutes)
-        self.check_interval = 30 * 60  
-        self.last_video_data = {}  # username -> {video_ids: []}
-        
-        # Start the background task
-        self.check_new_videos.start()
+        # Followed account -> [(guild_id, channel_id, message template)]
+        self.subscriptions = SubscriptionIndex(self.tiktok_config, normalize=normalize_handle)
         
     def load_config(self):
         """Load the TikTok configuration from file"""
@@ -42,12 +58,15 @@ class TikTokCommands(commands.Cog):
             
     def save_config(self):
         """Save the TikTok configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.tiktok_config, f, indent=4)
+        self.bot.json_store.save(self.config_file, self.tiktok_config)
             
+    async def cog_load(self):
+        """Poll the subscribed accounts through the shared feed engine"""
+        self.bot.feeds.register(TikTokFeed(self))
+        
     def cog_unload(self):
         """Clean up when the cog is unloaded"""
-        self.check_new_videos.cancel()
+        self.bot.feeds.unregister("tiktok")
         
     async def get_user_info(self, username):
         """Get the TikTok user info for a username"""
@@ -100,137 +119,67 @@ class TikTokCommands(commands.Cog):
         
         return mock_videos
         
-    @tasks.loop(minutes=30)
-    async def check_new_videos(self):
-        """Check for new videos and send notifications"""
-        logger.info("Checking for new TikTok videos...")
+    async def send_video_notifications(self, username, video):
+        """Send notifications for a new video to every channel following the user"""
+        subscriptions = self.subscriptions.get(username)
+        if not subscriptions:
+            return
+            
+        # Create the embed once; every channel gets the same one
+        embed = discord.Embed(
+            title=f"New TikTok from @{username}",
+            url=video['url'],
+            description=video['desc'],
+            color=0xff0050,  # TikTok pink
+            timestamp=datetime.fromisoformat(video['created_at'])
+        )
         
-        all_users = set()
+        user_info = await self.get_user_info(username)
         
-        # Collect all TikTok users across all guilds
-        for guild_id, guild_data in self.tiktok_config.items():
-            if "channels" in guild_data:
-                for discord_channel_id, tiktok_users in guild_data["channels"].items():
-                    all_users.update([u.lower() for u in tiktok_users])
+        # Set author with profile image
+        embed.set_author(
+            name=f"{user_info['display_name']} (@{username})",
+            icon_url=user_info['profile_image'],
+            url=f"https://www.tiktok.com/@{username}"
+        )
         
-        if not all_users:
-            return
+        # Add stats to the footer
+        embed.set_footer(
+            text=f"❤️ {video['like_count']:,} | 💬 {video['comment_count']:,} | 👁️ {video['view_count']:,}",
+            icon_url="https://sf16-scmcdn-sg.ibytedtos.com/goofy/tiktok/web/node/_next/static/images/logo-1d0074407.png"
+        )
+        
+        # Add cover image
+        if video['cover_image']:
+            embed.set_image(url=video['cover_image'])
             
-        for tiktok_user in all_users:
-            try:
-                # Remove '@' from the username if present
-                clean_username = tiktok_user[1:] if tiktok_user.startswith('@') else tiktok_user
-                
-                latest_videos = await self.get_latest_videos(clean_username, limit=5)
-                
-                # Initialize if this is a new user
-                if clean_username not in self.last_video_data:
-                    self.last_video_data[clean_username] = {
-                        'video_ids': [video['id'] for video in latest_videos]
-                    }
-                    continue
-                
-                # Get previously seen video IDs
-                known_video_ids = self.last_video_data[clean_username]['video_ids']
-                
-                # Find new videos
-                for video in latest_videos:
-                    if video['id'] not in known_video_ids:
-                        await self.send_video_notifications(clean_username, video)
-                        known_video_ids.append(video['id'])
-                
-                # Update last video data (keep only last 20 videos to prevent unlimited growth)
-                self.last_video_data[clean_username]['video_ids'] = known_video_ids[:20]
-                
-                # Small delay between API calls to avoid rate limits
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error checking videos for {tiktok_user}: {str(e)}")
-    
-    @check_new_videos.before_loop
-    async def before_check_new_videos(self):
-        """Wait until the bot is ready before starting the task"""
-        await self.bot.wait_until_ready()
-        logger.info("Starting TikTok video check task")
-    
-    async def send_video_notifications(self, username, video):
-        """Send notifications for a new video"""
-        username_lower = username.lower()
+        # Add music field
+        embed.add_field(
+            name="🎵 Music",
+            value=video['music'],
+            inline=True
+        )
         
-        for guild_id, guild_data in self.tiktok_config.items():
-            if "channels" not in guild_data:
-                continue
-                
-            for discord_channel_id, tiktok_users in guild_data["channels"].items():
-                if username_lower not in [u.lower() for u in tiktok_users]:
-                    continue
-                    
-                # Get the Discord channel
-                channel = self.bot.get_channel(int(discord_channel_id))
-                if not channel:
-                    logger.warning(f"Channel {discord_channel_id} not found, skipping")
-                    continue
-                
-                # Create embed
-                embed = discord.Embed(
-                    title=f"New TikTok from @{username}",
-                    url=video['url'],
-                    description=video['desc'],
-                    color=0xff0050,  # TikTok pink
-                    timestamp=datetime.fromisoformat(video['created_at'])
-                )
-                
-                user_info = await self.get_user_info(username)
-                
-                # Set author with profile image
-                embed.set_author(
-                    name=f"{user_info['display_name']} (@{username})",
-                    icon_url=user_info['profile_image'],
-                    url=f"https://www.tiktok.com/@{username}"
-                )
-                
-                # Add stats to the footer
-                embed.set_footer(
-                    text=f"❤️ {video['like_count']:,} | 💬 {video['comment_count']:,} | 👁️ {video['view_count']:,}",
-                    icon_url="https://sf16-scmcdn-sg.ibytedtos.com/goofy/tiktok/web/node/_next/static/images/logo-1d0074407.png"
-                )
-                
-                # Add cover image
-                if video['cover_image']:
-                    embed.set_image(url=video['cover_image'])
-                    
-                # Add music field
-                embed.add_field(
-                    name="🎵 Music",
-                    value=video['music'],
-                    inline=True
-                )
-                
-                # Add duration field
-                embed.add_field(
-                    name="⏱️ Duration",
-                    value=f"{video['duration']} seconds",
-                    inline=True
-                )
-                
-                # Get custom message if set
-                custom_message = None
-                if "messages" in guild_data and username_lower in guild_data["messages"]:
-                    custom_message = guild_data["messages"][username_lower]
-                
-                # Format the message content
-                content = custom_message or f"🎵 New TikTok from **@{username}**"
-                
-                # Send notification
-                try:
-                    await channel.send(content=content, embed=embed)
-                    logger.info(f"Sent TikTok notification for @{username} in guild {guild_id}, channel {discord_channel_id}")
-                except Exception as e:
-                    logger.error(f"Error sending notification: {str(e)}")
+        # Add duration field
+        embed.add_field(
+            name="⏱️ Duration",
+            value=f"{video['duration']} seconds",
+            inline=True
+        )
+        
+        async def send(guild_id, discord_channel_id, custom_message):
+            # Get the Discord channel
+            channel = self.bot.get_channel(int(discord_channel_id))
+            if not channel:
+                logger.warning(f"Channel {discord_channel_id} not found, skipping")
+                return False
                 
-                # Small delay between notifications
-                await asyncio.sleep(1)
+            # Format the message content
+            content = custom_message or f"🎵 New TikTok from **@{username}**"
+            await channel.send(content=content, embed=embed)
+            
+        sent, failed = await self.bot.feeds.deliver("tiktok", subscriptions, send)
+        logger.info(f"Sent TikTok notification for @{username} to {sent} channels ({failed} failed)")
             
     @commands.command(name="tiktok")
     async def tiktok_user(self, ctx, username: str = None):
@@ -410,11 +359,13 @@ class TikTokCommands(commands.Cog):
             
         if clean_username.lower() not in [name.lower() for name in self.tiktok_config[guild_id]["channels"][channel_id]]:
             self.tiktok_config[guild_id]["channels"][channel_id].append(clean_username)
+            self.subscriptions.add(guild_id, channel_id, clean_username, self.tiktok_config[guild_id].get("messages"))
             await ctx.send(f"✅ Added TikTok feed for `@{clean_username}` in {channel.mention}")
         else:
             await ctx.send(f"TikTok feed for `@{clean_username}` already exists in {channel.mention}")
             
         self.save_config()
+        self.bot.feeds.refresh()
 
     @tiktok_group.command(name="remove")
     @commands.has_permissions(manage_channels=True)
@@ -434,6 +385,7 @@ class TikTokCommands(commands.Cog):
             for i, name in enumerate(tiktok_users):
                 if name.lower() == clean_username.lower():
                     self.tiktok_config[guild_id]["channels"][channel_id].pop(i)
+                    self.subscriptions.remove(guild_id, channel_id, name)
                     await ctx.send(f"✅ Removed TikTok feed for `@{name}` from {channel.mention}")
                     
                     # Clean up empty entries
@@ -489,6 +441,7 @@ class TikTokCommands(commands.Cog):
         
         if guild_id in self.tiktok_config:
             del self.tiktok_config[guild_id]
+            self.subscriptions.remove_guild(guild_id)
             self.save_config()
             await ctx.send("✅ All TikTok feed configurations have been reset.")
         else:
@@ -66,20 +66,8 @@ class Utility(commands.Cog):
         emoji_count = len(guild.emojis)
         
         # Count members by status if possible
-        online = 0
-        idle = 0
-        dnd = 0
-        offline = 0
-        
-        for member in guild.members:
-            if member.status == discord.Status.online:
-                online += 1
-            elif member.status == discord.Status.idle:
-                idle += 1
-            elif member.status == discord.Status.dnd:
-                dnd += 1
-            else:
-                offline += 1
+        stats = self.bot.member_stats.get(guild)
+        statuses = stats.status_counts()
                 
         # Create the embed
         embed = discord.Embed(
@@ -98,12 +86,12 @@ class Utility(commands.Cog):
         
         # Member counts
         embed.add_field(name="Total Members", value=guild.member_count, inline=True)
-        embed.add_field(name="Humans", value=len([m for m in guild.members if not m.bot]), inline=True)
-        embed.add_field(name="Bots", value=len([m for m in guild.members if m.bot]), inline=True)
+        embed.add_field(name="Humans", value=stats.humans, inline=True)
+        embed.add_field(name="Bots", value=stats.bots, inline=True)
         
         # Status counts
         embed.add_field(name="Member Status", 
-            value=f"🟢 {online} 🟠 {idle} 🔴 {dnd} ⚫ {offline}", 
+            value=f"🟢 {statuses['online']} 🟠 {statuses['idle']} 🔴 {statuses['dnd']} ⚫ {statuses['offline']}", 
             inline=False)
         
         # Channel and role counts
@@ -291,8 +279,9 @@ class Utility(commands.Cog):
         guild = ctx.guild
         
         total = guild.member_count
-        humans = len([m for m in guild.members if not m.bot])
-        bots = len([m for m in guild.members if m.bot])
+        stats = self.bot.member_stats.get(guild)
+        humans = stats.humans
+        bots = stats.bots
         
         embed = discord.Embed(
             title=f"{guild.name} Member Count",
@@ -308,10 +297,11 @@ class Utility(commands.Cog):
         embed.add_field(name="Bots", value=bots, inline=True)
         
         # Calculate online counts if available
-        online = len([m for m in guild.members if m.status == discord.Status.online])
-        idle = len([m for m in guild.members if m.status == discord.Status.idle])
-        dnd = len([m for m in guild.members if m.status == discord.Status.dnd])
-        offline = len([m for m in guild.members if m.status == discord.Status.offline])
+        statuses = stats.status_counts()
+        online = statuses["online"]
+        idle = statuses["idle"]
+        dnd = statuses["dnd"]
+        offline = statuses["offline"]
         
         embed.add_field(name="Online", value=f"🟢 {online}", inline=True)
         embed.add_field(name="Idle", value=f"🟠 {idle}", inline=True)
@@ -57,6 +57,9 @@ class VoiceMaster(commands.Cog):
         self.active_channels = {}  # channel_id -> VoiceChannel
         self.voice_create_channels = {}  # guild_id -> channel_id
         self.guild_settings = {}  # guild_id -> settings dict
+        # Reverse indexes so voice events never scan every managed channel
+        self.create_channel_ids = set()  # ids of all "Create Voice Channel" channels
+        self.member_channels = {}  # (guild_id, member_id) -> managed channel_id they are in
         self.load_data()
         
     def load_data(self):
@@ -76,6 +79,7 @@ class VoiceMaster(commands.Cog):
                     # Load voice create channels
                     for guild_id, channel_id in data.get('voice_create_channels', {}).items():
                         self.voice_create_channels[int(guild_id)] = int(channel_id)
+                        self.create_channel_ids.add(int(channel_id))
                         
                     # Load guild settings
                     for guild_id, settings in data.get('guild_settings', {}).items():
@@ -91,35 +95,34 @@ class VoiceMaster(commands.Cog):
             self.guild_settings = {}
             
     def save_data(self):
-        """Save voicemaster data to JSON file"""
-        try:
-            with open(self.data_file, 'w') as f:
-                # Convert active channels to dict of dicts
-                active_channels_dict = {
-                    str(channel_id): channel.to_dict() 
-                    for channel_id, channel in self.active_channels.items()
-                }
-                
-                # Convert other dictionaries to use string keys
-                voice_create_dict = {
-                    str(guild_id): channel_id
-                    for guild_id, channel_id in self.voice_create_channels.items()
-                }
-                
-                guild_settings_dict = {
-                    str(guild_id): settings
-                    for guild_id, settings in self.guild_settings.items()
-                }
-                
-                data = {
-                    'active_channels': active_channels_dict,
-                    'voice_create_channels': voice_create_dict,
-                    'guild_settings': guild_settings_dict
-                }
-                
-                json.dump(data, f, indent=4)
-        except Exception as e:
-            logger.error(f"Error saving voicemaster data: {e}")
+        """Save voicemaster data; the shared store coalesces bursts of changes into one atomic write"""
+        self.bot.json_store.save(self.data_file, self._serialize())
+    
+    def _serialize(self):
+        # Convert active channels to dict of dicts
+        active_channels_dict = {
+            str(channel_id): channel.to_dict() 
+            for channel_id, channel in self.active_channels.items()
+        }
+        
+        # Convert other dictionaries to use string keys
+        voice_create_dict = {
+            str(guild_id): channel_id
+            for guild_id, channel_id in self.voice_create_channels.items()
+        }
+        
+        guild_settings_dict = {
+            str(guild_id): settings
+            for guild_id, settings in self.guild_settings.items()
+        }
+        
+        data = {
+            'active_channels': active_channels_dict,
+            'voice_create_channels': voice_create_dict,
+            'guild_settings': guild_settings_dict
+        }
+        
+        return data
 
     def get_default_settings(self):
         """Get default settings for a guild"""
@@ -149,8 +152,10 @@ class VoiceMaster(commands.Cog):
         # Create "Create Voice Channel" voice channel
         create_channel = await ctx.guild.create_voice_channel("➕ Create Voice Channel", category=category)
         
-        # Save settings
+        # Save settings, replacing any create channel that no longer exists
+        self.create_channel_ids.discard(self.voice_create_channels.get(guild_id))
         self.voice_create_channels[guild_id] = create_channel.id
+        self.create_channel_ids.add(create_channel.id)
         
         settings = self.get_default_settings()
         settings['category_id'] = category.id
@@ -166,7 +171,13 @@ class VoiceMaster(commands.Cog):
         if before.channel == after.channel:
             return  # No channel change
             
-        if after.channel and after.channel.id in self.voice_create_channels.values():
+        # Keep the member -> managed channel index current
+        if before.channel and self.member_channels.get((member.guild.id, member.id)) == before.channel.id:
+            del self.member_channels[(member.guild.id, member.id)]
+        if after.channel and after.channel.id in self.active_channels:
+            self.member_channels[(member.guild.id, member.id)] = after.channel.id
+            
+        if after.channel and after.channel.id in self.create_channel_ids:
             # User joined a create channel, create a new voice channel for them
             await self.create_voice_channel(member, after.channel)
             
@@ -215,12 +226,7 @@ class VoiceMaster(commands.Cog):
                     role = member.guild.get_role(default_role_id)
                     if role:
                         # Check if the member is in any other managed voice channels
-                        in_other_channel = False
-                        for channel_id in self.active_channels.keys():
-                            channel = self.bot.get_channel(channel_id)
-                            if channel and member in channel.members:
-                                in_other_channel = True
-                                break
+                        in_other_channel = self.member_channels.get((member.guild.id, member.id)) in self.active_channels
                                 
                         if not in_other_channel:
                             await member.remove_roles(role, reason="Left all voice channels with default role")
@@ -514,7 +520,7 @@ class VoiceMaster(commands.Cog):
                     
                 # Remove voice create channel
                 if guild_id in self.voice_create_channels:
-                    del self.voice_create_channels[guild_id]
+                    self.create_channel_ids.discard(self.voice_create_channels.pop(guild_id))
                     
                 # Save data
                 self.save_data()
@@ -1635,17 +1641,27 @@ class VoiceMaster(commands.Cog):
                 
         for guild_id in guild_ids_to_remove:
             logger.info(f"Removing non-existent create channel for guild {guild_id}")
-            del self.voice_create_channels[guild_id]
+            self.create_channel_ids.discard(self.voice_create_channels.pop(guild_id))
             
         # Save if we made changes
         if to_remove or guild_ids_to_remove:
             self.save_data()
     
+    def index_channel_members(self):
+        """Rebuild the member -> managed channel index from current voice states"""
+        self.member_channels = {}
+        for channel_id in self.active_channels:
+            channel = self.bot.get_channel(channel_id)
+            if channel:
+                for member in channel.members:
+                    self.member_channels[(channel.guild.id, member.id)] = channel_id
+    
     # Run cleanup when bot is ready
     @commands.Cog.listener()
     async def on_ready(self):
         """Called when the bot is ready"""
         self.cleanup_non_existent_channels()
+        self.index_channel_members()
         logger.info("VoiceMaster cog is ready, data cleaned up")
 
 async def setup(bot):
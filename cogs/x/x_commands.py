@@ -1,14 +1,35 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import json
 import os
 import logging
 import aiohttp
-import asyncio
 from datetime import datetime, timedelta
 
+from core.feeds import FeedProvider, SubscriptionIndex, normalize_handle
+
 logger = logging.getLogger('bot')
 
+class XFeed(FeedProvider):
+    """Feeds X posts from subscribed accounts into the shared feed engine"""
+    
+    name = "x"
+    interval = 15 * 60
+    
+    def __init__(self, cog):
+        self.cog = cog
+        
+    def accounts(self):
+        """Every X user subscribed to in any guild, without the '@'"""
+        return self.cog.subscriptions.accounts()
+        
+    async def fetch(self, username):
+        return await self.cog.get_latest_posts(username, limit=5)
+        
+    async def on_new(self, username, posts):
+        for post in posts:
+            await self.cog.send_post_notifications(username, post)
+
 class XCommands(commands.Cog):
     """Commands for X (Twitter) feed notifications"""
     
@@ -17,13 +38,8 @@ class XCommands(commands.Cog):
         self.data_folder = 'data'
         self.config_file = os.path.join(self.data_folder, 'x_config.json')
         self.x_config = self.load_config()
-        
-        # Check interval for new posts (default: 15 minutes)
-        self.check_interval = 15 * 60  
-        self.last_post_data = {}  # username -> {post_ids: []}
-        
-        # Start the background task
-        self.check_new_posts.start()
+        # Followed account -> [(guild_id, channel_id, message template)]
+        self.subscriptions = SubscriptionIndex(self.x_config, normalize=normalize_handle)
         
     def load_config(self):
         """Load the X configuration from file"""
@@ -42,12 +58,15 @@ class XCommands(commands.Cog):
             
     def save_config(self):
         """Save the X configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.x_config, f, indent=4)
+        self.bot.json_store.save(self.config_file, self.x_config)
             
+    async def cog_load(self):
+        """Poll the subscribed accounts through the shared feed engine"""
+        self.bot.feeds.register(XFeed(self))
+        
     def cog_unload(self):
         """Clean up when the cog is unloaded"""
-        self.check_new_posts.cancel()
+        self.bot.feeds.unregister("x")
         
     async def get_user_info(self, username):
         """Get the X user info for a username"""
@@ -97,123 +116,53 @@ class XCommands(commands.Cog):
         
         return mock_posts
         
-    @tasks.loop(minutes=15)
-    async def check_new_posts(self):
-        """Check for new posts and send notifications"""
-        logger.info("Checking for new X posts...")
+    async def send_post_notifications(self, username, post):
+        """Send notifications for a new post to every channel following the user"""
+        subscriptions = self.subscriptions.get(username)
+        if not subscriptions:
+            return
+            
+        # Create the embed once; every channel gets the same one
+        embed = discord.Embed(
+            title=f"New post from @{username}",
+            url=post['url'],
+            description=post['text'],
+            color=discord.Color.blue(),
+            timestamp=datetime.fromisoformat(post['created_at'])
+        )
         
-        all_users = set()
+        user_info = await self.get_user_info(username)
         
-        # Collect all X users across all guilds
-        for guild_id, guild_data in self.x_config.items():
-            if "channels" in guild_data:
-                for discord_channel_id, x_users in guild_data["channels"].items():
-                    all_users.update([u.lower() for u in x_users])
+        # Set author with profile image
+        embed.set_author(
+            name=f"{user_info['display_name']} (@{username})",
+            icon_url=user_info['profile_image'],
+            url=f"https://x.com/{username}"
+        )
         
-        if not all_users:
-            return
-            
-        for x_user in all_users:
-            try:
-                # Remove '@' from the username if present
-                clean_username = x_user[1:] if x_user.startswith('@') else x_user
-                
-                latest_posts = await self.get_latest_posts(clean_username, limit=5)
-                
-                # Initialize if this is a new user
-                if clean_username not in self.last_post_data:
-                    self.last_post_data[clean_username] = {
-                        'post_ids': [post['id'] for post in latest_posts]
-                    }
-                    continue
-                
-                # Get previously seen post IDs
-                known_post_ids = self.last_post_data[clean_username]['post_ids']
-                
-                # Find new posts
-                for post in latest_posts:
-                    if post['id'] not in known_post_ids:
-                        await self.send_post_notifications(clean_username, post)
-                        known_post_ids.append(post['id'])
-                
-                # Update last post data (keep only last 20 posts to prevent unlimited growth)
-                self.last_post_data[clean_username]['post_ids'] = known_post_ids[:20]
-                
-                # Small delay between API calls to avoid rate limits
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error checking posts for {x_user}: {str(e)}")
-    
-    @check_new_posts.before_loop
-    async def before_check_new_posts(self):
-        """Wait until the bot is ready before starting the task"""
-        await self.bot.wait_until_ready()
-        logger.info("Starting X post check task")
-    
-    async def send_post_notifications(self, username, post):
-        """Send notifications for a new post"""
-        username_lower = username.lower()
+        # Add stats to the footer
+        embed.set_footer(
+            text=f"❤️ {post['like_count']} | 🔁 {post['repost_count']} | 💬 {post['reply_count']}",
+            icon_url="https://abs.twimg.com/responsive-web/client-web/icon-default.522d363a.png"
+        )
         
-        for guild_id, guild_data in self.x_config.items():
-            if "channels" not in guild_data:
-                continue
-                
-            for discord_channel_id, x_users in guild_data["channels"].items():
-                if username_lower not in [u.lower() for u in x_users]:
-                    continue
-                    
-                # Get the Discord channel
-                channel = self.bot.get_channel(int(discord_channel_id))
-                if not channel:
-                    logger.warning(f"Channel {discord_channel_id} not found, skipping")
-                    continue
-                
-                # Create embed
-                embed = discord.Embed(
-                    title=f"New post from @{username}",
-                    url=post['url'],
-                    description=post['text'],
-                    color=discord.Color.blue(),
-                    timestamp=datetime.fromisoformat(post['created_at'])
-                )
-                
-                user_info = await self.get_user_info(username)
-                
-                # Set author with profile image
-                embed.set_author(
-                    name=f"{user_info['display_name']} (@{username})",
-                    icon_url=user_info['profile_image'],
-                    url=f"https://x.com/{username}"
-                )
-                
-                # Add stats to the footer
-                embed.set_footer(
-                    text=f"❤️ {post['like_count']} | 🔁 {post['repost_count']} | 💬 {post['reply_count']}",
-                    icon_url="https://abs.twimg.com/responsive-web/client-web/icon-default.522d363a.png"
-                )
-                
-                # Add media if available
-                if post['media'] and len(post['media']) > 0:
-                    embed.set_image(url=post['media'][0])
-                
-                # Get custom message if set
-                custom_message = None
-                if "messages" in guild_data and username_lower in guild_data["messages"]:
-                    custom_message = guild_data["messages"][username_lower]
-                
-                # Format the message content
-                content = custom_message or f"🔔 New post from **@{username}**"
-                
-                # Send notification
-                try:
-                    await channel.send(content=content, embed=embed)
-                    logger.info(f"Sent post notification for @{username} in guild {guild_id}, channel {discord_channel_id}")
-                except Exception as e:
-                    logger.error(f"Error sending notification: {str(e)}")
+        # Add media if available
+        if post['media'] and len(post['media']) > 0:
+            embed.set_image(url=post['media'][0])
+        
+        async def send(guild_id, discord_channel_id, custom_message):
+            # Get the Discord channel
+            channel = self.bot.get_channel(int(discord_channel_id))
+            if not channel:
+                logger.warning(f"Channel {discord_channel_id} not found, skipping")
+                return False
                 
-                # Small delay between notifications
-                await asyncio.sleep(1)
+            # Format the message content
+            content = custom_message or f"🔔 New post from **@{username}**"
+            await channel.send(content=content, embed=embed)
+            
+        sent, failed = await self.bot.feeds.deliver("x", subscriptions, send)
+        logger.info(f"Sent post notification for @{username} to {sent} channels ({failed} failed)")
             
     @commands.group(name="x", invoke_without_command=True)
     async def x_group(self, ctx, username: str = None):
@@ -350,11 +299,13 @@ class XCommands(commands.Cog):
             
         if clean_username.lower() not in [name.lower() for name in self.x_config[guild_id]["channels"][channel_id]]:
             self.x_config[guild_id]["channels"][channel_id].append(clean_username)
+            self.subscriptions.add(guild_id, channel_id, clean_username, self.x_config[guild_id].get("messages"))
             await ctx.send(f"✅ Added X feed for `@{clean_username}` in {channel.mention}")
         else:
             await ctx.send(f"X feed for `@{clean_username}` already exists in {channel.mention}")
             
         self.save_config()
+        self.bot.feeds.refresh()
 
     @x_group.command(name="remove")
     @commands.has_permissions(manage_channels=True)
@@ -374,6 +325,7 @@ class XCommands(commands.Cog):
             for i, name in enumerate(x_users):
                 if name.lower() == clean_username.lower():
                     self.x_config[guild_id]["channels"][channel_id].pop(i)
+                    self.subscriptions.remove(guild_id, channel_id, name)
                     await ctx.send(f"✅ Removed X feed for `@{name}` from {channel.mention}")
                     
                     # Clean up empty entries
@@ -429,6 +381,7 @@ class XCommands(commands.Cog):
         
         if guild_id in self.x_config:
             del self.x_config[guild_id]
+            self.subscriptions.remove_guild(guild_id)
             self.save_config()
             await ctx.send("✅ All X feed configurations have been reset.")
         else:
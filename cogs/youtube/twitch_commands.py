@@ -1,14 +1,49 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import json
 import os
 import logging
 import aiohttp
-import asyncio
 from datetime import datetime
 
+from core.feeds import FeedProvider, SubscriptionIndex
+
 logger = logging.getLogger('bot')
 
+class TwitchFeed(FeedProvider):
+    """Feeds stream-start events for subscribed Twitch streamers into the shared feed engine.
+    
+    A live stream is a single item that disappears when the stream ends, so
+    going live again is seen as new.
+    """
+    
+    name = "twitch"
+    interval = 5 * 60
+    min_interval = 2 * 60
+    max_interval = 15 * 60
+    seed_silently = False
+    forget_missing = True
+    
+    def __init__(self, cog):
+        self.cog = cog
+        
+    def accounts(self):
+        """Every streamer subscribed to in any guild"""
+        return self.cog.subscriptions.accounts()
+        
+    async def fetch(self, streamer):
+        stream_info = await self.cog.check_stream_status(streamer)
+        if not stream_info:
+            return None
+        return [stream_info] if stream_info['is_live'] else []
+        
+    def item_id(self, stream_info):
+        return "live"
+        
+    async def on_new(self, streamer, streams):
+        for stream_info in streams:
+            await self.cog.send_stream_notifications(streamer, stream_info)
+
 class TwitchCommands(commands.Cog):
     """Commands for Twitch stream notifications"""
     
@@ -17,13 +52,8 @@ class TwitchCommands(commands.Cog):
         self.data_folder = 'data'
         self.config_file = os.path.join(self.data_folder, 'twitch_config.json')
         self.twitch_config = self.load_config()
-        
-        # Stream check settings
-        self.check_interval = 5 * 60  # 5 minutes
-        self.streamer_status = {}  # username -> {is_live, last_checked, stream_data}
-        
-        # Start the background task
-        self.check_live_streams.start()
+        # Followed account -> [(guild_id, channel_id, message template)]
+        self.subscriptions = SubscriptionIndex(self.twitch_config)
         
     def load_config(self):
         """Load the Twitch configuration from file"""
@@ -42,12 +72,15 @@ class TwitchCommands(commands.Cog):
             
     def save_config(self):
         """Save the Twitch configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.twitch_config, f, indent=4)
+        self.bot.json_store.save(self.config_file, self.twitch_config)
             
+    async def cog_load(self):
+        """Poll the subscribed streamers through the shared feed engine"""
+        self.bot.feeds.register(TwitchFeed(self))
+        
     def cog_unload(self):
         """Clean up when the cog is unloaded"""
-        self.check_live_streams.cancel()
+        self.bot.feeds.unregister("twitch")
         
     async def check_stream_status(self, username):
         """Check if a Twitch user is currently streaming"""
@@ -85,118 +118,51 @@ class TwitchCommands(commands.Cog):
             logger.error(f"Error checking stream status for {username}: {str(e)}")
             return None
     
-    @tasks.loop(minutes=5)
-    async def check_live_streams(self):
-        """Check for live streams and send notifications"""
-        logger.info("Checking for Twitch live streams...")
+    async def send_stream_notifications(self, streamer, stream_info):
+        """Send notifications for a live stream to every channel following the streamer"""
+        subscriptions = self.subscriptions.get(streamer)
+        if not subscriptions:
+            return
+            
+        # Create the embed once; every channel gets the same one
+        embed = discord.Embed(
+            title=stream_info['title'],
+            url=f"https://twitch.tv/{streamer}",
+            description=f"**{stream_info['display_name']}** is now live on Twitch!",
+            color=discord.Color.purple(),
+            timestamp=datetime.now()
+        )
         
-        all_streamers = set()
+        if stream_info['game']:
+            embed.add_field(name="Game", value=stream_info['game'], inline=True)
+            
+        embed.add_field(name="Viewers", value=f"{stream_info['viewer_count']:,}", inline=True)
         
-        # Collect all streamers across all guilds and channels
-        for guild_id, guild_data in self.twitch_config.items():
-            if "channels" in guild_data:
-                for channel_id, streamers in guild_data["channels"].items():
-                    all_streamers.update([s.lower() for s in streamers])
+        if stream_info['thumbnail']:
+            embed.set_image(url=stream_info['thumbnail'])
+            
+        if stream_info['profile_image']:
+            embed.set_author(
+                name=stream_info['display_name'],
+                icon_url=stream_info['profile_image'],
+                url=f"https://twitch.tv/{streamer}"
+            )
         
-        if not all_streamers:
-            return
-            
-        for streamer in all_streamers:
-            try:
-                # Check if streamer is live
-                stream_info = await self.check_stream_status(streamer)
-                
-                if not stream_info:
-                    continue
-                    
-                # Get previous status
-                was_live = self.streamer_status.get(streamer, {}).get('is_live', False)
-                currently_live = stream_info['is_live']
-                
-                # Only notify if stream just started (changed from offline to online)
-                if currently_live and not was_live:
-                    await self.send_stream_notifications(streamer, stream_info)
-                
-                # Update status cache
-                self.streamer_status[streamer] = {
-                    'is_live': currently_live,
-                    'last_checked': datetime.now().isoformat(),
-                    'stream_data': stream_info if currently_live else None
-                }
-                
-                # Small delay between API calls to avoid rate limits
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error processing stream status for {streamer}: {str(e)}")
-    
-    @check_live_streams.before_loop
-    async def before_check_live_streams(self):
-        """Wait until the bot is ready before starting the task"""
-        await self.bot.wait_until_ready()
-        logger.info("Starting Twitch stream check task")
-    
-    async def send_stream_notifications(self, streamer, stream_info):
-        """Send notifications for a live stream"""
-        streamer_lower = streamer.lower()
+        embed.set_footer(text="Twitch", icon_url="https://brand.twitch.tv/assets/images/favicon.png")
         
-        for guild_id, guild_data in self.twitch_config.items():
-            if "channels" not in guild_data:
-                continue
-                
-            for discord_channel_id, streamers in guild_data["channels"].items():
-                if streamer_lower not in [s.lower() for s in streamers]:
-                    continue
-                    
-                # Get the channel
-                channel = self.bot.get_channel(int(discord_channel_id))
-                if not channel:
-                    logger.warning(f"Channel {discord_channel_id} not found, skipping")
-                    continue
+        async def send(guild_id, discord_channel_id, custom_message):
+            # Get the Discord channel
+            channel = self.bot.get_channel(int(discord_channel_id))
+            if not channel:
+                logger.warning(f"Channel {discord_channel_id} not found, skipping")
+                return False
                 
-                # Get custom message if set
-                custom_message = None
-                if "messages" in guild_data and streamer_lower in guild_data["messages"]:
-                    custom_message = guild_data["messages"][streamer_lower]
-                
-                # Create embed
-                embed = discord.Embed(
-                    title=stream_info['title'],
-                    url=f"https://twitch.tv/{streamer}",
-                    description=f"**{stream_info['display_name']}** is now live on Twitch!",
-                    color=discord.Color.purple(),
-                    timestamp=datetime.now()
-                )
-                
-                if stream_info['game']:
-                    embed.add_field(name="Game", value=stream_info['game'], inline=True)
-                    
-                embed.add_field(name="Viewers", value=f"{stream_info['viewer_count']:,}", inline=True)
-                
-                if stream_info['thumbnail']:
-                    embed.set_image(url=stream_info['thumbnail'])
-                    
-                if stream_info['profile_image']:
-                    embed.set_author(
-                        name=stream_info['display_name'],
-                        icon_url=stream_info['profile_image'],
-                        url=f"https://twitch.tv/{streamer}"
-                    )
-                
-                embed.set_footer(text="Twitch", icon_url="https://brand.twitch.tv/assets/images/favicon.png")
-                
-                # Format the message content with stream information
-                content = self.format_message(custom_message, stream_info) if custom_message else f"🔴 **{stream_info['display_name']}** is now live on Twitch!"
-                
-                # Send notification
-                try:
-                    await channel.send(content=content, embed=embed)
-                    logger.info(f"Sent stream notification for {streamer} in guild {guild_id}, channel {discord_channel_id}")
-                except Exception as e:
-                    logger.error(f"Error sending notification: {str(e)}")
-                
-                # Small delay between notifications
-                await asyncio.sleep(1)
+            # Format the message content
+            content = self.format_message(custom_message, stream_info) if custom_message else f"🔴 **{stream_info['display_name']}** is now live on Twitch!"
+            await channel.send(content=content, embed=embed)
+            
+        sent, failed = await self.bot.feeds.deliver("twitch", subscriptions, send)
+        logger.info(f"Sent stream notification for {streamer} to {sent} channels ({failed} failed)")
             
     def format_message(self, message_template, stream_info):
         """Format a message with stream information"""
@@ -304,11 +270,13 @@ class TwitchCommands(commands.Cog):
             
         if username.lower() not in [name.lower() for name in self.twitch_config[guild_id]["channels"][channel_id]]:
             self.twitch_config[guild_id]["channels"][channel_id].append(username)
+            self.subscriptions.add(guild_id, channel_id, username, self.twitch_config[guild_id].get("messages"))
             await ctx.send(f"✅ Added Twitch notifications for `{username}` in {channel.mention}")
         else:
             await ctx.send(f"Twitch notifications for `{username}` already exist in {channel.mention}")
             
         self.save_config()
+        self.bot.feeds.refresh()
 
     @twitch_group.command(name="remove")
     @commands.has_permissions(manage_channels=True)
@@ -325,6 +293,7 @@ class TwitchCommands(commands.Cog):
             for i, name in enumerate(streamers):
                 if name.lower() == username.lower():
                     self.twitch_config[guild_id]["channels"][channel_id].pop(i)
+                    self.subscriptions.remove(guild_id, channel_id, name)
                     await ctx.send(f"✅ Removed Twitch notifications for `{name}` from {channel.mention}")
                     
                     # Clean up empty entries
@@ -380,6 +349,7 @@ class TwitchCommands(commands.Cog):
         
         if guild_id in self.twitch_config:
             del self.twitch_config[guild_id]
+            self.subscriptions.remove_guild(guild_id)
             self.save_config()
             await ctx.send("✅ All Twitch stream notifications have been reset.")
         else:
@@ -420,6 +390,7 @@ class TwitchCommands(commands.Cog):
             self.twitch_config[guild_id]["messages"] = {}
             
         self.twitch_config[guild_id]["messages"][username.lower()] = message
+        self.subscriptions.set_template(guild_id, username, message)
         self.save_config()
         
         await ctx.send(f"✅ Set custom notification message for `{username}` streams")
@@ -1,14 +1,36 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import json
 import os
 import logging
 import aiohttp
-import asyncio
 from datetime import datetime, timedelta
 
+from core.feeds import FeedProvider, SubscriptionIndex
+
 logger = logging.getLogger('bot')
 
+class YouTubeFeed(FeedProvider):
+    """Feeds new uploads from subscribed YouTube channels into the shared feed engine"""
+    
+    name = "youtube"
+    interval = 30 * 60
+    
+    def __init__(self, cog):
+        self.cog = cog
+        
+    def accounts(self):
+        """Every YouTube channel subscribed to in any guild"""
+        return self.cog.subscriptions.accounts()
+        
+    async def fetch(self, youtube_channel):
+        channel_id = await self.cog.get_channel_id(youtube_channel)
+        return await self.cog.get_latest_videos(channel_id, limit=3)
+        
+    async def on_new(self, youtube_channel, videos):
+        for video in videos:
+            await self.cog.send_video_notifications(youtube_channel, video)
+
 class YouTubeCommands(commands.Cog):
     """Commands for YouTube feed notifications"""
     
@@ -17,13 +39,8 @@ class YouTubeCommands(commands.Cog):
         self.data_folder = 'data'
         self.config_file = os.path.join(self.data_folder, 'youtube_config.json')
         self.youtube_config = self.load_config()
-        
-        # Check interval for new videos (default: 30 minutes)
-        self.check_interval = 30 * 60  
-        self.last_video_data = {}  # youtube_id -> {video_ids: []}
-        
-        # Start the background task
-        self.check_new_videos.start()
+        # Followed account -> [(guild_id, channel_id, message template)]
+        self.subscriptions = SubscriptionIndex(self.youtube_config)
         
     def load_config(self):
         """Load the YouTube configuration from file"""
@@ -42,12 +59,15 @@ class YouTubeCommands(commands.Cog):
             
     def save_config(self):
         """Save the YouTube configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(self.youtube_config, f, indent=4)
+        self.bot.json_store.save(self.config_file, self.youtube_config)
             
+    async def cog_load(self):
+        """Poll the subscribed channels through the shared feed engine"""
+        self.bot.feeds.register(YouTubeFeed(self))
+        
     def cog_unload(self):
         """Clean up when the cog is unloaded"""
-        self.check_new_videos.cancel()
+        self.bot.feeds.unregister("youtube")
         
     async def get_channel_id(self, username):
         """Get the YouTube channel ID for a username or channel URL"""
@@ -74,107 +94,39 @@ class YouTubeCommands(commands.Cog):
         
         return mock_videos
         
-    @tasks.loop(minutes=30)
-    async def check_new_videos(self):
-        """Check for new videos and send notifications"""
-        logger.info("Checking for new YouTube videos...")
-        
-        all_channels = set()
-        
-        # Collect all YouTube channels across all guilds
-        for guild_id, guild_data in self.youtube_config.items():
-            if "channels" in guild_data:
-                for discord_channel_id, youtube_channels in guild_data["channels"].items():
-                    all_channels.update(youtube_channels)
-        
-        if not all_channels:
+    async def send_video_notifications(self, youtube_channel, video):
+        """Send notifications for a new video to every channel following the YouTube channel"""
+        subscriptions = self.subscriptions.get(youtube_channel)
+        if not subscriptions:
             return
             
-        for youtube_channel in all_channels:
-            try:
-                channel_id = await self.get_channel_id(youtube_channel)
-                latest_videos = await self.get_latest_videos(channel_id, limit=3)
-                
-                # Initialize if this is a new channel
-                if channel_id not in self.last_video_data:
-                    self.last_video_data[channel_id] = {
-                        'video_ids': [video['id'] for video in latest_videos]
-                    }
-                    continue
-                
-                # Get previously seen video IDs
-                known_video_ids = self.last_video_data[channel_id]['video_ids']
-                
-                # Find new videos
-                for video in latest_videos:
-                    if video['id'] not in known_video_ids:
-                        await self.send_video_notifications(youtube_channel, video)
-                        known_video_ids.append(video['id'])
-                
-                # Update last video data (keep only last 20 videos to prevent unlimited growth)
-                self.last_video_data[channel_id]['video_ids'] = known_video_ids[:20]
-                
-                # Small delay between API calls to avoid rate limits
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error checking videos for {youtube_channel}: {str(e)}")
-    
-    @check_new_videos.before_loop
-    async def before_check_new_videos(self):
-        """Wait until the bot is ready before starting the task"""
-        await self.bot.wait_until_ready()
-        logger.info("Starting YouTube video check task")
-    
-    async def send_video_notifications(self, youtube_channel, video):
-        """Send notifications for a new video"""
-        youtube_channel_lower = youtube_channel.lower()
+        # Create the embed once; every channel gets the same one
+        embed = discord.Embed(
+            title=video['title'],
+            url=video['url'],
+            description=f"**{youtube_channel}** has uploaded a new video!",
+            color=discord.Color.red(),
+            timestamp=datetime.now()
+        )
         
-        for guild_id, guild_data in self.youtube_config.items():
-            if "channels" not in guild_data:
-                continue
-                
-            for discord_channel_id, youtube_channels in guild_data["channels"].items():
-                if youtube_channel_lower not in [c.lower() for c in youtube_channels]:
-                    continue
-                    
-                # Get the Discord channel
-                channel = self.bot.get_channel(int(discord_channel_id))
-                if not channel:
-                    logger.warning(f"Channel {discord_channel_id} not found, skipping")
-                    continue
-                
-                # Create embed
-                embed = discord.Embed(
-                    title=video['title'],
-                    url=video['url'],
-                    description=f"**{youtube_channel}** has uploaded a new video!",
-                    color=discord.Color.red(),
-                    timestamp=datetime.now()
-                )
-                
-                if video['thumbnail']:
-                    embed.set_image(url=video['thumbnail'])
-                    
-                embed.set_footer(text="YouTube", icon_url="https://www.youtube.com/s/desktop/abfca16e/img/favicon_144x144.png")
-                
-                # Get custom message if set
-                custom_message = None
-                if "messages" in guild_data and youtube_channel_lower in guild_data["messages"]:
-                    custom_message = guild_data["messages"][youtube_channel_lower]
-                
-                # Format the message content
-                content = custom_message or f"🔴 **{youtube_channel}** has uploaded a new video!"
-                
-                # Send notification
-                try:
-                    await channel.send(content=content, embed=embed)
-                    logger.info(f"Sent video notification for {youtube_channel} in guild {guild_id}, channel {discord_channel_id}")
-                except Exception as e:
-                    logger.error(f"Error sending notification: {str(e)}")
+        if video['thumbnail']:
+            embed.set_image(url=video['thumbnail'])
+            
+        embed.set_footer(text="YouTube", icon_url="https://www.youtube.com/s/desktop/abfca16e/img/favicon_144x144.png")
+        
+        async def send(guild_id, discord_channel_id, custom_message):
+            # Get the Discord channel
+            channel = self.bot.get_channel(int(discord_channel_id))
+            if not channel:
+                logger.warning(f"Channel {discord_channel_id} not found, skipping")
+                return False
                 
-                # Small delay between notifications
-                await asyncio.sleep(1)
+            # Format the message content
+            content = custom_message or f"🔴 **{youtube_channel}** has uploaded a new video!"
+            await channel.send(content=content, embed=embed)
+            
+        sent, failed = await self.bot.feeds.deliver("youtube", subscriptions, send)
+        logger.info(f"Sent video notification for {youtube_channel} to {sent} channels ({failed} failed)")
             
     @commands.group(name="staryoutube", invoke_without_command=True)
     async def youtube_group(self, ctx, url: str = None):
@@ -256,6 +208,7 @@ class YouTubeCommands(commands.Cog):
         
         if guild_id in self.youtube_config:
             del self.youtube_config[guild_id]
+            self.subscriptions.remove_guild(guild_id)
             self.save_config()
             await ctx.send("✅ All YouTube feed configurations have been reset.")
         else:
@@ -279,11 +232,13 @@ class YouTubeCommands(commands.Cog):
             
         if user.lower() not in [name.lower() for name in self.youtube_config[guild_id]["channels"][channel_id]]:
             self.youtube_config[guild_id]["channels"][channel_id].append(user)
+            self.subscriptions.add(guild_id, channel_id, user, self.youtube_config[guild_id].get("messages"))
             await ctx.send(f"✅ Added YouTube notifications for `{user}` in {channel.mention}")
         else:
             await ctx.send(f"YouTube notifications for `{user}` already exist in {channel.mention}")
             
         self.save_config()
+        self.bot.feeds.refresh()
 
     @youtube_group.command(name="remove")
     @commands.has_permissions(manage_channels=True)
@@ -300,6 +255,7 @@ class YouTubeCommands(commands.Cog):
             for i, name in enumerate(youtube_channels):
                 if name.lower() == username.lower():
                     self.youtube_config[guild_id]["channels"][channel_id].pop(i)
+                    self.subscriptions.remove(guild_id, channel_id, name)
                     await ctx.send(f"✅ Removed YouTube notifications for `{name}` from {channel.mention}")
                     
                     # Clean up empty entries
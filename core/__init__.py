@@ -0,0 +1,16 @@
+"""
+Core services for QxrK Bot
+Shared infrastructure used by several cogs (database access, networking, etc.).
+"""
+
+from .bulk_actions import BulkActionEngine, BulkJob
+from .database import SQLitePool, get_pool, close_pool, close_all_pools
+from .feeds import FeedPoller, FeedProvider, SubscriptionIndex
+from .http import HTTPClient, get_http_client, configure_http_client, close_http_client
+from .joins import JoinPipeline, JoinVerdict
+from .loop_monitor import LoopLagProbe
+from .matching import TriggerMatcher, compile_filter_pattern
+from .member_stats import MemberStatsIndex, GuildMemberStats
+from .persistence import JSONStore, get_json_store, close_json_store, write_atomic
+from .ranking import RankIndex
+from .scheduler import Scheduler, ScheduledJob
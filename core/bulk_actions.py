@@ -0,0 +1,409 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import discord
+
+from .persistence import get_json_store
+
+logger = logging.getLogger('bot')
+
+DEFAULT_STATE_PATH = "data/bulk_actions.json"
+
+BAN = "ban"
+KICK = "kick"
+UNBAN = "unban"
+
+# Permission each action needs; without it every call would fail
+REQUIRED_PERMISSIONS = {BAN: "ban_members", KICK: "kick_members", UNBAN: "ban_members"}
+
+# Discord's bulk ban endpoint takes at most this many users per call
+BULK_BAN_LIMIT = 200
+# Message history removed along with each ban, as a single ban does by default
+DELETE_MESSAGE_SECONDS = 86400
+# Bounds for the adaptive concurrency of kicks, unbans and fallback bans
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 8
+INITIAL_CONCURRENCY = 4
+# A call taking this long was held back by discord.py's rate limit handling
+SLOW_CALL = 1.0
+# Seconds between progress callbacks
+PROGRESS_INTERVAL = 3.0
+# Extra attempts for a call that fails with a server error
+RETRIES = 2
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that backs off as calls start hitting rate limits.
+    
+    discord.py reads the X-RateLimit headers itself and sleeps before a
+    request when its bucket is spent, so a call that suddenly takes longer
+    than ``slow`` seconds (or a 429 that gets through) means the bucket is
+    exhausted. The limit is halved when that happens and grows by one after
+    every ``limit`` fast calls in a row.
+    """
+    
+    def __init__(self, initial=INITIAL_CONCURRENCY, maximum=MAX_CONCURRENCY, slow=SLOW_CALL):
+        self.limit = initial
+        self.maximum = maximum
+        self.slow = slow
+        self.backoffs = 0
+        self._active = 0
+        self._streak = 0
+        self._condition = asyncio.Condition()
+    
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+    
+    async def release(self, elapsed, rate_limited=False):
+        async with self._condition:
+            self._active -= 1
+            if rate_limited or elapsed >= self.slow:
+                self.limit = max(MIN_CONCURRENCY, self.limit // 2)
+                self._streak = 0
+                self.backoffs += 1
+            else:
+                self._streak += 1
+                if self._streak >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._streak = 0
+            self._condition.notify_all()
+
+
+class BulkJob:
+    """One bulk ban, kick or unban run, as persisted between restarts"""
+    
+    __slots__ = (
+        'kind', 'guild_id', 'action', 'reason', 'pending', 'total',
+        'succeeded', 'failed', 'payload', 'started', 'finished', 'cancelled'
+    )
+    
+    def __init__(self, kind, guild_id, action, user_ids, reason=None, payload=None,
+                 total=None, succeeded=0, failed=0, started=None):
+        self.kind = kind
+        self.guild_id = guild_id
+        self.action = action
+        self.reason = reason
+        # Ordered set of user ids still to process
+        self.pending = dict.fromkeys(user_ids)
+        self.total = len(self.pending) if total is None else total
+        self.succeeded = succeeded
+        self.failed = failed
+        self.payload = payload or {}
+        self.started = time.time() if started is None else started
+        self.finished = False
+        self.cancelled = False
+    
+    @property
+    def key(self):
+        return f"{self.kind}:{self.guild_id}"
+    
+    @property
+    def done(self):
+        return self.total - len(self.pending)
+    
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "guild_id": self.guild_id,
+            "action": self.action,
+            "reason": self.reason,
+            "user_ids": list(self.pending),
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "payload": self.payload,
+            "started": self.started
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["kind"], data["guild_id"], data["action"], data["user_ids"],
+            reason=data.get("reason"), payload=data.get("payload"), total=data.get("total"),
+            succeeded=data.get("succeeded", 0), failed=data.get("failed", 0), started=data.get("started")
+        )
+
+
+class BulkActionEngine:
+    """Runs mass bans, kicks and unbans for moderation cogs.
+    
+    Bans go through Discord's bulk ban endpoint, up to ``BULK_BAN_LIMIT``
+    users per call. Kicks and unbans (and bans, if the bot lacks Manage
+    Server, which bulk banning needs) are sent one user at a time under an
+    ``AdaptiveLimiter``.
+    
+    A job is identified by a ``kind`` and its guild, so each guild has at
+    most one job of a kind. Remaining user ids and counts are saved to disk
+    as the job runs; after a restart each job continues with the users it
+    had not reached, once its kind is registered again::
+        
+        bot.bulk_actions.register("raid", self.raid_progress)
+        await bot.bulk_actions.submit("raid", guild, "ban", user_ids, reason, {"channel_id": ...})
+        await bot.bulk_actions.cancel("raid", guild.id)
+    
+    Progress handlers are coroutines taking the ``BulkJob``; they are
+    awaited every few seconds while it runs and once more when it ends
+    (``job.finished`` is then True).
+    """
+    
+    def __init__(self, state_path=DEFAULT_STATE_PATH, get_guild=None, wait_until=None):
+        self.state_path = state_path
+        # Looks a guild up by id when a stored job resumes
+        self.get_guild = get_guild
+        # Optional coroutine function awaited before a job starts
+        self.wait_until = wait_until
+        
+        self._handlers = {}
+        self._jobs = {}  # key -> BulkJob
+        self._tasks = {}  # key -> asyncio.Task
+        self._parked = {}  # kind -> [stored jobs waiting for their handler]
+        self.bulk_calls = 0
+        self.single_calls = 0
+        self.backoffs = 0
+        self._load_state()
+    
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                stored = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error loading bulk action state: {e}")
+            return
+        for data in stored.values():
+            job = BulkJob.from_dict(data)
+            self._jobs[job.key] = job
+            self._parked.setdefault(job.kind, []).append(job)
+        if stored:
+            logger.info(f"Loaded {len(stored)} unfinished bulk moderation jobs")
+    
+    def _save_state(self):
+        get_json_store().save(self.state_path, {key: job.as_dict() for key, job in self._jobs.items()})
+    
+    def register(self, kind, handler):
+        """Set the progress handler for ``kind`` and resume its stored jobs"""
+        self._handlers[kind] = handler
+        for job in self._parked.pop(kind, []):
+            if self._jobs.get(job.key) is job:
+                self._launch(job)
+    
+    def unregister(self, kind):
+        """Remove ``kind``'s handler; its running jobs carry on without progress reports"""
+        self._handlers.pop(kind, None)
+    
+    def get(self, kind, guild_id):
+        """The unfinished job of a kind in a guild, or None"""
+        return self._jobs.get(f"{kind}:{guild_id}")
+    
+    async def submit(self, kind, guild, action, user_ids, reason=None, payload=None):
+        """Start a job; returns None if the guild already has one of this kind"""
+        job = BulkJob(kind, guild.id, action, user_ids, reason, payload)
+        if job.key in self._jobs:
+            return None
+        self._jobs[job.key] = job
+        self._save_state()
+        self._launch(job)
+        return job
+    
+    async def cancel(self, kind, guild_id):
+        """Stop a job and forget its remaining users; returns the job, or None if there was none"""
+        job = self._jobs.pop(f"{kind}:{guild_id}", None)
+        if job is None:
+            return None
+        job.cancelled = True
+        task = self._tasks.pop(job.key, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._save_state()
+        return job
+    
+    def _launch(self, job):
+        self._tasks[job.key] = asyncio.create_task(self._run(job))
+    
+    async def _run(self, job):
+        if self.wait_until is not None:
+            await self.wait_until()
+        
+        guild = self.get_guild(job.guild_id) if self.get_guild else None
+        if guild is None:
+            logger.warning(f"Dropping bulk {job.kind} job for unavailable guild {job.guild_id}")
+        elif not self._permitted(guild, job.action):
+            logger.error(f"Missing {REQUIRED_PERMISSIONS[job.action]} for bulk {job.kind} job in {guild.name}")
+            self._fail_pending(job)
+        else:
+            reporter = asyncio.create_task(self._report(job))
+            try:
+                if job.action == BAN:
+                    await self._ban_in_bulk(guild, job)
+                if job.pending:
+                    await self._run_singly(guild, job)
+            except Exception as e:
+                logger.error(f"Error running bulk {job.kind} job in {guild.name}: {e}")
+            finally:
+                reporter.cancel()
+        
+        job.finished = True
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+            self._save_state()
+        self._tasks.pop(job.key, None)
+        await self._progress(job)
+    
+    def _permitted(self, guild, action):
+        return getattr(guild.me.guild_permissions, REQUIRED_PERMISSIONS[action])
+    
+    def _fail_pending(self, job):
+        """Count every user the job has not reached as failed"""
+        job.failed += len(job.pending)
+        job.pending.clear()
+    
+    async def _report(self, job):
+        reported = -1
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            if job.done != reported:
+                reported = job.done
+                self._save_state()
+                await self._progress(job)
+    
+    async def _progress(self, job):
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            return
+        try:
+            await handler(job)
+        except Exception as e:
+            logger.error(f"Error reporting bulk {job.kind} progress: {e}")
+    
+    async def _bulk_ban(self, guild, user_ids, reason):
+        """One bulk ban call; returns the ids Discord reports as banned"""
+        self.bulk_calls += 1
+        users = [discord.Object(id=user_id) for user_id in user_ids]
+        if hasattr(guild, 'bulk_ban'):
+            result = await guild.bulk_ban(users, reason=reason, delete_message_seconds=DELETE_MESSAGE_SECONDS)
+            return {user.id for user in result.banned}
+        # discord.py releases before 2.4 have no wrapper for the endpoint
+        route = discord.http.Route('POST', '/guilds/{guild_id}/bulk-ban', guild_id=guild.id)
+        payload = {
+            "user_ids": [str(user_id) for user_id in user_ids],
+            "delete_message_seconds": DELETE_MESSAGE_SECONDS
+        }
+        data = await guild._state.http.request(route, json=payload, reason=reason)
+        return {int(user_id) for user_id in data.get("banned_users", [])}
+    
+    async def _ban_in_bulk(self, guild, job):
+        while job.pending:
+            batch = list(job.pending)[:BULK_BAN_LIMIT]
+            for attempt in range(RETRIES + 1):
+                try:
+                    banned = await self._bulk_ban(guild, batch, job.reason)
+                    break
+                except discord.Forbidden:
+                    if not self._permitted(guild, BAN):
+                        # Ban Members was taken away mid-job; single bans would fail too
+                        logger.error(f"Lost ban_members during bulk {job.kind} job in {guild.name}")
+                        self._fail_pending(job)
+                        return
+                    # Bulk banning also needs Manage Server; ban one by one instead
+                    logger.info(f"Bulk ban not permitted in {guild.name}, banning individually")
+                    return
+                except discord.HTTPException as e:
+                    if e.status >= 500 and attempt < RETRIES:
+                        await asyncio.sleep(1 + attempt)
+                        continue
+                    # Discord rejects the whole call when none of the users could be banned
+                    logger.error(f"Bulk ban of {len(batch)} users failed in {guild.name}: {e}")
+                    banned = set()
+                    break
+            
+            for user_id in batch:
+                del job.pending[user_id]
+            job.succeeded += len(banned)
+            job.failed += len(batch) - len(banned)
+            self._save_state()
+    
+    async def _act(self, guild, action, user_id, reason):
+        user = discord.Object(id=user_id)
+        if action == BAN:
+            await guild.ban(user, reason=reason, delete_message_seconds=DELETE_MESSAGE_SECONDS)
+        elif action == KICK:
+            await guild.kick(user, reason=reason)
+        else:
+            await guild.unban(user, reason=reason)
+    
+    async def _act_with_retries(self, guild, job, user_id, limiter):
+        started = time.monotonic()
+        rate_limited = False
+        try:
+            for attempt in range(RETRIES + 1):
+                try:
+                    self.single_calls += 1
+                    await self._act(guild, job.action, user_id, job.reason)
+                    return True
+                except discord.HTTPException as e:
+                    rate_limited = rate_limited or e.status == 429
+                    if (e.status < 500 and e.status != 429) or attempt == RETRIES:
+                        if not isinstance(e, discord.NotFound):
+                            logger.error(f"Bulk {job.action} of {user_id} failed in {guild.name}: {e}")
+                        return False
+                    await asyncio.sleep(1 + attempt)
+                except Exception as e:
+                    logger.error(f"Bulk {job.action} of {user_id} failed in {guild.name}: {e}")
+                    return False
+        finally:
+            await limiter.release(time.monotonic() - started, rate_limited)
+    
+    async def _run_singly(self, guild, job):
+        limiter = AdaptiveLimiter()
+        
+        async def run(user_id):
+            ok = await self._act_with_retries(guild, job, user_id, limiter)
+            job.pending.pop(user_id, None)
+            if ok:
+                job.succeeded += 1
+            else:
+                job.failed += 1
+        
+        # A task is only created once the limiter has a slot for it
+        running = set()
+        try:
+            for user_id in list(job.pending):
+                await limiter.acquire()
+                task = asyncio.create_task(run(user_id))
+                running.add(task)
+                task.add_done_callback(running.discard)
+            await asyncio.gather(*running)
+        finally:
+            for task in running:
+                task.cancel()
+            self.backoffs += limiter.backoffs
+    
+    async def close(self):
+        """Stop running jobs and write their progress, so they resume on the next start"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self._jobs:
+            self._save_state()
+            await get_json_store().flush(self.state_path)
+    
+    def stats(self):
+        """Running jobs and call counts, for diagnostics"""
+        return {
+            "jobs": {
+                key: {"action": job.action, "done": job.done, "total": job.total,
+                      "succeeded": job.succeeded, "failed": job.failed}
+                for key, job in self._jobs.items()
+            },
+            "bulk_calls": self.bulk_calls,
+            "single_calls": self.single_calls,
+            "backoffs": self.backoffs
+        }
@@ -0,0 +1,179 @@
+import os
+import asyncio
+import logging
+import contextlib
+import aiosqlite
+
+logger = logging.getLogger('bot')
+
+# Applied to every pooled connection when it is opened
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Number of compiled statements sqlite3 keeps per connection
+STATEMENT_CACHE_SIZE = 256
+
+# Default number of reader connections per database file
+DEFAULT_READERS = 3
+
+_pools = {}
+
+
+class SQLitePool:
+    """Long-lived aiosqlite connections for a single database file.
+    
+    One writer connection is shared behind a lock so writes are serialized,
+    and up to ``readers`` read-only connections serve queries concurrently
+    (WAL mode lets them run alongside the writer). Connections are opened
+    lazily and reused, so each query skips the connect/thread/pragma setup.
+    
+    Usage mirrors ``aiosqlite.connect``::
+    
+        async with pool.read() as db:
+            async with db.execute("SELECT ...") as cursor:
+                ...
+        
+        async with pool.write() as db:
+            await db.execute("UPDATE ...")
+            await db.commit()
+    
+    Rows are returned as ``aiosqlite.Row`` objects, which support both
+    index and key access.
+    """
+    
+    def __init__(self, db_path, readers=DEFAULT_READERS):
+        self.db_path = db_path
+        self.max_readers = max(1, readers)
+        
+        self._writer = None
+        self._write_lock = asyncio.Lock()
+        self._idle_readers = []
+        self._reader_slots = asyncio.Semaphore(self.max_readers)
+        self._open_readers = 0
+        
+    async def _open(self, readonly=False):
+        """Open and configure a new connection"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        db = await aiosqlite.connect(self.db_path, cached_statements=STATEMENT_CACHE_SIZE)
+        try:
+            db.row_factory = aiosqlite.Row
+            for pragma in CONNECTION_PRAGMAS:
+                await db.execute(pragma)
+            if readonly:
+                await db.execute("PRAGMA query_only = ON")
+        except Exception:
+            await db.close()
+            raise
+        return db
+    
+    @contextlib.asynccontextmanager
+    async def write(self):
+        """Borrow the writer connection.
+        
+        Any transaction still open when the block exits normally is
+        committed; it is rolled back if the block raises.
+        """
+        async with self._write_lock:
+            if self._writer is None:
+                self._writer = await self._open()
+            db = self._writer
+            
+            try:
+                yield db
+            except BaseException:
+                if db.in_transaction:
+                    await db.rollback()
+                raise
+            else:
+                if db.in_transaction:
+                    await db.commit()
+            finally:
+                db.row_factory = aiosqlite.Row
+    
+    @contextlib.asynccontextmanager
+    async def read(self):
+        """Borrow a read-only connection from the pool"""
+        await self._reader_slots.acquire()
+        try:
+            if self._idle_readers:
+                db = self._idle_readers.pop()
+            else:
+                db = await self._open(readonly=True)
+                self._open_readers += 1
+        except BaseException:
+            self._reader_slots.release()
+            raise
+        
+        try:
+            yield db
+        finally:
+            db.row_factory = aiosqlite.Row
+            self._idle_readers.append(db)
+            self._reader_slots.release()
+    
+    async def close(self):
+        """Close every connection held by the pool"""
+        async with self._write_lock:
+            if self._writer is not None:
+                try:
+                    await self._writer.close()
+                except Exception as e:
+                    logger.error(f"Error closing writer for {self.db_path}: {e}")
+                self._writer = None
+        
+        # Wait for borrowed readers to come back before closing them
+        for _ in range(self.max_readers):
+            await self._reader_slots.acquire()
+        try:
+            while self._idle_readers:
+                db = self._idle_readers.pop()
+                try:
+                    await db.close()
+                except Exception as e:
+                    logger.error(f"Error closing reader for {self.db_path}: {e}")
+            self._open_readers = 0
+        finally:
+            for _ in range(self.max_readers):
+                self._reader_slots.release()
+    
+    def stats(self):
+        """Current connection counts for diagnostics"""
+        return {
+            "db_path": self.db_path,
+            "writer_open": self._writer is not None,
+            "readers_open": self._open_readers,
+            "readers_idle": len(self._idle_readers),
+            "max_readers": self.max_readers
+        }
+
+
+def get_pool(db_path, readers=DEFAULT_READERS):
+    """Get the shared pool for a database file, creating it on first use"""
+    key = os.path.abspath(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = SQLitePool(db_path, readers=readers)
+        _pools[key] = pool
+    return pool
+
+
+async def close_pool(db_path):
+    """Close and forget the pool for a database file, if there is one"""
+    pool = _pools.pop(os.path.abspath(db_path), None)
+    if pool is not None:
+        await pool.close()
+
+
+async def close_all_pools():
+    """Close every pool (used on bot shutdown)"""
+    for key in list(_pools):
+        pool = _pools.pop(key)
+        await pool.close()
@@ -0,0 +1,461 @@
+import os
+import time
+import json
+import asyncio
+import logging
+from collections import deque
+
+from .persistence import write_atomic
+
+logger = logging.getLogger('bot')
+
+DEFAULT_STATE_PATH = "data/feed_state.json"
+
+# Accounts polled at once across every provider
+DEFAULT_CONCURRENCY = 8
+# Seen ids remembered per account
+SEEN_LIMIT = 50
+# Longest the engine sleeps before re-reading each provider's account list
+SYNC_INTERVAL = 30
+# Seconds to let state changes collect before writing them to disk
+SAVE_DELAY = 5.0
+
+# Notification sends in flight at once, and sends allowed per second across
+# every channel (kept under Discord's global limit of 50 requests a second)
+SEND_CONCURRENCY = 20
+SEND_RATE = 40
+
+
+class FeedProvider:
+    """Adapter a notifier cog implements to be polled by the ``FeedPoller``.
+    
+    ``accounts()`` returns the account keys currently subscribed to,
+    ``fetch(account)`` returns the account's latest items (newest first, or
+    None on failure), ``item_id(item)`` returns a stable id for an item and
+    ``on_new(account, items)`` is called with unseen items, oldest first.
+    
+    Intervals adapt per account between ``min_interval`` and
+    ``max_interval``: an account that just posted is polled sooner, a quiet
+    one progressively less often. ``rate``/``per`` cap how many fetches the
+    provider makes in any ``per`` seconds.
+    """
+    
+    name = None
+    interval = 30 * 60
+    min_interval = 5 * 60
+    max_interval = 2 * 60 * 60
+    rate = 30
+    per = 60
+    # Stay quiet about the items found on an account's first poll
+    seed_silently = True
+    # Only remember ids returned by the latest fetch (e.g. a live stream that can end)
+    forget_missing = False
+    
+    def accounts(self):
+        raise NotImplementedError
+    
+    async def fetch(self, account):
+        raise NotImplementedError
+    
+    def item_id(self, item):
+        return str(item['id'])
+    
+    async def on_new(self, account, items):
+        raise NotImplementedError
+
+
+class RateBudget:
+    """Token bucket allowing ``rate`` requests every ``per`` seconds"""
+    
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+
+
+class FeedAccount:
+    """Polling state for one account of one provider"""
+    
+    __slots__ = ('key', 'seen', 'interval', 'next_due', 'seeded', 'in_flight')
+    
+    def __init__(self, key, interval, seen=None, seeded=False):
+        self.key = key
+        self.seen = deque(seen or (), maxlen=SEEN_LIMIT)
+        self.interval = interval
+        self.next_due = 0.0
+        self.seeded = seeded
+        self.in_flight = False
+
+
+class ProviderStats:
+    __slots__ = ('polls', 'new_items', 'errors', 'fetch_time', 'sent', 'send_failed')
+    
+    def __init__(self):
+        self.polls = 0
+        self.new_items = 0
+        self.errors = 0
+        self.fetch_time = 0.0
+        self.sent = 0
+        self.send_failed = 0
+
+
+def normalize_handle(name):
+    """Account key for @handles: lowercase, without the '@'"""
+    return name.lower().lstrip('@')
+
+
+class SubscriptionIndex:
+    """Reverse index from a followed account to the channels that follow it.
+    
+    Built from the notifier config shape shared by the feed cogs,
+    ``{guild_id: {"channels": {channel_id: [accounts]}, "messages": {account: template}}}``,
+    so a new post finds its ``(guild_id, channel_id, template)`` targets with
+    one lookup instead of walking every guild. The cogs build it once on
+    load and then update just the entries their add, remove, clear and
+    message commands touch.
+    """
+    
+    def __init__(self, config=None, normalize=str.lower):
+        self.normalize = normalize
+        # account key -> {(guild_id, channel_id): template}
+        self._index = {}
+        # guild_id -> account keys it follows, so a guild can be dropped without a full scan
+        self._guild_accounts = {}
+        if config is not None:
+            self.rebuild(config)
+    
+    def __len__(self):
+        return len(self._index)
+    
+    def _template(self, messages, account):
+        return messages.get(self.normalize(account)) or messages.get(account.lower())
+    
+    def rebuild(self, config):
+        """Index a whole config from scratch"""
+        self._index = {}
+        self._guild_accounts = {}
+        for guild_id, guild_data in config.items():
+            messages = guild_data.get("messages", {})
+            for channel_id, accounts in guild_data.get("channels", {}).items():
+                for account in accounts:
+                    self.add(guild_id, channel_id, account, messages)
+    
+    def add(self, guild_id, channel_id, account, messages=None):
+        """Index one channel following an account; a channel is only listed once per account"""
+        key = self.normalize(account)
+        template = self._template(messages, account) if messages else None
+        self._index.setdefault(key, {}).setdefault((guild_id, channel_id), template)
+        self._guild_accounts.setdefault(guild_id, set()).add(key)
+    
+    def remove(self, guild_id, channel_id, account):
+        """Stop sending an account's posts to one channel"""
+        key = self.normalize(account)
+        targets = self._index.get(key)
+        if targets is None:
+            return
+        targets.pop((guild_id, channel_id), None)
+        if not targets:
+            del self._index[key]
+    
+    def remove_guild(self, guild_id):
+        """Drop every subscription a guild has"""
+        for key in self._guild_accounts.pop(guild_id, ()):
+            targets = self._index.get(key)
+            if targets is None:
+                continue
+            for target in [target for target in targets if target[0] == guild_id]:
+                del targets[target]
+            if not targets:
+                del self._index[key]
+    
+    def set_template(self, guild_id, account, template):
+        """Use a guild's custom message for an account in all of its channels"""
+        targets = self._index.get(self.normalize(account), {})
+        for target in targets:
+            if target[0] == guild_id:
+                targets[target] = template
+    
+    def get(self, account):
+        """[(guild_id, channel_id, template)] following an account"""
+        targets = self._index.get(self.normalize(account))
+        if not targets:
+            return []
+        return [(guild_id, channel_id, template) for (guild_id, channel_id), template in targets.items()]
+    
+    def accounts(self):
+        return self._index.keys()
+
+
+class FeedPoller:
+    """One polling engine shared by every feed notifier.
+    
+    Each registered provider's accounts are polled on their own adaptive
+    schedule, a bounded number at a time, with each provider held to its
+    own rate budget. Seen ids and intervals are kept in a small JSON file
+    so restarts neither re-announce old posts nor miss new ones::
+        
+        self.bot.feeds.register(YouTubeFeed(self))
+        self.bot.feeds.unregister("youtube")
+    """
+    
+    def __init__(self, state_path=DEFAULT_STATE_PATH, concurrency=DEFAULT_CONCURRENCY, wait_until=None):
+        self.state_path = state_path
+        self.wait_until = wait_until
+        self._semaphore = asyncio.Semaphore(concurrency)
+        
+        self._providers = {}
+        self._budgets = {}
+        self._accounts = {}  # provider name -> {account key: FeedAccount}
+        self._stats = {}
+        self._state = self._load_state()
+        
+        self._wakeup = asyncio.Event()
+        self._runner = None
+        self._polls = set()
+        self._save_task = None
+        self._save_pending = False
+        
+        self._send_semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+        self._send_budget = RateBudget(SEND_RATE, 1)
+    
+    def _load_state(self):
+        try:
+            if os.path.exists(self.state_path):
+                with open(self.state_path, 'r') as f:
+                    return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error loading feed state from {self.state_path}: {e}")
+        return {}
+    
+    def register(self, provider):
+        """Start polling a provider's accounts"""
+        self._providers[provider.name] = provider
+        self._budgets[provider.name] = RateBudget(provider.rate, provider.per)
+        self._accounts.setdefault(provider.name, {})
+        self._stats.setdefault(provider.name, ProviderStats())
+        
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+        self.refresh()
+    
+    def unregister(self, name):
+        """Stop polling a provider; its seen ids are kept"""
+        self._providers.pop(name, None)
+        self._budgets.pop(name, None)
+        self._accounts.pop(name, None)
+    
+    def refresh(self):
+        """Re-read account lists now (call after a subscription is added)"""
+        self._wakeup.set()
+    
+    def _sync(self, name, provider):
+        """Match the tracked accounts to the provider's current subscriptions"""
+        tracked = self._accounts[name]
+        saved = self._state.setdefault(name, {})
+        try:
+            current = set(provider.accounts())
+        except Exception as e:
+            logger.error(f"Error listing {name} feed accounts: {e}")
+            return
+        
+        for key in current - tracked.keys():
+            entry = saved.get(key)
+            if entry:
+                account = FeedAccount(key, entry.get("interval", provider.interval), entry.get("seen"), seeded=True)
+            else:
+                account = FeedAccount(key, provider.interval)
+            tracked[key] = account
+        
+        for key in tracked.keys() - current:
+            del tracked[key]
+            if saved.pop(key, None) is not None:
+                self._mark_dirty()
+    
+    async def _run(self):
+        if self.wait_until is not None:
+            await self.wait_until()
+        
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            next_due = now + SYNC_INTERVAL
+            
+            for name, provider in list(self._providers.items()):
+                self._sync(name, provider)
+                for account in self._accounts.get(name, {}).values():
+                    if account.in_flight:
+                        continue
+                    if account.next_due <= now:
+                        account.in_flight = True
+                        task = asyncio.create_task(self._poll(name, provider, account))
+                        self._polls.add(task)
+                        task.add_done_callback(self._polls.discard)
+                    else:
+                        next_due = min(next_due, account.next_due)
+            
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(1.0, next_due - now))
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _poll(self, name, provider, account):
+        stats = self._stats[name]
+        try:
+            async with self._semaphore:
+                await self._budgets[name].acquire()
+                started = time.monotonic()
+                try:
+                    items = await provider.fetch(account.key)
+                finally:
+                    stats.fetch_time += time.monotonic() - started
+                    stats.polls += 1
+            
+            if items is None:
+                # Failed fetch: back off like a quiet account
+                stats.errors += 1
+                self._adapt(provider, account, found=False)
+                return
+            
+            ids = [provider.item_id(item) for item in items]
+            new_items = [item for item, item_id in zip(items, ids) if item_id not in account.seen]
+            
+            if not account.seeded:
+                account.seeded = True
+                if provider.seed_silently:
+                    new_items = []
+            
+            if provider.forget_missing:
+                account.seen = deque(ids, maxlen=SEEN_LIMIT)
+            else:
+                # Oldest first so the newest ids survive the bound
+                for item_id in reversed(ids):
+                    if item_id not in account.seen:
+                        account.seen.append(item_id)
+            
+            self._adapt(provider, account, found=bool(new_items))
+            
+            if new_items:
+                stats.new_items += len(new_items)
+                await provider.on_new(account.key, list(reversed(new_items)))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.errors += 1
+            logger.error(f"Error polling {name} feed {account.key}: {e}")
+            self._adapt(provider, account, found=False)
+        finally:
+            account.in_flight = False
+            account.next_due = time.monotonic() + account.interval
+            # Skip accounts unsubscribed while this poll was running
+            if self._accounts.get(name, {}).get(account.key) is account:
+                self._state.setdefault(name, {})[account.key] = {"seen": list(account.seen), "interval": account.interval}
+                self._mark_dirty()
+            self._wakeup.set()
+    
+    def _adapt(self, provider, account, found):
+        """Halve the interval after a new post, stretch it by half after a quiet poll"""
+        if found:
+            interval = account.interval / 2
+        else:
+            interval = account.interval * 1.5
+        account.interval = max(provider.min_interval, min(provider.max_interval, interval))
+    
+    def _mark_dirty(self):
+        self._save_pending = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_later())
+    
+    async def _save_later(self):
+        await asyncio.sleep(SAVE_DELAY)
+        while self._save_pending:
+            self._save_pending = False
+            try:
+                await asyncio.to_thread(self._write_state, json.dumps(self._state))
+            except Exception as e:
+                logger.error(f"Error saving feed state: {e}")
+    
+    def _write_state(self, data):
+        """Write the state file atomically"""
+        write_atomic(self.state_path, data)
+    
+    async def deliver(self, name, subscriptions, send):
+        """Fan a notification out to ``(guild_id, channel_id, template)`` targets.
+        
+        ``send`` is awaited once per target with those three values and may
+        return False to mark the target skipped (e.g. a deleted channel).
+        Targets are grouped by channel, since Discord rate limits message
+        sends per channel: one channel's sends run in order while different
+        channels are sent to concurrently, bounded by ``SEND_CONCURRENCY``
+        and ``SEND_RATE``. Returns ``(sent, failed)``.
+        """
+        by_channel = {}
+        for subscription in subscriptions:
+            by_channel.setdefault(subscription[1], []).append(subscription)
+        
+        stats = self._stats.setdefault(name, ProviderStats())
+        
+        async def send_all(targets):
+            sent = failed = 0
+            async with self._send_semaphore:
+                for guild_id, channel_id, template in targets:
+                    await self._send_budget.acquire()
+                    try:
+                        if await send(guild_id, channel_id, template) is not False:
+                            sent += 1
+                    except Exception as e:
+                        failed += 1
+                        logger.error(f"Error sending {name} notification to channel {channel_id} in guild {guild_id}: {e}")
+            return sent, failed
+        
+        results = await asyncio.gather(*(send_all(targets) for targets in by_channel.values()))
+        sent = sum(result[0] for result in results)
+        failed = sum(result[1] for result in results)
+        stats.sent += sent
+        stats.send_failed += failed
+        return sent, failed
+    
+    def stats(self):
+        """Per-provider polling counters for diagnostics"""
+        result = {}
+        for name, stats in self._stats.items():
+            accounts = self._accounts.get(name, {})
+            intervals = [account.interval for account in accounts.values()]
+            result[name] = {
+                "accounts": len(accounts),
+                "polls": stats.polls,
+                "new_items": stats.new_items,
+                "errors": stats.errors,
+                "sent": stats.sent,
+                "send_failed": stats.send_failed,
+                "avg_fetch_ms": round(stats.fetch_time * 1000 / stats.polls, 1) if stats.polls else 0.0,
+                "avg_interval_min": round(sum(intervals) / len(intervals) / 60, 1) if intervals else None,
+                "active": name in self._providers
+            }
+        return result
+    
+    async def close(self):
+        """Stop polling and write the latest state"""
+        tasks = [task for task in (self._runner, self._save_task) if task is not None]
+        tasks.extend(self._polls)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runner = None
+        
+        try:
+            self._write_state(json.dumps(self._state))
+        except Exception as e:
+            logger.error(f"Error saving feed state: {e}")
@@ -0,0 +1,197 @@
+import time
+import asyncio
+import logging
+import contextlib
+import aiohttp
+from yarl import URL
+
+logger = logging.getLogger('bot')
+
+# Connection pool limits for the shared session
+TOTAL_CONNECTIONS = 100
+DEFAULT_PER_HOST = 8
+
+# Seconds to cache DNS answers and keep idle connections open
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+# Default request timeouts in seconds
+DEFAULT_TIMEOUT = 15
+CONNECT_TIMEOUT = 5
+
+_client = None
+
+
+class HostStats:
+    """Request counters for one host"""
+    
+    __slots__ = ('requests', 'errors', 'http_errors', 'total_latency', 'max_latency')
+    
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.http_errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+    
+    def record(self, latency, status=None):
+        self.requests += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        if status is None:
+            self.errors += 1
+        elif status >= 400:
+            self.http_errors += 1
+    
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "http_errors": self.http_errors,
+            "avg_ms": round(self.total_latency * 1000 / self.requests, 1) if self.requests else 0.0,
+            "max_ms": round(self.max_latency * 1000, 1)
+        }
+
+
+class HTTPClient:
+    """One aiohttp session shared by every cog.
+    
+    Connections are pooled and kept alive per host, DNS answers are cached,
+    and each host gets its own concurrency limit so one slow API cannot
+    starve the others. Latency and error counts are tracked per host.
+    
+    Usage mirrors ``aiohttp.ClientSession``::
+    
+        async with bot.http_client.get(url, params=params) as response:
+            data = await response.json()
+    
+    The session is created on first use and closed by ``close()`` (the bot
+    does this on shutdown).
+    """
+    
+    def __init__(self, per_host=DEFAULT_PER_HOST, host_limits=None, timeout=DEFAULT_TIMEOUT, headers=None):
+        self.per_host = per_host
+        self.host_limits = dict(host_limits or {})
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=CONNECT_TIMEOUT)
+        self.headers = headers
+        
+        self._session = None
+        self._limiters = {}
+        self._stats = {}
+    
+    @property
+    def closed(self):
+        return self._session is None or self._session.closed
+    
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=TOTAL_CONNECTIONS,
+                limit_per_host=max(self.per_host, *self.host_limits.values(), 1),
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers=self.headers
+            )
+        return self._session
+    
+    def _limiter(self, host):
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = asyncio.Semaphore(self.host_limits.get(host, self.per_host))
+            self._limiters[host] = limiter
+        return limiter
+    
+    def _host_stats(self, host):
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = HostStats()
+            self._stats[host] = stats
+        return stats
+    
+    @contextlib.asynccontextmanager
+    async def request(self, method, url, **kwargs):
+        """Send a request and yield the ``aiohttp.ClientResponse``.
+        
+        Accepts the same keyword arguments as ``ClientSession.request``
+        (params, json, data, headers, timeout, ...). The host's concurrency
+        slot is held until the block exits, so read the body inside it.
+        """
+        host = URL(str(url)).host or ""
+        stats = self._host_stats(host)
+        
+        async with self._limiter(host):
+            session = self._get_session()
+            started = time.perf_counter()
+            try:
+                response = await session.request(method, url, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                stats.record(time.perf_counter() - started)
+                raise
+            
+            stats.record(time.perf_counter() - started, response.status)
+            try:
+                yield response
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Failed while reading the body
+                stats.errors += 1
+                raise
+            finally:
+                response.release()
+    
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+    
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+    
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+    
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+    
+    def stats(self):
+        """Per-host request counters for diagnostics"""
+        return {host: stats.as_dict() for host, stats in sorted(self._stats.items())}
+    
+    async def close(self):
+        """Close the shared session and its pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def get_http_client():
+    """Get the bot-wide HTTP client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = HTTPClient()
+    return _client
+
+
+def configure_http_client(**kwargs):
+    """Replace the bot-wide HTTP client with one built from ``kwargs``.
+    
+    Must be called before anything has used the client (the bot does this
+    from its config at startup).
+    """
+    global _client
+    if _client is not None and not _client.closed:
+        raise RuntimeError("HTTP client is already in use")
+    _client = HTTPClient(**kwargs)
+    return _client
+
+
+async def close_http_client():
+    """Close the bot-wide HTTP client (used on bot shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
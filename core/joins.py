@@ -0,0 +1,231 @@
+import time
+import inspect
+import logging
+import discord
+
+logger = logging.getLogger('bot')
+
+# Verdicts a join gate can reach
+ALLOW = "allow"
+TIMEOUT = "timeout"
+KICK = "kick"
+BAN = "ban"
+
+
+class JoinVerdict:
+    """What a join gate decided about a new member"""
+    
+    __slots__ = ('action', 'reason', 'timeout')
+    
+    def __init__(self, action=ALLOW, reason=None, timeout=None):
+        self.action = action
+        self.reason = reason
+        # timedelta, for TIMEOUT verdicts
+        self.timeout = timeout
+    
+    @property
+    def removed(self):
+        """Whether the member was kicked or banned, so nothing else should run"""
+        return self.action in (KICK, BAN)
+
+
+class StageStats:
+    """Timing for one pipeline stage"""
+    
+    __slots__ = ('runs', 'errors', 'total', 'max')
+    
+    def __init__(self):
+        self.runs = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, elapsed, error=False):
+        self.runs += 1
+        self.errors += error
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+    
+    def as_dict(self):
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "avg_ms": round(self.total * 1000 / self.runs, 2) if self.runs else 0.0,
+            "max_ms": round(self.max * 1000, 2)
+        }
+
+
+class JoinPipeline:
+    """Runs every cog's on_member_join work in a fixed order.
+    
+    1. Gates (antiraid) judge the member first and carry out kicks and bans
+       themselves. The first verdict other than ALLOW wins; if the member
+       was removed, nothing else runs.
+    2. Role providers (auto roles, sticky roles) each return the roles they
+       want the member to have. All of them are applied with one
+       ``member.edit``, together with a timeout verdict if there is one,
+       instead of one REST call per role and per cog.
+    3. Followers (counters) run last, for members who stayed.
+    
+    Gates and followers are coroutines taking the member; providers are
+    plain functions returning an iterable of roles. Every stage is timed.
+    """
+    
+    def __init__(self):
+        self._gates = {}
+        self._providers = {}
+        self._followers = {}
+        self._stats = {}
+        self.joins = 0
+        self.removed = 0
+        self.edits = 0
+        # Role grants merged into the single edit (each was its own call before)
+        self.merged_roles = 0
+    
+    def add_gate(self, name, gate):
+        self._gates[name] = gate
+    
+    def add_role_provider(self, name, provider):
+        self._providers[name] = provider
+    
+    def add_follower(self, name, follower):
+        self._followers[name] = follower
+    
+    def remove(self, name):
+        """Drop a gate, role provider or follower registered under ``name``"""
+        self._gates.pop(name, None)
+        self._providers.pop(name, None)
+        self._followers.pop(name, None)
+    
+    def _record(self, stage, started, error=False):
+        stats = self._stats.get(stage)
+        if stats is None:
+            stats = self._stats[stage] = StageStats()
+        stats.record(time.perf_counter() - started, error)
+    
+    async def handle(self, member):
+        """on_member_join listener"""
+        self.joins += 1
+        started = time.perf_counter()
+        
+        verdict = await self._judge(member)
+        if verdict.removed:
+            self.removed += 1
+            self._record("total", started)
+            return
+        
+        await self._apply_roles(member, verdict)
+        
+        for name, follower in list(self._followers.items()):
+            stage_started = time.perf_counter()
+            try:
+                result = follower(member)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error in join follower {name}: {e}")
+                self._record(f"follow:{name}", stage_started, error=True)
+            else:
+                self._record(f"follow:{name}", stage_started)
+        
+        self._record("total", started)
+    
+    async def _judge(self, member):
+        verdict = JoinVerdict()
+        for name, gate in list(self._gates.items()):
+            stage_started = time.perf_counter()
+            try:
+                result = await gate(member)
+            except Exception as e:
+                logger.error(f"Error in join gate {name}: {e}")
+                self._record(f"gate:{name}", stage_started, error=True)
+                continue
+            self._record(f"gate:{name}", stage_started)
+            if result is not None and result.action != ALLOW:
+                verdict = result
+                if verdict.removed:
+                    break
+        return verdict
+    
+    async def _apply_roles(self, member, verdict):
+        roles = {}
+        contributions = {}
+        for name, provider in list(self._providers.items()):
+            stage_started = time.perf_counter()
+            try:
+                # Roles the bot can't grant would make the whole edit fail
+                contributed = [
+                    role for role in provider(member)
+                    if role not in member.roles and role.is_assignable()
+                ]
+            except Exception as e:
+                logger.error(f"Error in join role provider {name}: {e}")
+                self._record(f"roles:{name}", stage_started, error=True)
+                continue
+            self._record(f"roles:{name}", stage_started)
+            if contributed:
+                contributions[name] = contributed
+                for role in contributed:
+                    roles[role.id] = role
+        
+        sources = list(contributions)
+        kwargs = {}
+        if roles:
+            kwargs["roles"] = [role for role in member.roles if not role.is_default()] + list(roles.values())
+        if verdict.action == TIMEOUT and verdict.timeout:
+            kwargs["timed_out_until"] = discord.utils.utcnow() + verdict.timeout
+            sources.append(verdict.reason or "timeout")
+        if not kwargs:
+            return
+        
+        stage_started = time.perf_counter()
+        try:
+            await member.edit(reason=f"Member join: {', '.join(sources)}", **kwargs)
+        except discord.HTTPException as e:
+            logger.error(f"Failed to apply join roles to {member} in {member.guild.name}: {e}")
+            self._record("edit", stage_started, error=True)
+            await self._apply_separately(member, kwargs, contributions)
+            return
+        self._record("edit", stage_started)
+        self.edits += 1
+        self.merged_roles += len(roles)
+    
+    async def _apply_separately(self, member, kwargs, contributions):
+        """Fallback when the merged edit is rejected, so one bad part can't cost every join role.
+        
+        The edit is retried without the timeout (Moderate Members is a
+        separate permission); if that fails too, each provider's roles are
+        added on their own.
+        """
+        if "timed_out_until" in kwargs and "roles" in kwargs:
+            stage_started = time.perf_counter()
+            try:
+                await member.edit(roles=kwargs["roles"], reason=f"Member join: {', '.join(contributions)}")
+            except discord.HTTPException as e:
+                logger.error(f"Failed to apply join roles without timeout to {member} in {member.guild.name}: {e}")
+                self._record("edit:retry", stage_started, error=True)
+            else:
+                self._record("edit:retry", stage_started)
+                self.edits += 1
+                self.merged_roles += sum(len(contributed) for contributed in contributions.values())
+                return
+        
+        for name, contributed in contributions.items():
+            stage_started = time.perf_counter()
+            try:
+                await member.add_roles(*contributed, reason=f"Member join: {name}")
+            except discord.HTTPException as e:
+                logger.error(f"Failed to add {name} join roles to {member} in {member.guild.name}: {e}")
+                self._record(f"add:{name}", stage_started, error=True)
+            else:
+                self._record(f"add:{name}", stage_started)
+    
+    def stats(self):
+        """Per-stage timings plus join counters, for diagnostics"""
+        return {
+            "joins": self.joins,
+            "removed": self.removed,
+            "edits": self.edits,
+            "merged_roles": self.merged_roles,
+            "stages": {stage: stats.as_dict() for stage, stats in sorted(self._stats.items())}
+        }
@@ -0,0 +1,80 @@
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger('bot')
+
+
+class LoopLagProbe:
+    """Measures how late the event loop wakes up a sleeping task.
+    
+    A background task repeatedly sleeps for ``interval`` seconds and records
+    how much longer than that the sleep actually took. Any coroutine that
+    blocks the loop (synchronous disk or network I/O, heavy CPU work) shows
+    up directly as lag.
+    
+    Usage::
+    
+        async with LoopLagProbe() as probe:
+            await do_work()
+        print(probe.summary())
+    """
+    
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+        self._sleep_started = None
+        
+    async def _run(self):
+        while True:
+            self._sleep_started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._record()
+    
+    def _record(self):
+        lag = time.perf_counter() - self._sleep_started - self.interval
+        self.samples.append(max(0.0, lag))
+        self._sleep_started = None
+    
+    def start(self):
+        """Start sampling in the background"""
+        if self._task is None:
+            self.samples = []
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop sampling"""
+        if self._task is not None:
+            # A stall right before stopping would otherwise never be sampled
+            if self._sleep_started is not None:
+                self._record()
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def __aenter__(self):
+        self.start()
+        # Let the sampler take its first sleep before the measured work begins
+        await asyncio.sleep(0)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+    
+    def summary(self):
+        """Max, 99th percentile and mean lag in milliseconds"""
+        if not self.samples:
+            return {"samples": 0, "max_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+            
+        ordered = sorted(self.samples)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return {
+            "samples": len(ordered),
+            "max_ms": ordered[-1] * 1000,
+            "p99_ms": p99 * 1000,
+            "mean_ms": sum(ordered) / len(ordered) * 1000
+        }
@@ -0,0 +1,212 @@
+import re
+from collections import deque
+
+import regex
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Longest user-supplied regex accepted by compile_filter_pattern
+MAX_PATTERN_LENGTH = 300
+
+_REPEAT_OPS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+
+def _is_word_char(ch):
+    """Same notion of a word character as ``\\w`` in a str regex"""
+    return ch.isalnum() or ch == '_'
+
+
+class TriggerMatcher:
+    """Finds every trigger phrase contained in a message in a single pass.
+    
+    The triggers are compiled once into an Aho-Corasick automaton, so a scan
+    costs O(len(text) + matches) no matter how many triggers there are. With
+    ``word_boundaries`` (the default) a trigger only counts when it would
+    also match ``\\b<trigger>\\b`` as a regex, and overlapping triggers
+    ("good" and "good morning") are all reported.
+    
+    Usage::
+    
+        matcher = TriggerMatcher(["hello", "good morning"])
+        matcher.matches("Good morning, hello!")  # ["hello", "good morning"]
+    
+    Matches are returned in the order the triggers were given, each at most
+    once. Build a new matcher when the trigger list changes.
+    """
+    
+    def __init__(self, triggers, word_boundaries=True, case_sensitive=False):
+        self.word_boundaries = word_boundaries
+        self.case_sensitive = case_sensitive
+        self.triggers = []
+        
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        
+        patterns = []
+        seen = set()
+        for trigger in triggers:
+            pattern = trigger if case_sensitive else trigger.lower()
+            if not pattern or pattern in seen:
+                continue
+            seen.add(pattern)
+            self.triggers.append(trigger)
+            patterns.append(pattern)
+        
+        self._lengths = [len(pattern) for pattern in patterns]
+        self._starts_word = [_is_word_char(pattern[0]) for pattern in patterns]
+        self._ends_word = [_is_word_char(pattern[-1]) for pattern in patterns]
+        
+        self._build(patterns)
+    
+    def __len__(self):
+        return len(self.triggers)
+    
+    def _build(self, patterns):
+        goto = self._goto
+        output = [[]]
+        
+        # Trie of every pattern
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append(index)
+        
+        # Breadth-first failure links, merging outputs along the way
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(ch, 0)
+                output[child].extend(output[fail[child]])
+        
+        self._fail = fail
+        self._output = [tuple(indexes) for indexes in output]
+    
+    def _iter_matches(self, text):
+        """Yield (trigger index, end position) for every raw match"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in output[state]:
+                yield index, position
+    
+    def _on_boundaries(self, text, index, end):
+        start = end - self._lengths[index] + 1
+        before = start > 0 and _is_word_char(text[start - 1])
+        after = end + 1 < len(text) and _is_word_char(text[end + 1])
+        return before != self._starts_word[index] and after != self._ends_word[index]
+    
+    def search(self, text):
+        """The first trigger found in ``text`` (by position), or None.
+        
+        Stops scanning at the first hit, which is all a yes/no filter needs.
+        """
+        if not self.triggers or not text:
+            return None
+        
+        if not self.case_sensitive:
+            text = text.lower()
+        
+        for index, end in self._iter_matches(text):
+            if not self.word_boundaries or self._on_boundaries(text, index, end):
+                return self.triggers[index]
+        return None
+    
+    def matches(self, text):
+        """Every trigger found in ``text``, in trigger order"""
+        if not self.triggers or not text:
+            return []
+        
+        if not self.case_sensitive:
+            text = text.lower()
+        
+        found = set()
+        for index, end in self._iter_matches(text):
+            if index in found:
+                continue
+            if self.word_boundaries and not self._on_boundaries(text, index, end):
+                continue
+            found.add(index)
+        
+        return [self.triggers[index] for index in sorted(found)]
+
+
+def _has_risky_repeat(parsed, inside_repeat=False):
+    """True if an unbounded repeat wraps another quantifier or an alternation.
+    
+    Shapes like ``(a+)+``, ``(\\w+\\s?)*`` or ``(a|a)*`` give a backtracking
+    engine exponentially many ways to split a near-miss, so they are refused
+    up front. Possessive repeats and atomic groups never backtrack and are
+    skipped.
+    """
+    for op, av in parsed:
+        if op in _REPEAT_OPS:
+            min_repeat, max_repeat, sub = av
+            if inside_repeat and min_repeat != max_repeat:
+                return True
+            if _has_risky_repeat(sub, inside_repeat or max_repeat == sre_parse.MAXREPEAT):
+                return True
+        elif op == sre_parse.SUBPATTERN:
+            if _has_risky_repeat(av[-1], inside_repeat):
+                return True
+        elif op == sre_parse.BRANCH:
+            if inside_repeat:
+                return True
+            if any(_has_risky_repeat(sub, inside_repeat) for sub in av[1]):
+                return True
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if _has_risky_repeat(av[1], inside_repeat):
+                return True
+        elif op == sre_parse.GROUPREF_EXISTS:
+            if inside_repeat:
+                return True
+            if any(sub is not None and _has_risky_repeat(sub, inside_repeat) for sub in av[1:]):
+                return True
+    return False
+
+
+def compile_filter_pattern(pattern, flags=re.IGNORECASE):
+    """Compile a user-supplied filter regex, or raise ValueError saying why not.
+    
+    Rejects patterns that do not compile, are longer than MAX_PATTERN_LENGTH,
+    or repeat a quantified group or an alternation without bound (the usual
+    catastrophic-backtracking shapes). The result is a ``regex`` pattern, so
+    callers can pass ``timeout=`` to ``search``.
+    """
+    if not pattern:
+        raise ValueError("pattern is empty")
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise ValueError(f"pattern is longer than {MAX_PATTERN_LENGTH} characters")
+    
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+        compiled = regex.compile(pattern, flags)
+    except (re.error, regex.error) as e:
+        raise ValueError(f"invalid regex: {e}")
+    
+    if _has_risky_repeat(parsed):
+        raise ValueError("repeating a quantified group or an alternation, such as (a+)+ or (a|ab)*, can hang the filter")
+    
+    return compiled
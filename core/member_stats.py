@@ -0,0 +1,216 @@
+import bisect
+from datetime import timezone
+
+# Presence buckets; anything else (invisible, unknown) counts as offline
+STATUSES = ("online", "idle", "dnd", "offline")
+
+
+def _status_of(member):
+    status = str(member.status)
+    return status if status in STATUSES else "offline"
+
+
+def _counted(member):
+    """What a member contributes to the counters: (is bot, status, boosting)"""
+    return (member.bot, _status_of(member), member.premium_since is not None)
+
+
+def _joined_key(member):
+    return (member.joined_at.timestamp(), member.id) if member.joined_at else None
+
+
+class GuildMemberStats:
+    """Counters and a join-time index for one guild's cached members"""
+    
+    def __init__(self, guild):
+        self.guild = guild
+        self.humans = 0
+        self.bots = 0
+        self.boosters = 0
+        # (is bot, status) -> members
+        self._status = {(is_bot, status): 0 for is_bot in (False, True) for status in STATUSES}
+        # member id -> ((is bot, status, boosting) as last counted, join index key)
+        self._members = {}
+        # Bot member ids, in the order they were seen
+        self._bot_ids = {}
+        # Sorted (joined_at timestamp, member id) pairs
+        self._joined = []
+        
+        # Built in one pass and sorted once, rather than inserting member by member
+        for member in guild.members:
+            counted = _counted(member)
+            key = _joined_key(member)
+            self._members[member.id] = (counted, key)
+            self._count(counted, 1)
+            if member.bot:
+                self._bot_ids[member.id] = None
+            if key is not None:
+                self._joined.append(key)
+        self._joined.sort()
+    
+    @property
+    def total(self):
+        return self.humans + self.bots
+    
+    def add(self, member):
+        if member.id in self._members:
+            self.remove(member.id)
+        counted = _counted(member)
+        key = _joined_key(member)
+        self._members[member.id] = (counted, key)
+        self._count(counted, 1)
+        if member.bot:
+            self._bot_ids[member.id] = None
+        if key is not None:
+            bisect.insort(self._joined, key)
+    
+    def remove(self, member_id):
+        entry = self._members.pop(member_id, None)
+        if entry is None:
+            return
+        counted, key = entry
+        self._count(counted, -1)
+        self._bot_ids.pop(member_id, None)
+        if key is not None:
+            index = bisect.bisect_left(self._joined, key)
+            if index < len(self._joined) and self._joined[index] == key:
+                del self._joined[index]
+    
+    def update(self, member):
+        """Re-count a member whose status or boost changed"""
+        entry = self._members.get(member.id)
+        if entry is None:
+            self.add(member)
+            return
+        counted, key = entry
+        new = _counted(member)
+        if new != counted:
+            self._count(counted, -1)
+            self._count(new, 1)
+            self._members[member.id] = (new, key)
+    
+    def _count(self, entry, delta):
+        is_bot, status, boosting = entry
+        if is_bot:
+            self.bots += delta
+        else:
+            self.humans += delta
+        if boosting:
+            self.boosters += delta
+        self._status[(is_bot, status)] += delta
+    
+    def status_counts(self, bots=None):
+        """Members per status; ``bots`` True/False limits it to bots or humans"""
+        return {
+            status: sum(
+                count for (is_bot, bucket), count in self._status.items()
+                if bucket == status and (bots is None or is_bot == bots)
+            )
+            for status in STATUSES
+        }
+    
+    def bot_members(self):
+        """Cached bot members"""
+        members = (self.guild.get_member(member_id) for member_id in self._bot_ids)
+        return [member for member in members if member is not None]
+    
+    def _newest(self, check=None, stop=None):
+        for joined, member_id in reversed(self._joined):
+            if stop is not None and joined <= stop:
+                return
+            member = self.guild.get_member(member_id)
+            if member is not None and (check is None or check(member)):
+                yield member
+    
+    def recent(self, count, check=None):
+        """The ``count`` most recently joined members (passing ``check``), newest first"""
+        members = []
+        if count <= 0:
+            return members
+        for member in self._newest(check):
+            members.append(member)
+            if len(members) >= count:
+                break
+        return members
+    
+    def joined_since(self, since, check=None):
+        """Members (passing ``check``) who joined after ``since``, newest first.
+        
+        Naive datetimes are taken as UTC, matching ``datetime.utcnow()``.
+        """
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return list(self._newest(check, stop=since.timestamp()))
+
+
+class MemberStatsIndex:
+    """Per-guild member counts kept up to date from gateway events.
+    
+    Commands used to walk ``guild.members`` several times per call to count
+    humans, bots and statuses, and sorted the whole guild to find its
+    newest members. A guild's stats are built from its member cache the
+    first time they are asked for; after that the member join, remove,
+    update and presence events adjust the counters in O(1) and keep a
+    join-time-ordered index, so::
+        
+        stats = bot.member_stats.get(guild)
+        stats.humans, stats.bots, stats.status_counts()
+        stats.recent(10)
+    
+    never touch the full member list.
+    """
+    
+    def __init__(self):
+        self._guilds = {}
+        self.builds = 0
+    
+    def get(self, guild):
+        """Stats for ``guild``, built from its member cache on first use"""
+        stats = self._guilds.get(guild.id)
+        if stats is None:
+            stats = self._guilds[guild.id] = GuildMemberStats(guild)
+            self.builds += 1
+        return stats
+    
+    def listeners(self):
+        """(event name, coroutine) pairs to register with ``bot.add_listener``"""
+        return [
+            ("on_member_join", self.on_member_join),
+            ("on_member_remove", self.on_member_remove),
+            ("on_member_update", self.on_member_update),
+            ("on_presence_update", self.on_presence_update),
+            ("on_guild_available", self.on_guild_reset),
+            ("on_guild_remove", self.on_guild_reset),
+        ]
+    
+    async def on_member_join(self, member):
+        stats = self._guilds.get(member.guild.id)
+        if stats is not None:
+            stats.add(member)
+    
+    async def on_member_remove(self, member):
+        stats = self._guilds.get(member.guild.id)
+        if stats is not None:
+            stats.remove(member.id)
+    
+    async def on_member_update(self, before, after):
+        stats = self._guilds.get(after.guild.id)
+        if stats is not None:
+            stats.update(after)
+    
+    async def on_presence_update(self, before, after):
+        stats = self._guilds.get(after.guild.id)
+        if stats is not None:
+            stats.update(after)
+    
+    async def on_guild_reset(self, guild):
+        # The member cache was (re)filled or is gone; rebuild on next use
+        self._guilds.pop(guild.id, None)
+    
+    def stats(self):
+        """Indexed guild and member counts, for diagnostics"""
+        return {
+            "guilds": len(self._guilds),
+            "members": sum(stats.total for stats in self._guilds.values()),
+            "builds": self.builds
+        }
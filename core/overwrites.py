@@ -0,0 +1,132 @@
+import time
+import asyncio
+import logging
+import discord
+
+logger = logging.getLogger('bot')
+
+# Channels whose overwrites are edited at once
+DEFAULT_CONCURRENCY = 8
+# Seconds between progress callbacks, so status messages are not edited on every channel
+PROGRESS_INTERVAL = 2.0
+# Extra attempts for a change that fails with a server error
+RETRIES = 2
+
+
+class OverwriteChange:
+    """One permission overwrite to set; an empty or None overwrite removes it"""
+    
+    __slots__ = ('channel', 'target', 'overwrite', 'reason', 'error')
+    
+    def __init__(self, channel, target, overwrite, reason=None):
+        self.channel = channel
+        self.target = target
+        self.overwrite = overwrite
+        self.reason = reason
+        self.error = None
+
+
+class BulkResult:
+    """Outcome of an ``OverwriteExecutor.apply`` run"""
+    
+    __slots__ = ('applied', 'failed', 'elapsed')
+    
+    def __init__(self, applied, failed, elapsed):
+        self.applied = applied
+        self.failed = failed  # [OverwriteChange] with .error set
+        self.elapsed = elapsed
+
+
+class OverwriteExecutor:
+    """Applies many permission overwrite edits concurrently.
+    
+    Discord rate limits overwrite edits per channel, so changes are grouped
+    by channel: one channel's changes run in order, while up to
+    ``concurrency`` channels are edited at once. Server errors are retried;
+    anything else is recorded on the change and the rest carry on.
+    """
+    
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY):
+        self.concurrency = concurrency
+    
+    async def apply_one(self, channel, target, overwrite, reason=None):
+        """Set a single overwrite, raising on failure like ``set_permissions``"""
+        if overwrite is not None and overwrite.is_empty():
+            overwrite = None
+        await channel.set_permissions(target, overwrite=overwrite, reason=reason)
+    
+    async def _apply_change(self, change):
+        for attempt in range(RETRIES + 1):
+            try:
+                await self.apply_one(change.channel, change.target, change.overwrite, change.reason)
+                return True
+            except discord.HTTPException as e:
+                if e.status < 500 or attempt == RETRIES:
+                    change.error = e
+                    return False
+                await asyncio.sleep(1 + attempt)
+            except Exception as e:
+                change.error = e
+                return False
+    
+    async def apply(self, changes, on_progress=None):
+        """Apply ``changes``; ``on_progress(done, total)`` is awaited every few seconds and at the end"""
+        changes = list(changes)
+        started = time.monotonic()
+        by_channel = {}
+        for change in changes:
+            by_channel.setdefault(change.channel.id, []).append(change)
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        done = 0
+        failed = []
+        
+        async def run_channel(channel_changes):
+            nonlocal done
+            async with semaphore:
+                for change in channel_changes:
+                    if not await self._apply_change(change):
+                        failed.append(change)
+                    done += 1
+        
+        async def report():
+            reported = -1
+            while True:
+                await asyncio.sleep(PROGRESS_INTERVAL)
+                if done != reported:
+                    reported = done
+                    try:
+                        await on_progress(done, len(changes))
+                    except Exception as e:
+                        logger.error(f"Error reporting overwrite progress: {e}")
+        
+        reporter = asyncio.create_task(report()) if on_progress else None
+        try:
+            await asyncio.gather(*(run_channel(group) for group in by_channel.values()))
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+        
+        if on_progress:
+            try:
+                await on_progress(done, len(changes))
+            except Exception as e:
+                logger.error(f"Error reporting overwrite progress: {e}")
+        
+        return BulkResult(len(changes) - len(failed), failed, time.monotonic() - started)
+    
+    async def post(self, channels, **kwargs):
+        """Send the same message to several channels concurrently; returns how many were sent"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def send(channel):
+            async with semaphore:
+                try:
+                    await channel.send(**kwargs)
+                    return True
+                except Exception:
+                    # Can't send the notice, but the overwrite still applies
+                    return False
+        
+        results = await asyncio.gather(*(send(channel) for channel in channels))
+        return sum(results)
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('bot')
+
+# Seconds to wait after a save request so a burst of changes to one file is written once
+SAVE_DELAY = 1.0
+
+_store = None
+
+
+def write_atomic(path, contents):
+    """Write ``contents`` to a temp file next to ``path`` and swap it in.
+    
+    The rename is atomic, so a crash mid-write leaves the previous file
+    intact instead of a truncated one.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_file = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(contents)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, path)
+    except BaseException:
+        os.unlink(temp_file)
+        raise
+
+
+class WriteStats:
+    """Write counters for the files in one directory"""
+    
+    __slots__ = ('requests', 'writes', 'errors', 'bytes', 'total_latency', 'max_latency')
+    
+    def __init__(self):
+        self.requests = 0
+        self.writes = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+    
+    def record(self, latency, size=None):
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        if size is None:
+            self.errors += 1
+        else:
+            self.writes += 1
+            self.bytes += size
+    
+    def as_dict(self):
+        attempts = self.writes + self.errors
+        return {
+            "requests": self.requests,
+            "writes": self.writes,
+            "coalesced": max(0, self.requests - attempts),
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "avg_ms": round(self.total_latency * 1000 / attempts, 1) if attempts else 0.0,
+            "max_ms": round(self.max_latency * 1000, 1)
+        }
+
+
+class _PendingFile:
+    __slots__ = ('path', 'data', 'indent', 'pending', 'writing', 'task')
+    
+    def __init__(self, path):
+        self.path = path
+        self.data = None
+        self.indent = 4
+        self.pending = False
+        self.writing = False
+        self.task = None
+
+
+class JSONStore:
+    """Debounced, atomic JSON file writes shared by every cog.
+    
+    ``save(path, data)`` only records that ``path`` should hold ``data``;
+    repeated saves of the same file within ``delay`` seconds are written
+    once, from the latest data. Serializing and writing happen on a single
+    worker thread, so the event loop never blocks on disk, and each file
+    is replaced atomically.
+    
+    ``data`` is the cog's live object and is read at write time. If the
+    loop changes it while the worker is serializing, the write is redone
+    from the event loop; any save requested during a write triggers
+    another pass, so the file always ends up with the latest state.
+    
+    ``close()`` (called by the bot on shutdown) writes everything that is
+    still pending.
+    
+    Per-file state is dropped once a file has been written, and counters
+    are kept per directory, so per-user files such as ``seen/<id>.json``
+    do not grow the store.
+    """
+    
+    def __init__(self, delay=SAVE_DELAY):
+        self.delay = delay
+        self._files = {}
+        self._stats = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="json-store")
+    
+    def save(self, path, data, indent=4):
+        """Schedule ``data`` to be written to ``path`` as JSON"""
+        self._dir_stats(path).requests += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (startup scripts); write straight away
+            self._write(path, data, indent)
+            return
+        
+        entry = self._files.get(path)
+        if entry is None:
+            entry = self._files[path] = _PendingFile(path)
+        entry.data = data
+        entry.indent = indent
+        entry.pending = True
+        if entry.task is None or entry.task.done():
+            entry.task = loop.create_task(self._save_later(entry))
+    
+    def pending(self):
+        """Paths with changes that have not been written yet"""
+        return [path for path, entry in self._files.items() if entry.pending]
+    
+    def _dir_stats(self, path):
+        directory = os.path.dirname(path) or "."
+        stats = self._stats.get(directory)
+        if stats is None:
+            stats = self._stats[directory] = WriteStats()
+        return stats
+    
+    def _release(self, entry):
+        """Forget a file's state once nothing is left to write"""
+        if not entry.pending and not entry.writing and self._files.get(entry.path) is entry:
+            del self._files[entry.path]
+    
+    def _write(self, path, data, indent, contents=None):
+        """Serialize (unless already done) and write one file; runs on the worker thread"""
+        started = time.perf_counter()
+        try:
+            if contents is None:
+                contents = json.dumps(data, indent=indent)
+            write_atomic(path, contents)
+        except RuntimeError:
+            # The data changed size while being serialized off the loop; the caller retries
+            raise
+        except Exception as e:
+            self._dir_stats(path).record(time.perf_counter() - started)
+            logger.error(f"Error saving {path}: {e}")
+            return
+        self._dir_stats(path).record(time.perf_counter() - started, len(contents))
+    
+    async def _save_later(self, entry):
+        await asyncio.sleep(self.delay)
+        await self._drain(entry)
+        self._release(entry)
+    
+    async def _drain(self, entry):
+        loop = asyncio.get_running_loop()
+        entry.writing = True
+        try:
+            # Saves requested while a write is in flight are picked up by the next pass
+            while entry.pending:
+                entry.pending = False
+                data, indent = entry.data, entry.indent
+                try:
+                    await loop.run_in_executor(self._executor, self._write, entry.path, data, indent)
+                except RuntimeError:
+                    # Snapshot on the loop instead, where nothing can change it mid-dump
+                    await loop.run_in_executor(
+                        self._executor, self._write, entry.path, data, indent, json.dumps(data, indent=indent)
+                    )
+        finally:
+            entry.writing = False
+    
+    async def flush(self, path=None):
+        """Write pending changes now, for one file or all of them"""
+        if path is None:
+            entries = list(self._files.values())
+        else:
+            entries = [self._files[path]] if path in self._files else []
+        
+        for entry in entries:
+            task = entry.task
+            if task is not None and not task.done():
+                if entry.writing:
+                    # Already writing; let it finish, including any changes since
+                    await task
+                    continue
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            if entry.pending:
+                await self._drain(entry)
+            self._release(entry)
+    
+    def stats(self):
+        """Per-directory write counters for diagnostics"""
+        return {directory: stats.as_dict() for directory, stats in sorted(self._stats.items())}
+    
+    async def close(self):
+        """Write everything still pending and stop the worker thread"""
+        await self.flush()
+        self._executor.shutdown(wait=True)
+
+
+def get_json_store():
+    """Get the bot-wide JSON store, creating it on first use"""
+    global _store
+    if _store is None:
+        _store = JSONStore()
+    return _store
+
+
+async def close_json_store():
+    """Flush and close the bot-wide JSON store (used on bot shutdown)"""
+    global _store
+    if _store is not None:
+        await _store.close()
+        _store = None
@@ -0,0 +1,176 @@
+import random
+
+# Enough skiplist levels for tens of millions of entries
+MAX_LEVELS = 24
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+    
+    def __init__(self, key, levels):
+        self.key = key
+        self.next = [None] * levels
+        # width[i] is how many positions next[i] is ahead of this node
+        self.width = [1] * levels
+
+
+class RankIndex:
+    """In-memory leaderboard ordered by score, highest first.
+    
+    Backed by an indexable skiplist, so updating a member's score, looking up
+    a member's rank and reading the top N are all O(log n) (plus N for the
+    slice) instead of re-sorting every entry. Ties are broken by member, so
+    members must be mutually orderable (e.g. all str user IDs).
+    
+    Usage::
+    
+        index = RankIndex()
+        index.update("123", 500)
+        index.top(10)      # [("123", 500)]
+        index.rank("123")  # 1
+    """
+    
+    def __init__(self):
+        self._scores = {}
+        self._head = _Node(None, MAX_LEVELS)
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def __contains__(self, member):
+        return member in self._scores
+    
+    def score(self, member):
+        """Current score for a member, or None"""
+        return self._scores.get(member)
+    
+    def update(self, member, score):
+        """Set a member's score, inserting it if it is new"""
+        old_score = self._scores.get(member)
+        if old_score is not None:
+            if old_score == score:
+                return
+            self._remove_key((-old_score, member))
+        self._scores[member] = score
+        self._insert_key((-score, member))
+    
+    def load(self, items):
+        """Replace the contents with (member, score) pairs in one pass.
+        
+        Sorting once and linking the skiplist in order is much cheaper than
+        calling update() for every entry when building a large index.
+        """
+        self._scores = dict(items)
+        self._head = _Node(None, MAX_LEVELS)
+        self._size = len(self._scores)
+        
+        last = [self._head] * MAX_LEVELS
+        last_position = [0] * MAX_LEVELS
+        keys = sorted((-score, member) for member, score in self._scores.items())
+        for position, key in enumerate(keys, start=1):
+            node = _Node(key, self._random_levels())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_position[level]
+                last[level] = node
+                last_position[level] = position
+        
+        # The final link on every level points past the end
+        for level in range(MAX_LEVELS):
+            last[level].width[level] = self._size + 1 - last_position[level]
+    
+    def discard(self, member):
+        """Remove a member if it is present"""
+        old_score = self._scores.pop(member, None)
+        if old_score is not None:
+            self._remove_key((-old_score, member))
+    
+    def rank(self, member):
+        """1-based position of a member, or None if it is not indexed"""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        
+        key = (-score, member)
+        node = self._head
+        position = 0
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position + 1
+    
+    def top(self, limit=10, offset=0):
+        """The ``limit`` highest (member, score) pairs, skipping ``offset``"""
+        results = []
+        node = self._at(offset)
+        while node is not None and len(results) < limit:
+            results.append((node.key[1], -node.key[0]))
+            node = node.next[0]
+        return results
+    
+    def _at(self, offset):
+        """The node at a 0-based position, or None past the end"""
+        if offset < 0 or offset >= self._size:
+            return None
+        
+        node = self._head
+        remaining = offset + 1
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+    
+    @staticmethod
+    def _random_levels():
+        levels = 1
+        while levels < MAX_LEVELS and random.random() < 0.5:
+            levels += 1
+        return levels
+    
+    def _insert_key(self, key):
+        levels = self._random_levels()
+        
+        chain = [None] * MAX_LEVELS
+        steps_at_level = [0] * MAX_LEVELS
+        node = self._head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        
+        new_node = _Node(key, levels)
+        steps = 0
+        for level in range(levels):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+    
+    def _remove_key(self, key):
+        chain = [None] * MAX_LEVELS
+        node = self._head
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
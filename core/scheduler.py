@@ -0,0 +1,231 @@
+import time
+import json
+import heapq
+import asyncio
+import logging
+from datetime import datetime, timezone
+from itertools import count
+
+from .database import get_pool
+
+logger = logging.getLogger('bot')
+
+DEFAULT_DB_PATH = "data/scheduler.db"
+
+
+class ScheduledJob:
+    """One pending timer"""
+    
+    __slots__ = ('kind', 'key', 'due', 'payload')
+    
+    def __init__(self, kind, key, due, payload):
+        self.kind = kind
+        self.key = key
+        self.due = due
+        self.payload = payload
+
+
+class Scheduler:
+    """Durable one-shot timers shared by every cog.
+    
+    Jobs are stored in SQLite and kept in an in-memory heap, and a single
+    task sleeps until the earliest one is due, so each job fires at its due
+    time without anything polling. On startup every stored job is re-armed;
+    jobs that came due while the bot was down fire immediately.
+    
+    Each job has a ``kind`` (which handler runs it) and a ``key`` that is
+    unique within the kind, so scheduling the same key again moves the
+    existing timer instead of adding a second one::
+    
+        bot.scheduler.register("reminder", self.fire_reminder)
+        await bot.scheduler.schedule("reminder", f"{user_id}:{reminder_id}", expires, {"user_id": user_id})
+        await bot.scheduler.cancel("reminder", f"{user_id}:{reminder_id}")
+    
+    Handlers are coroutines taking the ``ScheduledJob``. A job is removed
+    from disk once its handler returns (or raises), so a crash mid-handler
+    means it runs again after restart.
+    """
+    
+    def __init__(self, db_path=DEFAULT_DB_PATH, wait_until=None):
+        self.pool = get_pool(db_path)
+        # Optional coroutine function awaited before the first job fires
+        self.wait_until = wait_until
+        
+        self._handlers = {}
+        self._jobs = {}  # (kind, key) -> ScheduledJob
+        self._heap = []
+        self._parked = {}  # kind -> [jobs that came due before a handler was registered]
+        self._sequence = count()
+        self._wakeup = asyncio.Event()
+        self._runner = None
+        self._running = set()
+        self.fired = 0
+    
+    def __len__(self):
+        return len(self._jobs)
+    
+    async def start(self):
+        """Create the table, re-arm stored jobs and start the timer task"""
+        async with self.pool.write() as db:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    due REAL NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+            """)
+        
+        async with self.pool.read() as db:
+            async with db.execute("SELECT kind, key, due, payload FROM scheduled_jobs") as cursor:
+                rows = await cursor.fetchall()
+        
+        for row in rows:
+            self._arm(ScheduledJob(row["kind"], row["key"], row["due"], json.loads(row["payload"])))
+        logger.info(f"Scheduler re-armed {len(rows)} pending jobs")
+        
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+    
+    def register(self, kind, handler):
+        """Set the coroutine that runs jobs of ``kind``"""
+        self._handlers[kind] = handler
+        for job in self._parked.pop(kind, []):
+            if self._jobs.get((job.kind, job.key)) is job:
+                self._push(job)
+    
+    def unregister(self, kind):
+        """Remove ``kind``'s handler; its jobs wait on disk until one is registered again"""
+        self._handlers.pop(kind, None)
+    
+    async def schedule(self, kind, key, due, payload=None):
+        """Run ``kind``'s handler at ``due`` (a datetime or UNIX timestamp).
+        
+        Naive datetimes are taken as UTC, matching ``datetime.utcnow()``.
+        Replaces any pending job with the same kind and key.
+        """
+        if isinstance(due, datetime):
+            if due.tzinfo is None:
+                due = due.replace(tzinfo=timezone.utc)
+            due = due.timestamp()
+        key = str(key)
+        payload = payload or {}
+        
+        async with self.pool.write() as db:
+            await db.execute(
+                """
+                INSERT INTO scheduled_jobs (kind, key, due, payload) VALUES (?, ?, ?, ?)
+                ON CONFLICT (kind, key) DO UPDATE SET due = excluded.due, payload = excluded.payload
+                """,
+                (kind, key, due, json.dumps(payload))
+            )
+        
+        job = ScheduledJob(kind, key, due, payload)
+        self._arm(job)
+        return job
+    
+    async def cancel(self, kind, key):
+        """Drop a pending job; returns False if there was none"""
+        key = str(key)
+        job = self._jobs.pop((kind, key), None)
+        
+        async with self.pool.write() as db:
+            await db.execute("DELETE FROM scheduled_jobs WHERE kind = ? AND key = ?", (kind, key))
+        
+        return job is not None
+    
+    def get(self, kind, key):
+        """The pending job for a kind and key, or None"""
+        return self._jobs.get((kind, str(key)))
+    
+    def _arm(self, job):
+        # A replaced job stays in the heap but is skipped when popped
+        self._jobs[(job.kind, job.key)] = job
+        self._push(job)
+    
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.due, next(self._sequence), job))
+        if self._heap[0][2] is job:
+            self._wakeup.set()
+    
+    async def _run(self):
+        if self.wait_until is not None:
+            await self.wait_until()
+        
+        while True:
+            self._wakeup.clear()
+            
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            
+            due, _, job = self._heap[0]
+            delay = due - time.time()
+            if delay > 0:
+                # Sleep until the earliest job, or until an earlier one is added
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            heapq.heappop(self._heap)
+            if self._jobs.get((job.kind, job.key)) is not job:
+                continue  # Cancelled or rescheduled
+            
+            if job.kind not in self._handlers:
+                self._parked.setdefault(job.kind, []).append(job)
+                continue
+            
+            del self._jobs[(job.kind, job.key)]
+            task = asyncio.create_task(self._fire(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _fire(self, job):
+        try:
+            await self._handlers[job.kind](job)
+        except Exception as e:
+            logger.error(f"Error running scheduled {job.kind} job {job.key}: {e}")
+        finally:
+            self.fired += 1
+        
+        # The handler may have scheduled the same key again
+        if (job.kind, job.key) not in self._jobs:
+            try:
+                async with self.pool.write() as db:
+                    # Matching on due leaves a row alone if it was rescheduled meanwhile
+                    await db.execute(
+                        "DELETE FROM scheduled_jobs WHERE kind = ? AND key = ? AND due = ?",
+                        (job.kind, job.key, job.due)
+                    )
+            except Exception as e:
+                logger.error(f"Error removing scheduled {job.kind} job {job.key}: {e}")
+    
+    def stats(self):
+        """Pending job counts for diagnostics"""
+        per_kind = {}
+        for kind, _ in self._jobs:
+            per_kind[kind] = per_kind.get(kind, 0) + 1
+        next_due = min((job.due for job in self._jobs.values()), default=None)
+        return {
+            "pending": len(self._jobs),
+            "per_kind": per_kind,
+            "next_in": round(next_due - time.time(), 1) if next_due is not None else None,
+            "fired": self.fired,
+            "running": len(self._running)
+        }
+    
+    async def close(self):
+        """Stop the timer task; pending jobs stay on disk for the next start"""
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        
+        for task in list(self._running):
+            task.cancel()